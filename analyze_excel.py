@@ -1,29 +1,32 @@
-import pandas as pd
-import openpyxl
+from workbook_cache import load_sheets
 
-# Load the Excel file
-excel_file = 'Product Engineering Canonical Product Features.xlsx'
-wb = openpyxl.load_workbook(excel_file)
 
-print("Sheet names:")
-for sheet_name in wb.sheetnames:
-    print(f"  - {sheet_name}")
+def main():
+    # Load the Excel file (every sheet parsed once, reused from the cache when unchanged)
+    excel_file = 'Product Engineering Canonical Product Features.xlsx'
+    sheets = load_sheets(excel_file)
 
-print("\n" + "="*80 + "\n")
+    print("Sheet names:")
+    for sheet_name in sheets:
+        print(f"  - {sheet_name}")
 
-# Analyze each sheet
-for sheet_name in wb.sheetnames:
-    print(f"\nSheet: {sheet_name}")
-    print("-" * 80)
-    
-    # Read with pandas for easier analysis
-    df = pd.read_excel(excel_file, sheet_name=sheet_name)
-    
-    print(f"Shape: {df.shape[0]} rows x {df.shape[1]} columns")
-    print(f"\nColumns:")
-    for col in df.columns:
-        print(f"  - {col}")
-    
-    print(f"\nFirst few rows:")
-    print(df.head(3))
-    print("\n" + "="*80)
+    print("\n" + "="*80 + "\n")
+
+    # Analyze each sheet
+    for sheet_name, df in sheets.items():
+        print(f"\nSheet: {sheet_name}")
+        print("-" * 80)
+        
+        print(f"Shape: {df.shape[0]} rows x {df.shape[1]} columns")
+        print(f"\nColumns:")
+        for col in df.columns:
+            print(f"  - {col}")
+        
+        print(f"\nFirst few rows:")
+        print(df.head(3))
+        print("\n" + "="*80)
+
+
+# Sheets may be parsed in worker processes, which re-import this module under spawn
+if __name__ == '__main__':
+    main()
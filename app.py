@@ -4,19 +4,30 @@ Main GUI application for Product Features management.
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext, filedialog
 from tkcalendar import Calendar
-from database import Database
+from database import CONFIG_COLUMNS, Database
 from datetime import datetime, timedelta
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
 import matplotlib.dates as mdates
 import json
-import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
 import webbrowser
 import os
 import tempfile
+from roadmap_export import (collect_roadmap_items, build_roadmap_figure, write_roadmap_html,
+                            write_static_images, export_variant_roadmaps)
+from reports import load_report_context, write_variant_report
+from json_import import plan_json_import, load_json
+from backup_store import BackupStore, default_store_dir
+from critical_path import compute_critical_paths, CAPABILITY, FEATURE, KIND_NAMES, VARIANT
+from trl_rollup import rolled_up_features
+from plan_validator import ERROR, RULE_NAMES, open_issues, issue_counts, sync as sync_validation, validate_all
+from config_filter_index import facet_label, get_filter_index
+from variant_compatibility import variant_items
+from gap_analysis import RANKINGS, gap_analysis, write_gap_csv
+
+# Delay before redrawing the interactive roadmap after a swimlane toggle
+INTERACTIVE_RENDER_DELAY_MS = 300
 
 class ProductFeaturesApp:
     def __init__(self, root):
@@ -26,6 +37,11 @@ class ProductFeaturesApp:
         
         self.db = Database()
         self.db.connect()
+        # Adds tables and triggers introduced since the database was created
+        self.db.create_tables()
+
+        # Dropdown text -> configuration value for dropdowns showing facet counts
+        self.facet_values = {}
         
         # Create menu bar
         menubar = tk.Menu(root)
@@ -36,6 +52,7 @@ class ProductFeaturesApp:
         menubar.add_cascade(label="File", menu=file_menu)
         file_menu.add_command(label="Export to JSON", command=self.export_to_json)
         file_menu.add_command(label="Import JSON", command=self.import_from_json)
+        file_menu.add_command(label="Backup Snapshot", command=self.create_backup_snapshot)
         file_menu.add_separator()
         file_menu.add_command(label="Exit", command=root.quit)
         
@@ -52,6 +69,10 @@ class ProductFeaturesApp:
         self.create_readiness_matrix_tab()
         self.create_roadmap_tab()
         self.create_interactive_roadmap_tab()
+        self.create_validation_tab()
+        self.create_gap_analysis_tab()
+        
+        self.notebook.bind('<<NotebookTabChanged>>', self.on_main_tab_changed)
     
     def create_product_variants_tab(self):
         """Create tab for managing Product Variants."""
@@ -729,22 +750,26 @@ class ProductFeaturesApp:
         row += 1
         
         ttk.Label(filter_frame, text="Platform:").grid(row=row, column=0, sticky=tk.W, padx=5, pady=3)
-        self.rm_platform = ttk.Combobox(filter_frame, state='readonly', width=25)
+        self.rm_platform = ttk.Combobox(filter_frame, state='readonly', width=32)
         self.rm_platform.grid(row=row, column=1, sticky=tk.W, padx=5, pady=3)
         
         ttk.Label(filter_frame, text="ODD:").grid(row=row, column=2, sticky=tk.W, padx=5, pady=3)
-        self.rm_odd = ttk.Combobox(filter_frame, state='readonly', width=25)
+        self.rm_odd = ttk.Combobox(filter_frame, state='readonly', width=32)
         self.rm_odd.grid(row=row, column=3, sticky=tk.W, padx=5, pady=3)
         row += 1
         
         ttk.Label(filter_frame, text="Environment:").grid(row=row, column=0, sticky=tk.W, padx=5, pady=3)
-        self.rm_environment = ttk.Combobox(filter_frame, state='readonly', width=25)
+        self.rm_environment = ttk.Combobox(filter_frame, state='readonly', width=32)
         self.rm_environment.grid(row=row, column=1, sticky=tk.W, padx=5, pady=3)
         
         ttk.Label(filter_frame, text="Cargo:").grid(row=row, column=2, sticky=tk.W, padx=5, pady=3)
-        self.rm_trailer = ttk.Combobox(filter_frame, state='readonly', width=25)
+        self.rm_trailer = ttk.Combobox(filter_frame, state='readonly', width=32)
         self.rm_trailer.grid(row=row, column=3, sticky=tk.W, padx=5, pady=3)
         row += 1
+
+        # Re-count the other dropdowns' options whenever one filter changes
+        for combobox in (self.rm_platform, self.rm_odd, self.rm_environment, self.rm_trailer):
+            combobox.bind('<<ComboboxSelected>>', lambda e: self.update_readiness_filter_counts())
         
         # Query mode selection
         ttk.Label(filter_frame, text="Query Mode:", font=('TkDefaultFont', 9, 'bold')).grid(row=row, column=0, sticky=tk.W, padx=5, pady=3)
@@ -778,6 +803,12 @@ class ProductFeaturesApp:
         self.rm_trl_label.grid(row=row, column=1, sticky=tk.E, padx=5, pady=3)
         row += 1
         
+        # Feature TRL dates rolled up from linked capabilities (trl_rollup table)
+        self.rm_use_rollup = tk.BooleanVar(value=True)
+        ttk.Checkbutton(filter_frame, text="Roll up feature TRL dates from linked capabilities",
+                        variable=self.rm_use_rollup).grid(row=row, column=1, columnspan=3, sticky=tk.W, padx=5, pady=3)
+        row += 1
+        
         btn_frame = ttk.Frame(filter_frame)
         btn_frame.grid(row=row, column=0, columnspan=4, pady=10)
         
@@ -858,6 +889,32 @@ class ProductFeaturesApp:
         
         self.rm_cap_tree.pack(fill=tk.BOTH, expand=True)
         
+        # Critical path results (earliest achievable TRL9 and slack, see critical_path.py)
+        cp_tab = ttk.Frame(results_notebook)
+        results_notebook.add(cp_tab, text="Critical Path")
+        
+        self.rm_cp_summary = ttk.Label(cp_tab, text="", font=('TkDefaultFont', 9, 'bold'))
+        self.rm_cp_summary.pack(fill=tk.X, padx=5, pady=(5, 0))
+        
+        cp_scroll = ttk.Scrollbar(cp_tab)
+        cp_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        cp_columns = ('Label', 'Type', 'Name', 'Planned / Due', 'Earliest TRL9', 'Slack (days)', 'Critical')
+        self.rm_cp_tree = ttk.Treeview(cp_tab,
+                                        columns=cp_columns,
+                                        show='headings',
+                                        yscrollcommand=cp_scroll.set)
+        cp_scroll.config(command=self.rm_cp_tree.yview)
+        
+        for col, width in zip(cp_columns, (120, 110, 250, 100, 100, 90, 120)):
+            self.rm_cp_tree.heading(col, text=col)
+            self.rm_cp_tree.column(col, width=width)
+        
+        self.rm_cp_tree.tag_configure('late', foreground='#DC3545')
+        self.rm_cp_tree.tag_configure('critical', font=('TkDefaultFont', 9, 'bold'))
+        
+        self.rm_cp_tree.pack(fill=tk.BOTH, expand=True)
+        
         # Right side - pie chart
         chart_frame = ttk.LabelFrame(results_paned, text="TRL Distribution", padding=5)
         results_paned.add(chart_frame, weight=1)
@@ -1276,7 +1333,7 @@ class ProductFeaturesApp:
         trailers = [''] + self.get_config_codes('Trailer')
         
         # Product Features filter
-        self.pf_platform_filter['values'] = platforms
+        self.update_pf_filter_counts()
         
         # Product Features form
         self.pf_form['swimlane']['values'] = swimlanes
@@ -1294,10 +1351,7 @@ class ProductFeaturesApp:
         self.tf_form['platform']['values'] = platforms
         
         # Readiness Matrix filters
-        self.rm_platform['values'] = platforms
-        self.rm_odd['values'] = odds
-        self.rm_environment['values'] = environments
-        self.rm_trailer['values'] = trailers
+        self.update_readiness_filter_counts()
         
         # Roadmap filters
         self.roadmap_platform['values'] = platforms
@@ -1341,8 +1395,28 @@ class ProductFeaturesApp:
     
     def load_pf_filters(self):
         """Load filter options for Product Features."""
+        self.update_pf_filter_counts()
+
+    def facet_value(self, combobox):
+        """Configuration value selected in a dropdown that may show facet counts."""
+        text = combobox.get()
+        return self.facet_values.get(str(combobox), {}).get(text, text)
+
+    def set_facet_options(self, combobox, values, counts):
+        """Show each value followed by its match counts text, keeping the selection."""
+        selected = self.facet_value(combobox) or ''
+        labels = [facet_label(value, counts[value]) for value in values]
+        self.facet_values[str(combobox)] = dict(zip(labels, values))
+        combobox['values'] = labels
+        combobox.set(labels[values.index(selected)] if selected in values else selected)
+
+    def update_pf_filter_counts(self):
+        """Refresh the Product Features platform filter with feature counts."""
         platforms = [''] + self.get_config_codes('Platform')
-        self.pf_platform_filter['values'] = platforms
+        index = get_filter_index(self.db, 'product_features')
+        counts = index.facet_counts('platform', platforms)
+        self.set_facet_options(self.pf_platform_filter, platforms,
+                               {value: str(count) for value, count in counts.items()})
         
     def clear_pf_filters(self):
         """Clear Product Features filters."""
@@ -1357,11 +1431,12 @@ class ProductFeaturesApp:
         
         # Get filters
         filters = {}
-        if self.pf_platform_filter.get():
-            filters['platform'] = self.pf_platform_filter.get()
+        if self.facet_value(self.pf_platform_filter):
+            filters['platform'] = self.facet_value(self.pf_platform_filter)
         
-        # Load data
-        features = self.db.get_product_features(filters)
+        # Load data (counts in the filter follow edits made since the last load)
+        self.update_pf_filter_counts()
+        features = get_filter_index(self.db, 'product_features').filter(filters)
         
         for feature in features:
             self.pf_tree.insert('', tk.END, iid=feature['id'],
@@ -1443,7 +1518,8 @@ class ProductFeaturesApp:
                 pv = self.db.get_product_variant_by_label(pv_label)
                 if pv:
                     self.db.link_pv_pf(pv['id'], self.current_pf_id)
-            messagebox.showinfo("Success", "Product Feature updated successfully!")
+            messagebox.showinfo("Success", "Product Feature updated successfully!" +
+                                self.validation_feedback('pf', self.current_pf_id))
             self.refresh_owner_dropdowns()
             self.load_product_features()
             self.load_product_variants()
@@ -1612,7 +1688,8 @@ class ProductFeaturesApp:
         try:
             if self.current_pv_id:
                 self.db.update_product_variant(self.current_pv_id, data)
-                messagebox.showinfo("Success", "Product Variant updated successfully!")
+                messagebox.showinfo("Success", "Product Variant updated successfully!" +
+                                    self.validation_feedback('pv', self.current_pv_id))
             else:
                 pv_id = self.db.add_product_variant(data)
                 self.current_pv_id = pv_id
@@ -1654,7 +1731,7 @@ class ProductFeaturesApp:
                 messagebox.showerror("Error", f"Failed to delete: {str(e)}")
     
     def export_product_variant_to_markdown(self):
-        """Export the selected Product Variant to a comprehensive Markdown file."""
+        """Export the selected Product Variant to a comprehensive Markdown (or HTML) file."""
         if not self.current_pv_id:
             messagebox.showwarning("No Selection", "Please select a product variant to export.")
             return
@@ -1666,431 +1743,22 @@ class ProductFeaturesApp:
                 messagebox.showerror("Error", "Product variant not found.")
                 return
             
-            # Get configuration details
-            config_details = {}
-            for config_type in ['platform', 'odd', 'environment', 'trailer', 'trl']:
-                if pv.get(config_type):
-                    configs = self.db.get_configurations(config_type.upper() if config_type != 'platform' else 'Platform')
-                    for cfg in configs:
-                        if cfg['code'] == pv[config_type]:
-                            config_details[config_type] = cfg
-                            break
-            
-            # Get linked product features
-            pfs = self.db.get_pv_product_features(self.current_pv_id)
-            
-            # Collect all capabilities and technical functions
-            all_capabilities = {}
-            all_technical_functions = {}
-            pf_dependencies = {}
-            
-            for pf in pfs:
-                # Get capabilities for this product feature
-                caps = self.db.get_pf_capabilities(pf['id'])
-                pf_dependencies[pf['id']] = {'capabilities': [], 'technical_functions': []}
-                
-                for cap in caps:
-                    cap_id = cap['id']
-                    if cap_id not in all_capabilities:
-                        all_capabilities[cap_id] = self.db.get_capability_by_id(cap_id)
-                    pf_dependencies[pf['id']]['capabilities'].append(cap_id)
-                    
-                    # Get technical functions for this capability
-                    tfs = self.db.get_cap_technical_functions(cap_id)
-                    for tf in tfs:
-                        tf_id = tf['id']
-                        if tf_id not in all_technical_functions:
-                            all_technical_functions[tf_id] = self.db.get_technical_function_by_id(tf_id)
-                        pf_dependencies[pf['id']]['technical_functions'].append(tf_id)
-            
-            # Build markdown content
-            md_content = []
-            md_content.append(f"# Product Variant: {pv['label']} - {pv['title']}\n")
-            md_content.append(f"**Export Date:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            md_content.append("---\n")
-            
-            # Product Variant Details
-            md_content.append("## Product Variant Overview\n")
-            md_content.append(f"**Label:** {pv['label']}\n\n")
-            md_content.append(f"**Title:** {pv['title']}\n\n")
-            if pv.get('description'):
-                md_content.append(f"**Description:**\n\n{pv['description']}\n\n")
-            if pv.get('due_date'):
-                md_content.append(f"**Target Date:** {pv['due_date']}\n\n")
-            
-            # Configuration Details
-            md_content.append("## Configuration Details\n")
-            
-            for config_type in ['platform', 'odd', 'environment', 'trailer', 'trl']:
-                if config_type in config_details:
-                    cfg = config_details[config_type]
-                    md_content.append(f"### {config_type.upper() if config_type != 'platform' else 'Platform'}\n")
-                    md_content.append(f"**Code:** {cfg['code']}\n\n")
-                    md_content.append(f"**Description:** {cfg['description']}\n\n")
-            
-            # Product Features
-            md_content.append("## Product Features\n")
-            md_content.append(f"Total Product Features: **{len(pfs)}**\n\n")
-            
-            for pf in pfs:
-                md_content.append(f"### {pf['label']}: {pf['name']}\n")
-                
-                if pf.get('details'):
-                    md_content.append(f"**Details:** {pf['details']}\n\n")
-                
-                # TRL dates
-                md_content.append("**TRL Completion Dates:**\n")
-                if pf.get('trl3_date'):
-                    md_content.append(f"- TRL3: {pf['trl3_date']}\n")
-                if pf.get('trl6_date'):
-                    md_content.append(f"- TRL6: {pf['trl6_date']}\n")
-                if pf.get('trl9_date'):
-                    md_content.append(f"- TRL9: {pf['trl9_date']}\n")
-                md_content.append("\n")
-                
-                # Configuration
-                md_content.append("**Configuration:**\n")
-                if pf.get('platform'):
-                    md_content.append(f"- Platform: {pf['platform']}\n")
-                if pf.get('odd'):
-                    md_content.append(f"- ODD: {pf['odd']}\n")
-                if pf.get('environment'):
-                    md_content.append(f"- Environment: {pf['environment']}\n")
-                if pf.get('trailer'):
-                    md_content.append(f"- Cargo: {pf['trailer']}\n")
-                md_content.append("\n")
-                
-                # Dependent Capabilities
-                cap_ids = pf_dependencies[pf['id']]['capabilities']
-                if cap_ids:
-                    md_content.append("**Dependent Capabilities:**\n")
-                    for cap_id in cap_ids:
-                        cap = all_capabilities[cap_id]
-                        md_content.append(f"- {cap['label']}: {cap['name']}\n")
-                    md_content.append("\n")
-                
-                # Dependent Technical Functions
-                tf_ids = pf_dependencies[pf['id']]['technical_functions']
-                if tf_ids:
-                    md_content.append("**Dependent Technical Functions:**\n")
-                    # Remove duplicates
-                    unique_tf_ids = list(set(tf_ids))
-                    for tf_id in unique_tf_ids:
-                        tf = all_technical_functions[tf_id]
-                        md_content.append(f"- {tf['label']}: {tf['name']}\n")
-                    md_content.append("\n")
-                
-                md_content.append("---\n\n")
-            
-            # All Capabilities Section
-            if all_capabilities:
-                md_content.append("## All Capabilities\n")
-                md_content.append(f"Total Unique Capabilities: **{len(all_capabilities)}**\n\n")
-                
-                for cap_id, cap in all_capabilities.items():
-                    md_content.append(f"### {cap['label']}: {cap['name']}\n")
-                    
-                    if cap.get('description'):
-                        md_content.append(f"**Description:** {cap['description']}\n\n")
-                    
-                    # TRL dates
-                    md_content.append("**TRL Completion Dates:**\n")
-                    if cap.get('trl3_date'):
-                        md_content.append(f"- TRL3: {cap['trl3_date']}\n")
-                    if cap.get('trl6_date'):
-                        md_content.append(f"- TRL6: {cap['trl6_date']}\n")
-                    if cap.get('trl9_date'):
-                        md_content.append(f"- TRL9: {cap['trl9_date']}\n")
-                    md_content.append("\n")
-                    
-                    # Cross-dependencies: Which Product Features use this capability
-                    dependent_pfs = [pf for pf in pfs if cap_id in pf_dependencies[pf['id']]['capabilities']]
-                    if dependent_pfs:
-                        md_content.append("**Used by Product Features:**\n")
-                        for dpf in dependent_pfs:
-                            md_content.append(f"- {dpf['label']}: {dpf['name']}\n")
-                        md_content.append("\n")
-                    
-                    # Technical Functions for this capability
-                    cap_tfs = self.db.get_cap_technical_functions(cap_id)
-                    if cap_tfs:
-                        md_content.append("**Dependent Technical Functions:**\n")
-                        for tf in cap_tfs:
-                            md_content.append(f"- {tf['label']}: {tf['name']}\n")
-                        md_content.append("\n")
-                    
-                    md_content.append("---\n\n")
-            
-            # All Technical Functions Section
-            if all_technical_functions:
-                md_content.append("## All Technical Functions\n")
-                md_content.append(f"Total Unique Technical Functions: **{len(all_technical_functions)}**\n\n")
-                
-                for tf_id, tf in all_technical_functions.items():
-                    md_content.append(f"### {tf['label']}: {tf['name']}\n")
-                    
-                    if tf.get('description'):
-                        md_content.append(f"**Description:** {tf['description']}\n\n")
-                    
-                    # TRL dates
-                    md_content.append("**TRL Completion Dates:**\n")
-                    if tf.get('trl3_date'):
-                        md_content.append(f"- TRL3: {tf['trl3_date']}\n")
-                    if tf.get('trl6_date'):
-                        md_content.append(f"- TRL6: {tf['trl6_date']}\n")
-                    if tf.get('trl9_date'):
-                        md_content.append(f"- TRL9: {tf['trl9_date']}\n")
-                    md_content.append("\n")
-                    
-                    # Cross-dependencies: Which Capabilities use this technical function
-                    dependent_caps = []
-                    for cap_id, cap in all_capabilities.items():
-                        cap_tfs = self.db.get_cap_technical_functions(cap_id)
-                        if any(ctf['id'] == tf_id for ctf in cap_tfs):
-                            dependent_caps.append(cap)
-                    
-                    if dependent_caps:
-                        md_content.append("**Used by Capabilities:**\n")
-                        for dcap in dependent_caps:
-                            md_content.append(f"- {dcap['label']}: {dcap['name']}\n")
-                        md_content.append("\n")
-                    
-                    md_content.append("---\n\n")
-            
-            # Prompt user for save location BEFORE generating roadmap
+            # Prompt user for save location
             filename = filedialog.asksaveasfilename(
                 defaultextension=".md",
-                filetypes=[("Markdown files", "*.md"), ("All files", "*.*")],
+                filetypes=[("Markdown files", "*.md"), ("HTML files", "*.html"), ("All files", "*.*")],
                 initialfile=f"{pv['label']}_export.md"
             )
             
             if filename:
-                # Generate roadmap snapshot (now that we know the save directory)
-                md_content.append("## Roadmap Snapshot\n")
-                md_content.append("Visual roadmap showing all dependencies (Product Features, Capabilities, Technical Functions) for this Product Variant.\n\n")
-                
-                # Get directory where markdown will be saved
-                save_dir = os.path.dirname(filename)
-                img_filename = f"{pv['label']}_roadmap.png"
-                
-                # Generate roadmap and save to same directory
-                self.generate_pv_roadmap_snapshot(pv, pfs, all_capabilities, all_technical_functions, 
-                                                   md_content, save_dir, img_filename)
-                
-                # Write markdown file
-                with open(filename, 'w', encoding='utf-8') as f:
-                    f.write(''.join(md_content))
+                # Build the report and save the roadmap image to the same directory
+                img_filename = write_variant_report(pv, filename, load_report_context(self.db))
                 
                 messagebox.showinfo("Success", f"Product Variant exported successfully to:\n{filename}\n\nRoadmap image saved as:\n{img_filename}")
         
         except Exception as e:
             messagebox.showerror("Error", f"Failed to export: {str(e)}")
     
-    def generate_pv_roadmap_snapshot(self, pv, pfs, all_capabilities, all_technical_functions, md_content, save_dir, img_filename):
-        """Generate a roadmap snapshot for the product variant and add it to markdown content."""
-        try:
-            # Create a figure for the roadmap
-            fig, ax = plt.subplots(figsize=(14, 10), dpi=100)
-            
-            # TRL colors
-            trl_colors = {
-                'TRL3': '#DC3545',  # Red
-                'TRL6': '#FFC107',  # Amber
-                'TRL9': '#28A745'   # Green
-            }
-            
-            # Collect all items (PFs, Caps, TFs)
-            items = []
-            
-            # Add Product Features
-            for pf in pfs:
-                trl_dates = []
-                if pf.get('trl3_date'):
-                    try:
-                        trl_dates.append(('TRL3', datetime.strptime(pf['trl3_date'], '%Y-%m-%d')))
-                    except: pass
-                if pf.get('trl6_date'):
-                    try:
-                        trl_dates.append(('TRL6', datetime.strptime(pf['trl6_date'], '%Y-%m-%d')))
-                    except: pass
-                if pf.get('trl9_date'):
-                    try:
-                        trl_dates.append(('TRL9', datetime.strptime(pf['trl9_date'], '%Y-%m-%d')))
-                    except: pass
-                
-                if trl_dates:
-                    trl_dates.sort(key=lambda x: x[1])
-                    items.append({
-                        'type': 'PF',
-                        'label': pf['label'],
-                        'name': pf['name'][:30] + '...' if len(pf['name']) > 30 else pf['name'],
-                        'trl_dates': trl_dates
-                    })
-            
-            # Add Capabilities
-            for cap_id, cap in all_capabilities.items():
-                trl_dates = []
-                if cap.get('trl3_date'):
-                    try:
-                        trl_dates.append(('TRL3', datetime.strptime(cap['trl3_date'], '%Y-%m-%d')))
-                    except: pass
-                if cap.get('trl6_date'):
-                    try:
-                        trl_dates.append(('TRL6', datetime.strptime(cap['trl6_date'], '%Y-%m-%d')))
-                    except: pass
-                if cap.get('trl9_date'):
-                    try:
-                        trl_dates.append(('TRL9', datetime.strptime(cap['trl9_date'], '%Y-%m-%d')))
-                    except: pass
-                
-                if trl_dates:
-                    trl_dates.sort(key=lambda x: x[1])
-                    items.append({
-                        'type': 'CAP',
-                        'label': cap['label'],
-                        'name': cap['name'][:30] + '...' if len(cap['name']) > 30 else cap['name'],
-                        'trl_dates': trl_dates
-                    })
-            
-            # Add Technical Functions
-            for tf_id, tf in all_technical_functions.items():
-                trl_dates = []
-                if tf.get('trl3_date'):
-                    try:
-                        trl_dates.append(('TRL3', datetime.strptime(tf['trl3_date'], '%Y-%m-%d')))
-                    except: pass
-                if tf.get('trl6_date'):
-                    try:
-                        trl_dates.append(('TRL6', datetime.strptime(tf['trl6_date'], '%Y-%m-%d')))
-                    except: pass
-                if tf.get('trl9_date'):
-                    try:
-                        trl_dates.append(('TRL9', datetime.strptime(tf['trl9_date'], '%Y-%m-%d')))
-                    except: pass
-                
-                if trl_dates:
-                    trl_dates.sort(key=lambda x: x[1])
-                    items.append({
-                        'type': 'TF',
-                        'label': tf['label'],
-                        'name': tf['name'][:30] + '...' if len(tf['name']) > 30 else tf['name'],
-                        'trl_dates': trl_dates
-                    })
-            
-            if not items:
-                md_content.append("*No timeline data available for roadmap visualization.*\n\n")
-                return
-            
-            # Sort items by type and first TRL date
-            items.sort(key=lambda x: (x['type'], x['trl_dates'][0][1]))
-            
-            # Limit items for readability
-            if len(items) > 50:
-                items = items[:50]
-                title_suffix = f" (showing first 50 of {len(items)} items)"
-            else:
-                title_suffix = f" ({len(items)} items)"
-            
-            # Find date range
-            all_dates = []
-            for item in items:
-                all_dates.extend([d[1] for d in item['trl_dates']])
-            min_date = min(all_dates)
-            max_date = max(all_dates)
-            
-            # Add padding
-            date_range = (max_date - min_date).days
-            padding = max(30, date_range * 0.1)
-            plot_min_date = min_date - timedelta(days=padding)
-            plot_max_date = max_date + timedelta(days=padding)
-            
-            # Draw timeline
-            y_pos = 0
-            y_labels = []
-            y_positions = []
-            
-            for item in items:
-                y_labels.append(f"[{item['type']}] {item['label']}")
-                y_positions.append(y_pos)
-                
-                trl_dates = item['trl_dates']
-                
-                # Draw segments
-                for i in range(len(trl_dates)):
-                    start_date = trl_dates[i][1]
-                    start_trl = trl_dates[i][0]
-                    
-                    if i < len(trl_dates) - 1:
-                        end_date = trl_dates[i + 1][1]
-                        color = trl_colors[start_trl]
-                    else:
-                        end_date = start_date + timedelta(days=max(30, date_range * 0.05))
-                        color = trl_colors[start_trl]
-                    
-                    ax.barh(y_pos, (end_date - start_date).days,
-                           left=mdates.date2num(start_date),
-                           height=0.6,
-                           color=color,
-                           alpha=0.8,
-                           edgecolor='black',
-                           linewidth=0.5)
-                    
-                    ax.plot(mdates.date2num(start_date), y_pos, 'o',
-                           color='black', markersize=6, zorder=10)
-                
-                y_pos += 1
-            
-            # Configure axes
-            ax.set_ylim(-0.5, len(items) - 0.5)
-            ax.set_yticks(y_positions)
-            ax.set_yticklabels(y_labels, fontsize=8)
-            ax.invert_yaxis()
-            
-            # Format x-axis
-            ax.xaxis_date()
-            ax.xaxis.set_major_formatter(mdates.DateFormatter('%b %y'))
-            ax.xaxis.set_major_locator(mdates.MonthLocator(interval=1))
-            plt.setp(ax.xaxis.get_majorticklabels(), rotation=45, ha='right')
-            
-            ax.set_xlabel('Timeline', fontsize=12, fontweight='bold')
-            ax.set_title(f'{pv["label"]} Roadmap{title_suffix}', fontsize=14, fontweight='bold')
-            ax.grid(True, axis='x', alpha=0.3, linestyle='--')
-            
-            # Add milestones
-            milestones = self.db.get_milestones()
-            for milestone in milestones:
-                try:
-                    milestone_date = datetime.strptime(milestone['date'], '%Y-%m-%d')
-                    if plot_min_date <= milestone_date <= plot_max_date:
-                        ax.axvline(x=mdates.date2num(milestone_date),
-                                  color='purple', linestyle='--', linewidth=2, alpha=0.7, zorder=5)
-                        ax.plot(mdates.date2num(milestone_date), -0.3,
-                               marker='*', color='gold', markersize=20,
-                               markeredgecolor='purple', markeredgewidth=1.5, zorder=15)
-                except: pass
-            
-            # Add legend
-            legend_elements = [
-                plt.Rectangle((0, 0), 1, 1, fc=trl_colors['TRL3'], alpha=0.8, edgecolor='black', label='TRL3'),
-                plt.Rectangle((0, 0), 1, 1, fc=trl_colors['TRL6'], alpha=0.8, edgecolor='black', label='TRL6'),
-                plt.Rectangle((0, 0), 1, 1, fc=trl_colors['TRL9'], alpha=0.8, edgecolor='black', label='TRL9')
-            ]
-            ax.legend(handles=legend_elements, loc='upper right')
-            
-            plt.tight_layout()
-            
-            # Save to same directory as markdown file
-            img_path = os.path.join(save_dir, img_filename)
-            fig.savefig(img_path, dpi=150, bbox_inches='tight')
-            plt.close(fig)
-            
-            # Use relative path in markdown (just the filename)
-            md_content.append(f"![Roadmap Snapshot](./{img_filename})\n\n")
-            md_content.append(f"*Roadmap image saved as: {img_filename} (in same directory as this file)*\n\n")
-            
-        except Exception as e:
-            md_content.append(f"*Error generating roadmap snapshot: {str(e)}*\n\n")
-    
     def add_pv_product_feature(self):
         """Add a product feature to the current product variant."""
         if not self.current_pv_id:
@@ -2330,7 +1998,8 @@ class ProductFeaturesApp:
         
         try:
             self.db.update_capability(self.current_cap_id, data)
-            messagebox.showinfo("Success", "Capability updated successfully!")
+            messagebox.showinfo("Success", "Capability updated successfully!" +
+                                self.validation_feedback('cap', self.current_cap_id))
             self.refresh_owner_dropdowns()
             self.load_capabilities()
         except Exception as e:
@@ -2712,17 +2381,32 @@ class ProductFeaturesApp:
         pv_options = [''] + [f"{pv['label']}: {pv['title']}" for pv in pvs]
         self.rm_product_variant['values'] = pv_options
         
-        platforms = [''] + self.get_config_codes('Platform')
-        self.rm_platform['values'] = platforms
-        
-        odds = [''] + self.get_config_codes('ODD')
-        self.rm_odd['values'] = odds
-        
-        envs = [''] + self.get_config_codes('Environment')
-        self.rm_environment['values'] = envs
-        
-        trailers = [''] + self.get_config_codes('Trailer')
-        self.rm_trailer['values'] = trailers
+        self.update_readiness_filter_counts()
+
+    def readiness_filters(self):
+        """Configuration filters selected in the Readiness Matrix."""
+        filters = {}
+        for column, combobox in [('platform', self.rm_platform), ('odd', self.rm_odd),
+                                 ('environment', self.rm_environment), ('trailer', self.rm_trailer)]:
+            if self.facet_value(combobox):
+                filters[column] = self.facet_value(combobox)
+        return filters
+
+    def update_readiness_filter_counts(self):
+        """Show next to every configuration option how many product features and
+        capabilities would match with it and the other selected filters."""
+        filters = self.readiness_filters()
+        pf_index = get_filter_index(self.db, 'product_features')
+        cap_index = get_filter_index(self.db, 'capabilities')
+        for column, combobox, config_type in [('platform', self.rm_platform, 'Platform'),
+                                              ('odd', self.rm_odd, 'ODD'),
+                                              ('environment', self.rm_environment, 'Environment'),
+                                              ('trailer', self.rm_trailer, 'Trailer')]:
+            values = [''] + self.get_config_codes(config_type)
+            pf_counts = pf_index.facet_counts(column, values, filters)
+            cap_counts = cap_index.facet_counts(column, values, filters)
+            self.set_facet_options(combobox, values, {
+                value: f"{pf_counts[value]} PF, {cap_counts[value]} cap" for value in values})
     
     def clear_readiness_filters(self):
         """Clear Readiness Matrix filters."""
@@ -2731,6 +2415,7 @@ class ProductFeaturesApp:
         self.rm_odd.set('')
         self.rm_environment.set('')
         self.rm_trailer.set('')
+        self.update_readiness_filter_counts()
         self.rm_date.delete(0, tk.END)
         self.rm_trl.set('')
         self.apply_readiness_query()
@@ -2754,6 +2439,7 @@ class ProductFeaturesApp:
             self.rm_odd.set(pv.get('odd', ''))
             self.rm_environment.set(pv.get('environment', ''))
             self.rm_trailer.set(pv.get('trailer', ''))
+            self.update_readiness_filter_counts()
     
     def open_calendar_picker(self):
         """Open a calendar dialog to select a date."""
@@ -2843,6 +2529,9 @@ class ProductFeaturesApp:
             if pv:
                 pv_id = pv['id']
         
+        # Critical path does not depend on the query mode or date
+        self.refresh_critical_path_view(pv_id)
+        
         # Update column headers based on mode
         if query_mode == 'date':
             # Date mode: show TRL achieved
@@ -2869,26 +2558,10 @@ class ProductFeaturesApp:
                 messagebox.showwarning("No TRL Selected", "Please select a TRL level to query")
                 return
         
-        # Build filters
-        pf_filters = {}
-        if self.rm_platform.get():
-            pf_filters['platform'] = self.rm_platform.get()
-        if self.rm_odd.get():
-            pf_filters['odd'] = self.rm_odd.get()
-        if self.rm_environment.get():
-            pf_filters['environment'] = self.rm_environment.get()
-        if self.rm_trailer.get():
-            pf_filters['trailer'] = self.rm_trailer.get()
-        
-        cap_filters = {}
-        if self.rm_platform.get():
-            cap_filters['platform'] = self.rm_platform.get()
-        if self.rm_odd.get():
-            cap_filters['odd'] = self.rm_odd.get()
-        if self.rm_environment.get():
-            cap_filters['environment'] = self.rm_environment.get()
-        if self.rm_trailer.get():
-            cap_filters['trailer'] = self.rm_trailer.get()
+        # Build filters (counts in the dropdowns follow edits made since the last query)
+        self.update_readiness_filter_counts()
+        pf_filters = self.readiness_filters()
+        cap_filters = self.readiness_filters()
         
         # Helper functions
         def calculate_trl_achieved(trl3_date, trl6_date, trl9_date, query_date):
@@ -2924,19 +2597,28 @@ class ProductFeaturesApp:
         # Load Product Features
         # If a product variant is selected, get only linked product features
         # If no PFs are explicitly linked, fall back to filtering by PV configuration
+        # Rows precomputed per variant (variant_compatibility.py)
+        pfs_linked = False
         if pv_id:
-            pfs = self.db.get_pv_product_features(pv_id)
+            pfs = variant_items(self.db, pv_id, FEATURE, linked=True)
+            pfs_linked = bool(pfs)
             print(f"DEBUG: Found {len(pfs)} product features explicitly linked to PV {pv_label}")
             
             # If no explicit links, use the PV's configuration to filter
             if not pfs:
                 print(f"DEBUG: No explicit PF links, falling back to configuration filter")
-                pfs = self.db.get_product_features(pf_filters)
+                if pf_filters == {key: pv[key] for key in CONFIG_COLUMNS if pv.get(key)}:
+                    pfs = variant_items(self.db, pv_id, FEATURE, linked=False)
+                else:
+                    pfs = get_filter_index(self.db, 'product_features').filter(pf_filters)
                 print(f"DEBUG: Found {len(pfs)} product features matching PV configuration: {pf_filters}")
         else:
-            pfs = self.db.get_product_features(pf_filters)
+            pfs = get_filter_index(self.db, 'product_features').filter(pf_filters)
             print(f"DEBUG: Found {len(pfs)} product features matching filters: {pf_filters}")
         
+        if self.rm_use_rollup.get():
+            pfs = rolled_up_features(self.db, pfs)
+        
         for pf in pfs:
             try:
                 # Determine if required (using when_date field)
@@ -3000,9 +2682,11 @@ class ProductFeaturesApp:
         
         # Load Capabilities
         # If a product variant is selected, get capabilities linked to the PFs
-        if pv_id and pfs:
-            # Check if we got PFs from explicit links or from configuration filter
-            # If we have PFs, collect their linked capabilities
+        if pv_id and pfs_linked:
+            caps = variant_items(self.db, pv_id, CAPABILITY, linked=True)
+            print(f"DEBUG: Found {len(caps)} capabilities linked to PFs of PV {pv_label}")
+        elif pv_id and pfs:
+            # PFs came from the configuration filter: collect their linked capabilities
             cap_ids_set = set()
             for pf in pfs:
                 linked_caps = self.db.get_pf_capabilities(pf['id'])
@@ -3018,7 +2702,7 @@ class ProductFeaturesApp:
             print(f"DEBUG: Found {len(caps)} capabilities linked to PFs of PV {pv_label}")
         else:
             # Environment filter now handles CFG-ENV-2.1 including CFG-ENV-1.1 at database level
-            caps = self.db.get_capabilities(cap_filters)
+            caps = get_filter_index(self.db, 'capabilities').filter(cap_filters)
             print(f"DEBUG: Found {len(caps)} capabilities matching filters: {cap_filters}")
         
         for cap in caps:
@@ -3093,6 +2777,67 @@ class ProductFeaturesApp:
                            font=('TkDefaultFont', 10))
             label.pack(expand=True)
     
+    def refresh_critical_path_view(self, pv_id=None):
+        """Fill the Critical Path view: all variants, or one variant's nodes by slack."""
+        for item in self.rm_cp_tree.get_children():
+            self.rm_cp_tree.delete(item)
+        
+        try:
+            result = compute_critical_paths(self.db)
+        except Exception as e:
+            self.rm_cp_summary.config(text=f"Critical path unavailable: {e}")
+            return
+        
+        def fmt(value):
+            return value.isoformat() if value else ''
+        
+        def slack_text(slack):
+            return '' if slack is None else slack
+        
+        if pv_id is None:
+            # One row per variant: slip against the due date and the driving capability
+            for variant_id, pv in sorted(result.index.product_variants.items(),
+                                         key=lambda item: item[1]['label']):
+                node = (VARIANT, variant_id)
+                slip = result.slip(variant_id)
+                chain = result.critical_chain(variant_id)
+                driver = result.label(chain[0]) if len(chain) > 1 else ''
+                tags = ('late',) if slip is not None and slip > 0 else ()
+                self.rm_cp_tree.insert('', tk.END, tags=tags, values=(
+                    pv['label'], KIND_NAMES[VARIANT], pv.get('title') or '',
+                    fmt(result.planned[node]), fmt(result.earliest[node]),
+                    slack_text(None if slip is None else -slip), driver))
+            self.rm_cp_summary.config(text="Select a product variant to see its critical chain "
+                                           "(Critical = capability driving each variant's TRL9)")
+            return
+        
+        chain = set(result.critical_chain(pv_id))
+        node = (VARIANT, pv_id)
+        slip = result.slip(pv_id)
+        if slip is None:
+            status = "no dated features linked"
+        elif slip > 0:
+            status = f"{slip} days late"
+        else:
+            status = f"on time ({-slip} days spare)"
+        self.rm_cp_summary.config(
+            text=f"Due {fmt(result.planned[node]) or '-'}  |  Earliest TRL9 "
+                 f"{fmt(result.earliest[node]) or '-'}  |  {status}")
+        
+        for variant_node in [node] + result.variant_nodes(pv_id):
+            entity = result.entity(variant_node)
+            slack = result.slack(variant_node)
+            tags = []
+            if slack is not None and slack < 0:
+                tags.append('late')
+            if variant_node in chain:
+                tags.append('critical')
+            self.rm_cp_tree.insert('', tk.END, tags=tuple(tags), values=(
+                entity['label'], KIND_NAMES[variant_node[0]],
+                entity.get('title') if variant_node[0] == VARIANT else entity.get('name') or '',
+                fmt(result.planned[variant_node]), fmt(result.earliest[variant_node]),
+                slack_text(slack), '★ Critical' if variant_node in chain else ''))
+    
     def on_rm_tab_changed(self, event):
         """Handle readiness matrix tab change to update pie chart."""
         if hasattr(self, 'rm_last_pfs'):
@@ -3669,8 +3414,8 @@ class ProductFeaturesApp:
             
             # Limit to top 50 items for readability
             if len(items) > 50:
-                items = items[:50]
                 title_suffix = f" (showing first 50 of {len(items)} items)"
+                items = items[:50]
             else:
                 title_suffix = f" ({len(items)} items)"
             
@@ -3868,8 +3613,19 @@ class ProductFeaturesApp:
         ttk.Button(control_frame, text="Export PDF",
                   command=lambda: self.export_interactive_roadmap('pdf')).grid(row=1, column=3, padx=5, pady=5, sticky='w')
         
+        ttk.Button(control_frame, text="Export HTML",
+                  command=lambda: self.export_interactive_roadmap('html')).grid(row=1, column=4, padx=5, pady=5, sticky='w')
+        
         ttk.Button(control_frame, text="Open in Browser",
-                  command=self.open_interactive_roadmap_in_browser).grid(row=1, column=4, padx=5, pady=5, sticky='w')
+                  command=self.open_interactive_roadmap_in_browser).grid(row=1, column=5, padx=5, pady=5, sticky='w')
+        
+        ttk.Button(control_frame, text="Export All Variants",
+                  command=self.export_all_variant_roadmaps).grid(row=1, column=6, padx=5, pady=5, sticky='w')
+        
+        self.interactive_roadmap_rollup = tk.BooleanVar(value=False)
+        ttk.Checkbutton(control_frame, text="Roll up feature TRL",
+                        variable=self.interactive_roadmap_rollup,
+                        command=self.update_interactive_roadmap).grid(row=1, column=7, padx=5, pady=5, sticky='w')
         
         # Swimlane toggles frame
         swimlane_frame = ttk.LabelFrame(tab, text="Swimlane Filters")
@@ -3892,10 +3648,16 @@ class ProductFeaturesApp:
         self.interactive_roadmap_canvas_frame = ttk.Frame(tab)
         self.interactive_roadmap_canvas_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
-        # Store the HTML for the current plot
-        self.current_interactive_html = None
+        # Store the current plot
         self.current_interactive_fig = None
         
+        # Cached roadmap dataset; swimlane toggles filter this instead of re-querying
+        self.interactive_roadmap_items = []
+        self.interactive_roadmap_milestones = []
+        self.interactive_roadmap_variants = []
+        self.interactive_roadmap_view_name = 'Both'
+        self._interactive_render_job = None
+        
         # Load filter options
         self.load_interactive_roadmap_filters()
         self.update_interactive_roadmap()
@@ -3918,7 +3680,7 @@ class ProductFeaturesApp:
         self.interactive_roadmap_environment['values'] = env_values
     
     def update_interactive_roadmap(self):
-        """Update the interactive roadmap visualization with Plotly."""
+        """Reload roadmap data from the database and redraw the interactive roadmap."""
         # Get filters
         filters = {}
         if hasattr(self, 'interactive_roadmap_platform') and self.interactive_roadmap_platform.get():
@@ -3930,94 +3692,40 @@ class ProductFeaturesApp:
         
         view = self.interactive_roadmap_view.get()
         
-        # TRL colors
-        trl_colors = {
-            'TRL3': '#DC3545',  # Red
-            'TRL6': '#FFC107',  # Amber
-            'TRL9': '#28A745'   # Green
-        }
-        
         # Collect items with swimlanes
-        items = []
-        all_swimlanes = set()
+        items, all_swimlanes = collect_roadmap_items(self.db, view, filters,
+                                                     self.interactive_roadmap_rollup.get())
         
-        if view in ['Product Features', 'Both']:
-            pfs = self.db.get_product_features(filters)
-            for pf in pfs:
-                if not any([pf.get('trl3_date'), pf.get('trl6_date'), pf.get('trl9_date')]):
-                    continue
-                
-                trl_dates = []
-                if pf.get('trl3_date'):
-                    try:
-                        trl_dates.append(('TRL3', datetime.strptime(pf['trl3_date'], '%Y-%m-%d')))
-                    except: pass
-                if pf.get('trl6_date'):
-                    try:
-                        trl_dates.append(('TRL6', datetime.strptime(pf['trl6_date'], '%Y-%m-%d')))
-                    except: pass
-                if pf.get('trl9_date'):
-                    try:
-                        trl_dates.append(('TRL9', datetime.strptime(pf['trl9_date'], '%Y-%m-%d')))
-                    except: pass
-                
-                if trl_dates:
-                    trl_dates.sort(key=lambda x: x[1])
-                    swimlane = pf.get('swimlane', 'Unassigned')
-                    all_swimlanes.add(swimlane)
-                    items.append({
-                        'type': 'Product Feature',
-                        'label': pf['label'],
-                        'name': pf['name'],
-                        'swimlane': swimlane,
-                        'trl_dates': trl_dates,
-                        'details': pf.get('details', ''),
-                        'platform': pf.get('platform', ''),
-                        'odd': pf.get('odd', ''),
-                        'environment': pf.get('environment', '')
-                    })
-        
-        if view in ['Capabilities', 'Both']:
-            caps = self.db.get_capabilities(filters)
-            for cap in caps:
-                if not any([cap.get('trl3_date'), cap.get('trl6_date'), cap.get('trl9_date')]):
-                    continue
-                
-                trl_dates = []
-                if cap.get('trl3_date'):
-                    try:
-                        trl_dates.append(('TRL3', datetime.strptime(cap['trl3_date'], '%Y-%m-%d')))
-                    except: pass
-                if cap.get('trl6_date'):
-                    try:
-                        trl_dates.append(('TRL6', datetime.strptime(cap['trl6_date'], '%Y-%m-%d')))
-                    except: pass
-                if cap.get('trl9_date'):
-                    try:
-                        trl_dates.append(('TRL9', datetime.strptime(cap['trl9_date'], '%Y-%m-%d')))
-                    except: pass
-                
-                if trl_dates:
-                    trl_dates.sort(key=lambda x: x[1])
-                    swimlane = cap.get('swimlane', 'Unassigned')
-                    all_swimlanes.add(swimlane)
-                    items.append({
-                        'type': 'Capability',
-                        'label': cap['label'],
-                        'name': cap['name'],
-                        'swimlane': swimlane,
-                        'trl_dates': trl_dates,
-                        'details': cap.get('details', ''),
-                        'platform': cap.get('platform', ''),
-                        'odd': cap.get('odd', ''),
-                        'environment': cap.get('environment', '')
-                    })
+        # Cache the dataset so swimlane toggles can be applied without re-querying
+        self.interactive_roadmap_items = items
+        self.interactive_roadmap_milestones = self.db.get_milestones()
+        self.interactive_roadmap_variants = self.db.get_product_variants()
+        self.interactive_roadmap_view_name = view
         
         # Update swimlane checkboxes
         self.update_swimlane_checkboxes(all_swimlanes)
         
+        self.render_interactive_roadmap()
+    
+    def schedule_interactive_roadmap_render(self):
+        """Debounce swimlane toggles so a burst of clicks triggers a single redraw."""
+        if self._interactive_render_job is not None:
+            self.root.after_cancel(self._interactive_render_job)
+        self._interactive_render_job = self.root.after(
+            INTERACTIVE_RENDER_DELAY_MS, self.render_interactive_roadmap
+        )
+    
+    def render_interactive_roadmap(self):
+        """Build the Plotly figure from the cached dataset and current swimlane selection."""
+        if self._interactive_render_job is not None:
+            self.root.after_cancel(self._interactive_render_job)
+            self._interactive_render_job = None
+        
+        view = self.interactive_roadmap_view_name
+        
         # Filter by selected swimlanes
-        selected_swimlanes = [sl for sl, var in self.interactive_swimlane_vars.items() if var.get()]
+        items = self.interactive_roadmap_items
+        selected_swimlanes = {sl for sl, var in self.interactive_swimlane_vars.items() if var.get()}
         if selected_swimlanes:
             items = [item for item in items if item['swimlane'] in selected_swimlanes]
         
@@ -4026,270 +3734,13 @@ class ProductFeaturesApp:
                 text="No timeline data available. Adjust filters or swimlane selections.",
                 foreground='red'
             )
-            self.current_interactive_html = None
+            self.current_interactive_fig = None
             return
         
-        # Sort by swimlane then by date
-        items.sort(key=lambda x: (x['swimlane'], x['trl_dates'][0][1]))
+        fig = build_roadmap_figure(items, self.interactive_roadmap_milestones,
+                                   self.interactive_roadmap_variants, view)
         
-        # Calculate date range for background shading
-        all_dates = []
-        for item in items:
-            for _, date in item['trl_dates']:
-                all_dates.append(date)
-        min_date = min(all_dates) if all_dates else datetime.now()
-        max_date = max(all_dates) if all_dates else datetime.now()
-        # Add padding to date range
-        date_padding = timedelta(days=30)
-        min_date -= date_padding
-        max_date += date_padding
-        
-        # Create Plotly figure
-        fig = go.Figure()
-        
-        # Track y positions
-        y_pos = 0
-        y_labels = []
-        y_positions = []
-        swimlane_boundaries = []
-        current_swimlane = None
-        swimlane_start = 0
-        
-        # Get milestones
-        milestones = self.db.get_milestones()
-        
-        for item in items:
-            # Track swimlane changes
-            if item['swimlane'] != current_swimlane:
-                if current_swimlane is not None:
-                    swimlane_boundaries.append((current_swimlane, swimlane_start, y_pos - 0.6))
-                current_swimlane = item['swimlane']
-                swimlane_start = y_pos
-            
-            # Y-axis label without swimlane (back to original)
-            y_labels.append(f"{item['label']}")
-            y_positions.append(y_pos)
-            
-            # Create hover text - use description (details) instead of label
-            hover_text = f"<b>{item['type']}: {item['name']}</b><br>"
-            if item['details']:
-                hover_text += f"{item['details']}<br><br>"
-            hover_text += f"Label: {item['label']}<br>"
-            hover_text += f"Swimlane: {item['swimlane']}<br>"
-            hover_text += f"Platform: {item['platform']}<br>"
-            hover_text += f"ODD: {item['odd']}<br>"
-            hover_text += f"Environment: {item['environment']}<br>"
-            hover_text += "<br><b>TRL Progression:</b><br>"
-            
-            # Draw segments between TRL milestones
-            trl_dates = item['trl_dates']
-            
-            for i in range(len(trl_dates)):
-                start_date = trl_dates[i][1]
-                start_trl = trl_dates[i][0]
-                hover_text += f"{start_trl}: {start_date.strftime('%Y-%m-%d')}<br>"
-                
-                if i < len(trl_dates) - 1:
-                    end_date = trl_dates[i + 1][1]
-                else:
-                    # Extend last segment
-                    end_date = start_date + timedelta(days=90)
-                
-                # Add bar for this segment using shape (reduced height)
-                fig.add_trace(go.Scatter(
-                    x=[start_date, end_date, end_date, start_date, start_date],
-                    y=[y_pos - 0.25, y_pos - 0.25, y_pos + 0.25, y_pos + 0.25, y_pos - 0.25],
-                    fill='toself',
-                    fillcolor=trl_colors[start_trl],
-                    line=dict(color='black', width=1),
-                    mode='lines',
-                    name=f"{item['name']} - {start_trl}",
-                    hovertext=hover_text,
-                    hoverinfo='text',
-                    showlegend=False
-                ))
-                
-                # Add TRL milestone marker
-                fig.add_trace(go.Scatter(
-                    x=[start_date],
-                    y=[y_pos],
-                    mode='markers',
-                    marker=dict(
-                        size=10,
-                        color='black',
-                        symbol='circle'
-                    ),
-                    hovertext=f"{start_trl} Milestone: {start_date.strftime('%Y-%m-%d')}",
-                    hoverinfo='text',
-                    showlegend=False
-                ))
-            
-            y_pos += 1.2
-        
-        # Add final swimlane boundary
-        if current_swimlane is not None:
-            swimlane_boundaries.append((current_swimlane, swimlane_start, y_pos - 0.6))
-        
-        # Add swimlane separators, background shading, and labels on the left
-        for idx, (swimlane_name, start_y, end_y) in enumerate(swimlane_boundaries):
-            # Add alternating gray background shading
-            if idx % 2 == 1:  # Shade every other swimlane
-                fig.add_shape(
-                    type="rect",
-                    x0=0,
-                    x1=1,
-                    y0=start_y - 0.6,
-                    y1=end_y,
-                    xref="paper",
-                    yref="y",
-                    fillcolor="rgba(200, 200, 200, 0.15)",
-                    line=dict(width=0),
-                    layer="below"
-                )
-            
-            # Add horizontal line separator (moved up to avoid running through bars)
-            if end_y < y_pos - 1.2:
-                fig.add_hline(
-                    y=end_y,
-                    line=dict(color='gray', width=2, dash='solid'),
-                    opacity=0.5
-                )
-            
-            # Add swimlane label as annotation on the far left
-            mid_y = (start_y + end_y) / 2
-            fig.add_annotation(
-                x=-0.15,  # Position further left, before the y-axis labels
-                y=mid_y,
-                text=f"<b>{swimlane_name}</b>",
-                xref="paper",
-                yref="y",
-                showarrow=False,
-                xanchor='center',
-                font=dict(size=12, color='blue'),
-                bgcolor='rgba(173, 216, 230, 0.3)',
-                bordercolor='blue',
-                borderwidth=2,
-                borderpad=8
-            )
-        
-        # Add milestone lines
-        for milestone in milestones:
-            try:
-                milestone_date = datetime.strptime(milestone['date'], '%Y-%m-%d')
-                fig.add_vline(
-                    x=milestone_date,
-                    line=dict(color='purple', width=2, dash='dash'),
-                    opacity=0.7
-                )
-                fig.add_annotation(
-                    x=milestone_date,
-                    y=1.05,
-                    text=f"⭐ {milestone['name']}",
-                    xref="x",
-                    yref="paper",
-                    showarrow=False,
-                    font=dict(size=10, color='purple', family='Arial'),
-                    bgcolor='rgba(255, 255, 224, 0.8)',
-                    bordercolor='purple',
-                    borderwidth=1,
-                    borderpad=3
-                )
-            except:
-                pass
-        
-        # Add product variant milestones (show all variants regardless of filters)
-        product_variants = self.db.get_product_variants()
-        for pv in product_variants:
-            if pv.get('due_date'):
-                try:
-                    pv_date = datetime.strptime(pv['due_date'], '%Y-%m-%d')
-                    fig.add_vline(
-                        x=pv_date,
-                        line=dict(color='red', width=3, dash='solid'),
-                        opacity=0.8
-                    )
-                    fig.add_annotation(
-                        x=pv_date,
-                        y=1.12,
-                        text=f"🎯 {pv['label']}: {pv['title']}",
-                        xref="x",
-                        yref="paper",
-                        showarrow=False,
-                        font=dict(size=11, color='red', family='Arial Black'),
-                        bgcolor='rgba(255, 200, 200, 0.9)',
-                        bordercolor='red',
-                        borderwidth=2,
-                        borderpad=4
-                    )
-                except:
-                    pass
-        
-        # Update layout
-        fig.update_layout(
-            title=dict(
-                text=f"Interactive {view} Roadmap ({len(items)} items)",
-                font=dict(size=16, family='Arial Black')
-            ),
-            xaxis=dict(
-                title="Timeline",
-                type='date',
-                showgrid=True,
-                gridcolor='lightgray',
-                tickformat='%b %Y',
-                side='bottom'
-            ),
-            yaxis=dict(
-                title="",
-                tickmode='array',
-                tickvals=y_positions,
-                ticktext=y_labels,
-                autorange='reversed',
-                showgrid=False
-            ),
-            height=max(600, len(items) * 30 + 150),
-            hovermode='closest',
-            plot_bgcolor='white',
-            margin=dict(l=300, r=50, t=100, b=80),
-            bargap=0.1
-        )
-        
-        # Add top x-axis after initial layout
-        fig.add_trace(go.Scatter(
-            x=[min_date],
-            y=[0],
-            mode='markers',
-            marker=dict(size=0.1, color='rgba(0,0,0,0)'),
-            xaxis='x2',
-            yaxis='y',
-            showlegend=False,
-            hoverinfo='skip'
-        ))
-        
-        fig.update_layout(
-            xaxis2=dict(
-                type='date',
-                showgrid=False,
-                tickformat='%b %Y',
-                side='top',
-                overlaying='x',
-                range=[min_date, max_date],
-                showticklabels=True
-            )
-        )
-        
-        # Add legend for TRL levels
-        for trl, color in trl_colors.items():
-            fig.add_trace(go.Scatter(
-                x=[None],
-                y=[None],
-                mode='markers',
-                marker=dict(size=10, color=color, symbol='square'),
-                showlegend=True,
-                name=trl
-            ))
-        
-        # Store HTML and figure
-        self.current_interactive_html = fig.to_html(include_plotlyjs='cdn')
+        # Store figure
         self.current_interactive_fig = fig
         
         # Display in UI using matplotlib
@@ -4366,7 +3817,10 @@ class ProductFeaturesApp:
             error_label.pack(pady=20)
     
     def update_swimlane_checkboxes(self, swimlanes):
-        """Update the swimlane filter checkboxes."""
+        """Update the swimlane filter checkboxes, preserving existing selections."""
+        # Remember current selections so a data refresh doesn't reset them
+        previous_state = {sl: var.get() for sl, var in self.interactive_swimlane_vars.items()}
+        
         # Clear existing checkboxes
         for widget in self.swimlane_checkboxes_frame.winfo_children():
             widget.destroy()
@@ -4381,14 +3835,15 @@ class ProductFeaturesApp:
         max_cols = 5
         
         for swimlane in sorted_swimlanes:
-            var = tk.BooleanVar(value=True)
+            # New swimlanes start selected
+            var = tk.BooleanVar(value=previous_state.get(swimlane, True))
             self.interactive_swimlane_vars[swimlane] = var
             
             cb = ttk.Checkbutton(
                 self.swimlane_checkboxes_frame,
                 text=swimlane,
                 variable=var,
-                command=self.update_interactive_roadmap
+                command=self.schedule_interactive_roadmap_render
             )
             cb.grid(row=row, column=col, sticky='w', padx=5, pady=2)
             
@@ -4399,54 +3854,248 @@ class ProductFeaturesApp:
     
     def open_interactive_roadmap_in_browser(self):
         """Open the current interactive roadmap in a web browser."""
-        if not self.current_interactive_html:
+        if not self.current_interactive_fig:
             messagebox.showwarning("No Data", "Please generate a roadmap first by clicking 'Update Roadmap'.")
             return
         
-        # Create temporary HTML file
-        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.html', encoding='utf-8') as f:
-            f.write(self.current_interactive_html)
-            temp_path = f.name
+        # Reuse one preview file (and one cached plotly.js) instead of a new temp file per click
+        preview_dir = os.path.join(tempfile.gettempdir(), 'engineering_plan_roadmap')
+        os.makedirs(preview_dir, exist_ok=True)
+        preview_path = os.path.join(preview_dir, 'interactive_roadmap.html')
+        write_roadmap_html(self.current_interactive_fig, preview_path)
         
         # Open in default browser
-        webbrowser.open('file://' + temp_path)
+        webbrowser.open('file://' + preview_path)
     
     def export_interactive_roadmap(self, format_type='png'):
-        """Export the interactive roadmap to PNG or PDF."""
-        if not self.current_interactive_html:
+        """Export the interactive roadmap to PNG, PDF or offline HTML."""
+        if not self.current_interactive_fig:
             messagebox.showwarning("No Data", "Please generate a roadmap first by clicking 'Update Roadmap'.")
             return
         
+        filetypes = {
+            'png': ("PNG files", "*.png"),
+            'pdf': ("PDF files", "*.pdf"),
+            'html': ("HTML files", "*.html")
+        }
+        
         # Ask for save location
-        if format_type == 'png':
-            filepath = filedialog.asksaveasfilename(
-                defaultextension=".png",
-                filetypes=[("PNG files", "*.png"), ("All files", "*.*")],
-                title="Export Roadmap as PNG"
-            )
-        else:
-            filepath = filedialog.asksaveasfilename(
-                defaultextension=".pdf",
-                filetypes=[("PDF files", "*.pdf"), ("All files", "*.*")],
-                title="Export Roadmap as PDF"
-            )
+        filepath = filedialog.asksaveasfilename(
+            defaultextension=f".{format_type}",
+            filetypes=[filetypes[format_type], ("All files", "*.*")],
+            title=f"Export Roadmap as {format_type.upper()}"
+        )
         
         if not filepath:
             return
         
         try:
-            # Need to recreate the figure for export
-            # This is a simplified version - we'll save the HTML and let user print to PDF from browser
+            if format_type == 'html':
+                write_roadmap_html(self.current_interactive_fig, filepath)
+            else:
+                write_static_images([self.current_interactive_fig], [filepath], format_type)
+            messagebox.showinfo("Export Successful", f"Roadmap exported to:\n{filepath}")
+        except Exception as e:
+            messagebox.showerror("Export Error", f"Failed to export: {str(e)}")
+    
+    def export_all_variant_roadmaps(self):
+        """Export roadmaps for every product variant into a chosen directory."""
+        output_dir = filedialog.askdirectory(title="Select folder for variant roadmaps")
+        if not output_dir:
+            return
+        
+        try:
+            written = export_variant_roadmaps(self.db, output_dir, formats=('html', 'png'),
+                                              view=self.interactive_roadmap_view.get(),
+                                              rollup=self.interactive_roadmap_rollup.get())
             messagebox.showinfo(
-                "Export Info",
-                f"To export as {format_type.upper()}:\n\n"
-                "1. The chart is open in your browser\n"
-                "2. Use the camera icon in the plotly toolbar (top-right of chart)\n"
-                "3. Or use your browser's Print function to save as PDF\n\n"
-                "For high-resolution exports, use the plotly toolbar's download option."
+                "Export Successful",
+                f"Exported {len(written)} roadmap files to:\n{output_dir}"
             )
         except Exception as e:
-            messagebox.showerror("Export Error", f"Failed to export: {str(e)}")
+            messagebox.showerror("Export Error", f"Failed to export roadmaps: {str(e)}")
+    
+    def create_validation_tab(self):
+        """Create the Validation tab listing plan-consistency issues (see plan_validator.py)."""
+        tab = ttk.Frame(self.notebook)
+        self.notebook.add(tab, text="Validation")
+        self.validation_tab = tab
+        
+        control_frame = ttk.Frame(tab)
+        control_frame.pack(fill=tk.X, padx=10, pady=10)
+        
+        ttk.Label(control_frame, text="Rule:").pack(side=tk.LEFT, padx=5)
+        self.validation_rule = ttk.Combobox(control_frame, state='readonly', width=28,
+                                            values=['All'] + RULE_NAMES)
+        self.validation_rule.set('All')
+        self.validation_rule.pack(side=tk.LEFT, padx=5)
+        self.validation_rule.bind('<<ComboboxSelected>>', lambda e: self.refresh_validation_view())
+        
+        ttk.Button(control_frame, text="Refresh",
+                  command=self.refresh_validation_view).pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="Re-check All",
+                  command=lambda: self.refresh_validation_view(full=True)).pack(side=tk.LEFT, padx=5)
+        
+        self.validation_summary = ttk.Label(control_frame, text="", font=('TkDefaultFont', 9, 'bold'))
+        self.validation_summary.pack(side=tk.LEFT, padx=20)
+        
+        list_frame = ttk.Frame(tab)
+        list_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+        
+        scroll = ttk.Scrollbar(list_frame)
+        scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        columns = ('Severity', 'Rule', 'Item', 'Related', 'Issue')
+        self.validation_tree = ttk.Treeview(list_frame, columns=columns, show='headings',
+                                            yscrollcommand=scroll.set)
+        scroll.config(command=self.validation_tree.yview)
+        
+        for col, width in zip(columns, (80, 190, 130, 130, 650)):
+            self.validation_tree.heading(col, text=col)
+            self.validation_tree.column(col, width=width, stretch=(col == 'Issue'))
+        
+        self.validation_tree.tag_configure('error', foreground='#DC3545')
+        self.validation_tree.tag_configure('warning', foreground='#B8860B')
+        
+        self.validation_tree.pack(fill=tk.BOTH, expand=True)
+        
+        self.refresh_validation_view()
+    
+    def refresh_validation_view(self, full=False):
+        """Re-check edited items (or the whole plan) and list the open issues."""
+        try:
+            if full:
+                validate_all(self.db)
+            else:
+                sync_validation(self.db)
+        except Exception as e:
+            self.validation_summary.config(text=f"Validation unavailable: {e}")
+            return
+        
+        for item in self.validation_tree.get_children():
+            self.validation_tree.delete(item)
+        
+        rule = self.validation_rule.get()
+        issues = open_issues(self.db, rules=None if rule == 'All' else [rule])
+        for issue in issues:
+            marker = '✗ Error' if issue['severity'] == ERROR else '⚠ Warning'
+            self.validation_tree.insert('', tk.END, tags=(issue['severity'],), values=(
+                marker, issue['rule'], issue['label'] or '', issue['related_label'] or '', issue['message']))
+        
+        counts = issue_counts(self.db)
+        errors = counts.get(ERROR, 0)
+        warnings = sum(counts.values()) - errors
+        self.validation_summary.config(text=f"{errors} errors, {warnings} warnings")
+        self.notebook.tab(self.validation_tab, text=f"Validation ({errors + warnings})"
+                          if errors + warnings else "Validation")
+    
+    def create_gap_analysis_tab(self):
+        """Create the Gap Analysis tab ranking items late against their variants (see gap_analysis.py)."""
+        tab = ttk.Frame(self.notebook)
+        self.notebook.add(tab, text="Gap Analysis")
+        self.gap_tab = tab
+        self.gap_items = []
+        
+        control_frame = ttk.Frame(tab)
+        control_frame.pack(fill=tk.X, padx=10, pady=10)
+        
+        ttk.Label(control_frame, text="Rank by:").pack(side=tk.LEFT, padx=5)
+        self.gap_rank = ttk.Combobox(control_frame, state='readonly', width=12, values=list(RANKINGS))
+        self.gap_rank.set('lateness')
+        self.gap_rank.pack(side=tk.LEFT, padx=5)
+        self.gap_rank.bind('<<ComboboxSelected>>', lambda e: self.refresh_gap_view())
+        
+        ttk.Button(control_frame, text="Refresh",
+                  command=self.refresh_gap_view).pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="Export CSV",
+                  command=self.export_gap_analysis).pack(side=tk.LEFT, padx=5)
+        
+        self.gap_summary = ttk.Label(control_frame, text="", font=('TkDefaultFont', 9, 'bold'))
+        self.gap_summary.pack(side=tk.LEFT, padx=20)
+        
+        list_frame = ttk.Frame(tab)
+        list_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+        
+        scroll = ttk.Scrollbar(list_frame)
+        scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        # Item rows expand to the variants they block
+        columns = ('Type', 'Name', 'TRL9 / Due', 'Days Late', 'Variants Blocked', 'Via')
+        self.gap_tree = ttk.Treeview(list_frame, columns=columns, show='tree headings',
+                                     yscrollcommand=scroll.set)
+        scroll.config(command=self.gap_tree.yview)
+        
+        self.gap_tree.heading('#0', text='Item / Variant')
+        self.gap_tree.column('#0', width=160, stretch=False)
+        for col, width in zip(columns, (120, 450, 100, 80, 110, 200)):
+            self.gap_tree.heading(col, text=col)
+            self.gap_tree.column(col, width=width, stretch=(col == 'Name'))
+        
+        self.gap_tree.tag_configure('late', foreground='#DC3545')
+        
+        self.gap_tree.pack(fill=tk.BOTH, expand=True)
+        
+        self.refresh_gap_view()
+    
+    def refresh_gap_view(self):
+        """List the late items across all variants in the selected ranking."""
+        try:
+            self.gap_items = gap_analysis(self.db, self.gap_rank.get())
+        except Exception as e:
+            self.gap_summary.config(text=f"Gap analysis unavailable: {e}")
+            return
+        
+        for item in self.gap_tree.get_children():
+            self.gap_tree.delete(item)
+        
+        for item in self.gap_items:
+            parent = self.gap_tree.insert('', tk.END, text=item.label, tags=('late',), values=(
+                KIND_NAMES[item.kind], item.name or '', item.trl9_date, item.max_days_late,
+                item.variants_blocked, ''))
+            for gap in item.gaps:
+                self.gap_tree.insert(parent, tk.END, text=gap['pv_label'], values=(
+                    KIND_NAMES[VARIANT], gap['pv_title'] or '', gap['due_date'], gap['days_late'],
+                    '', gap['via'] or ''))
+        
+        variants = {gap['pv_id'] for item in self.gap_items for gap in item.gaps}
+        self.gap_summary.config(text=f"{len(self.gap_items)} late items blocking {len(variants)} variants")
+    
+    def export_gap_analysis(self):
+        """Export every gap (item and blocked variant) to CSV."""
+        filepath = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+        )
+        
+        if not filepath:
+            return
+        
+        try:
+            write_gap_csv(self.gap_items, filepath)
+            messagebox.showinfo("Success", f"Gap analysis exported to {filepath}")
+        except Exception as e:
+            messagebox.showerror("Export Error", f"Failed to export gap analysis: {str(e)}")
+    
+    def validation_feedback(self, entity_type, entity_id):
+        """Re-check the edited items and describe the saved item's open issues (for save messages)."""
+        try:
+            self.refresh_validation_view()
+            issues = open_issues(self.db, entity_type, entity_id)
+        except Exception:
+            return ''
+        if not issues:
+            return ''
+        lines = [f"• {issue['message']}" for issue in issues[:5]]
+        if len(issues) > 5:
+            lines.append(f"… and {len(issues) - 5} more (see the Validation tab)")
+        return f"\n\n⚠ {len(issues)} plan issue(s):\n" + '\n'.join(lines)
+    
+    def on_main_tab_changed(self, event):
+        """Bring the Validation and Gap Analysis tabs up to date when they are opened."""
+        if self.notebook.select() == str(self.validation_tab):
+            self.refresh_validation_view()
+        elif self.notebook.select() == str(self.gap_tab):
+            self.refresh_gap_view()
     
     def export_to_json(self):
         """Export all database content to a JSON file."""
@@ -4554,7 +4203,10 @@ class ProductFeaturesApp:
             messagebox.showerror("Export Error", f"Failed to export database:\n{str(e)}")
     
     def import_from_json(self):
-        """Import database content from engineering_plan_db.json file."""
+        """Import database content from engineering_plan_db.json file.
+        
+        Only the differences from the current database are applied (see json_import.py).
+        """
         # Check for the file in the root directory
         filepath = os.path.join(os.path.dirname(__file__), 'engineering_plan_db.json')
         
@@ -4566,129 +4218,34 @@ class ProductFeaturesApp:
             )
             return
         
-        # Confirm before importing
-        response = messagebox.askyesno(
-            "Confirm Import",
-            f"This will import data from:\n{filepath}\n\n"
-            "Existing records with matching labels will be updated.\n"
-            "New records will be added.\n\n"
-            "Continue?"
-        )
-        
-        if not response:
-            return
-        
         try:
-            # Read JSON file
-            with open(filepath, 'r', encoding='utf-8') as f:
-                import_data = json.load(f)
+            # Read JSON file and work out what would change
+            plan = plan_json_import(self.db, load_json(filepath))
             
-            stats = {
-                'product_variants': {'added': 0, 'updated': 0},
-                'product_features': {'added': 0, 'updated': 0},
-                'capabilities': {'added': 0, 'updated': 0},
-                'technical_functions': {'added': 0, 'updated': 0},
-                'configurations': {'added': 0, 'updated': 0},
-                'milestones': {'added': 0, 'updated': 0},
-                'relationships': 0
-            }
-            
-            # Import Product Variants
-            for pv_data in import_data.get('product_variants', []):
-                # Check if exists by label
-                existing = self.db.get_product_variant_by_label(pv_data['label'])
-                if existing:
-                    self.db.update_product_variant(existing['id'], pv_data)
-                    stats['product_variants']['updated'] += 1
-                else:
-                    self.db.add_product_variant(pv_data)
-                    stats['product_variants']['added'] += 1
-            
-            # Import Product Features
-            for pf_data in import_data.get('product_features', []):
-                existing = self.db.get_product_feature_by_label(pf_data['label'])
-                if existing:
-                    self.db.update_product_feature(existing['id'], pf_data)
-                    stats['product_features']['updated'] += 1
-                else:
-                    self.db.add_product_feature(pf_data)
-                    stats['product_features']['added'] += 1
-            
-            # Import Capabilities
-            for cap_data in import_data.get('capabilities', []):
-                existing = self.db.get_capability_by_label(cap_data['label'])
-                if existing:
-                    self.db.update_capability(existing['id'], cap_data)
-                    stats['capabilities']['updated'] += 1
-                else:
-                    self.db.add_capability(cap_data)
-                    stats['capabilities']['added'] += 1
-            
-            # Import Technical Functions
-            for tf_data in import_data.get('technical_functions', []):
-                existing = self.db.get_technical_function_by_label(tf_data['label'])
-                if existing:
-                    self.db.update_technical_function(existing['id'], tf_data)
-                    stats['technical_functions']['updated'] += 1
-                else:
-                    self.db.add_technical_function(tf_data)
-                    stats['technical_functions']['added'] += 1
-            
-            # Import Configurations
-            for config_data in import_data.get('configurations', []):
-                # Check if configuration exists (by config_type and code)
-                existing_configs = self.db.get_configurations(config_data['config_type'])
-                existing = next((c for c in existing_configs if c['code'] == config_data['code']), None)
-                if existing:
-                    self.db.update_configuration(existing['id'], config_data)
-                    stats['configurations']['updated'] += 1
-                else:
-                    self.db.add_configuration(config_data)
-                    stats['configurations']['added'] += 1
-            
-            # Import Milestones
-            for milestone_data in import_data.get('milestones', []):
-                # Check if milestone exists by name
-                existing_milestones = self.db.get_milestones()
-                existing = next((m for m in existing_milestones if m['name'] == milestone_data['name']), None)
-                if existing:
-                    self.db.update_milestone(existing['id'], milestone_data)
-                    stats['milestones']['updated'] += 1
-                else:
-                    self.db.add_milestone(milestone_data)
-                    stats['milestones']['added'] += 1
-            
-            # Clear existing relationships and re-import
-            cursor = self.db.connection.cursor()
-            cursor.execute("DELETE FROM pv_product_features")
-            cursor.execute("DELETE FROM pf_capabilities")
-            cursor.execute("DELETE FROM cap_technical_functions")
+            if plan.is_empty():
+                messagebox.showinfo(
+                    "Import",
+                    f"The database already matches:\n{filepath}\n\nNothing to import."
+                )
+                return
             
-            # Import PV-PF Relationships
-            for rel in import_data.get('pv_product_features_relationships', []):
-                pv = self.db.get_product_variant_by_label(rel['product_variant_label'])
-                pf = self.db.get_product_feature_by_label(rel['product_feature_label'])
-                if pv and pf:
-                    self.db.link_pv_pf(pv['id'], pf['id'])
-                    stats['relationships'] += 1
+            # Show the delta and confirm before writing anything
+            response = messagebox.askyesno(
+                "Confirm Import",
+                f"Importing from:\n{filepath}\n\n"
+                "The following changes will be applied:\n\n" +
+                "\n".join(plan.summary_lines()) +
+                "\n\nRecords not in the file are kept. Continue?"
+            )
             
-            # Import PF-Capability Relationships
-            for rel in import_data.get('pf_capabilities_relationships', []):
-                pf = self.db.get_product_feature_by_label(rel['product_feature_label'])
-                cap = self.db.get_capability_by_label(rel['capability_label'])
-                if pf and cap:
-                    self.db.link_pf_capability(pf['id'], cap['id'])
-                    stats['relationships'] += 1
+            if not response:
+                return
             
-            # Import Capability-TF Relationships
-            for rel in import_data.get('cap_technical_functions_relationships', []):
-                cap = self.db.get_capability_by_label(rel['capability_label'])
-                tf = self.db.get_technical_function_by_label(rel['technical_function_label'])
-                if cap and tf:
-                    self.db.link_cap_tf(cap['id'], tf['id'])
-                    stats['relationships'] += 1
+            # Keep a restorable copy of the current contents (cheap: only changed records are stored)
+            BackupStore(default_store_dir(self.db.db_path)).create_snapshot(
+                self.db, note=f"Before JSON import from {os.path.basename(filepath)}")
             
-            self.db.connection.commit()
+            plan.apply(self.db)
             
             # Refresh all tabs
             self.refresh_product_variants()
@@ -4700,14 +4257,8 @@ class ProductFeaturesApp:
             # Show success message
             messagebox.showinfo(
                 "Import Successful",
-                f"Database imported successfully from:\n{filepath}\n\n"
-                f"Product Variants: {stats['product_variants']['added']} added, {stats['product_variants']['updated']} updated\n"
-                f"Product Features: {stats['product_features']['added']} added, {stats['product_features']['updated']} updated\n"
-                f"Capabilities: {stats['capabilities']['added']} added, {stats['capabilities']['updated']} updated\n"
-                f"Technical Functions: {stats['technical_functions']['added']} added, {stats['technical_functions']['updated']} updated\n"
-                f"Configurations: {stats['configurations']['added']} added, {stats['configurations']['updated']} updated\n"
-                f"Milestones: {stats['milestones']['added']} added, {stats['milestones']['updated']} updated\n"
-                f"Relationships: {stats['relationships']} linked"
+                f"Database imported successfully from:\n{filepath}\n\n" +
+                "\n".join(plan.summary_lines())
             )
             
         except FileNotFoundError:
@@ -4717,6 +4268,29 @@ class ProductFeaturesApp:
         except Exception as e:
             messagebox.showerror("Import Error", f"Failed to import database:\n{str(e)}")
     
+    def create_backup_snapshot(self):
+        """Store an incremental, content-addressed backup snapshot of the database."""
+        store = BackupStore(default_store_dir(self.db.db_path))
+        
+        try:
+            previous = store.latest_snapshot_id()
+            manifest = store.create_snapshot(self.db, note="Manual backup")
+            
+            if manifest['id'] == previous:
+                messagebox.showinfo(
+                    "Backup Snapshot",
+                    f"No changes since snapshot {previous}.\n\nStore: {store.root}"
+                )
+            else:
+                messagebox.showinfo(
+                    "Backup Snapshot",
+                    f"Snapshot {manifest['id']} created ({manifest['written']} new records stored).\n\n"
+                    f"Store: {store.root}\n\n"
+                    "Restore with: python backup_store.py restore " + manifest['id']
+                )
+        except Exception as e:
+            messagebox.showerror("Backup Error", f"Failed to create backup snapshot:\n{str(e)}")
+    
     def __del__(self):
         """Cleanup."""
         if hasattr(self, 'db'):
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+Content-addressed, incremental backups of the engineering plan database.
+
+Every backed-up record is stored as a small JSON blob named by the SHA-256 of its
+contents: one blob per entity row, and one blob per parent for the link tables (e.g. all
+capabilities linked to one product feature). A snapshot is a manifest mapping each
+table's keys to blob hashes. Blobs already in the store are never written again, so a
+snapshot only costs the records that changed since the last one, and snapshots can be
+diffed by comparing manifests without reading any blobs.
+
+Layout (default directory: plan_backups/ next to the database):
+    objects/ab/abcdef...json      record blobs
+    manifests/20251119_065158.json
+
+Usage:
+    python backup_store.py create [--db product_features.db] [--store plan_backups] [--force]
+    python backup_store.py list [--store plan_backups]
+    python backup_store.py diff OLD [NEW] [--store plan_backups]
+    python backup_store.py restore SNAPSHOT [--db product_features.db] [--store plan_backups]
+    python backup_store.py prune --keep 20 [--store plan_backups]
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from database import Database
+
+# Tables in insert order (link tables after the entities they reference)
+ENTITY_TABLES = [
+    'configurations',
+    'milestones',
+    'product_variants',
+    'product_features',
+    'capabilities',
+    'technical_functions',
+]
+
+# Link table -> column the rows are grouped by (one blob per parent)
+LINK_TABLES = {
+    'pv_product_features': 'product_variant_id',
+    'pf_capabilities': 'product_feature_id',
+    'cap_technical_functions': 'capability_id',
+}
+
+BACKUP_TABLES = ENTITY_TABLES + list(LINK_TABLES)
+
+DEFAULT_STORE_DIR = 'plan_backups'
+
+SNAPSHOT_ID_FORMAT = '%Y%m%d_%H%M%S'
+
+MANIFEST_VERSION = 1
+
+
+def canonical_json(value) -> bytes:
+    """Stable JSON encoding used for blobs and hashes."""
+    return json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False,
+                      default=str).encode('utf-8')
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def table_digest(entries: Dict[str, str]) -> str:
+    """Hash of a table's {key: blob hash} map; equal digests mean identical tables."""
+    return _digest(canonical_json(sorted(entries.items())))
+
+
+def read_table_records(db: Database, table: str) -> Dict[str, Dict]:
+    """{manifest key: record} for one table.
+
+    Entity rows are keyed by id. Link rows are grouped by their parent id into
+    {'rows': [...]} records, ordered by link id.
+    """
+    cursor = db.connection.cursor()
+    cursor.execute(f'SELECT * FROM {table} ORDER BY id')
+    rows = [dict(row) for row in cursor.fetchall()]
+
+    if table not in LINK_TABLES:
+        return {str(row['id']): row for row in rows}
+
+    parent_column = LINK_TABLES[table]
+    groups: Dict[str, Dict] = {}
+    for row in rows:
+        groups.setdefault(str(row[parent_column]), {'rows': []})['rows'].append(row)
+    return groups
+
+
+class BackupStore:
+    """A directory of content-addressed record blobs and snapshot manifests."""
+
+    def __init__(self, root=DEFAULT_STORE_DIR):
+        self.root = Path(root)
+        self.objects_dir = self.root / 'objects'
+        self.manifests_dir = self.root / 'manifests'
+
+    # ---- blobs ----
+
+    def blob_path(self, blob_hash: str) -> Path:
+        return self.objects_dir / blob_hash[:2] / f"{blob_hash}.json"
+
+    def put_blob(self, data: bytes, blob_hash: Optional[str] = None) -> bool:
+        """Store a blob unless it is already present. Returns True if it was written."""
+        blob_hash = blob_hash or _digest(data)
+        path = self.blob_path(blob_hash)
+        if path.exists():
+            return False
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        tmp_path.replace(path)
+        return True
+
+    def get_blob(self, blob_hash: str) -> Dict:
+        with open(self.blob_path(blob_hash), 'rb') as f:
+            return json.loads(f.read())
+
+    # ---- manifests ----
+
+    def snapshot_ids(self) -> List[str]:
+        """Snapshot ids, oldest first."""
+        if not self.manifests_dir.exists():
+            return []
+        return sorted(path.stem for path in self.manifests_dir.glob('*.json'))
+
+    def latest_snapshot_id(self) -> Optional[str]:
+        ids = self.snapshot_ids()
+        return ids[-1] if ids else None
+
+    def load_manifest(self, snapshot_id: str) -> Dict:
+        path = self.manifests_dir / f"{snapshot_id}.json"
+        if not path.exists():
+            raise FileNotFoundError(f"Snapshot not found: {snapshot_id}")
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _new_snapshot_id(self) -> str:
+        base = datetime.now().strftime(SNAPSHOT_ID_FORMAT)
+        snapshot_id, suffix = base, 1
+        while (self.manifests_dir / f"{snapshot_id}.json").exists():
+            snapshot_id = f"{base}_{suffix}"
+            suffix += 1
+        return snapshot_id
+
+    # ---- operations ----
+
+    def create_snapshot(self, db: Database, note: str = '', force: bool = False) -> Dict:
+        """Back up the database, writing only blobs the store does not have yet.
+
+        If nothing changed since the latest snapshot, no manifest is written (unless
+        force) and the latest manifest is returned. The returned manifest has an extra
+        'written' count of new blobs.
+        """
+        latest_id = self.latest_snapshot_id()
+        latest = self.load_manifest(latest_id) if latest_id else None
+        known = set()
+        if latest:
+            for table in latest['tables'].values():
+                known.update(table['entries'].values())
+
+        tables = {}
+        written = 0
+        for table in BACKUP_TABLES:
+            entries = {}
+            for key, record in read_table_records(db, table).items():
+                data = canonical_json(record)
+                blob_hash = _digest(data)
+                # Blobs referenced by the latest manifest are known to exist
+                if blob_hash not in known and self.put_blob(data, blob_hash):
+                    written += 1
+                entries[key] = blob_hash
+            tables[table] = {'digest': table_digest(entries), 'entries': entries}
+
+        if latest and not force and all(
+                latest['tables'].get(table, {}).get('digest') == tables[table]['digest']
+                for table in BACKUP_TABLES):
+            latest['written'] = 0
+            return latest
+
+        manifest = {
+            'version': MANIFEST_VERSION,
+            'id': self._new_snapshot_id(),
+            'created': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'database': str(db.db_path),
+            'note': note,
+            'parent': latest_id,
+            'tables': tables,
+        }
+        self.manifests_dir.mkdir(parents=True, exist_ok=True)
+        path = self.manifests_dir / f"{manifest['id']}.json"
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(canonical_json(manifest))
+        tmp_path.replace(path)
+
+        manifest['written'] = written
+        return manifest
+
+    def diff(self, old_id: str, new_id: str) -> Dict[str, Dict[str, List[str]]]:
+        """Keys added, removed and changed per table between two snapshots.
+
+        Tables with equal digests are skipped without comparing their entries.
+        """
+        old, new = self.load_manifest(old_id), self.load_manifest(new_id)
+        changes = {}
+        for table in BACKUP_TABLES:
+            old_table = old['tables'].get(table, {'digest': None, 'entries': {}})
+            new_table = new['tables'].get(table, {'digest': None, 'entries': {}})
+            if old_table['digest'] == new_table['digest']:
+                continue
+            old_entries, new_entries = old_table['entries'], new_table['entries']
+            changes[table] = {
+                'added': sorted(new_entries.keys() - old_entries.keys(), key=int),
+                'removed': sorted(old_entries.keys() - new_entries.keys(), key=int),
+                'changed': sorted((key for key in old_entries.keys() & new_entries.keys()
+                                   if old_entries[key] != new_entries[key]), key=int),
+            }
+        return changes
+
+    def restore(self, snapshot_id: str, db: Database) -> Dict[str, int]:
+        """Replace the database contents with a snapshot, in a single transaction.
+
+        Ids are preserved. Columns the database does not have are ignored.
+        Returns {table name: rows restored}.
+        """
+        manifest = self.load_manifest(snapshot_id)
+        db.create_tables()
+        cursor = db.connection.cursor()
+        counts = {}
+        try:
+            for table in reversed(BACKUP_TABLES):
+                cursor.execute(f'DELETE FROM {table}')
+
+            for table in BACKUP_TABLES:
+                cursor.execute(f'PRAGMA table_info({table})')
+                db_columns = [row['name'] for row in cursor.fetchall()]
+
+                rows = []
+                for blob_hash in manifest['tables'].get(table, {'entries': {}})['entries'].values():
+                    record = self.get_blob(blob_hash)
+                    rows.extend(record['rows'] if table in LINK_TABLES else [record])
+                if not rows:
+                    counts[table] = 0
+                    continue
+
+                columns = [col for col in db_columns if col in rows[0]]
+                cursor.executemany(
+                    f'INSERT INTO {table} ({", ".join(columns)}) '
+                    f'VALUES ({", ".join("?" for _ in columns)})',
+                    [[row.get(col) for col in columns] for row in rows]
+                )
+                counts[table] = len(rows)
+
+            db.connection.commit()
+        except Exception:
+            db.connection.rollback()
+            raise
+        return counts
+
+    def prune(self, keep: int) -> Dict[str, int]:
+        """Keep the newest `keep` snapshots and delete blobs no longer referenced."""
+        ids = self.snapshot_ids()
+        removed_ids = ids[:-keep] if keep > 0 else ids
+        for snapshot_id in removed_ids:
+            (self.manifests_dir / f"{snapshot_id}.json").unlink()
+
+        referenced = set()
+        for snapshot_id in self.snapshot_ids():
+            for table in self.load_manifest(snapshot_id)['tables'].values():
+                referenced.update(table['entries'].values())
+
+        removed_blobs = 0
+        if self.objects_dir.exists():
+            for path in self.objects_dir.glob('*/*.json'):
+                if path.stem not in referenced:
+                    path.unlink()
+                    removed_blobs += 1
+        return {'snapshots': len(removed_ids), 'blobs': removed_blobs}
+
+
+def default_store_dir(db_path) -> Path:
+    """The store directory used for a database: plan_backups/ next to it."""
+    return Path(db_path).resolve().parent / DEFAULT_STORE_DIR
+
+
+def print_diff(changes: Dict[str, Dict[str, List[str]]]):
+    if not changes:
+        print("  No differences")
+        return
+    for table, delta in changes.items():
+        print(f"  {table}: {len(delta['added'])} added, {len(delta['removed'])} removed, "
+              f"{len(delta['changed'])} changed")
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Incremental content-addressed database backups.")
+    parser.add_argument('--store', help=f"Backup store directory (default: {DEFAULT_STORE_DIR}/ next to the database)")
+    parser.add_argument('--db', default='product_features.db', help="SQLite database (default: product_features.db)")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    create_parser = subparsers.add_parser('create', help="Back up the database")
+    create_parser.add_argument('--note', default='', help="Note stored with the snapshot")
+    create_parser.add_argument('--force', action='store_true', help="Write a snapshot even if nothing changed")
+
+    subparsers.add_parser('list', help="List snapshots")
+
+    diff_parser = subparsers.add_parser('diff', help="Compare two snapshots")
+    diff_parser.add_argument('old', help="Older snapshot id")
+    diff_parser.add_argument('new', nargs='?', help="Newer snapshot id (default: latest)")
+
+    restore_parser = subparsers.add_parser('restore', help="Replace the database contents with a snapshot")
+    restore_parser.add_argument('snapshot', help="Snapshot id ('latest' for the newest)")
+
+    prune_parser = subparsers.add_parser('prune', help="Delete old snapshots and unreferenced blobs")
+    prune_parser.add_argument('--keep', type=int, required=True, help="Number of newest snapshots to keep")
+
+    args = parser.parse_args(argv)
+    store = BackupStore(args.store or default_store_dir(args.db))
+
+    if args.command == 'list':
+        for snapshot_id in store.snapshot_ids():
+            manifest = store.load_manifest(snapshot_id)
+            rows = sum(len(table['entries']) for table in manifest['tables'].values())
+            note = f"  {manifest['note']}" if manifest.get('note') else ''
+            print(f"  {snapshot_id}  {manifest['created']}  {rows} records{note}")
+        return 0
+
+    if args.command == 'diff':
+        new_id = args.new or store.latest_snapshot_id()
+        print(f"Changes from {args.old} to {new_id}:")
+        print_diff(store.diff(args.old, new_id))
+        return 0
+
+    if args.command == 'prune':
+        removed = store.prune(args.keep)
+        print(f"✓ Removed {removed['snapshots']} snapshots and {removed['blobs']} unreferenced blobs")
+        return 0
+
+    if not os.path.exists(args.db) and args.command == 'create':
+        print(f"✗ Error: Database '{args.db}' not found")
+        return 1
+
+    db = Database(args.db)
+    db.connect()
+    try:
+        if args.command == 'create':
+            previous = store.latest_snapshot_id()
+            manifest = store.create_snapshot(db, note=args.note, force=args.force)
+            if manifest['id'] == previous:
+                print(f"✓ No changes since snapshot {previous}")
+            else:
+                print(f"✓ Snapshot {manifest['id']} created ({manifest['written']} new blobs)")
+                if previous:
+                    print_diff(store.diff(previous, manifest['id']))
+        else:
+            snapshot_id = store.latest_snapshot_id() if args.snapshot == 'latest' else args.snapshot
+            if snapshot_id is None:
+                print("✗ Error: No snapshots in the store")
+                return 1
+            counts = store.restore(snapshot_id, db)
+            for table, count in counts.items():
+                print(f"  ✓ {table}: {count} rows")
+            print(f"\n✓ Snapshot {snapshot_id} restored into {args.db}")
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+In-memory bitset index for the configuration filters of features and capabilities.
+
+Database.get_product_features/get_capabilities build a SQL query per filter
+combination. This index loads a table once and gives every entity a bit (label order).
+For each filter column it then keeps one bitset per stored value. Bitsets are plain
+Python ints, so a filter is resolved as follows:
+
+    - expand the filter value with included_config_values (hierarchy);
+    - OR the bitsets of the included values together;
+    - AND the results across columns.
+
+Facet counts answer "how many items would match if this dropdown were set to X,
+keeping the other filters". Each count is a popcount of one AND.
+
+Indexes are cached per database file and table. table_versions (kept by triggers)
+tells when a cached index is stale, whichever connection made the change.
+
+Usage:
+    python config_filter_index.py [--db product_features.db] [--table capabilities]
+                                  [--platform Terberg-1.2] [--odd CFG-ODD-2] ...
+"""
+import argparse
+import sys
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from database import CONFIG_COLUMNS, Database, included_config_values
+
+# Filterable columns per table (as in Database.get_product_features/get_capabilities)
+FILTER_COLUMNS = {
+    'product_features': CONFIG_COLUMNS,
+    'capabilities': CONFIG_COLUMNS + ('swimlane',),
+}
+
+
+class ConfigFilterIndex:
+    """Per-column value bitsets over one table's rows (bit i: rows[i])."""
+
+    def __init__(self, table: str, rows: List[Dict], version: int):
+        self.table = table
+        self.rows = rows
+        self.version = version
+        self.all_bits = (1 << len(rows)) - 1
+        # {column: {stored value: bitset}}
+        self.value_bits: Dict[str, Dict[str, int]] = {column: {} for column in FILTER_COLUMNS[table]}
+        for i, row in enumerate(rows):
+            for column, bits in self.value_bits.items():
+                value = row.get(column)
+                if value:
+                    bits[value] = bits.get(value, 0) | (1 << i)
+        # Bitsets of hierarchy-expanded filter values: {(column, value): bitset}
+        self._filter_bits: Dict[Tuple[str, str], int] = {}
+
+    @classmethod
+    def load(cls, db: Database, table: str) -> 'ConfigFilterIndex':
+        version = db.get_table_version(table)
+        cursor = db.connection.cursor()
+        cursor.execute(f'SELECT * FROM {table} ORDER BY label')
+        return cls(table, [dict(row) for row in cursor.fetchall()], version)
+
+    def bits(self, column: str, value: str) -> int:
+        """Rows matching one filter, e.g. ('platform', 'Terberg-1.2') also matches
+        rows on Terberg-1.1 and Terberg-1."""
+        key = (column, value)
+        if key not in self._filter_bits:
+            stored = self.value_bits[column]
+            bits = 0
+            for included in included_config_values(column, value):
+                bits |= stored.get(included, 0)
+            self._filter_bits[key] = bits
+        return self._filter_bits[key]
+
+    def match(self, filters: Optional[Dict] = None, ignore: Optional[str] = None) -> int:
+        """Bitset of the rows matching every non-empty filter (except column `ignore`)."""
+        bits = self.all_bits
+        for column, value in (filters or {}).items():
+            if value and column != ignore and column in self.value_bits:
+                bits &= self.bits(column, value)
+        return bits
+
+    def rows_for(self, bits: int) -> List[Dict]:
+        """Copies of the rows in a bitset, in label order."""
+        return [dict(self.rows[i]) for i, bit in enumerate(bin(bits)[:1:-1]) if bit == '1']
+
+    def filter(self, filters: Optional[Dict] = None) -> List[Dict]:
+        """Same rows as Database.get_product_features/get_capabilities(filters)."""
+        return self.rows_for(self.match(filters))
+
+    def count(self, filters: Optional[Dict] = None) -> int:
+        return self.match(filters).bit_count()
+
+    def facet_counts(self, column: str, values: Iterable[str], filters: Optional[Dict] = None) -> Dict[str, int]:
+        """Matches per value of `column`, combined with the other filters; the current
+        filter on `column` itself is ignored, so every option shows what picking it
+        would give. An empty value counts the column unfiltered."""
+        others = self.match(filters, ignore=column)
+        return {value: (others & self.bits(column, value) if value else others).bit_count()
+                for value in values}
+
+
+# Indexes reused across calls: {(database path, table): ConfigFilterIndex}
+_index_cache: Dict[Tuple[str, str], ConfigFilterIndex] = {}
+
+
+def get_filter_index(db: Database, table: str) -> ConfigFilterIndex:
+    """The table's filter index, rebuilt only when the table changed since it was built."""
+    key = (str(db.db_path), table)
+    index = _index_cache.get(key)
+    if index is None or index.version != db.get_table_version(table):
+        index = _index_cache[key] = ConfigFilterIndex.load(db, table)
+    return index
+
+
+def facet_label(value: str, count: str) -> str:
+    """Dropdown text for a value followed by its match count(s)."""
+    return f"{value} ({count})" if value else ''
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description="Configuration filter matches and facet counts.")
+    parser.add_argument('--db', default='product_features.db', help="SQLite database (default: product_features.db)")
+    parser.add_argument('--table', default='product_features', choices=sorted(FILTER_COLUMNS),
+                        help="Table to filter (default: product_features)")
+    for column in FILTER_COLUMNS['capabilities']:
+        parser.add_argument(f'--{column}', help=f"Filter on {column}")
+    args = parser.parse_args(argv)
+
+    db = Database(args.db)
+    db.connect()
+    db.create_tables()
+    try:
+        index = get_filter_index(db, args.table)
+    finally:
+        db.close()
+
+    filters = {column: getattr(args, column) for column in FILTER_COLUMNS[args.table] if getattr(args, column)}
+    matches = index.filter(filters)
+    print(f"{len(matches)} of {len(index.rows)} {args.table.replace('_', ' ')} match {filters or 'no filters'}")
+    for row in matches:
+        print(f"  {row['label']:16} {row.get('name') or ''}")
+
+    for column in FILTER_COLUMNS[args.table]:
+        counts = index.facet_counts(column, sorted(index.value_bits[column]), filters)
+        print(f"\n{column}:")
+        for value, count in counts.items():
+            print(f"  {value:24} {count}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
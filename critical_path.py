@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Critical-path and schedule-slack engine for product variant readiness.
+
+Builds one precedence graph from the link tables and the parsed capability
+dependencies (dependency_graph.py):
+
+    capability -> product feature      (a PF cannot reach TRL9 before its capabilities)
+    product feature -> product variant (a PV is ready when all its PFs are at TRL9)
+    capability -> capability           (finish-to-start: the dependent capability's own
+                                        duration, start_date to trl9_date, follows its
+                                        prerequisite's TRL9)
+
+A forward pass in topological order gives each node's earliest achievable TRL9: the
+later of its planned trl9_date and what its predecessors allow. A backward pass from
+the variants' due dates gives the latest TRL9 that keeps every variant on time; slack
+is the difference (negative slack means the node makes a variant late). Following each
+node's driving predecessor back from a variant gives its critical chain. Both passes
+are linear in nodes + edges.
+
+Usage:
+    python critical_path.py [PV-LABEL ...] [--db product_features.db]
+"""
+import argparse
+import sys
+from collections import deque
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from database import Database
+from dependency_graph import load_capability_graph
+from dependency_index import DependencyIndex
+
+# Node kinds (a node is a (kind, id) tuple)
+VARIANT = 'pv'
+FEATURE = 'pf'
+CAPABILITY = 'cap'
+
+KIND_NAMES = {
+    VARIANT: 'Product Variant',
+    FEATURE: 'Product Feature',
+    CAPABILITY: 'Capability',
+}
+
+Node = Tuple[str, int]
+
+
+def parse_date(value) -> Optional[date]:
+    """Date from a stored 'YYYY-MM-DD' value (None if empty or not a date)."""
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
+
+
+class CriticalPathResult:
+    """Earliest/latest TRL9 dates, slack and drivers for every node.
+
+    earliest[n]   earliest achievable TRL9 (None when nothing feeding n is dated)
+    latest[n]     latest TRL9 that keeps every dependent variant on time (None if no
+                  dated variant depends on n)
+    driver[n]     predecessor that determines earliest[n] (None: n's own plan does)
+    """
+
+    def __init__(self, index: DependencyIndex):
+        self.index = index
+        self.planned: Dict[Node, Optional[date]] = {}
+        self.earliest: Dict[Node, Optional[date]] = {}
+        self.latest: Dict[Node, Optional[date]] = {}
+        self.driver: Dict[Node, Optional[Node]] = {}
+        self.predecessors: Dict[Node, List[Tuple[Node, int]]] = {}
+        self.successors: Dict[Node, List[Tuple[Node, int]]] = {}
+        # Topological order of all nodes
+        self.order: List[Node] = []
+        # Capabilities on a dependency cycle (edges within the cycle were ignored)
+        self.cyclic: List[int] = []
+
+    def entity(self, node: Node) -> Dict:
+        kind, node_id = node
+        return {
+            VARIANT: self.index.product_variants,
+            FEATURE: self.index.product_features,
+            CAPABILITY: self.index.capabilities,
+        }[kind][node_id]
+
+    def label(self, node: Node) -> str:
+        return self.entity(node)['label']
+
+    def slack(self, node: Node) -> Optional[int]:
+        """Days between latest and earliest TRL9 (negative: the node causes a slip)."""
+        if self.earliest.get(node) is None or self.latest.get(node) is None:
+            return None
+        return (self.latest[node] - self.earliest[node]).days
+
+    def slip(self, pv_id: int) -> Optional[int]:
+        """Days the variant is late (negative: early) against its due date."""
+        node = (VARIANT, pv_id)
+        due = self.planned.get(node)
+        if due is None or self.earliest.get(node) is None:
+            return None
+        return (self.earliest[node] - due).days
+
+    def critical_chain(self, pv_id: int) -> List[Node]:
+        """Nodes driving the variant's earliest TRL9, from the root cause to the variant."""
+        chain = []
+        node: Optional[Node] = (VARIANT, pv_id)
+        while node is not None:
+            chain.append(node)
+            node = self.driver.get(node)
+        return list(reversed(chain))
+
+    def _forward(self, node: Node, planned: Optional[date],
+                 earliest: Dict[Node, Optional[date]]) -> Tuple[Optional[date], Optional[Node]]:
+        """Earliest TRL9 of node and its driving predecessor, given its predecessors'."""
+        # A variant's due date is its deadline, not a planned finish
+        best = None if node[0] == VARIANT else planned
+        driver = None
+        for pred, lag in self.predecessors[node]:
+            if earliest[pred] is None:
+                continue
+            candidate = earliest[pred] + timedelta(days=lag)
+            # Ties go to the predecessor: it is a binding constraint
+            if best is None or candidate > best or (candidate == best and driver is None):
+                best, driver = candidate, pred
+        return best, driver
+
+    def shifted_earliest(self, shifts: Dict[Node, int]) -> Dict[Node, Optional[date]]:
+        """Earliest TRL9 of every node if the planned TRL9 of some feature/capability
+        nodes moved by a number of days. Only nodes downstream of a shifted node are
+        recomputed; this result is not modified."""
+        if any(node[0] == VARIANT for node in shifts):
+            raise ValueError("Only product features and capabilities can be shifted")
+
+        affected = set()
+        stack = [node for node in shifts if node in self.successors]
+        while stack:
+            node = stack.pop()
+            if node not in affected:
+                affected.add(node)
+                stack.extend(succ for succ, _ in self.successors[node])
+
+        earliest = dict(self.earliest)
+        for node in self.order:
+            if node in affected:
+                planned = self.planned[node]
+                if planned is not None and node in shifts:
+                    planned += timedelta(days=shifts[node])
+                earliest[node], _ = self._forward(node, planned, earliest)
+        return earliest
+
+    def variant_nodes(self, pv_id: int) -> List[Node]:
+        """Every node feeding the variant (its features, their capabilities and the
+        capabilities those depend on)."""
+        seen = {(VARIANT, pv_id)}
+        queue = deque(seen)
+        while queue:
+            for pred, _ in self.predecessors.get(queue.popleft(), []):
+                if pred not in seen:
+                    seen.add(pred)
+                    queue.append(pred)
+        seen.discard((VARIANT, pv_id))
+        return sorted(seen, key=lambda n: (self.slack(n) is None, self.slack(n) or 0, self.label(n)))
+
+
+def _capability_duration(cap: Dict) -> int:
+    """Days from start_date to trl9_date (0 when either is missing or reversed)."""
+    start, finish = parse_date(cap.get('start_date')), parse_date(cap.get('trl9_date'))
+    if start and finish and finish > start:
+        return (finish - start).days
+    return 0
+
+
+def compute_critical_paths(db: Database, index: Optional[DependencyIndex] = None) -> CriticalPathResult:
+    """Run the forward and backward passes over the whole plan."""
+    index = index or DependencyIndex.load(db)
+    result = CriticalPathResult(index)
+    graph = load_capability_graph(db)
+    # Only edges inside a cycle are dropped; capabilities that merely depend on one keep theirs
+    cycles = graph.cycle_components()
+    result.cyclic = sorted(cycles)
+
+    nodes: List[Node] = ([(VARIANT, i) for i in index.product_variants] +
+                         [(FEATURE, i) for i in index.product_features] +
+                         [(CAPABILITY, i) for i in index.capabilities])
+    for node in nodes:
+        result.predecessors[node] = []
+        result.successors[node] = []
+
+    def add_edge(pred: Node, succ: Node, lag: int):
+        result.predecessors[succ].append((pred, lag))
+        result.successors[pred].append((succ, lag))
+
+    for pv_id, pf_ids in index.pv_pfs.items():
+        for pf_id in pf_ids:
+            add_edge((FEATURE, pf_id), (VARIANT, pv_id), 0)
+    for pf_id, cap_ids in index.pf_caps.items():
+        for cap_id in cap_ids:
+            add_edge((CAPABILITY, cap_id), (FEATURE, pf_id), 0)
+    for cap_id, prereq_ids in graph.prerequisites.items():
+        if cap_id not in index.capabilities:
+            continue
+        duration = _capability_duration(index.capabilities[cap_id])
+        for prereq_id in prereq_ids:
+            if prereq_id in cycles and cycles.get(cap_id) == cycles[prereq_id]:
+                continue
+            if prereq_id in index.capabilities:
+                add_edge((CAPABILITY, prereq_id), (CAPABILITY, cap_id), duration)
+
+    for node in nodes:
+        entity = result.entity(node)
+        result.planned[node] = parse_date(entity.get('due_date' if node[0] == VARIANT else 'trl9_date'))
+
+    # Topological order (Kahn); the graph is acyclic once edges within cycles are dropped
+    pending = {node: len(result.predecessors[node]) for node in nodes}
+    queue = deque(node for node in nodes if pending[node] == 0)
+    order = []
+    while queue:
+        node = queue.popleft()
+        order.append(node)
+        for succ, _ in result.successors[node]:
+            pending[succ] -= 1
+            if pending[succ] == 0:
+                queue.append(succ)
+
+    # Forward pass: earliest achievable TRL9
+    result.order = order
+    for node in order:
+        result.earliest[node], result.driver[node] = result._forward(node, result.planned[node], result.earliest)
+
+    # Backward pass: latest TRL9 that keeps every dated variant on time
+    for node in reversed(order):
+        latest = result.planned[node] if node[0] == VARIANT else None
+        for succ, lag in result.successors[node]:
+            if result.latest[succ] is None:
+                continue
+            candidate = result.latest[succ] - timedelta(days=lag)
+            if latest is None or candidate < latest:
+                latest = candidate
+        result.latest[node] = latest
+
+    return result
+
+
+def _format_date(value: Optional[date]) -> str:
+    return value.isoformat() if value else '-'
+
+
+def print_variant(result: CriticalPathResult, pv_id: int):
+    pv = result.index.product_variants[pv_id]
+    node = (VARIANT, pv_id)
+    slip = result.slip(pv_id)
+    status = '' if slip is None else (f"  ✗ {slip} days late" if slip > 0 else "  ✓ on time")
+    print(f"\n{pv['label']}: {pv.get('title') or ''}")
+    print(f"  Due: {_format_date(result.planned[node])}   "
+          f"Earliest TRL9: {_format_date(result.earliest[node])}{status}")
+    chain = result.critical_chain(pv_id)
+    if len(chain) > 1:
+        print("  Critical chain:")
+        for chain_node in chain[:-1]:
+            slack = result.slack(chain_node)
+            print(f"    {result.label(chain_node):16} {KIND_NAMES[chain_node[0]]:16} "
+                  f"TRL9 {_format_date(result.earliest[chain_node])}  "
+                  f"slack {'-' if slack is None else slack}")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Critical path and slack per product variant.")
+    parser.add_argument('variants', nargs='*', help="Product variant labels (default: all)")
+    parser.add_argument('--db', default='product_features.db', help="SQLite database (default: product_features.db)")
+    args = parser.parse_args(argv)
+
+    db = Database(args.db)
+    db.connect()
+    db.create_tables()
+    try:
+        result = compute_critical_paths(db)
+    finally:
+        db.close()
+
+    by_label = {pv['label']: pv_id for pv_id, pv in result.index.product_variants.items()}
+    unknown = [label for label in args.variants if label not in by_label]
+    if unknown:
+        print(f"✗ Unknown product variant(s): {', '.join(unknown)}")
+        return 1
+    if result.cyclic:
+        print(f"⚠ Ignored dependency cycle between: "
+              f"{', '.join(result.index.capabilities[i]['label'] for i in result.cyclic)}")
+
+    for label in args.variants or sorted(by_label):
+        print_variant(result, by_label[label])
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
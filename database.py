@@ -5,6 +5,115 @@ import sqlite3
 from datetime import datetime
 from typing import List, Dict, Optional, Tuple
 
+# TRL date columns rolled up the PV -> PF -> capability hierarchy (trl_rollup table)
+TRL_DATE_COLUMNS = ('trl3_date', 'trl6_date', 'trl9_date')
+
+# Most recent link changes kept in link_change_log (older entries are trimmed on insert)
+CHANGE_LOG_LIMIT = 10000
+
+
+def valid_date_sql(expr: str) -> str:
+    """SQL expression giving the 'YYYY-MM-DD' part of a date column, NULL if not a date."""
+    return f"CASE WHEN date(substr({expr}, 1, 10)) = substr({expr}, 1, 10) THEN substr({expr}, 1, 10) END"
+
+
+def _rollup_feature_sql(where: str) -> str:
+    """Recompute the trl_rollup rows of the product features matching `where` (on pf):
+    each TRL date is the latest of the feature's own date and its capabilities' dates."""
+    dates = []
+    for col in TRL_DATE_COLUMNS:
+        own, linked = valid_date_sql(f'pf.{col}'), f"MAX({valid_date_sql(f'c.{col}')})"
+        dates.append(f"CASE WHEN {linked} IS NULL OR {own} > {linked} THEN {own} ELSE {linked} END")
+    # One grouped pass over each feature's links (LEFT JOINs keep unlinked features)
+    return f'''
+        INSERT OR REPLACE INTO trl_rollup
+        (entity_type, entity_id, trl3_date, trl6_date, trl9_date, child_count, undated_children, updated_at)
+        SELECT 'pf', pf.id,
+        {', '.join(dates)},
+        COUNT(c.id),
+        COUNT(c.id) - COUNT({valid_date_sql('c.trl9_date')}),
+        CURRENT_TIMESTAMP
+        FROM product_features pf
+        LEFT JOIN pf_capabilities l ON l.product_feature_id = pf.id
+        LEFT JOIN capabilities c ON c.id = l.capability_id
+        WHERE {where}
+        GROUP BY pf.id;
+    '''
+
+
+def _rollup_variant_sql(where: str) -> str:
+    """Recompute the trl_rollup rows of the product variants matching `where` (on pv)
+    from their features' rolled-up rows."""
+    # LEFT JOINs also fix the join order: the variant's links drive the lookups
+    return f'''
+        INSERT OR REPLACE INTO trl_rollup
+        (entity_type, entity_id, trl3_date, trl6_date, trl9_date, child_count, undated_children, updated_at)
+        SELECT 'pv', pv.id,
+        {', '.join(f'MAX(r.{col})' for col in TRL_DATE_COLUMNS)},
+        COUNT(r.entity_id),
+        COUNT(r.entity_id) - COUNT(r.trl9_date),
+        CURRENT_TIMESTAMP
+        FROM product_variants pv
+        LEFT JOIN pv_product_features l ON l.product_variant_id = pv.id
+        LEFT JOIN trl_rollup r ON r.entity_type = 'pf' AND r.entity_id = l.product_feature_id
+        WHERE {where}
+        GROUP BY pv.id;
+    '''
+
+
+# Configuration columns shared by variants, features and capabilities
+CONFIG_COLUMNS = ('platform', 'odd', 'environment', 'trailer')
+
+# Tables whose changes are counted in table_versions
+VERSIONED_TABLES = ('product_variants', 'product_features', 'capabilities', 'technical_functions')
+
+
+def included_config_values(column: str, value: str) -> List[str]:
+    """Configuration values an item may carry to apply to a `column` value of `value`
+    (hierarchical: Terberg-1.3 includes 1.2, 1.1 and 1; CFG-ODD-2 includes CFG-ODD-1.1
+    and CFG-ODD-1; CFG-ENV-2.1 includes CFG-ENV-1.1)."""
+    if column == 'platform' and value.startswith('Terberg-'):
+        # Extract versions: Terberg-1.3 includes Terberg-1.2, Terberg-1.1, Terberg-1
+        base = value.split('-')[1]  # e.g., "1.3"
+        parts = base.split('.')
+        included = ['Terberg-' + parts[0]]  # Base version (Terberg-1)
+        
+        # Add intermediate versions
+        if len(parts) > 1:
+            for i in range(1, int(parts[1]) + 1):
+                included.append(f'Terberg-{parts[0]}.{i}')
+        return included
+    if column == 'odd' and value.startswith('CFG-ODD-'):
+        version = value.replace('CFG-ODD-', '')
+        included = ['CFG-ODD-1']  # Always include base
+        
+        if version == '1.1' or version == '2':
+            included.append('CFG-ODD-1.1')
+        if version == '2':
+            included.append('CFG-ODD-2')
+        elif '.' in version:
+            included.append(value)
+        return included
+    if column == 'environment' and value == 'CFG-ENV-2.1':
+        return ['CFG-ENV-2.1', 'CFG-ENV-1.1']
+    return [value]
+
+
+def _config_filter_sql(filters: Dict, params: List) -> str:
+    """WHERE clause fragment for the hierarchical platform/ODD/environment/trailer filters."""
+    query = ''
+    for column in CONFIG_COLUMNS:
+        if filters.get(column):
+            included = included_config_values(column, filters[column])
+            query += f" AND {column} IN ({','.join('?' * len(included))})"
+            params.extend(included)
+    return query
+
+
+def _dates_changed() -> str:
+    return ' OR '.join(f'OLD.{col} IS NOT NEW.{col}' for col in TRL_DATE_COLUMNS)
+
+
 class Database:
     def __init__(self, db_path='product_features.db'):
         self.db_path = db_path
@@ -182,7 +291,275 @@ class Database:
                 UNIQUE(product_variant_id, product_feature_id)
             )
         ''')
-        
+
+        # Hashes of the spreadsheet rows/links last applied by the Excel sync (import_data.py --sync)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS import_row_hashes (
+                table_name TEXT NOT NULL,
+                row_key TEXT NOT NULL,
+                row_hash TEXT NOT NULL,
+                synced_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (table_name, row_key)
+            )
+        ''')
+
+        # Dependency edges parsed from capabilities.dependencies/dependents (dependency_graph.py)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS capability_dependencies (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                capability_id INTEGER NOT NULL,
+                depends_on_id INTEGER NOT NULL,
+                source TEXT NOT NULL,
+                FOREIGN KEY (capability_id) REFERENCES capabilities(id) ON DELETE CASCADE,
+                FOREIGN KEY (depends_on_id) REFERENCES capabilities(id) ON DELETE CASCADE,
+                UNIQUE(capability_id, depends_on_id, source)
+            )
+        ''')
+
+        # Sequencing edges parsed from technical_functions.next (dependency_graph.py)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS technical_function_dependencies (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                technical_function_id INTEGER NOT NULL,
+                depends_on_id INTEGER NOT NULL,
+                source TEXT NOT NULL,
+                FOREIGN KEY (technical_function_id) REFERENCES technical_functions(id) ON DELETE CASCADE,
+                FOREIGN KEY (depends_on_id) REFERENCES technical_functions(id) ON DELETE CASCADE,
+                UNIQUE(technical_function_id, depends_on_id, source)
+            )
+        ''')
+
+        # Fingerprint of the source columns each materialized table was last built from
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS derived_table_state (
+                table_name TEXT PRIMARY KEY,
+                fingerprint TEXT NOT NULL,
+                built_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        # Log of link table changes, written by triggers, so in-memory indexes
+        # (impact_index.py) can catch up incrementally whoever changed the links
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS link_change_log (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                table_name TEXT NOT NULL,
+                parent_id INTEGER,
+                child_id INTEGER,
+                change TEXT NOT NULL
+            )
+        ''')
+        for table, parent_col, child_col in [
+            ('pv_product_features', 'product_variant_id', 'product_feature_id'),
+            ('pf_capabilities', 'product_feature_id', 'capability_id'),
+            ('cap_technical_functions', 'capability_id', 'technical_function_id'),
+        ]:
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS log_{table}_insert AFTER INSERT ON {table}
+                BEGIN
+                    INSERT INTO link_change_log (table_name, parent_id, child_id, change)
+                    VALUES ('{table}', NEW.{parent_col}, NEW.{child_col}, 'insert');
+                END
+            ''')
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS log_{table}_delete AFTER DELETE ON {table}
+                BEGIN
+                    INSERT INTO link_change_log (table_name, parent_id, child_id, change)
+                    VALUES ('{table}', OLD.{parent_col}, OLD.{child_col}, 'delete');
+                END
+            ''')
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS log_{table}_update AFTER UPDATE ON {table}
+                BEGIN
+                    INSERT INTO link_change_log (table_name, parent_id, child_id, change)
+                    VALUES ('{table}', OLD.{parent_col}, OLD.{child_col}, 'delete');
+                    INSERT INTO link_change_log (table_name, parent_id, child_id, change)
+                    VALUES ('{table}', NEW.{parent_col}, NEW.{child_col}, 'insert');
+                END
+            ''')
+        # Ids have no gaps (AUTOINCREMENT), so this keeps exactly the last
+        # CHANGE_LOG_LIMIT entries whichever path wrote the links (bulk imports included)
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trim_link_change_log AFTER INSERT ON link_change_log
+            WHEN NEW.id > {CHANGE_LOG_LIMIT}
+            BEGIN
+                DELETE FROM link_change_log WHERE id <= NEW.id - {CHANGE_LOG_LIMIT};
+            END
+        ''')
+
+        # TRL dates rolled up the hierarchy (a feature cannot be readier than its
+        # capabilities, a variant than its features), kept current by triggers on
+        # the entity date columns and the link tables
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS trl_rollup (
+                entity_type TEXT NOT NULL,
+                entity_id INTEGER NOT NULL,
+                trl3_date DATE,
+                trl6_date DATE,
+                trl9_date DATE,
+                child_count INTEGER NOT NULL DEFAULT 0,
+                undated_children INTEGER NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (entity_type, entity_id)
+            )
+        ''')
+        date_columns = ', '.join(TRL_DATE_COLUMNS)
+        variants_of_feature = ('pv.id IN (SELECT product_variant_id FROM pv_product_features '
+                               'WHERE product_feature_id = {row}.{col})')
+        features_of_capability = ('pf.id IN (SELECT product_feature_id FROM pf_capabilities '
+                                  'WHERE capability_id = {row}.id)')
+        variants_of_capability = ('pv.id IN (SELECT l.product_variant_id FROM pv_product_features l '
+                                  'JOIN pf_capabilities pc ON pc.product_feature_id = l.product_feature_id '
+                                  'WHERE pc.capability_id = {row}.id)')
+        rollup_triggers = {
+            'rollup_pf_insert': ('AFTER INSERT ON product_features',
+                                 _rollup_feature_sql('pf.id = NEW.id') +
+                                 _rollup_variant_sql(variants_of_feature.format(row='NEW', col='id'))),
+            'rollup_pf_update': (f'AFTER UPDATE OF {date_columns} ON product_features WHEN {_dates_changed()}',
+                                 _rollup_feature_sql('pf.id = NEW.id') +
+                                 _rollup_variant_sql(variants_of_feature.format(row='NEW', col='id'))),
+            'rollup_pf_delete': ('AFTER DELETE ON product_features',
+                                 "DELETE FROM trl_rollup WHERE entity_type = 'pf' AND entity_id = OLD.id;" +
+                                 _rollup_variant_sql(variants_of_feature.format(row='OLD', col='id'))),
+            'rollup_cap_insert': ('AFTER INSERT ON capabilities',
+                                  _rollup_feature_sql(features_of_capability.format(row='NEW')) +
+                                  _rollup_variant_sql(variants_of_capability.format(row='NEW'))),
+            'rollup_cap_update': (f'AFTER UPDATE OF {date_columns} ON capabilities WHEN {_dates_changed()}',
+                                  _rollup_feature_sql(features_of_capability.format(row='NEW')) +
+                                  _rollup_variant_sql(variants_of_capability.format(row='NEW'))),
+            'rollup_cap_delete': ('AFTER DELETE ON capabilities',
+                                  _rollup_feature_sql(features_of_capability.format(row='OLD')) +
+                                  _rollup_variant_sql(variants_of_capability.format(row='OLD'))),
+            'rollup_pv_insert': ('AFTER INSERT ON product_variants',
+                                 _rollup_variant_sql('pv.id = NEW.id')),
+            'rollup_pv_delete': ('AFTER DELETE ON product_variants',
+                                 "DELETE FROM trl_rollup WHERE entity_type = 'pv' AND entity_id = OLD.id;"),
+        }
+        for row in ('NEW', 'OLD'):
+            change = {'NEW': 'insert', 'OLD': 'delete'}[row]
+            rollup_triggers[f'rollup_pf_capabilities_{change}'] = (
+                f'AFTER {change.upper()} ON pf_capabilities',
+                _rollup_feature_sql(f'pf.id = {row}.product_feature_id') +
+                _rollup_variant_sql(variants_of_feature.format(row=row, col='product_feature_id')))
+            rollup_triggers[f'rollup_pv_product_features_{change}'] = (
+                f'AFTER {change.upper()} ON pv_product_features',
+                _rollup_variant_sql(f'pv.id = {row}.product_variant_id'))
+        rollup_triggers['rollup_pf_capabilities_update'] = (
+            'AFTER UPDATE ON pf_capabilities',
+            _rollup_feature_sql('pf.id IN (OLD.product_feature_id, NEW.product_feature_id)') +
+            _rollup_variant_sql('pv.id IN (SELECT product_variant_id FROM pv_product_features '
+                                'WHERE product_feature_id IN (OLD.product_feature_id, NEW.product_feature_id))'))
+        rollup_triggers['rollup_pv_product_features_update'] = (
+            'AFTER UPDATE ON pv_product_features',
+            _rollup_variant_sql('pv.id IN (OLD.product_variant_id, NEW.product_variant_id)'))
+        for name, (event, body) in rollup_triggers.items():
+            cursor.execute(f'CREATE TRIGGER IF NOT EXISTS {name} {event} BEGIN {body} END')
+
+        # Plan-consistency issues found by plan_validator.py, and the queue of edited
+        # items (filled by triggers) whose rules it re-checks on the next sync
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS validation_issues (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                rule TEXT NOT NULL,
+                severity TEXT NOT NULL,
+                entity_type TEXT NOT NULL,
+                entity_id INTEGER NOT NULL,
+                related_type TEXT,
+                related_id INTEGER,
+                message TEXT NOT NULL,
+                detected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS validation_queue (
+                entity_type TEXT NOT NULL,
+                entity_id INTEGER NOT NULL,
+                PRIMARY KEY (entity_type, entity_id)
+            )
+        ''')
+        for table, kind in [('product_variants', 'pv'), ('product_features', 'pf'), ('capabilities', 'cap')]:
+            for event, row in [('INSERT', 'NEW'), ('UPDATE', 'NEW'), ('DELETE', 'OLD')]:
+                cursor.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS queue_{table}_{event.lower()} AFTER {event} ON {table}
+                    BEGIN
+                        INSERT OR IGNORE INTO validation_queue VALUES ('{kind}', {row}.id);
+                    END
+                ''')
+        for table, kind, parent_col in [('pv_product_features', 'pv', 'product_variant_id'),
+                                        ('pf_capabilities', 'pf', 'product_feature_id')]:
+            for event, rows in [('INSERT', ['NEW']), ('UPDATE', ['OLD', 'NEW']), ('DELETE', ['OLD'])]:
+                inserts = ''.join(f"INSERT OR IGNORE INTO validation_queue VALUES ('{kind}', {row}.{parent_col});"
+                                  for row in rows)
+                cursor.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS queue_{table}_{event.lower()} AFTER {event} ON {table}
+                    BEGIN {inserts} END
+                ''')
+
+        # Materialized variant x feature/capability compatibility (variant_compatibility.py):
+        # explicit links and per-column configuration matches, refreshed from the queue
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS variant_compatibility (
+                product_variant_id INTEGER NOT NULL,
+                entity_type TEXT NOT NULL,
+                entity_id INTEGER NOT NULL,
+                linked INTEGER NOT NULL,
+                matched_columns INTEGER NOT NULL,
+                PRIMARY KEY (product_variant_id, entity_type, entity_id)
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS compatibility_queue (
+                entity_type TEXT NOT NULL,
+                entity_id INTEGER NOT NULL,
+                PRIMARY KEY (entity_type, entity_id)
+            )
+        ''')
+        config_changed = ' OR '.join(f'OLD.{col} IS NOT NEW.{col}' for col in CONFIG_COLUMNS)
+        for table, kind in [('product_variants', 'pv'), ('product_features', 'pf'), ('capabilities', 'cap')]:
+            for event, row, when in [('INSERT', 'NEW', ''), ('UPDATE', 'NEW', f'WHEN {config_changed}'),
+                                     ('DELETE', 'OLD', '')]:
+                cursor.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS compat_{table}_{event.lower()} AFTER {event} ON {table} {when}
+                    BEGIN
+                        INSERT OR IGNORE INTO compatibility_queue VALUES ('{kind}', {row}.id);
+                    END
+                ''')
+        # A deleted feature no longer links its capabilities to its variants
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS compat_product_features_delete_links AFTER DELETE ON product_features
+            BEGIN
+                INSERT OR IGNORE INTO compatibility_queue
+                SELECT 'cap', capability_id FROM pf_capabilities WHERE product_feature_id = OLD.id;
+            END
+        ''')
+        for table, kind, column in [('pv_product_features', 'pv', 'product_variant_id'),
+                                    ('pf_capabilities', 'cap', 'capability_id')]:
+            for event, rows in [('INSERT', ['NEW']), ('UPDATE', ['OLD', 'NEW']), ('DELETE', ['OLD'])]:
+                inserts = ''.join(f"INSERT OR IGNORE INTO compatibility_queue VALUES ('{kind}', {row}.{column});"
+                                  for row in rows)
+                cursor.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS compat_{table}_{event.lower()} AFTER {event} ON {table}
+                    BEGIN {inserts} END
+                ''')
+
+        # Change counters for in-memory copies of entity tables (config_filter_index.py,
+        # dependency_graph.py): a cached copy is current while its table's version is unchanged
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS table_versions (
+                table_name TEXT PRIMARY KEY,
+                version INTEGER NOT NULL
+            )
+        ''')
+        for table in VERSIONED_TABLES:
+            for event in ('INSERT', 'UPDATE', 'DELETE'):
+                cursor.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS version_{table}_{event.lower()} AFTER {event} ON {table}
+                    BEGIN
+                        INSERT INTO table_versions VALUES ('{table}', 1)
+                        ON CONFLICT(table_name) DO UPDATE SET version = version + 1;
+                    END
+                ''')
+
         # Create indexes for better query performance
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_pf_label ON product_features(label)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_cap_label ON capabilities(label)')
@@ -195,8 +572,42 @@ class Database:
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_pv_label ON product_variants(label)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_pv_pf_pv ON pv_product_features(product_variant_id)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_pv_pf_pf ON pv_product_features(product_feature_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_cap_dep_cap ON capability_dependencies(capability_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_cap_dep_on ON capability_dependencies(depends_on_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_tf_dep_tf ON technical_function_dependencies(technical_function_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_tf_dep_on ON technical_function_dependencies(depends_on_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_issue_entity ON validation_issues(entity_type, entity_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_issue_rule ON validation_issues(rule)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_compat_entity ON variant_compatibility(entity_type, entity_id)')
+
+        # Populate the roll-up the first time it is created in an existing database
+        cursor.execute('SELECT COUNT(*) FROM trl_rollup')
+        if cursor.fetchone()[0] == 0:
+            self.rebuild_trl_rollup(commit=False)
         
         self.connection.commit()
+
+    def rebuild_trl_rollup(self, commit: bool = True):
+        """Recompute every row of the trl_rollup table from scratch."""
+        cursor = self.connection.cursor()
+        cursor.execute('DELETE FROM trl_rollup')
+        cursor.execute(_rollup_feature_sql('1').strip().rstrip(';'))
+        cursor.execute(_rollup_variant_sql('1').strip().rstrip(';'))
+        if commit:
+            self.connection.commit()
+
+    def get_table_version(self, table: str) -> int:
+        """Change counter of one of VERSIONED_TABLES (0 if never changed)."""
+        cursor = self.connection.cursor()
+        cursor.execute('SELECT version FROM table_versions WHERE table_name = ?', (table,))
+        row = cursor.fetchone()
+        return row[0] if row else 0
+
+    def get_trl_rollup(self, entity_type: str) -> Dict[int, Dict]:
+        """Rolled-up TRL dates by entity id for 'pf' (product features) or 'pv' (variants)."""
+        cursor = self.connection.cursor()
+        cursor.execute('SELECT * FROM trl_rollup WHERE entity_type = ?', (entity_type,))
+        return {row['entity_id']: dict(row) for row in cursor.fetchall()}
         
     # CRUD operations for Product Features
     def add_product_feature(self, data: Dict) -> int:
@@ -224,59 +635,7 @@ class Database:
         params = []
         
         if filters:
-            if filters.get('platform'):
-                # Hierarchical: Terberg-1.3 includes 1.2, 1.1, 1
-                platform = filters['platform']
-                if platform.startswith('Terberg-'):
-                    # Extract versions: Terberg-1.3 includes Terberg-1.2, Terberg-1.1, Terberg-1
-                    base = platform.split('-')[1]  # e.g., "1.3"
-                    parts = base.split('.')
-                    included = ['Terberg-' + parts[0]]  # Base version (Terberg-1)
-                    
-                    # Add intermediate versions
-                    if len(parts) > 1:
-                        for i in range(1, int(parts[1]) + 1):
-                            included.append(f'Terberg-{parts[0]}.{i}')
-                    
-                    query += ' AND platform IN ({})'.format(','.join('?' * len(included)))
-                    params.extend(included)
-                else:
-                    query += ' AND platform = ?'
-                    params.append(platform)
-                    
-            if filters.get('odd'):
-                # Hierarchical: CFG-ODD-2 > CFG-ODD-1.1 > CFG-ODD-1
-                odd = filters['odd']
-                if odd.startswith('CFG-ODD-'):
-                    version = odd.replace('CFG-ODD-', '')
-                    included = ['CFG-ODD-1']  # Always include base
-                    
-                    if version == '1.1' or version == '2':
-                        included.append('CFG-ODD-1.1')
-                    if version == '2':
-                        included.append('CFG-ODD-2')
-                    elif '.' in version:
-                        included.append(odd)
-                    
-                    query += ' AND odd IN ({})'.format(','.join('?' * len(included)))
-                    params.extend(included)
-                else:
-                    query += ' AND odd = ?'
-                    params.append(odd)
-                    
-            if filters.get('environment'):
-                # CFG-ENV-2.1 includes CFG-ENV-1.1, so show both
-                env = filters['environment']
-                if env == 'CFG-ENV-2.1':
-                    query += ' AND (environment = ? OR environment = ?)'
-                    params.append('CFG-ENV-2.1')
-                    params.append('CFG-ENV-1.1')
-                else:
-                    query += ' AND environment = ?'
-                    params.append(env)
-            if filters.get('trailer'):
-                query += ' AND trailer = ?'
-                params.append(filters['trailer'])
+            query += _config_filter_sql(filters, params)
                 
         query += ' ORDER BY label'
         cursor.execute(query, params)
@@ -348,64 +707,11 @@ class Database:
         params = []
         
         if filters:
-            if filters.get('platform'):
-                # Hierarchical: Terberg-1.3 includes 1.2, 1.1, 1
-                platform = filters['platform']
-                if platform.startswith('Terberg-'):
-                    # Extract versions: Terberg-1.3 includes Terberg-1.2, Terberg-1.1, Terberg-1
-                    base = platform.split('-')[1]  # e.g., "1.3"
-                    parts = base.split('.')
-                    included = ['Terberg-' + parts[0]]  # Base version (Terberg-1)
-                    
-                    # Add intermediate versions
-                    if len(parts) > 1:
-                        for i in range(1, int(parts[1]) + 1):
-                            included.append(f'Terberg-{parts[0]}.{i}')
-                    
-                    query += ' AND platform IN ({})'.format(','.join('?' * len(included)))
-                    params.extend(included)
-                else:
-                    query += ' AND platform = ?'
-                    params.append(platform)
-                    
+            query += _config_filter_sql(filters, params)
             if filters.get('swimlane'):
                 query += ' AND swimlane = ?'
                 params.append(filters['swimlane'])
                 
-            if filters.get('odd'):
-                # Hierarchical: CFG-ODD-2 > CFG-ODD-1.1 > CFG-ODD-1
-                odd = filters['odd']
-                if odd.startswith('CFG-ODD-'):
-                    version = odd.replace('CFG-ODD-', '')
-                    included = ['CFG-ODD-1']  # Always include base
-                    
-                    if version == '1.1' or version == '2':
-                        included.append('CFG-ODD-1.1')
-                    if version == '2':
-                        included.append('CFG-ODD-2')
-                    elif '.' in version:
-                        included.append(odd)
-                    
-                    query += ' AND odd IN ({})'.format(','.join('?' * len(included)))
-                    params.extend(included)
-                else:
-                    query += ' AND odd = ?'
-                    params.append(odd)
-                    
-            if filters.get('environment'):
-                # CFG-ENV-2.1 includes CFG-ENV-1.1, so show both
-                env = filters['environment']
-                if env == 'CFG-ENV-2.1':
-                    query += ' AND (environment = ? OR environment = ?)'
-                    params.append('CFG-ENV-2.1')
-                    params.append('CFG-ENV-1.1')
-                else:
-                    query += ' AND environment = ?'
-                    params.append(env)
-            if filters.get('trailer'):
-                query += ' AND trailer = ?'
-                params.append(filters['trailer'])
-                
         query += ' ORDER BY label'
         cursor.execute(query, params)
         return [dict(row) for row in cursor.fetchall()]
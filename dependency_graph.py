@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+Capability and technical function dependency graphs.
+
+capabilities.dependencies / capabilities.dependents and technical_functions.next are
+free text. This module parses the labels they mention into the normalized, indexed
+edge tables capability_dependencies and technical_function_dependencies, and loads
+them into a DependencyGraph with a cached topological order and transitive closure.
+
+The edge tables are rebuilt whenever the source columns change: a fingerprint of the
+parsed columns is kept in derived_table_state, so load_capability_graph() only
+re-parses after an edit, import or sync touched them. A loaded graph is reused without
+reading the table at all while the table's table_versions counter is unchanged.
+
+Edge direction: an edge (capability_id, depends_on_id) means capability_id cannot
+start before depends_on_id is done. Text in `dependencies` lists what the row depends
+on; text in `dependents` and `next` lists what depends on the row.
+
+Usage:
+    python dependency_graph.py [LABEL ...] [--db product_features.db] [--functions]
+"""
+import argparse
+import hashlib
+import heapq
+import json
+import re
+import sys
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from database import Database
+
+# Entity table -> (edge table, node column, {text column: direction})
+# 'prerequisites': the column lists labels this row depends on
+# 'dependents': the column lists labels that depend on this row
+GRAPH_SPECS = {
+    'capabilities': ('capability_dependencies', 'capability_id',
+                     {'dependencies': 'prerequisites', 'dependents': 'dependents'}),
+    'technical_functions': ('technical_function_dependencies', 'technical_function_id',
+                            {'next': 'dependents'}),
+}
+
+# Separators between references in the free-text columns
+REFERENCE_SEPARATORS = re.compile(r'[,;\n\r\t|/ ]+')
+
+# Tokens that look like a label (e.g. CA-ENV-1.1); other words are ignored silently
+LABEL_LIKE = re.compile(r'^[A-Za-z]+-[A-Za-z0-9.\-]*\d')
+
+
+class DependencyCycleError(ValueError):
+    """Raised when a topological order is requested for a graph containing cycles."""
+
+    def __init__(self, labels: List[str]):
+        self.labels = labels
+        super().__init__(f"Dependency cycle between: {', '.join(labels)}")
+
+
+def parse_references(text: Optional[str]) -> List[str]:
+    """Split a free-text reference column into candidate label tokens."""
+    if not text:
+        return []
+    return [token.strip('()[]."\'') for token in REFERENCE_SEPARATORS.split(str(text))
+            if token.strip('()[]."\'')]
+
+
+class DependencyGraph:
+    """Directed dependency graph over one entity table.
+
+    prerequisites[n] holds the ids n depends on directly; dependents[n] the ids that
+    depend on n directly. Topological order and the transitive closure are computed on
+    first use and cached (the graph is immutable once loaded).
+    """
+
+    def __init__(self, labels: Dict[int, str], edges: Iterable[Tuple[int, int]],
+                 unresolved: Optional[List[Tuple[int, str, str]]] = None):
+        self.labels = labels
+        self.ids = {label: node_id for node_id, label in labels.items()}
+        self.prerequisites: Dict[int, Set[int]] = {node_id: set() for node_id in labels}
+        self.dependents: Dict[int, Set[int]] = {node_id: set() for node_id in labels}
+        for node_id, depends_on_id in edges:
+            if node_id in labels and depends_on_id in labels:
+                self.prerequisites[node_id].add(depends_on_id)
+                self.dependents[depends_on_id].add(node_id)
+        # (entity id, column, token) for label-like references that matched nothing
+        self.unresolved = unresolved or []
+
+        self._order: Optional[List[int]] = None
+        self._cyclic: Optional[List[int]] = None
+        self._bits: Optional[Dict[int, int]] = None
+        self._upstream: Optional[Dict[int, int]] = None
+        self._downstream: Optional[Dict[int, int]] = None
+
+    @property
+    def edge_count(self) -> int:
+        return sum(len(targets) for targets in self.prerequisites.values())
+
+    def node_id(self, label: str) -> int:
+        """Id for a label (KeyError if unknown)."""
+        return self.ids[label]
+
+    # ---- ordering ----
+
+    def _sort(self):
+        """Kahn's algorithm; nodes left over are on (or behind) a cycle."""
+        remaining = {node_id: len(prereqs) for node_id, prereqs in self.prerequisites.items()}
+        # Heap of (label, id) keeps ties in label order so the result is deterministic
+        ready = [(str(self.labels[node_id]), node_id) for node_id, count in remaining.items() if count == 0]
+        heapq.heapify(ready)
+        order = []
+        while ready:
+            _, node_id = heapq.heappop(ready)
+            order.append(node_id)
+            for dependent in self.dependents[node_id]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    heapq.heappush(ready, (str(self.labels[dependent]), dependent))
+        placed = set(order)
+        self._order = order
+        self._cyclic = sorted((node_id for node_id in self.labels if node_id not in placed),
+                              key=lambda node_id: str(self.labels[node_id]))
+
+    def cyclic_nodes(self) -> List[int]:
+        """Ids that cannot be ordered because they are on or depend on a cycle."""
+        if self._order is None:
+            self._sort()
+        return list(self._cyclic)
+
+    def cycle_components(self) -> Dict[int, int]:
+        """{id: component number} for the ids on a cycle.
+
+        Ids in the same strongly connected component share a number; ids that only
+        depend on a cycle are left out. Iterative Tarjan, linear in nodes + edges.
+        """
+        index: Dict[int, int] = {}
+        lowlink: Dict[int, int] = {}
+        stack: List[int] = []
+        on_stack: Set[int] = set()
+        components: Dict[int, int] = {}
+        for root in self.labels:
+            if root in index:
+                continue
+            index[root] = lowlink[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(self.prerequisites[root]))]
+            while work:
+                node_id, prereqs = work[-1]
+                for prereq in prereqs:
+                    if prereq not in index:
+                        index[prereq] = lowlink[prereq] = len(index)
+                        stack.append(prereq)
+                        on_stack.add(prereq)
+                        work.append((prereq, iter(self.prerequisites[prereq])))
+                        break
+                    if prereq in on_stack:
+                        lowlink[node_id] = min(lowlink[node_id], index[prereq])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        lowlink[parent] = min(lowlink[parent], lowlink[node_id])
+                    if lowlink[node_id] == index[node_id]:
+                        members = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            members.append(member)
+                            if member == node_id:
+                                break
+                        if len(members) > 1 or node_id in self.prerequisites[node_id]:
+                            for member in members:
+                                components[member] = index[node_id]
+        return components
+
+    def topological_order(self) -> List[int]:
+        """All ids, prerequisites before dependents (ties broken by label).
+
+        Raises DependencyCycleError if the graph has a cycle.
+        """
+        if self._order is None:
+            self._sort()
+        if self._cyclic:
+            raise DependencyCycleError([self.labels[node_id] for node_id in self._cyclic])
+        return list(self._order)
+
+    # ---- transitive closure ----
+
+    def _closure(self):
+        """Reachability bitsets in both directions (Python ints, one bit per node)."""
+        self._bits = {node_id: 1 << idx for idx, node_id in enumerate(self.labels)}
+        if self._order is None:
+            self._sort()
+
+        upstream: Dict[int, int] = {}
+        downstream: Dict[int, int] = {}
+        if not self._cyclic:
+            # One pass in each direction over the topological order
+            for node_id in self._order:
+                mask = 0
+                for prereq in self.prerequisites[node_id]:
+                    mask |= self._bits[prereq] | upstream[prereq]
+                upstream[node_id] = mask
+            for node_id in reversed(self._order):
+                mask = 0
+                for dependent in self.dependents[node_id]:
+                    mask |= self._bits[dependent] | downstream[dependent]
+                downstream[node_id] = mask
+        else:
+            for node_id in self.labels:
+                upstream[node_id] = self._reach(node_id, self.prerequisites)
+                downstream[node_id] = self._reach(node_id, self.dependents)
+        self._upstream = upstream
+        self._downstream = downstream
+
+    def _reach(self, start: int, adjacency: Dict[int, Set[int]]) -> int:
+        """Bitset of nodes reachable from start (graph search, works with cycles)."""
+        mask = 0
+        stack = list(adjacency[start])
+        while stack:
+            node_id = stack.pop()
+            bit = self._bits[node_id]
+            if not mask & bit:
+                mask |= bit
+                stack.extend(adjacency[node_id])
+        return mask
+
+    def _ids(self, mask: int) -> List[int]:
+        return [node_id for node_id, bit in self._bits.items() if mask & bit]
+
+    def all_prerequisites(self, node_id: int) -> List[int]:
+        """Every id node_id depends on, directly or transitively."""
+        if self._upstream is None:
+            self._closure()
+        return self._ids(self._upstream[node_id])
+
+    def all_dependents(self, node_id: int) -> List[int]:
+        """Every id that depends on node_id, directly or transitively (what it blocks)."""
+        if self._downstream is None:
+            self._closure()
+        return self._ids(self._downstream[node_id])
+
+    def depends_on(self, node_id: int, other_id: int) -> bool:
+        """True if node_id depends on other_id, directly or transitively."""
+        if self._upstream is None:
+            self._closure()
+        return bool(self._upstream[node_id] & self._bits[other_id])
+
+
+# Loaded graphs: {(database path, entity table): (table version, fingerprint, DependencyGraph)}
+_graph_cache: Dict[Tuple[str, str], Tuple[int, str, DependencyGraph]] = {}
+
+
+def _read_sources(db: Database, table: str) -> Tuple[List[Tuple], str]:
+    """Rows (id, label, text columns...) and their fingerprint."""
+    _, _, columns = GRAPH_SPECS[table]
+    cursor = db.connection.cursor()
+    cursor.execute(f'SELECT id, label, {", ".join(columns)} FROM {table} ORDER BY id')
+    rows = [tuple(row) for row in cursor.fetchall()]
+    fingerprint = hashlib.sha256(json.dumps(rows, default=str).encode('utf-8')).hexdigest()
+    return rows, fingerprint
+
+
+def parse_edges(table: str, rows: List[Tuple]) -> Tuple[List[Tuple[int, int, str]], List[Tuple[int, str, str]]]:
+    """Resolve the text columns of (id, label, columns...) rows into edges.
+
+    Returns ([(node id, depends-on id, source column)], [(id, column, unresolved token)]).
+    Labels match case-insensitively; self-references are dropped.
+    """
+    _, _, columns = GRAPH_SPECS[table]
+    ids = {str(row[1]).strip().upper(): row[0] for row in rows if row[1]}
+    edges = set()
+    unresolved = []
+    for row in rows:
+        node_id = row[0]
+        for column, text in zip(columns, row[2:]):
+            for token in parse_references(text):
+                other_id = ids.get(token.upper())
+                if other_id is None:
+                    if LABEL_LIKE.match(token):
+                        unresolved.append((node_id, column, token))
+                    continue
+                if other_id == node_id:
+                    continue
+                if columns[column] == 'prerequisites':
+                    edges.add((node_id, other_id, column))
+                else:
+                    edges.add((other_id, node_id, column))
+    return sorted(edges), unresolved
+
+
+def rebuild_edges(db: Database, table: str, rows: Optional[List[Tuple]] = None,
+                  fingerprint: Optional[str] = None) -> List[Tuple[int, str, str]]:
+    """Re-materialize one edge table from its source columns (single transaction).
+
+    Returns the unresolved references.
+    """
+    edge_table, node_column, _ = GRAPH_SPECS[table]
+    if rows is None:
+        rows, fingerprint = _read_sources(db, table)
+    edges, unresolved = parse_edges(table, rows)
+
+    cursor = db.connection.cursor()
+    try:
+        cursor.execute(f'DELETE FROM {edge_table}')
+        cursor.executemany(
+            f'INSERT INTO {edge_table} ({node_column}, depends_on_id, source) VALUES (?, ?, ?)',
+            edges
+        )
+        cursor.execute('''
+            INSERT OR REPLACE INTO derived_table_state (table_name, fingerprint, built_at)
+            VALUES (?, ?, CURRENT_TIMESTAMP)
+        ''', (edge_table, fingerprint))
+        db.connection.commit()
+    except Exception:
+        db.connection.rollback()
+        raise
+    return unresolved
+
+
+def load_graph(db: Database, table: str) -> DependencyGraph:
+    """DependencyGraph for 'capabilities' or 'technical_functions'.
+
+    Rebuilds the edge table if its source columns changed since it was last built, and
+    returns the cached graph (with its cached order/closure) if nothing changed. The
+    table is only read when its table_versions counter moved since the graph was loaded.
+    """
+    edge_table, node_column, _ = GRAPH_SPECS[table]
+    cache_key = (str(db.db_path), table)
+    cached = _graph_cache.get(cache_key)
+    version = db.get_table_version(table)
+    if cached and cached[0] == version:
+        return cached[2]
+
+    rows, fingerprint = _read_sources(db, table)
+    if cached and cached[1] == fingerprint:
+        # Other columns changed: same graph
+        _graph_cache[cache_key] = (version, fingerprint, cached[2])
+        return cached[2]
+
+    cursor = db.connection.cursor()
+    cursor.execute('SELECT fingerprint FROM derived_table_state WHERE table_name = ?', (edge_table,))
+    state = cursor.fetchone()
+    if state and state[0] == fingerprint:
+        _, unresolved = parse_edges(table, rows)
+    else:
+        unresolved = rebuild_edges(db, table, rows, fingerprint)
+
+    cursor.execute(f'SELECT {node_column}, depends_on_id FROM {edge_table}')
+    graph = DependencyGraph({row[0]: row[1] for row in rows},
+                            [tuple(edge) for edge in cursor.fetchall()], unresolved)
+    _graph_cache[cache_key] = (version, fingerprint, graph)
+    return graph
+
+
+def load_capability_graph(db: Database) -> DependencyGraph:
+    """Capability dependency graph (see load_graph)."""
+    return load_graph(db, 'capabilities')
+
+
+def load_technical_function_graph(db: Database) -> DependencyGraph:
+    """Technical function sequencing graph (see load_graph)."""
+    return load_graph(db, 'technical_functions')
+
+
+def main(argv: Optional[List[str]] = None):
+    """Print the dependency graph summary, or the closure of the given labels."""
+    parser = argparse.ArgumentParser(description="Query the capability dependency graph.")
+    parser.add_argument('labels', nargs='*', help="Labels to show prerequisites and dependents for")
+    parser.add_argument('--db', default='product_features.db', help="SQLite database (default: product_features.db)")
+    parser.add_argument('--functions', action='store_true',
+                        help="Use the technical function graph (technical_functions.next)")
+    args = parser.parse_args(argv)
+
+    db = Database(args.db)
+    db.connect()
+    db.create_tables()
+    try:
+        graph = load_graph(db, 'technical_functions' if args.functions else 'capabilities')
+    finally:
+        db.close()
+
+    print(f"✓ {len(graph.labels)} nodes, {graph.edge_count} dependency edges")
+    cyclic = graph.cyclic_nodes()
+    if cyclic:
+        print(f"⚠ {len(cyclic)} nodes on or behind a dependency cycle: "
+              f"{', '.join(graph.labels[node_id] for node_id in cyclic)}")
+    for node_id, column, token in graph.unresolved:
+        print(f"⚠ {graph.labels[node_id]}.{column}: unknown reference '{token}'")
+
+    status = 0
+    for label in args.labels:
+        if label not in graph.ids:
+            print(f"✗ Unknown label: {label}")
+            status = 1
+            continue
+        node_id = graph.node_id(label)
+        prereqs = sorted(graph.labels[n] for n in graph.all_prerequisites(node_id))
+        blocked = sorted(graph.labels[n] for n in graph.all_dependents(node_id))
+        print(f"\n{label}")
+        print(f"  Depends on ({len(prereqs)}): {', '.join(prereqs) or '-'}")
+        print(f"  Blocks ({len(blocked)}): {', '.join(blocked) or '-'}")
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""
+In-memory dependency index over the Product Variant -> Product Feature -> Capability ->
+Technical Function link tables.
+
+Loads every entity and link in a handful of queries and keeps adjacency lists in both
+directions, so report and export code can walk the hierarchy without issuing a query
+per entity or per (entity, entity) pair.
+"""
+from typing import Dict, List
+
+from database import Database
+
+
+class DependencyIndex:
+    """Bidirectional adjacency index for the PV/PF/CAP/TF hierarchy.
+
+    Adjacency lists hold entity ids ordered by the linked entity's label, matching the
+    ordering of Database.get_pv_product_features / get_pf_capabilities /
+    get_cap_technical_functions.
+    """
+
+    def __init__(self):
+        # Entity rows by id
+        self.product_variants: Dict[int, Dict] = {}
+        self.product_features: Dict[int, Dict] = {}
+        self.capabilities: Dict[int, Dict] = {}
+        self.technical_functions: Dict[int, Dict] = {}
+
+        # Forward adjacency (parent id -> child ids)
+        self.pv_pfs: Dict[int, List[int]] = {}
+        self.pf_caps: Dict[int, List[int]] = {}
+        self.cap_tfs: Dict[int, List[int]] = {}
+
+        # Reverse adjacency (child id -> parent ids)
+        self.pf_pvs: Dict[int, List[int]] = {}
+        self.cap_pfs: Dict[int, List[int]] = {}
+        self.tf_caps: Dict[int, List[int]] = {}
+
+    @classmethod
+    def load(cls, db: Database) -> 'DependencyIndex':
+        """Build the index from the database."""
+        index = cls()
+        index.product_variants = {pv['id']: pv for pv in db.get_product_variants()}
+        index.product_features = {pf['id']: pf for pf in db.get_product_features()}
+        index.capabilities = {cap['id']: cap for cap in db.get_capabilities()}
+        index.technical_functions = {tf['id']: tf for tf in db.get_technical_functions()}
+
+        cursor = db.connection.cursor()
+        links = [
+            ('pv_product_features', 'product_variant_id', 'product_feature_id',
+             index.pv_pfs, index.pf_pvs, index.product_variants, index.product_features),
+            ('pf_capabilities', 'product_feature_id', 'capability_id',
+             index.pf_caps, index.cap_pfs, index.product_features, index.capabilities),
+            ('cap_technical_functions', 'capability_id', 'technical_function_id',
+             index.cap_tfs, index.tf_caps, index.capabilities, index.technical_functions),
+        ]
+        for table, parent_col, child_col, forward, reverse, parents, children in links:
+            cursor.execute(f'SELECT {parent_col}, {child_col} FROM {table}')
+            for parent_id, child_id in cursor.fetchall():
+                # Skip dangling links (e.g. rows left behind without foreign key enforcement)
+                if parent_id not in parents or child_id not in children:
+                    continue
+                forward.setdefault(parent_id, []).append(child_id)
+                reverse.setdefault(child_id, []).append(parent_id)
+
+            for adjacency, entities in ((forward, children), (reverse, parents)):
+                for ids in adjacency.values():
+                    ids.sort(key=lambda entity_id: entities[entity_id]['label'])
+
+        return index
+
+    def variant_closure(self, pv_id: int) -> Dict:
+        """Collect everything a product variant depends on.
+
+        Returns a dict with:
+            'product_features': linked PF rows (label order)
+            'capabilities': {cap_id: row} in first-seen order
+            'technical_functions': {tf_id: row} in first-seen order
+            'pf_capabilities': {pf_id: [cap_id, ...]}
+            'pf_technical_functions': {pf_id: [tf_id, ...]} (may repeat when caps share TFs)
+        """
+        pfs = [self.product_features[pf_id] for pf_id in self.pv_pfs.get(pv_id, [])]
+        capabilities = {}
+        technical_functions = {}
+        pf_capabilities = {}
+        pf_technical_functions = {}
+
+        for pf in pfs:
+            cap_ids = self.pf_caps.get(pf['id'], [])
+            pf_capabilities[pf['id']] = cap_ids
+            tf_ids = []
+            for cap_id in cap_ids:
+                capabilities.setdefault(cap_id, self.capabilities[cap_id])
+                for tf_id in self.cap_tfs.get(cap_id, []):
+                    technical_functions.setdefault(tf_id, self.technical_functions[tf_id])
+                    tf_ids.append(tf_id)
+            pf_technical_functions[pf['id']] = tf_ids
+
+        return {
+            'product_features': pfs,
+            'capabilities': capabilities,
+            'technical_functions': technical_functions,
+            'pf_capabilities': pf_capabilities,
+            'pf_technical_functions': pf_technical_functions
+        }
@@ -1,74 +1,208 @@
 #!/usr/bin/env python3
 """
-Export engineering_plan_db.json to Google Sheets compatible format (CSV/Excel).
+Export the engineering plan to Google Sheets compatible format (CSV/Excel).
+Reads either the engineering_plan_db.json export or the SQLite database directly;
+database rows are streamed from cursors straight into the CSV/XLSX writers.
 Allows user to select which components to export while maintaining all linking relationships.
 Includes support for owner and url fields.
+
+Run without options for the interactive menu, or pass --components/--format for a
+non-interactive export (CSV tables are written on a thread pool while the XLSX is built).
 """
 
+import argparse
 import json
 import csv
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from itertools import chain
 from pathlib import Path
-from typing import Dict, List, Set, Any
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Any
 import openpyxl
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, PatternFill, Alignment
 from openpyxl.utils import get_column_letter
 
+from database import Database
+
+# File suffixes treated as SQLite databases rather than JSON exports
+SQLITE_SUFFIXES = {'.db', '.sqlite', '.sqlite3'}
+
+# Output formats supported by the command line
+EXPORT_FORMATS = ('xlsx', 'csv')
+DEFAULT_XLSX_OUTPUT = "roadmap_export.xlsx"
+DEFAULT_CSV_DIR = "roadmap_export_csv"
+
 
 class SheetsExporter:
-    def __init__(self, json_file: str):
-        self.json_file = json_file
+    # Header styling
+    HEADER_FONT = Font(bold=True, color="FFFFFF")
+    HEADER_ALIGNMENT = Alignment(horizontal="center", vertical="center", wrap_text=True)
+    
+    # (component key, sheet name, CSV file name) in export order
+    ENTITY_SHEETS = [
+        ('product_variants', 'Product Variants', 'product_variants.csv'),
+        ('configurations', 'Configurations', 'configurations.csv'),
+        ('product_features', 'Product Features', 'product_features.csv'),
+        ('capabilities', 'Capabilities', 'capabilities.csv'),
+        ('technical_functions', 'Technical Functions', 'technical_functions.csv'),
+    ]
+    
+    # (relationship key, parent component, child component, sheet name, header color, CSV file name, description)
+    RELATIONSHIP_SHEETS = [
+        ('pv_product_features', 'product_variants', 'product_features',
+         'PV-PF Links', '5B9BD5', 'pv_pf_links.csv', 'Product Variant <-> Product Feature'),
+        ('pf_capabilities', 'product_features', 'capabilities',
+         'PF-Capability Links', '70AD47', 'pf_capability_links.csv', 'Product Feature <-> Capability'),
+        ('cap_technical_functions', 'capabilities', 'technical_functions',
+         'Cap-TF Links', 'FFC000', 'cap_tf_links.csv', 'Capability <-> Technical Function'),
+    ]
+    
+    # Queries used when exporting straight from SQLite; ordering matches the JSON export
+    SQL_QUERIES = {
+        'product_variants': 'SELECT * FROM product_variants ORDER BY due_date, label',
+        'configurations': 'SELECT * FROM configurations ORDER BY config_type, code',
+        'product_features': 'SELECT * FROM product_features ORDER BY label',
+        'capabilities': 'SELECT * FROM capabilities ORDER BY label',
+        'technical_functions': 'SELECT * FROM technical_functions ORDER BY label',
+        'pv_product_features': '''
+            SELECT pv.id AS product_variant_id, pv.label AS product_variant_label,
+                   pf.id AS product_feature_id, pf.label AS product_feature_label
+            FROM pv_product_features l
+            JOIN product_variants pv ON pv.id = l.product_variant_id
+            JOIN product_features pf ON pf.id = l.product_feature_id
+            ORDER BY pv.due_date, pv.label, pf.label
+        ''',
+        'pf_capabilities': '''
+            SELECT pf.id AS product_feature_id, pf.label AS product_feature_label,
+                   c.id AS capability_id, c.label AS capability_label
+            FROM pf_capabilities l
+            JOIN product_features pf ON pf.id = l.product_feature_id
+            JOIN capabilities c ON c.id = l.capability_id
+            ORDER BY pf.label, c.label
+        ''',
+        'cap_technical_functions': '''
+            SELECT c.id AS capability_id, c.label AS capability_label,
+                   tf.id AS technical_function_id, tf.label AS technical_function_label
+            FROM cap_technical_functions l
+            JOIN capabilities c ON c.id = l.capability_id
+            JOIN technical_functions tf ON tf.id = l.technical_function_id
+            ORDER BY c.label, tf.label
+        ''',
+    }
+    
+    def __init__(self, source_file: str):
+        self.source_file = source_file
+        self.is_sqlite = Path(source_file).suffix.lower() in SQLITE_SUFFIXES
         self.data = None
+        self.db = None
         self.selected_components = set()
+    
+    @property
+    def json_file(self) -> str:
+        """Source file path (kept for callers written against the JSON-only exporter)."""
+        return self.source_file
         
     def load_data(self):
-        """Load the JSON data file."""
+        """Open the data source: load the JSON file or connect to the SQLite database."""
+        if self.is_sqlite:
+            if not Path(self.source_file).exists():
+                print(f"✗ Error: Database '{self.source_file}' not found")
+                return False
+            self.db = Database(self.source_file)
+            self.db.connect()
+            self.data = {'export_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+            print(f"✓ Connected to database {self.source_file}")
+            return True
+        
         try:
-            with open(self.json_file, 'r', encoding='utf-8') as f:
+            with open(self.source_file, 'r', encoding='utf-8') as f:
                 self.data = json.load(f)
-            print(f"✓ Loaded data from {self.json_file}")
+            print(f"✓ Loaded data from {self.source_file}")
             print(f"  Export date: {self.data.get('export_date', 'Unknown')}")
             return True
         except FileNotFoundError:
-            print(f"✗ Error: File '{self.json_file}' not found")
+            print(f"✗ Error: File '{self.source_file}' not found")
             return False
         except json.JSONDecodeError as e:
             print(f"✗ Error: Invalid JSON in file: {e}")
             return False
     
+    def close(self):
+        """Close the database connection, if any."""
+        if self.db:
+            self.db.close()
+            self.db = None
+    
+    @staticmethod
+    def _json_key(key: str) -> str:
+        """Key of a component or relationship in the JSON export."""
+        if key in ('pv_product_features', 'pf_capabilities', 'cap_technical_functions'):
+            return f"{key}_relationships"
+        return key
+    
+    def iter_rows(self, key: str) -> Iterator[Dict]:
+        """Yield the rows of a component or relationship as dicts.
+        
+        From SQLite the rows are streamed straight off a cursor. Each stream opens its own
+        connection, since SQLite connections are bound to the thread that created them and
+        CSV tables are written from pool threads.
+        """
+        if self.is_sqlite:
+            db = Database(self.source_file)
+            db.connect()
+            try:
+                cursor = db.connection.cursor()
+                cursor.execute(self.SQL_QUERIES[key])
+                for row in cursor:
+                    yield dict(row)
+            finally:
+                db.close()
+        else:
+            yield from self.data.get(self._json_key(key), [])
+    
+    def value_lengths(self, key: str) -> Dict[str, int]:
+        """Length of the longest value per column of a component, for column widths.
+        
+        From SQLite this is one aggregate query, so the rows are still streamed only once
+        into the sheet afterwards.
+        """
+        if self.is_sqlite:
+            cursor = self.db.connection.cursor()
+            cursor.execute(f"SELECT * FROM ({self.SQL_QUERIES[key]}) LIMIT 0")
+            columns = [description[0] for description in cursor.description]
+            lengths = ', '.join(f'MAX(LENGTH("{column}"))' for column in columns)
+            cursor.execute(f"SELECT {lengths} FROM ({self.SQL_QUERIES[key]})")
+            return {column: length or 0 for column, length in zip(columns, cursor.fetchone())}
+        lengths: Dict[str, int] = {}
+        for item in self.data.get(self._json_key(key), []):
+            for column, value in item.items():
+                if value is not None:
+                    lengths[column] = max(lengths.get(column, 0), len(str(value)))
+        return lengths
+    
+    def count_rows(self, key: str) -> int:
+        """Number of rows in a component or relationship."""
+        if self.is_sqlite:
+            cursor = self.db.connection.cursor()
+            cursor.execute(f"SELECT COUNT(*) FROM ({self.SQL_QUERIES[key]})")
+            return cursor.fetchone()[0]
+        return len(self.data.get(self._json_key(key), []))
+    
     def show_menu(self):
         """Display menu and get user selections."""
         print("\n" + "="*60)
         print("EXPORT TO GOOGLE SHEETS - Component Selection")
         print("="*60)
         
-        components = {
-            '1': {
-                'name': 'Product Variants',
-                'key': 'product_variants',
-                'count': len(self.data.get('product_variants', []))
-            },
-            '2': {
-                'name': 'Configurations',
-                'key': 'configurations',
-                'count': len(self.data.get('configurations', []))
-            },
-            '3': {
-                'name': 'Product Features',
-                'key': 'product_features',
-                'count': len(self.data.get('product_features', []))
-            },
-            '4': {
-                'name': 'Capabilities',
-                'key': 'capabilities',
-                'count': len(self.data.get('capabilities', []))
-            },
-            '5': {
-                'name': 'Technical Functions',
-                'key': 'technical_functions',
-                'count': len(self.data.get('technical_functions', []))
+        components = {}
+        for idx, (key, name, _) in enumerate(self.ENTITY_SHEETS, 1):
+            components[str(idx)] = {
+                'name': name,
+                'key': key,
+                'count': self.count_rows(key)
             }
-        }
         
         print("\nAvailable components:")
         for key, comp in components.items():
@@ -85,7 +219,7 @@ class SheetsExporter:
                 return False
             
             if selection == '6':
-                self.selected_components = {'product_variants', 'configurations', 'product_features', 'capabilities', 'technical_functions'}
+                self.selected_components = {key for key, _, _ in self.ENTITY_SHEETS}
                 break
             
             try:
@@ -109,339 +243,210 @@ class SheetsExporter:
         
         return True
     
-    def get_relevant_relationships(self) -> Dict[str, List[Dict]]:
-        """Get only the relationships relevant to selected components."""
-        relationships = {}
-        
-        # Product Variants <-> Product Features
-        if 'product_variants' in self.selected_components and 'product_features' in self.selected_components:
-            relationships['pv_product_features'] = self.data.get('pv_product_features_relationships', [])
-            print(f"  ✓ Including Product Variant <-> Product Feature links ({len(relationships['pv_product_features'])} relationships)")
-        
-        # Product Features <-> Capabilities
-        if 'product_features' in self.selected_components and 'capabilities' in self.selected_components:
-            relationships['pf_capabilities'] = self.data.get('pf_capabilities_relationships', [])
-            print(f"  ✓ Including Product Feature <-> Capability links ({len(relationships['pf_capabilities'])} relationships)")
-        
-        # Capabilities <-> Technical Functions
-        if 'capabilities' in self.selected_components and 'technical_functions' in self.selected_components:
-            relationships['cap_technical_functions'] = self.data.get('cap_technical_functions_relationships', [])
-            print(f"  ✓ Including Capability <-> Technical Function links ({len(relationships['cap_technical_functions'])} relationships)")
-        
+    def get_relevant_relationships(self) -> List[tuple]:
+        """Get only the relationship sheets relevant to selected components."""
+        relationships = []
+        for rel in self.RELATIONSHIP_SHEETS:
+            key, parent, child, _, _, _, description = rel
+            if parent in self.selected_components and child in self.selected_components:
+                relationships.append(rel)
+                print(f"  ✓ Including {description} links ({self.count_rows(key)} relationships)")
         return relationships
     
-    def export_to_excel(self, output_file: str):
-        """Export selected data to Excel format with multiple sheets."""
+    @staticmethod
+    def _peek(rows: Iterable[Dict]):
+        """Return (first_row, iterator over all rows), or (None, None) when empty."""
+        rows = iter(rows)
+        first = next(rows, None)
+        if first is None:
+            return None, None
+        return first, chain([first], rows)
+    
+    def _write_table(self, wb, title: str, rows: Iterable[Dict], header_color: str = "366092",
+                     column_width: Optional[int] = None,
+                     value_lengths: Optional[Dict[str, int]] = None) -> int:
+        """Stream one table into a new write-only worksheet.
+        
+        Headers come from the first row; nothing is written for an empty table. Column
+        widths must be set before any row is appended in write-only mode, so they are
+        sized from the header names and value_lengths (see value_lengths()), or fixed at
+        column_width. Returns the number of data rows written.
+        """
+        first, rows = self._peek(rows)
+        if first is None:
+            return 0
+        headers = list(first.keys())
+        ws = wb.create_sheet(title)
+        
+        # Set column widths
+        for col_idx, header in enumerate(headers, 1):
+            longest = max(len(str(header)), (value_lengths or {}).get(header, 0))
+            width = column_width or min(max(longest + 2, 12), 50)
+            ws.column_dimensions[get_column_letter(col_idx)].width = width
+        
+        # Write headers
+        header_fill = PatternFill(start_color=header_color, end_color=header_color, fill_type="solid")
+        header_cells = []
+        for header in headers:
+            cell = WriteOnlyCell(ws, value=header)
+            cell.font = self.HEADER_FONT
+            cell.fill = header_fill
+            cell.alignment = self.HEADER_ALIGNMENT
+            header_cells.append(cell)
+        ws.append(header_cells)
+        
+        # Write data
+        count = 0
+        for item in rows:
+            ws.append([item.get(header) for header in headers])
+            count += 1
+        return count
+    
+    def _write_csv(self, csv_file: Path, rows: Iterable[Dict]) -> int:
+        """Stream one table into a CSV file. Returns the number of rows written (0 = no file)."""
+        first, rows = self._peek(rows)
+        if first is None:
+            return 0
+        count = 0
+        with open(csv_file, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=first.keys())
+            writer.writeheader()
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+        return count
+    
+    def export_to_excel(self, output_file: str, relationships: Optional[List[tuple]] = None):
+        """Export selected data to Excel format with multiple sheets.
+        
+        Uses a write-only workbook, so rows are streamed to the file instead of being
+        held as an in-memory cell grid.
+        """
+        if relationships is None:
+            relationships = self.get_relevant_relationships()
+        
         print(f"\n{'='*60}")
         print("EXPORTING TO EXCEL")
         print(f"{'='*60}")
         
-        wb = openpyxl.Workbook()
-        wb.remove(wb.active)  # Remove default sheet
-        
-        # Header styling
-        header_font = Font(bold=True, color="FFFFFF")
-        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        header_alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-        
-        # Export Product Variants
-        if 'product_variants' in self.selected_components:
-            pv_data = self.data.get('product_variants', [])
-            if pv_data:
-                ws = wb.create_sheet("Product Variants")
-                headers = list(pv_data[0].keys())
-                
-                # Write headers
-                for col_idx, header in enumerate(headers, 1):
-                    cell = ws.cell(row=1, column=col_idx, value=header)
-                    cell.font = header_font
-                    cell.fill = header_fill
-                    cell.alignment = header_alignment
-                
-                # Write data
-                for row_idx, item in enumerate(pv_data, 2):
-                    for col_idx, header in enumerate(headers, 1):
-                        ws.cell(row=row_idx, column=col_idx, value=item.get(header))
-                
-                # Auto-adjust column widths
-                for col_idx, header in enumerate(headers, 1):
-                    ws.column_dimensions[get_column_letter(col_idx)].width = min(max(len(str(header)) + 2, 12), 50)
-                
-                print(f"  ✓ Exported {len(pv_data)} Product Variants")
-
-        # Export Configurations
-        if 'configurations' in self.selected_components:
-            pf_data = self.data.get('configurations', [])
-            if pf_data:
-                ws = wb.create_sheet("Configurations")
-                headers = list(pf_data[0].keys())
-                
-                # Write headers
-                for col_idx, header in enumerate(headers, 1):
-                    cell = ws.cell(row=1, column=col_idx, value=header)
-                    cell.font = header_font
-                    cell.fill = header_fill
-                    cell.alignment = header_alignment
-                
-                # Write data
-                for row_idx, item in enumerate(pf_data, 2):
-                    for col_idx, header in enumerate(headers, 1):
-                        ws.cell(row=row_idx, column=col_idx, value=item.get(header))
-                
-                # Auto-adjust column widths
-                for col_idx, header in enumerate(headers, 1):
-                    ws.column_dimensions[get_column_letter(col_idx)].width = min(max(len(str(header)) + 2, 12), 50)
-                
-                print(f"  ✓ Exported {len(pf_data)} Configurations")
-
-        # Export Product Features
-        if 'product_features' in self.selected_components:
-            pf_data = self.data.get('product_features', [])
-            if pf_data:
-                ws = wb.create_sheet("Product Features")
-                headers = list(pf_data[0].keys())
-                
-                # Write headers
-                for col_idx, header in enumerate(headers, 1):
-                    cell = ws.cell(row=1, column=col_idx, value=header)
-                    cell.font = header_font
-                    cell.fill = header_fill
-                    cell.alignment = header_alignment
-                
-                # Write data
-                for row_idx, item in enumerate(pf_data, 2):
-                    for col_idx, header in enumerate(headers, 1):
-                        ws.cell(row=row_idx, column=col_idx, value=item.get(header))
-                
-                # Auto-adjust column widths
-                for col_idx, header in enumerate(headers, 1):
-                    ws.column_dimensions[get_column_letter(col_idx)].width = min(max(len(str(header)) + 2, 12), 50)
-                
-                print(f"  ✓ Exported {len(pf_data)} Product Features")
-        
-        # Export Capabilities
-        if 'capabilities' in self.selected_components:
-            cap_data = self.data.get('capabilities', [])
-            if cap_data:
-                ws = wb.create_sheet("Capabilities")
-                headers = list(cap_data[0].keys())
-                
-                # Write headers
-                for col_idx, header in enumerate(headers, 1):
-                    cell = ws.cell(row=1, column=col_idx, value=header)
-                    cell.font = header_font
-                    cell.fill = header_fill
-                    cell.alignment = header_alignment
-                
-                # Write data
-                for row_idx, item in enumerate(cap_data, 2):
-                    for col_idx, header in enumerate(headers, 1):
-                        ws.cell(row=row_idx, column=col_idx, value=item.get(header))
-                
-                # Auto-adjust column widths
-                for col_idx, header in enumerate(headers, 1):
-                    ws.column_dimensions[get_column_letter(col_idx)].width = min(max(len(str(header)) + 2, 12), 50)
-                
-                print(f"  ✓ Exported {len(cap_data)} Capabilities")
-        
-        # Export Technical Functions
-        if 'technical_functions' in self.selected_components:
-            tf_data = self.data.get('technical_functions', [])
-            if tf_data:
-                ws = wb.create_sheet("Technical Functions")
-                headers = list(tf_data[0].keys())
-                
-                # Write headers
-                for col_idx, header in enumerate(headers, 1):
-                    cell = ws.cell(row=1, column=col_idx, value=header)
-                    cell.font = header_font
-                    cell.fill = header_fill
-                    cell.alignment = header_alignment
-                
-                # Write data
-                for row_idx, item in enumerate(tf_data, 2):
-                    for col_idx, header in enumerate(headers, 1):
-                        ws.cell(row=row_idx, column=col_idx, value=item.get(header))
-                
-                # Auto-adjust column widths
-                for col_idx, header in enumerate(headers, 1):
-                    ws.column_dimensions[get_column_letter(col_idx)].width = min(max(len(str(header)) + 2, 12), 50)
-                
-                print(f"  ✓ Exported {len(tf_data)} Technical Functions")
-        
-        # Export Relationships
-        relationships = self.get_relevant_relationships()
-        
-        if 'pf_capabilities' in relationships and relationships['pf_capabilities']:
-            ws = wb.create_sheet("PF-Capability Links")
-            rel_data = relationships['pf_capabilities']
-            headers = list(rel_data[0].keys())
-            
-            # Write headers
-            for col_idx, header in enumerate(headers, 1):
-                cell = ws.cell(row=1, column=col_idx, value=header)
-                cell.font = header_font
-                cell.fill = PatternFill(start_color="70AD47", end_color="70AD47", fill_type="solid")
-                cell.alignment = header_alignment
-            
-            # Write data
-            for row_idx, item in enumerate(rel_data, 2):
-                for col_idx, header in enumerate(headers, 1):
-                    ws.cell(row=row_idx, column=col_idx, value=item.get(header))
-            
-            # Auto-adjust column widths
-            for col_idx in range(1, len(headers) + 1):
-                ws.column_dimensions[get_column_letter(col_idx)].width = 20
-            
-            print(f"  ✓ Exported {len(rel_data)} Product Feature <-> Capability links")
-        
-        if 'cap_technical_functions' in relationships and relationships['cap_technical_functions']:
-            ws = wb.create_sheet("Cap-TF Links")
-            rel_data = relationships['cap_technical_functions']
-            headers = list(rel_data[0].keys())
-            
-            # Write headers
-            for col_idx, header in enumerate(headers, 1):
-                cell = ws.cell(row=1, column=col_idx, value=header)
-                cell.font = header_font
-                cell.fill = PatternFill(start_color="FFC000", end_color="FFC000", fill_type="solid")
-                cell.alignment = header_alignment
-            
-            # Write data
-            for row_idx, item in enumerate(rel_data, 2):
-                for col_idx, header in enumerate(headers, 1):
-                    ws.cell(row=row_idx, column=col_idx, value=item.get(header))
-            
-            # Auto-adjust column widths
-            for col_idx in range(1, len(headers) + 1):
-                ws.column_dimensions[get_column_letter(col_idx)].width = 20
-            
-            print(f"  ✓ Exported {len(rel_data)} Capability <-> Technical Function links")
-        
-        # Add metadata sheet
-        ws = wb.create_sheet("Export Metadata", 0)
-        ws['A1'] = "Export Information"
-        ws['A1'].font = Font(bold=True, size=14)
-        ws['A3'] = "Original Export Date:"
-        ws['B3'] = self.data.get('export_date', 'Unknown')
-        ws['A4'] = "Re-exported to Excel:"
-        from datetime import datetime
-        ws['B4'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        ws['A5'] = "Source File:"
-        ws['B5'] = self.json_file
-        ws['A6'] = "Selected Components:"
-        ws['B6'] = ", ".join(sorted(self.selected_components))
-        ws['B5'] = self.json_file
-        ws['A6'] = "Selected Components:"
-        ws['B6'] = ", ".join(sorted(self.selected_components))
+        wb = openpyxl.Workbook(write_only=True)
         
+        # Add metadata sheet (first, since write-only sheets are written in creation order)
+        ws = wb.create_sheet("Export Metadata")
         ws.column_dimensions['A'].width = 25
         ws.column_dimensions['B'].width = 40
+        title_cell = WriteOnlyCell(ws, value="Export Information")
+        title_cell.font = Font(bold=True, size=14)
+        ws.append([title_cell])
+        ws.append([])
+        ws.append(["Original Export Date:", self.data.get('export_date', 'Unknown')])
+        ws.append(["Re-exported to Excel:", datetime.now().strftime('%Y-%m-%d %H:%M:%S')])
+        ws.append(["Source File:", self.source_file])
+        ws.append(["Selected Components:", ", ".join(sorted(self.selected_components))])
+        
+        # Export entity sheets
+        for key, sheet_name, _ in self.ENTITY_SHEETS:
+            if key in self.selected_components:
+                count = self._write_table(wb, sheet_name, self.iter_rows(key),
+                                          value_lengths=self.value_lengths(key))
+                if count:
+                    print(f"  ✓ Exported {count} {sheet_name}")
+        
+        # Export Relationships
+        for key, _, _, sheet_name, header_color, _, description in relationships:
+            count = self._write_table(wb, sheet_name, self.iter_rows(key), header_color, column_width=20)
+            if count:
+                print(f"  ✓ Exported {count} {description} links")
         
         # Save workbook
+        sheet_count = len(wb.sheetnames)
         wb.save(output_file)
         print(f"\n✓ Excel file saved: {output_file}")
-        print(f"  Total sheets: {len(wb.sheetnames)}")
+        print(f"  Total sheets: {sheet_count}")
         print(f"  Ready to import into Google Sheets!")
     
-    def export_to_csv(self, output_dir: str):
-        """Export selected data to multiple CSV files (one per component)."""
-        print(f"\n{'='*60}")
-        print("EXPORTING TO CSV FILES")
-        print(f"{'='*60}")
-        
-        output_path = Path(output_dir)
-        output_path.mkdir(exist_ok=True)
-        
+    def _write_csv_table(self, csv_file: Path, key: str):
+        """Pool task: stream one component or relationship into its CSV file."""
+        return self._write_csv(csv_file, self.iter_rows(key))
+    
+    def _submit_csv_tables(self, pool: ThreadPoolExecutor, output_path: Path,
+                           relationships: List[tuple]) -> List[tuple]:
+        """Queue one CSV task per selected table. Returns (csv_file, label, future) tuples."""
+        output_path.mkdir(parents=True, exist_ok=True)
+        tables = [(key, file_name, name) for key, name, file_name in self.ENTITY_SHEETS
+                  if key in self.selected_components]
+        tables += [(key, file_name, f"{description} links")
+                   for key, _, _, _, _, file_name, description in relationships]
+        return [(output_path / file_name, label,
+                 pool.submit(self._write_csv_table, output_path / file_name, key))
+                for key, file_name, label in tables]
+    
+    def _report_csv_tables(self, output_path: Path, tasks: List[tuple]):
+        """Wait for the CSV tasks and print a summary (re-raises the first failure)."""
         files_created = []
-        
-        # Export Product Variants
-        if 'product_variants' in self.selected_components:
-            pv_data = self.data.get('product_variants', [])
-            if pv_data:
-                csv_file = output_path / "product_variants.csv"
-                with open(csv_file, 'w', newline='', encoding='utf-8') as f:
-                    writer = csv.DictWriter(f, fieldnames=pv_data[0].keys())
-                    writer.writeheader()
-                    writer.writerows(pv_data)
+        for csv_file, label, future in tasks:
+            count = future.result()
+            if count:
                 files_created.append(csv_file)
-                print(f"  ✓ Exported {len(pv_data)} Product Variants to {csv_file.name}")
-
-        # Export Configurations
-        if 'product_features' in self.selected_components:
-            pf_data = self.data.get('configurations', [])
-            if pf_data:
-                csv_file = output_path / "configurations.csv"
-                with open(csv_file, 'w', newline='', encoding='utf-8') as f:
-                    writer = csv.DictWriter(f, fieldnames=pf_data[0].keys())
-                    writer.writeheader()
-                    writer.writerows(pf_data)
-                files_created.append(csv_file)
-                print(f"  ✓ Exported {len(pf_data)} Configurations to {csv_file.name}")
-
-        # Export Product Features
-        if 'product_features' in self.selected_components:
-            pf_data = self.data.get('product_features', [])
-            if pf_data:
-                csv_file = output_path / "product_features.csv"
-                with open(csv_file, 'w', newline='', encoding='utf-8') as f:
-                    writer = csv.DictWriter(f, fieldnames=pf_data[0].keys())
-                    writer.writeheader()
-                    writer.writerows(pf_data)
-                files_created.append(csv_file)
-                print(f"  ✓ Exported {len(pf_data)} Product Features to {csv_file.name}")
-        
-        # Export Capabilities
-        if 'capabilities' in self.selected_components:
-            cap_data = self.data.get('capabilities', [])
-            if cap_data:
-                csv_file = output_path / "capabilities.csv"
-                with open(csv_file, 'w', newline='', encoding='utf-8') as f:
-                    writer = csv.DictWriter(f, fieldnames=cap_data[0].keys())
-                    writer.writeheader()
-                    writer.writerows(cap_data)
-                files_created.append(csv_file)
-                print(f"  ✓ Exported {len(cap_data)} Capabilities to {csv_file.name}")
-        
-        # Export Technical Functions
-        if 'technical_functions' in self.selected_components:
-            tf_data = self.data.get('technical_functions', [])
-            if tf_data:
-                csv_file = output_path / "technical_functions.csv"
-                with open(csv_file, 'w', newline='', encoding='utf-8') as f:
-                    writer = csv.DictWriter(f, fieldnames=tf_data[0].keys())
-                    writer.writeheader()
-                    writer.writerows(tf_data)
-                files_created.append(csv_file)
-                print(f"  ✓ Exported {len(tf_data)} Technical Functions to {csv_file.name}")
-        
-        # Export Relationships
-        relationships = self.get_relevant_relationships()
-        
-        if 'pf_capabilities' in relationships and relationships['pf_capabilities']:
-            rel_data = relationships['pf_capabilities']
-            csv_file = output_path / "pf_capability_links.csv"
-            with open(csv_file, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=rel_data[0].keys())
-                writer.writeheader()
-                writer.writerows(rel_data)
-            files_created.append(csv_file)
-            print(f"  ✓ Exported {len(rel_data)} PF-Capability links to {csv_file.name}")
-        
-        if 'cap_technical_functions' in relationships and relationships['cap_technical_functions']:
-            rel_data = relationships['cap_technical_functions']
-            csv_file = output_path / "cap_tf_links.csv"
-            with open(csv_file, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=rel_data[0].keys())
-                writer.writeheader()
-                writer.writerows(rel_data)
-            files_created.append(csv_file)
-            print(f"  ✓ Exported {len(rel_data)} Cap-TF links to {csv_file.name}")
+                print(f"  ✓ Exported {count} {label} to {csv_file.name}")
         
         print(f"\n✓ CSV files saved to: {output_path}")
         print(f"  Total files: {len(files_created)}")
         print(f"  You can import these CSV files into separate Google Sheets tabs")
     
+    def export_to_csv(self, output_dir: str, workers: Optional[int] = None):
+        """Export selected data to multiple CSV files (one per component), written in parallel."""
+        print(f"\n{'='*60}")
+        print("EXPORTING TO CSV FILES")
+        print(f"{'='*60}")
+        
+        output_path = Path(output_dir)
+        relationships = self.get_relevant_relationships()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            tasks = self._submit_csv_tables(pool, output_path, relationships)
+            self._report_csv_tables(output_path, tasks)
+    
+    def export(self, formats: Iterable[str], output_file: str = DEFAULT_XLSX_OUTPUT,
+               output_dir: str = DEFAULT_CSV_DIR, workers: Optional[int] = None):
+        """Export the selected components in every requested format.
+        
+        CSV tables are queued on a thread pool first and written while the XLSX
+        workbook is built on the calling thread.
+        """
+        formats = set(formats)
+        relationships = self.get_relevant_relationships()
+        output_path = Path(output_dir)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            tasks = []
+            if 'csv' in formats:
+                tasks = self._submit_csv_tables(pool, output_path, relationships)
+            if 'xlsx' in formats:
+                self.export_to_excel(output_file, relationships)
+            if 'csv' in formats:
+                print(f"\n{'='*60}")
+                print("EXPORTING TO CSV FILES")
+                print(f"{'='*60}")
+                self._report_csv_tables(output_path, tasks)
+    
+    @staticmethod
+    def print_import_instructions(formats: Iterable[str], output_file: str, output_dir: str):
+        """Print how to bring the exported files into Google Sheets."""
+        print("\n" + "="*60)
+        print("IMPORT TO GOOGLE SHEETS")
+        print("="*60)
+        print("\nTo import into Google Sheets:")
+        print("  1. Go to https://sheets.google.com")
+        print("  2. Create a new spreadsheet or open an existing one")
+        if 'xlsx' in formats:
+            print("  3. File > Import > Upload")
+            print(f"  4. Select '{output_file}'")
+            print("  5. Import location: 'Replace spreadsheet' or 'Insert new sheets'")
+        else:
+            print("  3. File > Import > Upload (for each CSV file)")
+            print(f"  4. Import each file from '{output_dir}/' as a separate sheet")
+        print("\n✓ All linking relationships are maintained in the exported data!")
+        print("="*60)
+    
     def run(self):
         """Main execution flow."""
         print("\n" + "="*60)
@@ -472,48 +477,85 @@ class SheetsExporter:
                 print("\n✗ Export cancelled")
                 return 0
             elif choice == '1':
-                output_file = "roadmap_export.xlsx"
-                self.export_to_excel(output_file)
+                formats = ['xlsx']
+                self.export_to_excel(DEFAULT_XLSX_OUTPUT)
                 break
             elif choice == '2':
-                output_dir = "roadmap_export_csv"
-                self.export_to_csv(output_dir)
+                formats = ['csv']
+                self.export_to_csv(DEFAULT_CSV_DIR)
                 break
             else:
                 print("  ✗ Invalid choice. Please select 1, 2, or 0.")
         
-        print("\n" + "="*60)
-        print("IMPORT TO GOOGLE SHEETS")
-        print("="*60)
-        print("\nTo import into Google Sheets:")
-        print("  1. Go to https://sheets.google.com")
-        print("  2. Create a new spreadsheet or open an existing one")
-        if choice == '1':
-            print("  3. File > Import > Upload")
-            print(f"  4. Select '{output_file}'")
-            print("  5. Import location: 'Replace spreadsheet' or 'Insert new sheets'")
-        else:
-            print("  3. File > Import > Upload (for each CSV file)")
-            print(f"  4. Import each file from '{output_dir}/' as a separate sheet")
-        print("\n✓ All linking relationships are maintained in the exported data!")
-        print("="*60)
+        self.print_import_instructions(formats, DEFAULT_XLSX_OUTPUT, DEFAULT_CSV_DIR)
+        return 0
+    
+    def run_batch(self, components: Iterable[str], formats: Iterable[str],
+                  output_file: str = DEFAULT_XLSX_OUTPUT, output_dir: str = DEFAULT_CSV_DIR,
+                  workers: Optional[int] = None):
+        """Non-interactive export of the given components in the given formats."""
+        if not self.load_data():
+            return 1
+        
+        self.selected_components = set(components)
+        print("\n✓ Selected components:")
+        for comp in sorted(self.selected_components):
+            print(f"  - {comp}")
         
+        self.export(formats, output_file, output_dir, workers)
+        self.print_import_instructions(formats, output_file, output_dir)
         return 0
 
 
-def main():
-    """Main entry point."""
-    json_file = "engineering_plan_db.json"
+def parse_args(argv=None):
+    """Parse command line options."""
+    component_keys = [key for key, _, _ in SheetsExporter.ENTITY_SHEETS]
+    parser = argparse.ArgumentParser(
+        description="Export the engineering plan to Google Sheets compatible Excel/CSV files. "
+                    "Without --components or --format an interactive menu is shown.")
+    parser.add_argument('source', nargs='?', default="engineering_plan_db.json",
+                        help="JSON export or SQLite database (default: engineering_plan_db.json)")
+    parser.add_argument('--components', nargs='+', choices=component_keys + ['all'],
+                        help="Components to export (default: all)")
+    parser.add_argument('--format', dest='formats', action='append', choices=EXPORT_FORMATS,
+                        help="Output format; repeat for several (default: xlsx)")
+    parser.add_argument('--xlsx-output', default=DEFAULT_XLSX_OUTPUT,
+                        help=f"Excel output file (default: {DEFAULT_XLSX_OUTPUT})")
+    parser.add_argument('--csv-dir', default=DEFAULT_CSV_DIR,
+                        help=f"CSV output directory (default: {DEFAULT_CSV_DIR})")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Threads used to write CSV files (default: Python's thread pool default)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main entry point.
+    
+    Usage: export_to_sheets.py [source] [--components KEY ...] [--format xlsx|csv ...]
+                               [--xlsx-output FILE] [--csv-dir DIR] [--workers N]
+    """
+    args = parse_args(argv)
+    source_file = args.source
     
     # Check if file exists
-    if not Path(json_file).exists():
-        print(f"✗ Error: '{json_file}' not found in current directory")
+    if not Path(source_file).exists():
+        print(f"✗ Error: '{source_file}' not found in current directory")
         print(f"  Current directory: {Path.cwd()}")
-        print(f"\nPlease run this script from the directory containing {json_file}")
+        print(f"\nPlease run this script from the directory containing {source_file}")
         return 1
     
-    exporter = SheetsExporter(json_file)
-    return exporter.run()
+    exporter = SheetsExporter(source_file)
+    try:
+        if args.components is None and args.formats is None:
+            return exporter.run()
+        
+        components = args.components or ['all']
+        if 'all' in components:
+            components = [key for key, _, _ in SheetsExporter.ENTITY_SHEETS]
+        return exporter.run_batch(components, args.formats or ['xlsx'],
+                                  args.xlsx_output, args.csv_dir, args.workers)
+    finally:
+        exporter.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Variant gap analysis: linked features and capabilities that reach TRL9 after a
+variant's due date.
+
+plan_validator.py flags a late variant as a whole (variant_late). The weekly risk review
+needs it the other way round: across every variant at once, which items are late, how
+late, and how many variants each one holds up. A gap is one (variant, item) pair where
+
+    - the item is a feature linked to the variant, or a capability linked to one of
+      those features (via: the features it is reached through), and
+    - the item's trl9_date is after the variant's due_date.
+
+Items or variants without a valid date have no gap (invalid_date covers those).
+
+All gaps come from a single query over pv_product_features, pf_capabilities and the
+date columns. Window functions add each item's worst lateness, total lateness and the
+number of variants it blocks, and the rows are ranked in SQL:
+
+    lateness    worst days late, then variants blocked
+    blocked     variants blocked, then worst days late
+
+Usage:
+    python gap_analysis.py [--db product_features.db] [--rank blocked] [--limit 20]
+                           [--csv gaps.csv]
+"""
+import argparse
+import csv
+import sys
+from typing import Dict, List, Optional, Sequence
+
+from critical_path import CAPABILITY, FEATURE, KIND_NAMES
+from database import Database, valid_date_sql
+
+# Item order per ranking (ties: label)
+RANKINGS = {
+    'lateness': 'max_days_late DESC, variants_blocked DESC',
+    'blocked': 'variants_blocked DESC, max_days_late DESC',
+}
+
+CSV_HEADER = ['Rank', 'Item Type', 'Item', 'Name', 'TRL9', 'Max Days Late', 'Variants Blocked',
+              'Variant', 'Variant Title', 'Due', 'Days Late', 'Via Features']
+
+
+class GapItem:
+    """A late feature or capability and the variants it blocks.
+
+    gaps: [{'pv_id', 'pv_label', 'pv_title', 'due_date', 'days_late', 'via'}], latest
+          variant first; via lists the linking feature labels (capabilities only)
+    """
+
+    def __init__(self, kind: str, item_id: int, label: str, name: Optional[str], trl9_date: str,
+                 max_days_late: int, total_days_late: int):
+        self.kind = kind
+        self.id = item_id
+        self.label = label
+        self.name = name
+        self.trl9_date = trl9_date
+        self.max_days_late = max_days_late
+        self.total_days_late = total_days_late
+        self.gaps: List[Dict] = []
+
+    @property
+    def variants_blocked(self) -> int:
+        return len(self.gaps)
+
+
+def _gap_query(order: str) -> str:
+    due, pf_trl9, cap_trl9 = (valid_date_sql(col) for col in ('due_date', 'pf.trl9_date', 'c.trl9_date'))
+    return f'''
+        WITH links AS (
+            SELECT l.product_variant_id AS pv_id, '{FEATURE}' AS item_type, pf.id AS item_id,
+                   pf.label, pf.name, {pf_trl9} AS trl9_date, NULL AS via
+            FROM pv_product_features l
+            JOIN product_features pf ON pf.id = l.product_feature_id
+            UNION ALL
+            SELECT pv_id, '{CAPABILITY}', item_id, label, name, trl9_date, GROUP_CONCAT(pf_label, ', ')
+            FROM (
+                SELECT l.product_variant_id AS pv_id, c.id AS item_id, c.label, c.name,
+                       {cap_trl9} AS trl9_date, pf.label AS pf_label
+                FROM pv_product_features l
+                JOIN product_features pf ON pf.id = l.product_feature_id
+                JOIN pf_capabilities pc ON pc.product_feature_id = pf.id
+                JOIN capabilities c ON c.id = pc.capability_id
+                ORDER BY pf.label
+            )
+            GROUP BY pv_id, item_id
+        ),
+        gaps AS (
+            SELECT links.*, pv.label AS pv_label, pv.title AS pv_title, pv.due AS due_date,
+                   CAST(julianday(links.trl9_date) - julianday(pv.due) AS INTEGER) AS days_late
+            FROM links
+            JOIN (SELECT id, label, title, {due} AS due FROM product_variants) pv ON pv.id = links.pv_id
+            WHERE links.trl9_date > pv.due
+        )
+        SELECT *
+        FROM (
+            SELECT gaps.*,
+                   COUNT(*) OVER item AS variants_blocked,
+                   MAX(days_late) OVER item AS max_days_late,
+                   SUM(days_late) OVER item AS total_days_late
+            FROM gaps
+            WINDOW item AS (PARTITION BY item_type, item_id)
+        )
+        ORDER BY {order}, label, item_type, days_late DESC, pv_label
+    '''
+
+
+def gap_analysis(db: Database, rank_by: str = 'lateness') -> List[GapItem]:
+    """Late items across all variants, ranked by `rank_by` (see RANKINGS)."""
+    if rank_by not in RANKINGS:
+        raise ValueError(f"Unknown ranking '{rank_by}' (choose from {', '.join(RANKINGS)})")
+    cursor = db.connection.cursor()
+    cursor.execute(_gap_query(RANKINGS[rank_by]))
+
+    items: List[GapItem] = []
+    for row in cursor.fetchall():
+        key = (row['item_type'], row['item_id'])
+        if not items or (items[-1].kind, items[-1].id) != key:
+            items.append(GapItem(row['item_type'], row['item_id'], row['label'], row['name'],
+                                 row['trl9_date'], row['max_days_late'], row['total_days_late']))
+        items[-1].gaps.append({
+            'pv_id': row['pv_id'],
+            'pv_label': row['pv_label'],
+            'pv_title': row['pv_title'],
+            'due_date': row['due_date'],
+            'days_late': row['days_late'],
+            'via': row['via'],
+        })
+    return items
+
+
+def write_gap_csv(items: List[GapItem], path: str):
+    """One row per gap (item and blocked variant), in ranking order."""
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_HEADER)
+        for rank, item in enumerate(items, 1):
+            for gap in item.gaps:
+                writer.writerow([rank, KIND_NAMES[item.kind], item.label, item.name or '', item.trl9_date,
+                                 item.max_days_late, item.variants_blocked, gap['pv_label'],
+                                 gap['pv_title'] or '', gap['due_date'], gap['days_late'], gap['via'] or ''])
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description="Features and capabilities reaching TRL9 after their variants' due dates.")
+    parser.add_argument('--db', default='product_features.db', help="SQLite database (default: product_features.db)")
+    parser.add_argument('--rank', default='lateness', choices=sorted(RANKINGS),
+                        help="Rank items by worst lateness or by variants blocked (default: lateness)")
+    parser.add_argument('--limit', type=int, default=None, help="Show only the first N items")
+    parser.add_argument('--csv', metavar='FILE', help="Also write every gap to a CSV file")
+    args = parser.parse_args(argv)
+
+    db = Database(args.db)
+    db.connect()
+    db.create_tables()
+    try:
+        items = gap_analysis(db, args.rank)
+    finally:
+        db.close()
+
+    variants = {gap['pv_id'] for item in items for gap in item.gaps}
+    print(f"{len(items)} late items blocking {len(variants)} product variants\n")
+    if items:
+        print(f"{'#':>3}  {'Item':16} {'Type':18} {'TRL9':10} {'Max late':>8} {'Variants':>8}")
+    for rank, item in enumerate(items[:args.limit], 1):
+        print(f"{rank:>3}  {item.label:16} {KIND_NAMES[item.kind]:18} {item.trl9_date:10} "
+              f"{item.max_days_late:>8} {item.variants_blocked:>8}")
+        for gap in item.gaps:
+            via = f"  via {gap['via']}" if gap['via'] else ''
+            print(f"       {gap['pv_label']:16} due {gap['due_date']}  {gap['days_late']:+d} days{via}")
+
+    if args.csv:
+        write_gap_csv(items, args.csv)
+        print(f"\n✓ Wrote {sum(item.variants_blocked for item in items)} gaps to {args.csv}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Slip impact analysis: which product features and variants depend on an item, and what
+happens to the variants' due-date gaps if items move.
+
+ImpactIndex keeps, for every technical function, capability and product feature, the
+set of product features and variants that (transitively) depend on it:
+
+    technical function -> capability -> product feature -> product variant
+    capability -> capabilities that depend on it (capability_dependencies)
+
+It is built once and then maintained incrementally: triggers on the link tables append
+every change to link_change_log, and sync() applies new log entries by recomputing only
+the nodes below the changed link. A change to the parsed capability dependencies, or a
+gap in the log (entries trimmed before this index saw them; a trigger keeps only the
+last database.CHANGE_LOG_LIMIT entries), triggers a full rebuild.
+
+what_if_shift() moves the planned TRL9 of some items by N days and reports the impacted
+variants' earliest TRL9 and due-date gap before and after, without touching the database.
+
+Usage:
+    python impact_index.py CA-ENV-1.1=+30 [PF-ACT-1.1=-14 ...] [--db product_features.db]
+"""
+import argparse
+import re
+import sys
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+from critical_path import CAPABILITY, FEATURE, VARIANT, compute_critical_paths
+from database import Database
+from dependency_graph import load_capability_graph
+
+TECHNICAL_FUNCTION = 'tf'
+
+Node = Tuple[str, int]
+
+# Link table -> (parent kind, child kind); the child's slip impacts the parent
+LINK_KINDS = {
+    'pv_product_features': (VARIANT, FEATURE),
+    'pf_capabilities': (FEATURE, CAPABILITY),
+    'cap_technical_functions': (CAPABILITY, TECHNICAL_FUNCTION),
+}
+
+# Entity table per node kind (for labels)
+KIND_TABLES = {
+    VARIANT: 'product_variants',
+    FEATURE: 'product_features',
+    CAPABILITY: 'capabilities',
+    TECHNICAL_FUNCTION: 'technical_functions',
+}
+
+# Kinds collected in the reachability sets
+IMPACT_KINDS = (FEATURE, VARIANT)
+
+
+class ImpactIndex:
+    """Reverse-reachability index from any item to the features/variants above it."""
+
+    def __init__(self):
+        # Direct edges: parents[n] are the nodes impacted directly when n slips
+        self.parents: Dict[Node, Set[Node]] = {}
+        self.children: Dict[Node, Set[Node]] = {}
+        # Transitive: reach[n] are all features and variants impacted when n slips
+        self.reach: Dict[Node, FrozenSet[Node]] = {}
+        self.last_log_id = 0
+        self._dependency_graph = None
+
+    # ---- building ----
+
+    def _add_edge(self, child: Node, parent: Node):
+        self.parents.setdefault(child, set()).add(parent)
+        self.children.setdefault(parent, set()).add(child)
+
+    def _remove_edge(self, child: Node, parent: Node):
+        self.parents.get(child, set()).discard(parent)
+        self.children.get(parent, set()).discard(child)
+
+    def _compute(self, nodes: Set[Node]):
+        """Recompute reach for nodes (all other nodes' reach must be current).
+
+        Iterative post-order over parents, so long dependency chains do not recurse.
+        """
+        for start in nodes:
+            if start in self.reach:
+                continue
+            stack = [(start, False)]
+            visiting = set()
+            while stack:
+                node, expanded = stack.pop()
+                if node in self.reach or (node in visiting and not expanded):
+                    continue
+                visiting.add(node)
+                pending = [p for p in self.parents.get(node, ()) if p not in self.reach]
+                if expanded or not pending:
+                    reach = set()
+                    for parent in self.parents.get(node, ()):
+                        if parent[0] in IMPACT_KINDS:
+                            reach.add(parent)
+                        reach |= self.reach.get(parent, frozenset())
+                    self.reach[node] = frozenset(reach)
+                else:
+                    stack.append((node, True))
+                    stack.extend((parent, False) for parent in pending)
+
+    def rebuild(self, db: Database):
+        """Build the whole index from the link tables and the dependency graph."""
+        cursor = db.connection.cursor()
+        self.last_log_id = _last_log_id(db)
+
+        self.parents = {}
+        self.children = {}
+        for table, (parent_kind, child_kind) in LINK_KINDS.items():
+            parent_col, child_col = _link_columns(table)
+            cursor.execute(f'SELECT {parent_col}, {child_col} FROM {table}')
+            for parent_id, child_id in cursor.fetchall():
+                self._add_edge((child_kind, child_id), (parent_kind, parent_id))
+
+        graph = load_capability_graph(db)
+        # Edges inside a dependency cycle are ignored, as in compute_critical_paths
+        cycles = graph.cycle_components()
+        for cap_id, prereq_ids in graph.prerequisites.items():
+            for prereq_id in prereq_ids:
+                if prereq_id in cycles and cycles.get(cap_id) == cycles[prereq_id]:
+                    continue
+                self._add_edge((CAPABILITY, prereq_id), (CAPABILITY, cap_id))
+        self._dependency_graph = graph
+
+        self.reach = {}
+        self._compute(set(self.parents) | set(self.children))
+
+    @classmethod
+    def load(cls, db: Database) -> 'ImpactIndex':
+        index = cls()
+        index.rebuild(db)
+        return index
+
+    # ---- incremental maintenance ----
+
+    def _descendants(self, node: Node) -> Set[Node]:
+        """node and every node below it (whose reach includes what node reaches)."""
+        seen = {node}
+        stack = [node]
+        while stack:
+            for child in self.children.get(stack.pop(), ()):
+                if child not in seen:
+                    seen.add(child)
+                    stack.append(child)
+        return seen
+
+    def apply_link_change(self, table: str, parent_id: int, child_id: int, change: str):
+        """Apply one link insert/delete and update the reach of the affected nodes."""
+        parent_kind, child_kind = LINK_KINDS[table]
+        child, parent = (child_kind, child_id), (parent_kind, parent_id)
+        if change == 'insert':
+            self._add_edge(child, parent)
+        else:
+            self._remove_edge(child, parent)
+        affected = self._descendants(child)
+        for node in affected:
+            self.reach.pop(node, None)
+        self._compute(affected)
+
+    def sync(self, db: Database) -> int:
+        """Catch up with link changes made since the index was built or last synced.
+
+        Returns the number of log entries applied (-1 when the index was rebuilt).
+        """
+        if load_capability_graph(db) is not self._dependency_graph:
+            self.rebuild(db)
+            return -1
+
+        if _last_log_id(db) == self.last_log_id:
+            return 0
+
+        cursor = db.connection.cursor()
+        cursor.execute('''
+            SELECT id, table_name, parent_id, child_id, change FROM link_change_log
+            WHERE id > ? ORDER BY id
+        ''', (self.last_log_id,))
+        entries = cursor.fetchall()
+
+        # Log ids have no gaps (AUTOINCREMENT), so a missing next entry means entries
+        # this index never saw were trimmed and the log cannot be replayed
+        if not entries or entries[0][0] != self.last_log_id + 1:
+            self.rebuild(db)
+            return -1
+        if len(entries) > max(1000, sum(len(p) for p in self.parents.values())):
+            # Bulk rewrites (restore, import): rebuilding is cheaper than replaying
+            self.rebuild(db)
+            return -1
+
+        for entry_id, table, parent_id, child_id, change in entries:
+            self.apply_link_change(table, parent_id, child_id, change)
+            self.last_log_id = entry_id
+        return len(entries)
+
+    # ---- queries ----
+
+    def impacted(self, node: Node) -> FrozenSet[Node]:
+        """Features and variants impacted when node slips."""
+        return self.reach.get(node, frozenset())
+
+    def impacted_variants(self, node: Node) -> List[int]:
+        return sorted(node_id for kind, node_id in self.impacted(node) if kind == VARIANT)
+
+    def impacted_features(self, node: Node) -> List[int]:
+        return sorted(node_id for kind, node_id in self.impacted(node) if kind == FEATURE)
+
+
+def _last_log_id(db: Database) -> int:
+    """Id of the last link change ever logged (survives trimming the log)."""
+    cursor = db.connection.cursor()
+    cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'link_change_log'")
+    row = cursor.fetchone()
+    return row[0] if row else 0
+
+
+def _link_columns(table: str) -> Tuple[str, str]:
+    return {
+        'pv_product_features': ('product_variant_id', 'product_feature_id'),
+        'pf_capabilities': ('product_feature_id', 'capability_id'),
+        'cap_technical_functions': ('capability_id', 'technical_function_id'),
+    }[table]
+
+
+# Indexes kept up to date across calls: {database path: ImpactIndex}
+_index_cache: Dict[str, ImpactIndex] = {}
+
+def get_impact_index(db: Database) -> ImpactIndex:
+    """The database's ImpactIndex, built on first use and synced on later calls."""
+    key = str(db.db_path)
+    index = _index_cache.get(key)
+    if index is None:
+        index = _index_cache[key] = ImpactIndex.load(db)
+    else:
+        index.sync(db)
+    return index
+
+
+class WhatIfResult:
+    """Impacted variants before and after a set of shifts.
+
+    rows: [{'id', 'label', 'title', 'due_date', 'earliest_before', 'earliest_after',
+            'gap_before', 'gap_after'}] where gap = earliest TRL9 - due date in days
+            (positive: late), ordered by gap_after descending.
+    """
+
+    def __init__(self, shifts: Dict[Node, int], features: List[int], rows: List[Dict]):
+        self.shifts = shifts
+        self.features = features
+        self.rows = rows
+
+
+def resolve_shifts(index: ImpactIndex, shifts: Dict[Node, int]) -> Dict[Node, int]:
+    """Turn technical function shifts into shifts of the capabilities using them.
+
+    A capability moved both directly and through a function moves by the larger amount.
+    """
+    resolved: Dict[Node, int] = {}
+    for node, days in shifts.items():
+        if node[0] == VARIANT:
+            raise ValueError("Product variants cannot be shifted (their due dates are deadlines)")
+        targets = ([parent for parent in index.parents.get(node, ()) if parent[0] == CAPABILITY]
+                   if node[0] == TECHNICAL_FUNCTION else [node])
+        for target in targets:
+            previous = resolved.get(target)
+            resolved[target] = days if previous is None else max(previous, days, key=abs)
+    return resolved
+
+
+def what_if_shift(db: Database, shifts: Dict[Node, int]) -> WhatIfResult:
+    """Impact of moving the planned TRL9 of items by N days (database left unchanged)."""
+    index = get_impact_index(db)
+    impacted = set()
+    for node in shifts:
+        impacted |= index.impacted(node)
+    variant_ids = sorted(node_id for kind, node_id in impacted if kind == VARIANT)
+    feature_ids = sorted(node_id for kind, node_id in impacted if kind == FEATURE)
+
+    result = compute_critical_paths(db)
+    earliest_after = result.shifted_earliest(resolve_shifts(index, shifts))
+
+    rows = []
+    for pv_id in variant_ids:
+        pv = result.index.product_variants.get(pv_id)
+        if pv is None:
+            continue  # link left behind by a deleted variant
+        node = (VARIANT, pv_id)
+        due = result.planned[node]
+        after = earliest_after[node]
+        rows.append({
+            'id': pv_id,
+            'label': pv['label'],
+            'title': pv.get('title'),
+            'due_date': due,
+            'earliest_before': result.earliest[node],
+            'earliest_after': after,
+            'gap_before': result.slip(pv_id),
+            'gap_after': (after - due).days if due and after else None,
+        })
+    rows.sort(key=lambda row: (row['gap_after'] is None, -(row['gap_after'] or 0), row['label']))
+    features = [pf_id for pf_id in feature_ids if pf_id in result.index.product_features]
+    return WhatIfResult(shifts, features, rows)
+
+
+def find_node(db: Database, label: str) -> Optional[Node]:
+    """Node for a label of any technical function, capability, feature or variant."""
+    cursor = db.connection.cursor()
+    for kind, table in KIND_TABLES.items():
+        cursor.execute(f'SELECT id FROM {table} WHERE label = ?', (label,))
+        row = cursor.fetchone()
+        if row:
+            return (kind, row[0])
+    return None
+
+
+SHIFT_ARGUMENT = re.compile(r'^(?P<label>.+?)=(?P<days>[+-]?\d+)$')
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="What-if analysis of shifting TRL9 dates.")
+    parser.add_argument('shifts', nargs='+', metavar='LABEL=DAYS',
+                        help="Item to move and by how many days, e.g. CA-ENV-1.1=+30")
+    parser.add_argument('--db', default='product_features.db', help="SQLite database (default: product_features.db)")
+    args = parser.parse_args(argv)
+
+    db = Database(args.db)
+    db.connect()
+    db.create_tables()
+    try:
+        shifts = {}
+        for argument in args.shifts:
+            match = SHIFT_ARGUMENT.match(argument)
+            node = find_node(db, match.group('label')) if match else None
+            if node is None or node[0] == VARIANT:
+                print(f"✗ Not a technical function, capability or feature shift: {argument}")
+                return 1
+            shifts[node] = int(match.group('days'))
+        result = what_if_shift(db, shifts)
+    finally:
+        db.close()
+
+    print(f"Impacted product features: {len(result.features)}")
+    print(f"Impacted product variants: {len(result.rows)}")
+    if result.rows:
+        print(f"\n  {'Variant':10} {'Due':10}  {'Earliest before':15} {'Earliest after':15} {'Gap before':>10} {'Gap after':>10}")
+        for row in result.rows:
+            fmt = lambda value: value.isoformat() if value else '-'
+            gap = lambda value: '-' if value is None else f"{value:+d}"
+            print(f"  {row['label']:10} {fmt(row['due_date']):10}  {fmt(row['earliest_before']):15} "
+                  f"{fmt(row['earliest_after']):15} {gap(row['gap_before']):>10} {gap(row['gap_after']):>10}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,10 +1,11 @@
 """Import configuration data from Excel file into the database."""
 import pandas as pd
 import database
+from workbook_cache import load_sheet
 
-# Load the Configurations sheet
+# Load the Configurations sheet (from the parsed-workbook cache when the file is unchanged)
 excel_file = 'Product Engineering Canonical Product Features.xlsx'
-df = pd.read_excel(excel_file, sheet_name='Configurations')
+df = load_sheet(excel_file, 'Configurations')
 
 db = database.Database()
 db.connect()
@@ -1,11 +1,75 @@
 """
 Import data from Excel spreadsheet into the database.
+
+Sheets are cleaned column-wise with pandas, relationship cells are exploded into link
+rows, and each table is written with a single bulk insert inside one transaction.
+
+With --sync, an existing database is brought in line with the spreadsheet instead: only
+rows whose source hash changed are inserted/updated/deleted (see sync_data).
 """
+import argparse
+import hashlib
+import json
 import pandas as pd
 import numpy as np
 from database import Database
+from workbook_cache import load_sheets
 from datetime import datetime
 
+EXCEL_FILE = 'Product Engineering Canonical Product Features.xlsx'
+
+# Date formats tried (in order) for dates entered as text
+DATE_FORMATS = ['%d/%m/%Y', '%Y-%m-%d', '%m/%d/%Y', '%d-%m-%Y']
+
+# Mapping of label abbreviations to full swimlane names
+SWIMLANE_MAP = {
+    'ACT': 'Actors',
+    'LOC': 'Localisation',
+    'ENV': 'Environment',
+    'MAP': 'Mapping',
+    'INF': 'Infrastructure',
+    'STA': 'Static',
+    'CGO': 'Cargo',
+    'VEH': 'Vehicle',
+    'SV': 'Supervision',
+    'FWD': 'Forward Driving',
+    'REV': 'Reverse Driving',
+    'NAV': 'Navigation',
+    'MSN': 'Mission',
+    'HMI': 'Human-Robot Interaction',
+    'CE': 'CE',
+    'PRK': 'Parking',
+    'DCK': 'Docking',
+    'CHE': 'Charging',
+    'HCH': 'Hitching/Unhitching',
+    'XMS': 'Crossmarket',
+    'OPS': 'Operations',
+    'PRC': 'Perception',
+    'BAR': 'Barrier',
+    'HRI': 'Human-Robot Interaction'
+}
+
+# Map Excel swimlane names to database config_type values
+CONFIG_TYPE_MAP = {
+    'Platform': 'Platform',
+    'Operational Environment': 'ODD',
+    'Environmental conditions': 'Environment',
+    'Cargo': 'Cargo'
+}
+
+# Link tables referencing each entity table, cleaned up when the sync deletes an entity
+ENTITY_LINK_COLUMNS = {
+    'product_features': [('pf_capabilities', 'product_feature_id'),
+                         ('pv_product_features', 'product_feature_id')],
+    'capabilities': [('pf_capabilities', 'capability_id'),
+                     ('cap_technical_functions', 'capability_id')],
+    'technical_functions': [('cap_technical_functions', 'technical_function_id')],
+    'configurations': [],
+}
+
+# Sheets read from the workbook (parsed once and cached by workbook_cache)
+SHEETS = ['Product Features', 'Capabilities', 'Technical Functions (WIP)', 'Configurations']
+
 def parse_date(date_val):
     """Parse various date formats from Excel."""
     if pd.isna(date_val) or date_val == '' or date_val is None:
@@ -18,8 +82,7 @@ def parse_date(date_val):
     # If it's a string, try to parse it
     if isinstance(date_val, str):
         # Try common formats
-        formats = ['%d/%m/%Y', '%Y-%m-%d', '%m/%d/%Y', '%d-%m-%Y']
-        for fmt in formats:
+        for fmt in DATE_FORMATS:
             try:
                 dt = datetime.strptime(date_val, fmt)
                 return dt.strftime('%Y-%m-%d')
@@ -46,273 +109,504 @@ def extract_swimlane_from_label(label):
     if not label:
         return None
     
-    # Mapping of abbreviations to full swimlane names
-    swimlane_map = {
-        'ACT': 'Actors',
-        'LOC': 'Localisation',
-        'ENV': 'Environment',
-        'MAP': 'Mapping',
-        'INF': 'Infrastructure',
-        'STA': 'Static',
-        'CGO': 'Cargo',
-        'VEH': 'Vehicle',
-        'SV': 'Supervision',
-        'FWD': 'Forward Driving',
-        'REV': 'Reverse Driving',
-        'NAV': 'Navigation',
-        'MSN': 'Mission',
-        'HMI': 'Human-Robot Interaction',
-        'CE': 'CE',
-        'PRK': 'Parking',
-        'DCK': 'Docking',
-        'CHE': 'Charging',
-        'HCH': 'Hitching/Unhitching',
-        'XMS': 'Crossmarket',
-        'OPS': 'Operations',
-        'PRC': 'Perception',
-        'BAR': 'Barrier',
-        'HRI': 'Human-Robot Interaction'
-    }
-    
     # Try to extract the code (e.g., 'ACT' from 'PF-ACT-1.1', 'CA-ACT-1.1' or 'PRC' from 'TF-PRC-1.0')
     parts = label.split('-')
     if len(parts) >= 2:
         code = parts[1]
-        return swimlane_map.get(code, code)  # Return mapped name or the code itself
+        return SWIMLANE_MAP.get(code, code)  # Return mapped name or the code itself
     
     return None
 
-def import_data():
-    """Import all data from Excel to database."""
-    db = Database()
+def column(df, name):
+    """A sheet column, or an all-empty column if the sheet does not have it."""
+    if name in df.columns:
+        return df[name]
+    return pd.Series(None, index=df.index, dtype=object)
+
+def clean_text_column(series):
+    """Column-wise clean_text: stripped strings, with blanks/NaN as None."""
+    values = series.astype(object)
+    missing = values.isna() | (values == '')
+    cleaned = values.astype(str).str.strip().astype(object)
+    return cleaned.where(~missing, None)
+
+def parse_date_column(series):
+    """Column-wise parse_date: 'YYYY-MM-DD' strings, None where no date could be parsed."""
+    values = series.astype(object)
+    result = pd.Series(None, index=values.index, dtype=object)
+    
+    # Cells Excel already typed as dates
+    is_datetime = values.map(lambda v: isinstance(v, datetime)).astype(bool) & values.notna()
+    if is_datetime.any():
+        result[is_datetime] = pd.to_datetime(values[is_datetime]).dt.strftime('%Y-%m-%d')
+    
+    # Dates entered as text: try each format on the values still unparsed
+    is_text = values.map(lambda v: isinstance(v, str)).astype(bool)
+    for fmt in DATE_FORMATS:
+        pending = is_text & result.isna()
+        if not pending.any():
+            break
+        parsed = pd.to_datetime(values[pending], format=fmt, errors='coerce')
+        parsed = parsed[parsed.notna()]
+        result[parsed.index] = parsed.dt.strftime('%Y-%m-%d')
+    
+    return result
+
+def number_column(series):
+    """Numeric column with NaN as None."""
+    return series.astype(object).where(series.notna(), None)
+
+def swimlane_column(swimlanes, labels):
+    """Swimlane from the sheet, or extracted from the label where missing."""
+    codes = labels.str.split('-').str[1]
+    from_label = codes.map(SWIMLANE_MAP).fillna(codes).astype(object)
+    from_label = from_label.where(from_label.notna(), None)
+    return swimlanes.where(swimlanes.notna(), from_label)
+
+def unique_labelled_rows(df, kind):
+    """Rows that have a label, keeping the first row of each label. Returns (rows, labels)."""
+    labels = clean_text_column(column(df, 'Label'))
+    has_label = labels.notna() & (labels != 'nan')
+    duplicated = has_label & labels.duplicated()
+    for label in labels[duplicated]:
+        print(f"  Skipping duplicate {kind}: {label}")
+    keep = has_label & ~duplicated
+    return df[keep], labels[keep]
+
+def row_key(key):
+    """String key of a row for import_row_hashes (multi-column keys joined with '|')."""
+    return '|'.join(str(part) for part in key)
+
+def link_key(pair):
+    """String key of a (label, linked label) link for import_row_hashes."""
+    return row_key(pair)
+
+def row_hash(values):
+    """Stable hash of a row's values. Numbers hash as floats, so 1 and 1.0 match."""
+    normalized = [float(v) if isinstance(v, (int, float)) and not isinstance(v, bool) else v
+                  for v in values]
+    return hashlib.sha256(json.dumps(normalized, default=str).encode('utf-8')).hexdigest()
+
+def source_rows(records, key_columns):
+    """{row key: list of values} for a records DataFrame, with NaN as None."""
+    rows = records.astype(object).where(records.notna(), None).values.tolist()
+    key_idx = [list(records.columns).index(col) for col in key_columns]
+    return {row_key([row[i] for i in key_idx]): row for row in rows}
+
+def stored_hashes(cursor, table):
+    """{row key: hash} recorded by the last import/sync of a table."""
+    cursor.execute('SELECT row_key, row_hash FROM import_row_hashes WHERE table_name = ?', (table,))
+    return {key: value for key, value in cursor.fetchall()}
+
+def save_hashes(cursor, table, hashes):
+    """Record the source hash of each row key."""
+    cursor.executemany(
+        'INSERT OR REPLACE INTO import_row_hashes (table_name, row_key, row_hash, synced_at) '
+        'VALUES (?, ?, ?, CURRENT_TIMESTAMP)',
+        [(table, key, value) for key, value in hashes.items()]
+    )
+
+def drop_hashes(cursor, table, keys):
+    """Stop tracking row keys that are no longer in the spreadsheet."""
+    cursor.executemany('DELETE FROM import_row_hashes WHERE table_name = ? AND row_key = ?',
+                       [(table, key) for key in keys])
+
+def bulk_insert(cursor, table, records, key_columns=('label',)):
+    """Insert the rows of the records DataFrame into table with one executemany.
+    
+    Rows whose key already exists in the table are reported and skipped, as the row-by-row
+    import did when the UNIQUE constraint failed. Returns {key: id} for the inserted rows
+    (key is the label, or a tuple for multi-column keys).
+    """
+    key_list = ', '.join(key_columns)
+    cursor.execute(f'SELECT {key_list} FROM {table}')
+    existing = {tuple(row) for row in cursor.fetchall()}
+    
+    keys = list(zip(*(records[col] for col in key_columns)))
+    is_new = [key not in existing for key in keys]
+    for key, new in zip(keys, is_new):
+        if not new:
+            print(f"  Skipping existing: {' / '.join(key)}")
+    records = records[is_new]
+    
+    columns = list(records.columns)
+    rows = records.astype(object).where(records.notna(), None).values.tolist()
+    cursor.executemany(
+        f'INSERT INTO {table} ({", ".join(columns)}) VALUES ({", ".join("?" for _ in columns)})',
+        rows
+    )
+    
+    inserted = {key for key, new in zip(keys, is_new) if new}
+    save_hashes(cursor, table, {key: row_hash(row)
+                                for key, row in source_rows(records, key_columns).items()})
+    cursor.execute(f'SELECT id, {key_list} FROM {table}')
+    ids = {}
+    for row in cursor.fetchall():
+        key = tuple(row[1:])
+        if key in inserted:
+            ids[key[0] if len(key_columns) == 1 else key] = row[0]
+    return ids
+
+def explode_links(labels, links, known_labels, known_linked_labels):
+    """Explode comma/newline separated link cells into unique (label, linked label) pairs.
+    
+    labels holds each row's own label and links the cell listing the labels it links to.
+    Only labels present in known_labels / known_linked_labels are linked.
+    """
+    pairs = pd.DataFrame({'label': labels, 'linked': clean_text_column(links)})
+    pairs = pairs[pairs['label'].isin(known_labels) & pairs['linked'].notna()]
+    pairs['linked'] = pairs['linked'].str.replace('\n', ',').str.split(',')
+    pairs = pairs.explode('linked')
+    pairs['linked'] = pairs['linked'].str.strip()
+    pairs = pairs[pairs['linked'].isin(known_linked_labels)]
+    pairs = pairs.drop_duplicates()
+    return list(zip(pairs['label'], pairs['linked']))
+
+def pf_capability_links(pf_df, pf_labels, cap_labels):
+    """(product feature label, capability label) pairs from the Product Features sheet."""
+    return explode_links(clean_text_column(column(pf_df, 'Label')), column(pf_df, 'Capabilities'),
+                         pf_labels, cap_labels)
+
+def cap_technical_function_links(tf_df, cap_labels, tf_labels):
+    """(capability label, technical function label) pairs from the Technical Functions sheet."""
+    pairs = explode_links(clean_text_column(column(tf_df, 'Label')), column(tf_df, 'Capability'),
+                          tf_labels, cap_labels)
+    return [(cap, tf) for tf, cap in pairs]
+
+def product_feature_records(pf_df):
+    """Product Features sheet -> product_features rows."""
+    rows, labels = unique_labelled_rows(pf_df, 'Product Feature')
+    return pd.DataFrame({
+        'label': labels,
+        'name': clean_text_column(column(rows, 'Product Feature')).fillna(labels),
+        'platform': clean_text_column(column(rows, 'Platform')),
+        'odd': clean_text_column(column(rows, 'ODD')),
+        'environment': clean_text_column(column(rows, 'Environment')),
+        'trailer': clean_text_column(column(rows, 'Trailer')),
+        'details': clean_text_column(column(rows, 'Details')),
+        'comments': clean_text_column(column(rows, 'Comments')),
+        'when_date': clean_text_column(column(rows, 'When')),
+        'start_date': parse_date_column(column(rows, 'Start Date')),
+        'trl3_date': parse_date_column(column(rows, 'TRL 3')),
+        'trl6_date': parse_date_column(column(rows, 'TRL 6')),
+        'trl9_date': parse_date_column(column(rows, 'TRL 9')),
+        'swimlane': swimlane_column(clean_text_column(column(rows, 'Swimlanes')), labels)
+    })
+
+def capability_records(cap_df):
+    """Capabilities sheet -> capabilities rows."""
+    rows, labels = unique_labelled_rows(cap_df, 'Capability')
+    return pd.DataFrame({
+        'swimlane': swimlane_column(clean_text_column(column(rows, 'Swimlane')), labels),
+        'sl': clean_text_column(column(rows, 'SL')),
+        'maj': number_column(column(rows, 'Maj')),
+        'min': number_column(column(rows, 'Min')),
+        'label': labels,
+        'name': clean_text_column(column(rows, 'Capability')).fillna(labels),
+        'platform': clean_text_column(column(rows, 'Platform')),
+        'odd': clean_text_column(column(rows, 'ODD')),
+        'environment': clean_text_column(column(rows, 'Environment')),
+        'trailer': clean_text_column(column(rows, 'Trailer')),
+        'details': clean_text_column(column(rows, 'Details/ comments')),
+        'when_date': clean_text_column(column(rows, 'When')),
+        'dependencies': clean_text_column(column(rows, 'Dependencies')),
+        'dependents': clean_text_column(column(rows, 'Dependents')),
+        'start_date': parse_date_column(column(rows, 'Start date')),
+        'trl3_date': parse_date_column(column(rows, 'TRL3')),
+        'trl6_date': parse_date_column(column(rows, 'TRL6')),
+        'trl9_date': parse_date_column(column(rows, 'TRL9'))
+    })
+
+def technical_function_records(tf_df):
+    """Technical Functions sheet -> technical_functions rows."""
+    rows, labels = unique_labelled_rows(tf_df, 'Technical Function')
+    return pd.DataFrame({
+        'swimlane': swimlane_column(clean_text_column(column(rows, 'Swimlane')), labels),
+        'sl': clean_text_column(column(rows, 'SL')),
+        'maj': number_column(column(rows, 'Maj')),
+        'min': number_column(column(rows, 'Min')),
+        'label': labels,
+        'name': clean_text_column(column(rows, 'Technical Function')).fillna(labels),
+        'platform': clean_text_column(column(rows, 'Platform')),
+        'odd': clean_text_column(column(rows, 'ODD')),
+        'environment': clean_text_column(column(rows, 'Environment')),
+        'trailer': clean_text_column(column(rows, 'Trailer')),
+        'details': clean_text_column(column(rows, 'Details/ comments')),
+        'next': clean_text_column(column(rows, 'Next'))
+    })
+
+def configuration_records(config_df):
+    """Configurations sheet -> configurations rows.
+    
+    A row with a Swimlane starts a new configuration type that applies to the rows below
+    it; an unrecognised Swimlane stops collecting until the next recognised one.
+    """
+    swimlanes = clean_text_column(column(config_df, 'Swimlane'))
+    # '' marks an unrecognised swimlane so it still interrupts the forward fill
+    markers = swimlanes.map(CONFIG_TYPE_MAP).astype(object)
+    markers = markers.where(markers.notna() | swimlanes.isna(), '')
+    config_types = markers.ffill()
+    
+    records = pd.DataFrame({
+        'config_type': config_types.where(config_types != '', None),
+        'code': clean_text_column(column(config_df, 'Label')),
+        'description': clean_text_column(column(config_df, 'Configuration'))
+    }).dropna()
+    
+    duplicated = records.duplicated(['config_type', 'code'])
+    for config_type, code in records.loc[duplicated, ['config_type', 'code']].values.tolist():
+        print(f"  Skipping duplicate Configuration: {code} ({config_type})")
+    return records[~duplicated]
+
+def import_data(excel_file=EXCEL_FILE, db_path='product_features.db'):
+    """Import all data from Excel to database, in a single transaction."""
+    db = Database(db_path)
     db.connect()
     db.create_tables()
     
-    excel_file = 'Product Engineering Canonical Product Features.xlsx'
+    sheets = load_sheets(excel_file, SHEETS)
+    pf_df = sheets['Product Features']
+    cap_df = sheets['Capabilities']
+    tf_df = sheets['Technical Functions (WIP)']
+    config_df = sheets['Configurations']
     
-    print("Importing Product Features...")
-    pf_df = pd.read_excel(excel_file, sheet_name='Product Features')
-    
-    pf_label_to_id = {}
-    for idx, row in pf_df.iterrows():
-        label = clean_text(row.get('Label'))
-        if not label or label == 'nan':
-            continue
-        
-        # Skip duplicates
-        if label in pf_label_to_id:
-            print(f"  Skipping duplicate: {label}")
-            continue
-        
-        # Get swimlane from Excel, or extract from label if missing
-        swimlane = clean_text(row.get('Swimlanes'))
-        if not swimlane:
-            swimlane = extract_swimlane_from_label(label)
-            
-        pf_data = {
-            'label': label,
-            'name': clean_text(row.get('Product Feature')) or label,
-            'platform': clean_text(row.get('Platform')),
-            'odd': clean_text(row.get('ODD')),
-            'environment': clean_text(row.get('Environment')),
-            'trailer': clean_text(row.get('Trailer')),
-            'details': clean_text(row.get('Details')),
-            'comments': clean_text(row.get('Comments')),
-            'when_date': clean_text(row.get('When')),
-            'start_date': parse_date(row.get('Start Date')),
-            'trl3_date': parse_date(row.get('TRL 3')),
-            'trl6_date': parse_date(row.get('TRL 6')),
-            'trl9_date': parse_date(row.get('TRL 9')),
-            'swimlane': swimlane
-        }
-        
-        try:
-            pf_id = db.add_product_feature(pf_data)
-            pf_label_to_id[label] = pf_id
-            print(f"  Added: {label}")
-        except Exception as e:
-            print(f"  Error adding {label}: {e}")
-    
-    print(f"\nImported {len(pf_label_to_id)} Product Features")
-    
-    print("\nImporting Capabilities...")
-    cap_df = pd.read_excel(excel_file, sheet_name='Capabilities')
-    
-    cap_label_to_id = {}
-    for idx, row in cap_df.iterrows():
-        label = clean_text(row.get('Label'))
-        if not label or label == 'nan':
-            continue
-        
-        # Skip duplicates
-        if label in cap_label_to_id:
-            print(f"  Skipping duplicate: {label}")
-            continue
+    cursor = db.connection.cursor()
+    try:
+        print("Importing Product Features...")
+        pf_label_to_id = bulk_insert(cursor, 'product_features', product_feature_records(pf_df))
+        print(f"Imported {len(pf_label_to_id)} Product Features")
         
-        # Get swimlane from Excel, or extract from label if missing
-        swimlane = clean_text(row.get('Swimlane'))
-        if not swimlane:
-            swimlane = extract_swimlane_from_label(label)
-            
-        cap_data = {
-            'swimlane': swimlane,
-            'sl': clean_text(row.get('SL')),
-            'maj': row.get('Maj') if not pd.isna(row.get('Maj')) else None,
-            'min': row.get('Min') if not pd.isna(row.get('Min')) else None,
-            'label': label,
-            'name': clean_text(row.get('Capability')) or label,
-            'platform': clean_text(row.get('Platform')),
-            'odd': clean_text(row.get('ODD')),
-            'environment': clean_text(row.get('Environment')),
-            'trailer': clean_text(row.get('Trailer')),
-            'details': clean_text(row.get('Details/ comments')),
-            'when_date': clean_text(row.get('When')),
-            'dependencies': clean_text(row.get('Dependencies')),
-            'dependents': clean_text(row.get('Dependents')),
-            'start_date': parse_date(row.get('Start date')),
-            'trl3_date': parse_date(row.get('TRL3')),
-            'trl6_date': parse_date(row.get('TRL6')),
-            'trl9_date': parse_date(row.get('TRL9'))
-        }
+        print("\nImporting Capabilities...")
+        cap_label_to_id = bulk_insert(cursor, 'capabilities', capability_records(cap_df))
+        print(f"Imported {len(cap_label_to_id)} Capabilities")
         
-        try:
-            cap_id = db.add_capability(cap_data)
-            cap_label_to_id[label] = cap_id
-            print(f"  Added: {label}")
-        except Exception as e:
-            print(f"  Error adding {label}: {e}")
-    
-    print(f"\nImported {len(cap_label_to_id)} Capabilities")
-    
-    print("\nImporting Technical Functions...")
-    tf_df = pd.read_excel(excel_file, sheet_name='Technical Functions (WIP)')
-    
-    tf_label_to_id = {}
-    for idx, row in tf_df.iterrows():
-        label = clean_text(row.get('Label'))
-        if not label or label == 'nan':
-            continue
+        print("\nImporting Technical Functions...")
+        tf_label_to_id = bulk_insert(cursor, 'technical_functions', technical_function_records(tf_df))
+        print(f"Imported {len(tf_label_to_id)} Technical Functions")
         
-        # Skip duplicates
-        if label in tf_label_to_id:
-            print(f"  Skipping duplicate: {label}")
-            continue
+        # Link Product Features to Capabilities
+        print("\nLinking Product Features to Capabilities...")
+        pf_cap_links = pf_capability_links(pf_df, pf_label_to_id, cap_label_to_id)
+        cursor.executemany(
+            'INSERT OR IGNORE INTO pf_capabilities (product_feature_id, capability_id) VALUES (?, ?)',
+            [(pf_label_to_id[pf], cap_label_to_id[cap]) for pf, cap in pf_cap_links]
+        )
+        save_hashes(cursor, 'pf_capabilities', {link_key(pair): '' for pair in pf_cap_links})
+        print(f"Linked {len(pf_cap_links)} Product Feature -> Capability pairs")
         
-        # Get swimlane from Excel, or extract from label if missing
-        swimlane = clean_text(row.get('Swimlane'))
-        if not swimlane:
-            swimlane = extract_swimlane_from_label(label)
-            
-        tf_data = {
-            'swimlane': swimlane,
-            'sl': clean_text(row.get('SL')),
-            'maj': row.get('Maj') if not pd.isna(row.get('Maj')) else None,
-            'min': row.get('Min') if not pd.isna(row.get('Min')) else None,
-            'label': label,
-            'name': clean_text(row.get('Technical Function')) or label,
-            'platform': clean_text(row.get('Platform')),
-            'odd': clean_text(row.get('ODD')),
-            'environment': clean_text(row.get('Environment')),
-            'trailer': clean_text(row.get('Trailer')),
-            'details': clean_text(row.get('Details/ comments')),
-            'next': clean_text(row.get('Next'))
-        }
+        # Link Capabilities to Technical Functions
+        print("\nLinking Capabilities to Technical Functions...")
+        cap_tf_links = cap_technical_function_links(tf_df, cap_label_to_id, tf_label_to_id)
+        cursor.executemany(
+            'INSERT OR IGNORE INTO cap_technical_functions (capability_id, technical_function_id) VALUES (?, ?)',
+            [(cap_label_to_id[cap], tf_label_to_id[tf]) for cap, tf in cap_tf_links]
+        )
+        save_hashes(cursor, 'cap_technical_functions', {link_key(pair): '' for pair in cap_tf_links})
+        print(f"Linked {len(cap_tf_links)} Capability -> Technical Function pairs")
         
-        try:
-            tf_id = db.add_technical_function(tf_data)
-            tf_label_to_id[label] = tf_id
-            print(f"  Added: {label}")
-        except Exception as e:
-            print(f"  Error adding {label}: {e}")
-    
-    print(f"\nImported {len(tf_label_to_id)} Technical Functions")
-    
-    # Link Product Features to Capabilities
-    print("\nLinking Product Features to Capabilities...")
-    for idx, row in pf_df.iterrows():
-        pf_label = clean_text(row.get('Label'))
-        if pf_label not in pf_label_to_id:
-            continue
-            
-        pf_id = pf_label_to_id[pf_label]
-        capabilities_str = clean_text(row.get('Capabilities'))
+        print("\nImporting Configurations...")
+        config_ids = bulk_insert(cursor, 'configurations', configuration_records(config_df),
+                                 key_columns=('config_type', 'code'))
+        print(f"Imported {len(config_ids)} Configurations")
         
-        if capabilities_str:
-            # Split by newlines or commas
-            cap_labels = capabilities_str.replace('\n', ',').split(',')
-            for cap_label in cap_labels:
-                cap_label = cap_label.strip()
-                if cap_label and cap_label in cap_label_to_id:
-                    db.link_pf_capability(pf_id, cap_label_to_id[cap_label])
-                    print(f"  Linked {pf_label} -> {cap_label}")
-    
-    # Link Capabilities to Technical Functions
-    print("\nLinking Capabilities to Technical Functions...")
-    for idx, row in tf_df.iterrows():
-        tf_label = clean_text(row.get('Label'))
-        if tf_label not in tf_label_to_id:
-            continue
-            
-        tf_id = tf_label_to_id[tf_label]
-        capabilities_str = clean_text(row.get('Capability'))
-        
-        if capabilities_str:
-            # Split by newlines or commas
-            cap_labels = capabilities_str.replace('\n', ',').split(',')
-            for cap_label in cap_labels:
-                cap_label = cap_label.strip()
-                if cap_label and cap_label in cap_label_to_id:
-                    db.link_cap_tf(cap_label_to_id[cap_label], tf_id)
-                    print(f"  Linked {cap_label} -> {tf_label}")
-    
-    # Import Configurations
-    print("\nImporting Configurations...")
-    config_df = pd.read_excel(excel_file, sheet_name='Configurations')
-    
-    # Map Excel swimlane names to database config_type values
-    type_map = {
-        'Platform': 'Platform',
-        'Operational Environment': 'ODD',
-        'Environmental conditions': 'Environment',
-        'Cargo': 'Cargo'
-    }
-    
-    current_type = None
-    config_count = 0
-    
-    for idx, row in config_df.iterrows():
-        # Check if this row defines a new type (Swimlane column is not empty)
-        swimlane = clean_text(row.get('Swimlane'))
-        if swimlane:
-            current_type = type_map.get(swimlane)
-            if current_type:
-                print(f"\n  Processing {current_type} configurations...")
-        
-        # Get the label (code) and description
-        label = clean_text(row.get('Label'))
-        description = clean_text(row.get('Configuration'))
-        
-        # Skip rows without label or description, or if no type is set
-        if not label or not description or not current_type:
-            continue
+        db.connection.commit()
+    except Exception:
+        db.connection.rollback()
+        raise
+    finally:
+        db.close()
+    
+    print("\n✓ Data import completed successfully!")
+
+def sync_table(cursor, table, records, key_columns=('label',)):
+    """Apply the changed rows of one sheet to its table.
+    
+    Each source row is hashed and compared with the hash stored by the last import/sync:
+      - rows missing from the table are inserted
+      - rows whose hash changed are updated (sheet columns only; owner/url are kept)
+      - rows already in the table but never imported/synced (e.g. a database built
+        before row hashes existed) are adopted: their values are kept, and only the
+        hash is recorded so later sheet changes are applied
+      - rows imported before but now gone from the sheet are deleted, with their links
+    Rows added in the app are left alone. Returns ({key: id} for every sheet row,
+    {'inserted'/'updated'/'deleted'/'adopted'/'unchanged': [keys]}).
+    """
+    source = source_rows(records, key_columns)
+    stored = stored_hashes(cursor, table)
+    columns = list(records.columns)
+    key_idx = [columns.index(col) for col in key_columns]
+    
+    cursor.execute(f'SELECT id, {", ".join(columns)} FROM {table}')
+    existing = {}
+    for db_row in cursor.fetchall():
+        values = list(db_row[1:])
+        existing[row_key([values[i] for i in key_idx])] = (db_row[0], values)
+    
+    changes = {'inserted': [], 'updated': [], 'deleted': [], 'adopted': [], 'unchanged': []}
+    hashes = {}
+    inserts = []
+    updates = []
+    for key, row in source.items():
+        hashes[key] = row_hash(row)
+        if key not in existing:
+            inserts.append(row)
+            changes['inserted'].append(key)
+        elif stored.get(key) == hashes[key]:
+            changes['unchanged'].append(key)
+        elif key not in stored:
+            same = row_hash(existing[key][1]) == hashes[key]
+            changes['unchanged' if same else 'adopted'].append(key)
+        else:
+            updates.append(row + [existing[key][0]])
+            changes['updated'].append(key)
+    
+    gone = [key for key in stored if key not in source]
+    changes['deleted'] = [key for key in gone if key in existing]
+    deleted_ids = [(existing[key][0],) for key in changes['deleted']]
+    
+    cursor.executemany(
+        f'INSERT INTO {table} ({", ".join(columns)}) VALUES ({", ".join("?" for _ in columns)})',
+        inserts
+    )
+    cursor.executemany(
+        f'UPDATE {table} SET {", ".join(f"{col} = ?" for col in columns)}, '
+        f'updated_at = CURRENT_TIMESTAMP WHERE id = ?',
+        updates
+    )
+    cursor.executemany(f'DELETE FROM {table} WHERE id = ?', deleted_ids)
+    for link_table, link_column in ENTITY_LINK_COLUMNS[table]:
+        cursor.executemany(f'DELETE FROM {link_table} WHERE {link_column} = ?', deleted_ids)
+    
+    save_hashes(cursor, table, hashes)
+    drop_hashes(cursor, table, gone)
+    
+    cursor.execute(f'SELECT id, {", ".join(key_columns)} FROM {table}')
+    ids = {}
+    for db_row in cursor.fetchall():
+        key = row_key(db_row[1:])
+        if key in source:
+            ids[key] = db_row[0]
+    return ids, changes
+
+def sync_links(cursor, table, parent_column, child_column, pairs, parent_ids, child_ids):
+    """Apply link changes: add sheet links that are missing and remove links that were
+    imported before but are no longer in the sheet. Links added in the app are left alone.
+    Returns {'added': [keys], 'removed': [keys]}."""
+    wanted = {link_key(pair): pair for pair in pairs}
+    stored = stored_hashes(cursor, table)
+    
+    cursor.execute(f'SELECT {parent_column}, {child_column} FROM {table}')
+    existing = {tuple(row) for row in cursor.fetchall()}
+    
+    added = [key for key, (parent, child) in wanted.items()
+             if (parent_ids[parent], child_ids[child]) not in existing]
+    cursor.executemany(
+        f'INSERT OR IGNORE INTO {table} ({parent_column}, {child_column}) VALUES (?, ?)',
+        [(parent_ids[wanted[key][0]], child_ids[wanted[key][1]]) for key in added]
+    )
+    
+    gone = [key for key in stored if key not in wanted]
+    removed = []
+    removed_ids = []
+    for key in gone:
+        parent, _, child = key.partition('|')
+        if parent in parent_ids and child in child_ids:
+            if (parent_ids[parent], child_ids[child]) in existing:
+                removed.append(key)
+                removed_ids.append((parent_ids[parent], child_ids[child]))
+    cursor.executemany(
+        f'DELETE FROM {table} WHERE {parent_column} = ? AND {child_column} = ?', removed_ids)
+    
+    save_hashes(cursor, table, {key: '' for key in wanted})
+    drop_hashes(cursor, table, gone)
+    return {'added': added, 'removed': removed}
+
+def print_sync_summary(summary):
+    """Print the per-table diff of a sync."""
+    print("\n" + "="*60)
+    print("SYNC SUMMARY")
+    print("="*60)
+    for table, changes in summary.items():
+        if 'added' in changes:
+            print(f"\n{table}: {len(changes['added'])} links added, {len(changes['removed'])} removed")
+            for key in changes['added']:
+                print(f"  + {key.replace('|', ' -> ')}")
+            for key in changes['removed']:
+                print(f"  - {key.replace('|', ' -> ')}")
+        else:
+            print(f"\n{table}: {len(changes['inserted'])} inserted, {len(changes['updated'])} updated, "
+                  f"{len(changes['deleted'])} deleted, {len(changes['unchanged'])} unchanged")
+            if changes['adopted']:
+                print(f"  ({len(changes['adopted'])} rows differ from the sheet but were never synced; "
+                      f"kept as-is and tracked from now on)")
+            for marker, kind in (('+', 'inserted'), ('~', 'updated'), ('-', 'deleted')):
+                for key in changes[kind]:
+                    print(f"  {marker} {key}")
+
+def sync_data(excel_file=EXCEL_FILE, db_path='product_features.db', dry_run=False):
+    """Re-sync an existing database with the spreadsheet, applying only changed rows.
+    
+    All changes are applied in one transaction; with dry_run they are rolled back after
+    the summary is printed. Returns the summary {table: changes}.
+    """
+    db = Database(db_path)
+    db.connect()
+    db.create_tables()
+    
+    sheets = load_sheets(excel_file, SHEETS)
+    pf_df = sheets['Product Features']
+    tf_df = sheets['Technical Functions (WIP)']
+    
+    cursor = db.connection.cursor()
+    summary = {}
+    try:
+        pf_ids, summary['product_features'] = sync_table(
+            cursor, 'product_features', product_feature_records(pf_df))
+        cap_ids, summary['capabilities'] = sync_table(
+            cursor, 'capabilities', capability_records(sheets['Capabilities']))
+        tf_ids, summary['technical_functions'] = sync_table(
+            cursor, 'technical_functions', technical_function_records(tf_df))
+        _, summary['configurations'] = sync_table(
+            cursor, 'configurations', configuration_records(sheets['Configurations']),
+            key_columns=('config_type', 'code'))
         
-        config_data = {
-            'config_type': current_type,
-            'code': label,
-            'description': description
-        }
+        summary['pf_capabilities'] = sync_links(
+            cursor, 'pf_capabilities', 'product_feature_id', 'capability_id',
+            pf_capability_links(pf_df, pf_ids, cap_ids), pf_ids, cap_ids)
+        summary['cap_technical_functions'] = sync_links(
+            cursor, 'cap_technical_functions', 'capability_id', 'technical_function_id',
+            cap_technical_function_links(tf_df, cap_ids, tf_ids), cap_ids, tf_ids)
         
-        try:
-            db.add_configuration(config_data)
-            config_count += 1
-            print(f"    Added: {label} ({current_type})")
-        except Exception as e:
-            print(f"    Error adding {label}: {e}")
+        print_sync_summary(summary)
+        if dry_run:
+            db.connection.rollback()
+            print("\n✓ Dry run - no changes written")
+        else:
+            db.connection.commit()
+            print("\n✓ Sync completed successfully!")
+    except Exception:
+        db.connection.rollback()
+        raise
+    finally:
+        db.close()
     
-    print(f"\nImported {config_count} Configurations")
+    return summary
+
+def main(argv=None):
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Import the canonical spreadsheet into the database.")
+    parser.add_argument('--excel', default=EXCEL_FILE, help=f"Workbook to read (default: {EXCEL_FILE})")
+    parser.add_argument('--db', default='product_features.db', help="SQLite database (default: product_features.db)")
+    parser.add_argument('--sync', action='store_true',
+                        help="Apply only the rows that changed since the last import/sync")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="With --sync, report the changes without writing them")
+    args = parser.parse_args(argv)
     
-    db.close()
-    print("\n✓ Data import completed successfully!")
+    if args.sync:
+        sync_data(args.excel, args.db, dry_run=args.dry_run)
+    else:
+        import_data(args.excel, args.db)
 
 if __name__ == '__main__':
-    import_data()
+    main()
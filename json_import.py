@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Differential import of an engineering_plan_db.json export.
+
+plan_json_import() compares the JSON file with the database and works out the delta:
+which entities are new, which have changed content (by content hash over the columns
+the import writes) and which links must be added or removed. The plan can be shown to
+the user and then applied with ImportPlan.apply(), which writes only the delta in a
+single transaction. Re-importing an unchanged file is a no-op.
+
+Matching follows the GUI import: entities by label (configurations by type and code,
+milestones by name); entities missing from the file are kept; the three link tables
+end up exactly as listed in the file.
+
+Usage:
+    python json_import.py [engineering_plan_db.json] [--db product_features.db] [--apply]
+"""
+import argparse
+import hashlib
+import json
+import sys
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from database import Database
+
+PV_COLUMNS = ['label', 'title', 'description', 'platform', 'odd', 'environment', 'trailer',
+              'trl', 'due_date', 'owner', 'url']
+PF_COLUMNS = ['label', 'name', 'swimlane', 'platform', 'odd', 'environment', 'trailer',
+              'details', 'comments', 'when_date', 'start_date', 'trl3_date', 'trl6_date',
+              'trl9_date', 'owner', 'url']
+CAP_COLUMNS = ['swimlane', 'sl', 'maj', 'min', 'label', 'name', 'platform', 'odd',
+               'environment', 'trailer', 'details', 'when_date', 'dependencies', 'dependents',
+               'start_date', 'trl3_date', 'trl6_date', 'trl9_date', 'owner', 'url']
+TF_COLUMNS = ['swimlane', 'sl', 'maj', 'min', 'label', 'name', 'platform', 'odd',
+              'environment', 'trailer', 'details', 'next', 'owner', 'url']
+
+# (table / JSON key, display name, key columns, columns written, ORDER BY for key lookup)
+# Columns match the Database add_*/update_* methods the GUI import used.
+ENTITY_SPECS = [
+    ('product_variants', 'Product Variants', ('label',), PV_COLUMNS, 'id'),
+    ('product_features', 'Product Features', ('label',), PF_COLUMNS, 'id'),
+    ('capabilities', 'Capabilities', ('label',), CAP_COLUMNS, 'id'),
+    ('technical_functions', 'Technical Functions', ('label',), TF_COLUMNS, 'id'),
+    ('configurations', 'Configurations', ('config_type', 'code'),
+     ['config_type', 'code', 'description'], 'id'),
+    ('milestones', 'Milestones', ('name',), ['name', 'description', 'date'], 'date, id'),
+]
+
+# (link table, JSON key, display name, parent column, child column, parent table,
+#  child table, parent label field, child label field)
+LINK_SPECS = [
+    ('pv_product_features', 'pv_product_features_relationships', 'PV-PF Links',
+     'product_variant_id', 'product_feature_id', 'product_variants', 'product_features',
+     'product_variant_label', 'product_feature_label'),
+    ('pf_capabilities', 'pf_capabilities_relationships', 'PF-Capability Links',
+     'product_feature_id', 'capability_id', 'product_features', 'capabilities',
+     'product_feature_label', 'capability_label'),
+    ('cap_technical_functions', 'cap_technical_functions_relationships', 'Capability-TF Links',
+     'capability_id', 'technical_function_id', 'capabilities', 'technical_functions',
+     'capability_label', 'technical_function_label'),
+]
+
+
+def content_hash(values: Iterable) -> str:
+    """Hash of a record's values. Numbers hash as floats, so 1 and 1.0 match."""
+    normalized = [float(v) if isinstance(v, (int, float)) and not isinstance(v, bool) else v
+                  for v in values]
+    return hashlib.sha256(json.dumps(normalized, default=str).encode('utf-8')).hexdigest()
+
+
+def _label_ids(cursor, table: str) -> Dict[str, int]:
+    """{label: id} for an entity table."""
+    cursor.execute(f'SELECT id, label FROM {table}')
+    return {label: row_id for row_id, label in cursor.fetchall()}
+
+
+class ImportPlan:
+    """The delta between a JSON export and the database.
+
+    entities: {table: {'insert': [record], 'update': [(id, key, record)], 'unchanged': int}}
+    links: {table: {'add': [(parent label, child label)], 'remove': [(parent id, child id,
+            parent label, child label)], 'dangling': int, 'unchanged': int}}
+    """
+
+    def __init__(self):
+        self.entities: Dict[str, Dict] = {}
+        self.links: Dict[str, Dict] = {}
+        self.skipped_links = 0
+
+    def is_empty(self) -> bool:
+        """True when applying the plan would not change the database."""
+        return (all(not e['insert'] and not e['update'] for e in self.entities.values()) and
+                all(not l['add'] and not l['remove'] and not l['dangling']
+                    for l in self.links.values()))
+
+    def summary_lines(self, detail: bool = False, limit: int = 10) -> List[str]:
+        """Human-readable summary; with detail, list up to limit changed keys per table."""
+        lines = []
+        for table, name, _, _, _ in ENTITY_SPECS:
+            delta = self.entities.get(table)
+            if delta is None:
+                continue
+            lines.append(f"{name}: {len(delta['insert'])} added, {len(delta['update'])} updated, "
+                         f"{delta['unchanged']} unchanged")
+            if detail:
+                changed = ([('+', ' / '.join(map(str, key))) for key in delta['insert_keys']] +
+                           [('~', ' / '.join(map(str, key))) for _, key, _ in delta['update']])
+                for marker, key in changed[:limit]:
+                    lines.append(f"  {marker} {key}")
+                if len(changed) > limit:
+                    lines.append(f"  ... and {len(changed) - limit} more")
+        for table, _, name, *_ in LINK_SPECS:
+            delta = self.links.get(table)
+            if delta is None:
+                continue
+            removed = len(delta['remove']) + delta['dangling']
+            lines.append(f"{name}: {len(delta['add'])} added, {removed} removed, "
+                         f"{delta['unchanged']} unchanged")
+            if detail:
+                changed = ([('+', parent, child) for parent, child in delta['add']] +
+                           [('-', parent, child) for _, _, parent, child in delta['remove']])
+                for marker, parent, child in changed[:limit]:
+                    lines.append(f"  {marker} {parent} -> {child}")
+                if len(changed) > limit:
+                    lines.append(f"  ... and {len(changed) - limit} more")
+        if self.skipped_links:
+            lines.append(f"Skipped {self.skipped_links} links to labels that do not exist")
+        return lines
+
+    def apply(self, db: Database):
+        """Write the delta in one transaction (rolled back on error)."""
+        cursor = db.connection.cursor()
+        specs = {table: (key_columns, columns) for table, _, key_columns, columns, _ in ENTITY_SPECS}
+        try:
+            for table, delta in self.entities.items():
+                _, columns = specs[table]
+                cursor.executemany(
+                    f'INSERT INTO {table} ({", ".join(columns)}) '
+                    f'VALUES ({", ".join("?" for _ in columns)})',
+                    [[record.get(col) for col in columns] for record in delta['insert']]
+                )
+                cursor.executemany(
+                    f'UPDATE {table} SET {", ".join(f"{col} = ?" for col in columns)}, '
+                    f'updated_at = CURRENT_TIMESTAMP WHERE id = ?',
+                    [[record.get(col) for col in columns] + [row_id]
+                     for row_id, _, record in delta['update']]
+                )
+
+            for (table, _, _, parent_col, child_col, parent_table, child_table, _, _) in LINK_SPECS:
+                delta = self.links.get(table)
+                if delta is None:
+                    continue
+                if delta['dangling']:
+                    cursor.execute(f'''
+                        DELETE FROM {table}
+                        WHERE {parent_col} NOT IN (SELECT id FROM {parent_table})
+                           OR {child_col} NOT IN (SELECT id FROM {child_table})
+                    ''')
+                cursor.executemany(
+                    f'DELETE FROM {table} WHERE {parent_col} = ? AND {child_col} = ?',
+                    [(parent_id, child_id) for parent_id, child_id, _, _ in delta['remove']]
+                )
+                # New entities only have ids now, so resolve the added links' labels here
+                parent_ids = _label_ids(cursor, parent_table)
+                child_ids = _label_ids(cursor, child_table)
+                cursor.executemany(
+                    f'INSERT OR IGNORE INTO {table} ({parent_col}, {child_col}) VALUES (?, ?)',
+                    [(parent_ids[parent], child_ids[child]) for parent, child in delta['add']]
+                )
+
+            db.connection.commit()
+        except Exception:
+            db.connection.rollback()
+            raise
+
+
+def plan_json_import(db: Database, data: Dict) -> ImportPlan:
+    """Compare a loaded JSON export with the database and return the ImportPlan."""
+    cursor = db.connection.cursor()
+    plan = ImportPlan()
+
+    # Labels each entity table will have after the import (for resolving links)
+    final_labels: Dict[str, set] = {}
+
+    for table, _, key_columns, columns, order_by in ENTITY_SPECS:
+        # The last record for a key wins, as with the row-by-row import
+        records: Dict[Tuple, Dict] = {}
+        for record in data.get(table, []):
+            records[tuple(record.get(col) for col in key_columns)] = record
+
+        cursor.execute(f'SELECT id, {", ".join(columns)} FROM {table} ORDER BY {order_by}')
+        existing: Dict[Tuple, Tuple[int, str]] = {}
+        for row in cursor.fetchall():
+            values = dict(zip(columns, tuple(row)[1:]))
+            key = tuple(values[col] for col in key_columns)
+            existing.setdefault(key, (row[0], content_hash(values[col] for col in columns)))
+
+        delta = {'insert': [], 'insert_keys': [], 'update': [], 'unchanged': 0}
+        for key, record in records.items():
+            if key not in existing:
+                delta['insert'].append(record)
+                delta['insert_keys'].append(key)
+                continue
+            row_id, stored_hash = existing[key]
+            if content_hash(record.get(col) for col in columns) == stored_hash:
+                delta['unchanged'] += 1
+            else:
+                delta['update'].append((row_id, key, record))
+        plan.entities[table] = delta
+
+        if key_columns == ('label',):
+            final_labels[table] = {key[0] for key in existing} | {key[0] for key in records}
+
+    for (table, json_key, _, parent_col, child_col, parent_table, child_table,
+         parent_field, child_field) in LINK_SPECS:
+        wanted = set()
+        for rel in data.get(json_key, []):
+            pair = (rel.get(parent_field), rel.get(child_field))
+            if pair[0] in final_labels[parent_table] and pair[1] in final_labels[child_table]:
+                wanted.add(pair)
+            else:
+                plan.skipped_links += 1
+
+        cursor.execute(f'''
+            SELECT l.{parent_col}, l.{child_col}, p.label, c.label
+            FROM {table} l
+            JOIN {parent_table} p ON p.id = l.{parent_col}
+            JOIN {child_table} c ON c.id = l.{child_col}
+        ''')
+        existing_links = {(parent, child): (parent_id, child_id)
+                          for parent_id, child_id, parent, child in cursor.fetchall()}
+
+        cursor.execute(f'SELECT COUNT(*) FROM {table}')
+        dangling = cursor.fetchone()[0] - len(existing_links)
+
+        plan.links[table] = {
+            'add': sorted(wanted - existing_links.keys()),
+            'remove': sorted((*existing_links[pair], *pair) for pair in existing_links.keys() - wanted),
+            'dangling': dangling,
+            'unchanged': len(wanted & existing_links.keys()),
+        }
+
+    return plan
+
+
+def load_json(filepath: str) -> Dict:
+    """Read an engineering_plan_db.json export."""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command line entry point: print the import plan, and apply it with --apply."""
+    parser = argparse.ArgumentParser(description="Differential import of a JSON database export.")
+    parser.add_argument('json_file', nargs='?', default='engineering_plan_db.json',
+                        help="JSON export to import (default: engineering_plan_db.json)")
+    parser.add_argument('--db', default='product_features.db', help="SQLite database (default: product_features.db)")
+    parser.add_argument('--apply', action='store_true', help="Apply the changes (default: only report them)")
+    args = parser.parse_args(argv)
+
+    db = Database(args.db)
+    db.connect()
+    db.create_tables()
+    try:
+        plan = plan_json_import(db, load_json(args.json_file))
+        print("\n".join(plan.summary_lines(detail=True)))
+        if plan.is_empty():
+            print("\n✓ Database already matches the file - nothing to import")
+        elif args.apply:
+            plan.apply(db)
+            print("\n✓ Changes applied")
+        else:
+            print("\nRun with --apply to write these changes")
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Sparse-matrix analytics over the PV -> PF -> capability -> TF link tables.
+
+Each link table is loaded into a compressed-sparse-row (CSR) matrix over dense entity
+indexes (entities in label order), so all-pairs questions are matrix products instead
+of per-entity query loops:
+
+    pv_pf @ pf_cap            which capabilities each variant needs (and via how many features)
+    pv_pf @ pf_cap @ cap_tf   which technical functions each variant needs
+    column counts             how many variants need each item (coverage)
+    R @ R.T                   items each pair of variants has in common
+
+The CSR matrix is a small NumPy implementation (indptr/indices/data arrays); the
+product is fully vectorized. Values count paths: entry (pv, tf) of the PV->TF matrix is
+the number of feature/capability routes from the variant to the technical function.
+
+Usage:
+    python link_analytics.py [--db product_features.db] [--kind tf|cap|pf]
+    python link_analytics.py --needs TF-PRC-1.1
+"""
+import argparse
+import sys
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from critical_path import CAPABILITY, FEATURE, KIND_NAMES, VARIANT
+from database import Database
+from impact_index import KIND_TABLES, TECHNICAL_FUNCTION
+
+# Hierarchy order; LINKS[i] joins KINDS[i] to KINDS[i + 1]
+KINDS = (VARIANT, FEATURE, CAPABILITY, TECHNICAL_FUNCTION)
+LINKS = (
+    ('pv_product_features', 'product_variant_id', 'product_feature_id'),
+    ('pf_capabilities', 'product_feature_id', 'capability_id'),
+    ('cap_technical_functions', 'capability_id', 'technical_function_id'),
+)
+
+ALL_KIND_NAMES = {**KIND_NAMES, TECHNICAL_FUNCTION: 'Technical Function'}
+PLURAL_NAMES = {VARIANT: 'product variants', FEATURE: 'product features',
+                CAPABILITY: 'capabilities', TECHNICAL_FUNCTION: 'technical functions'}
+
+
+class CSRMatrix:
+    """Integer sparse matrix in compressed-sparse-row form.
+
+    Row i's column indexes are indices[indptr[i]:indptr[i + 1]] (sorted), with values
+    in the same slice of data.
+    """
+
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray, data: np.ndarray, shape):
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.shape = tuple(shape)
+
+    @classmethod
+    def from_coo(cls, rows, cols, shape, data=None) -> 'CSRMatrix':
+        """Build from (row, col[, value]) triplets; duplicate entries are summed."""
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        data = np.ones(len(rows), dtype=np.int64) if data is None else np.asarray(data, dtype=np.int64)
+        keys, inverse = np.unique(rows * shape[1] + cols, return_inverse=True)
+        summed = np.bincount(inverse, weights=data, minlength=len(keys)).astype(np.int64)
+        out_rows = keys // shape[1] if shape[1] else keys
+        indptr = np.zeros(shape[0] + 1, dtype=np.int64)
+        np.cumsum(np.bincount(out_rows, minlength=shape[0]), out=indptr[1:])
+        return cls(indptr, keys % shape[1] if shape[1] else keys, summed, shape)
+
+    @property
+    def nnz(self) -> int:
+        return len(self.indices)
+
+    def _row_of_entries(self) -> np.ndarray:
+        return np.repeat(np.arange(self.shape[0]), np.diff(self.indptr))
+
+    def row(self, i: int) -> np.ndarray:
+        """Column indexes of row i's non-zero entries."""
+        return self.indices[self.indptr[i]:self.indptr[i + 1]]
+
+    def transpose(self) -> 'CSRMatrix':
+        return CSRMatrix.from_coo(self.indices, self._row_of_entries(), self.shape[::-1], self.data)
+
+    def pattern(self) -> 'CSRMatrix':
+        """Same non-zeros with every value set to 1."""
+        return CSRMatrix(self.indptr, self.indices, np.ones(self.nnz, dtype=np.int64), self.shape)
+
+    def row_counts(self) -> np.ndarray:
+        """Number of non-zero entries per row."""
+        return np.diff(self.indptr)
+
+    def column_counts(self) -> np.ndarray:
+        """Number of non-zero entries per column."""
+        return np.bincount(self.indices, minlength=self.shape[1])
+
+    def __matmul__(self, other: 'CSRMatrix') -> 'CSRMatrix':
+        if self.shape[1] != other.shape[0]:
+            raise ValueError(f"Shape mismatch: {self.shape} @ {other.shape}")
+        # Every entry (i, k) of self meets every entry (k, j) of other's row k
+        lengths = other.indptr[self.indices + 1] - other.indptr[self.indices]
+        total = int(lengths.sum())
+        rows = np.repeat(self._row_of_entries(), lengths)
+        offsets = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        positions = np.repeat(other.indptr[self.indices], lengths) + offsets
+        values = np.repeat(self.data, lengths) * other.data[positions]
+        return CSRMatrix.from_coo(rows, other.indices[positions], (self.shape[0], other.shape[1]), values)
+
+    def to_dense(self) -> np.ndarray:
+        dense = np.zeros(self.shape, dtype=np.int64)
+        dense[self._row_of_entries(), self.indices] = self.data
+        return dense
+
+
+class LinkAnalytics:
+    """Link tables as CSR matrices over dense, label-ordered entity indexes."""
+
+    def __init__(self):
+        # Entity ids and labels per kind, in matrix index order
+        self.ids: Dict[str, np.ndarray] = {}
+        self.labels: Dict[str, List[str]] = {}
+        # Entity id -> matrix index per kind
+        self.position: Dict[str, Dict[int, int]] = {}
+        # Direct link matrices: (parent kind, child kind) -> CSR
+        self.links: Dict[tuple, CSRMatrix] = {}
+        self._reach: Dict[tuple, CSRMatrix] = {}
+
+    @classmethod
+    def load(cls, db: Database) -> 'LinkAnalytics':
+        analytics = cls()
+        cursor = db.connection.cursor()
+        for kind in KINDS:
+            cursor.execute(f'SELECT id, label FROM {KIND_TABLES[kind]} ORDER BY label')
+            rows = cursor.fetchall()
+            analytics.ids[kind] = np.array([row['id'] for row in rows], dtype=np.int64)
+            analytics.labels[kind] = [row['label'] for row in rows]
+            analytics.position[kind] = {row['id']: i for i, row in enumerate(rows)}
+
+        for (table, parent_col, child_col), parent, child in zip(LINKS, KINDS, KINDS[1:]):
+            cursor.execute(f'SELECT DISTINCT {parent_col}, {child_col} FROM {table}')
+            parent_pos, child_pos = analytics.position[parent], analytics.position[child]
+            # Dangling links (no foreign key enforcement) are skipped
+            pairs = [(parent_pos[p], child_pos[c]) for p, c in cursor.fetchall()
+                     if p in parent_pos and c in child_pos]
+            rows, cols = zip(*pairs) if pairs else ((), ())
+            analytics.links[(parent, child)] = CSRMatrix.from_coo(
+                rows, cols, (len(parent_pos), len(child_pos)))
+        return analytics
+
+    def reach(self, source: str, target: str) -> CSRMatrix:
+        """Path counts from every `source` item down to every `target` item
+        (e.g. reach(VARIANT, TECHNICAL_FUNCTION)); products are cached."""
+        start, end = KINDS.index(source), KINDS.index(target)
+        if end <= start:
+            raise ValueError(f"{target} is not below {source} in the hierarchy")
+        key = (source, target)
+        if key not in self._reach:
+            if end == start + 1:
+                self._reach[key] = self.links[key]
+            else:
+                self._reach[key] = self.reach(source, KINDS[end - 1]) @ self.links[(KINDS[end - 1], target)]
+        return self._reach[key]
+
+    def needed_by(self, kind: str, entity_id: int, source: str = VARIANT) -> List[int]:
+        """Ids of the `source` items (default: variants) that need the given item."""
+        column = self.position[kind][entity_id]
+        return self.ids[source][self.reach(source, kind).transpose().row(column)].tolist()
+
+    def needs(self, kind: str, source_id: int, source: str = VARIANT) -> List[int]:
+        """Ids of the `kind` items the given source item (default: a variant) needs."""
+        return self.ids[kind][self.reach(source, kind).row(self.position[source][source_id])].tolist()
+
+    def coverage(self, kind: str, source: str = VARIANT) -> Dict[int, int]:
+        """Number of `source` items needing each `kind` item, by entity id."""
+        counts = self.reach(source, kind).column_counts()
+        return dict(zip(self.ids[kind].tolist(), counts.tolist()))
+
+    def unneeded(self, kind: str, source: str = VARIANT) -> List[int]:
+        """Ids of the `kind` items no `source` item needs."""
+        return self.ids[kind][self.reach(source, kind).column_counts() == 0].tolist()
+
+    def overlap(self, kind: str, source: str = VARIANT) -> np.ndarray:
+        """Dense source x source matrix of how many `kind` items each pair has in
+        common (the diagonal is each item's own count)."""
+        # The result is dense, so a dense product beats summing the sparse one's
+        # (items x sources^2) partial products
+        needed = self.reach(source, kind).pattern().to_dense()
+        return needed @ needed.T
+
+
+def find_item(analytics: LinkAnalytics, label: str):
+    """(kind, id) of the item with this label, or None."""
+    for kind in KINDS:
+        if label in analytics.labels[kind]:
+            return kind, int(analytics.ids[kind][analytics.labels[kind].index(label)])
+    return None
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description="Variant coverage of features, capabilities and technical functions.")
+    parser.add_argument('--db', default='product_features.db', help="SQLite database (default: product_features.db)")
+    parser.add_argument('--kind', default=TECHNICAL_FUNCTION, choices=[FEATURE, CAPABILITY, TECHNICAL_FUNCTION],
+                        help="Item type to report coverage for (default: tf)")
+    parser.add_argument('--needs', metavar='LABEL', help="List the variants that need this item")
+    args = parser.parse_args(argv)
+
+    db = Database(args.db)
+    db.connect()
+    try:
+        analytics = LinkAnalytics.load(db)
+    finally:
+        db.close()
+
+    variant_labels = dict(zip(analytics.ids[VARIANT].tolist(), analytics.labels[VARIANT]))
+    if args.needs:
+        found = find_item(analytics, args.needs)
+        if found is None:
+            print(f"✗ Unknown item: {args.needs}")
+            return 1
+        kind, entity_id = found
+        if kind == VARIANT:
+            print(f"✗ {args.needs} is a product variant")
+            return 1
+        variants = analytics.needed_by(kind, entity_id)
+        print(f"{args.needs} ({ALL_KIND_NAMES[kind]}) is needed by {len(variants)} variant(s)")
+        for pv_id in variants:
+            print(f"  {variant_labels[pv_id]}")
+        return 0
+
+    kind = args.kind
+    reach = analytics.reach(VARIANT, kind)
+    print(f"{PLURAL_NAMES[kind].capitalize()} needed per variant:")
+    for label, count in zip(analytics.labels[VARIANT], reach.row_counts().tolist()):
+        print(f"  {label:16} {count}")
+
+    coverage = analytics.coverage(kind)
+    labels = dict(zip(analytics.ids[kind].tolist(), analytics.labels[kind]))
+    shared = sorted((entity_id for entity_id, count in coverage.items() if count > 1),
+                    key=lambda entity_id: (-coverage[entity_id], labels[entity_id]))
+    print(f"\n{len(shared)} {PLURAL_NAMES[kind]} shared by several variants:")
+    for entity_id in shared:
+        print(f"  {labels[entity_id]:16} {coverage[entity_id]} variants")
+    print(f"\n{len(analytics.unneeded(kind))} of {len(labels)} {PLURAL_NAMES[kind]} "
+          f"are not needed by any variant")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
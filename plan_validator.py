@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Plan-consistency validation.
+
+Each rule is a set-based query over a whole table (or over a set of item ids) and
+writes what it finds to the validation_issues table:
+
+    trl_order                  start_date <= trl3_date <= trl6_date <= trl9_date
+                               (features and capabilities)
+    invalid_date               date values that are not 'YYYY-MM-DD' dates
+    feature_before_capability  a feature planned to reach a TRL before one of its
+                               capabilities does
+    configuration_mismatch     a variant linked to a feature, or through it a capability,
+                               of another platform, ODD, environment or trailer
+    variant_late               a variant whose features reach TRL9 (rolled up from their
+                               capabilities, trl_rollup) after its due date
+
+validate_all() re-checks the whole plan. Triggers on the entity and link tables queue
+every edited item in validation_queue; sync() re-checks only the queued items and their
+neighbours (a capability's features and variants, a feature's variants), so the issue
+list follows each write without rescanning the plan.
+
+Usage:
+    python plan_validator.py [--db product_features.db] [--all] [--rule RULE ...]
+"""
+import argparse
+import json
+import sys
+from itertools import combinations
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from critical_path import CAPABILITY, FEATURE, KIND_NAMES, VARIANT
+from database import CONFIG_COLUMNS, TRL_DATE_COLUMNS, Database, included_config_values, valid_date_sql
+
+ERROR = 'error'
+WARNING = 'warning'
+
+KIND_TABLES = {
+    VARIANT: 'product_variants',
+    FEATURE: 'product_features',
+    CAPABILITY: 'capabilities',
+}
+
+# Planned dates in the order they must be reached
+PLAN_DATE_COLUMNS = ('start_date',) + TRL_DATE_COLUMNS
+DATE_NAMES = {'start_date': 'Start', 'trl3_date': 'TRL3', 'trl6_date': 'TRL6',
+              'trl9_date': 'TRL9', 'due_date': 'Due'}
+
+# Value that applies to every configuration
+GENERIC = 'Generic'
+
+# (entity id, related type, related id, message)
+Issue = Tuple[int, Optional[str], Optional[int], str]
+
+
+def _scope(column: str, ids: Optional[Set[int]]) -> Tuple[str, List]:
+    """WHERE condition restricting `column` to ids (everything when ids is None)."""
+    if ids is None:
+        return '1', []
+    return f'{column} IN (SELECT value FROM json_each(?))', [json.dumps(sorted(ids))]
+
+
+def config_matches(column: str, variant_value: Optional[str], value: Optional[str]) -> bool:
+    """Whether an item's configuration value applies to a variant's (either unset,
+    'Generic', or included in the variant's hierarchy; items may list several values)."""
+    if not variant_value or not value:
+        return True
+    allowed = included_config_values(column, variant_value)
+    return any(part.strip() in allowed or part.strip() == GENERIC for part in value.split(','))
+
+
+def check_trl_order(cursor, kind: str, ids: Optional[Set[int]]) -> List[Issue]:
+    where, params = _scope('id', ids)
+    out_of_order = ' OR '.join(f'{valid_date_sql(a)} > {valid_date_sql(b)}'
+                               for a, b in combinations(PLAN_DATE_COLUMNS, 2))
+    dates = ', '.join(f'{valid_date_sql(col)} AS {col}' for col in PLAN_DATE_COLUMNS)
+    cursor.execute(f"SELECT id, {dates} FROM {KIND_TABLES[kind]} WHERE {where} AND ({out_of_order})", params)
+    issues = []
+    for row in cursor.fetchall():
+        dated = [(col, row[col]) for col in PLAN_DATE_COLUMNS if row[col]]
+        problems = [f"{DATE_NAMES[a]} {a_date} is after {DATE_NAMES[b]} {b_date}"
+                    for (a, a_date), (b, b_date) in zip(dated, dated[1:]) if a_date > b_date]
+        issues.append((row['id'], None, None, '; '.join(problems)))
+    return issues
+
+
+def check_invalid_dates(cursor, kind: str, ids: Optional[Set[int]]) -> List[Issue]:
+    columns = ('due_date',) if kind == VARIANT else PLAN_DATE_COLUMNS
+    where, params = _scope('id', ids)
+    invalid = ' OR '.join(f"(COALESCE({col}, '') != '' AND {valid_date_sql(col)} IS NULL)" for col in columns)
+    checked = ', '.join(f'{col}, {valid_date_sql(col)} AS valid_{col}' for col in columns)
+    cursor.execute(f"SELECT id, {checked} FROM {KIND_TABLES[kind]} WHERE {where} AND ({invalid})", params)
+    issues = []
+    for row in cursor.fetchall():
+        bad = [f"{DATE_NAMES[col]} '{row[col]}'" for col in columns
+               if row[col] not in (None, '') and row['valid_' + col] is None]
+        issues.append((row['id'], None, None, f"Not a YYYY-MM-DD date: {', '.join(bad)}"))
+    return issues
+
+
+def check_feature_before_capability(cursor, kind: str, ids: Optional[Set[int]]) -> List[Issue]:
+    where, params = _scope('pf.id', ids)
+    earlier = ' OR '.join(f'{valid_date_sql(f"pf.{col}")} < {valid_date_sql(f"c.{col}")}'
+                          for col in TRL_DATE_COLUMNS)
+    cursor.execute(f'''
+        SELECT DISTINCT pf.id AS pf_id, c.id AS cap_id, c.label AS cap_label,
+               {', '.join(f'{valid_date_sql(f"pf.{col}")} AS pf_{col}, {valid_date_sql(f"c.{col}")} AS cap_{col}'
+                          for col in TRL_DATE_COLUMNS)}
+        FROM product_features pf
+        JOIN pf_capabilities l ON l.product_feature_id = pf.id
+        JOIN capabilities c ON c.id = l.capability_id
+        WHERE {where} AND ({earlier})
+    ''', params)
+    issues = []
+    for row in cursor.fetchall():
+        levels = [f"{DATE_NAMES[col]} {row['pf_' + col]} before {row['cap_label']}'s {row['cap_' + col]}"
+                  for col in TRL_DATE_COLUMNS
+                  if row['pf_' + col] and row['cap_' + col] and row['pf_' + col] < row['cap_' + col]]
+        issues.append((row['pf_id'], CAPABILITY, row['cap_id'], '; '.join(levels)))
+    return issues
+
+
+def check_configuration(cursor, kind: str, ids: Optional[Set[int]]) -> List[Issue]:
+    where, params = _scope('pv.id', ids)
+    columns = ', '.join(f'pv.{col} AS pv_{col}, item.{col} AS {col}' for col in CONFIG_COLUMNS)
+    cursor.execute(f'''
+        SELECT pv.id AS pv_id, 'pf' AS item_type, item.id AS item_id, item.label, {columns}
+        FROM product_variants pv
+        JOIN pv_product_features l ON l.product_variant_id = pv.id
+        JOIN product_features item ON item.id = l.product_feature_id
+        WHERE {where}
+        UNION
+        SELECT pv.id, 'cap', item.id, item.label, {columns}
+        FROM product_variants pv
+        JOIN pv_product_features l ON l.product_variant_id = pv.id
+        JOIN pf_capabilities pc ON pc.product_feature_id = l.product_feature_id
+        JOIN capabilities item ON item.id = pc.capability_id
+        WHERE {where}
+    ''', params * 2)
+    issues = []
+    for row in cursor.fetchall():
+        mismatched = [f"{col} '{row[col]}' (variant: {row['pv_' + col]})" for col in CONFIG_COLUMNS
+                      if not config_matches(col, row['pv_' + col], row[col])]
+        if mismatched:
+            issues.append((row['pv_id'], row['item_type'], row['item_id'],
+                           f"{row['label']} does not match: {'; '.join(mismatched)}"))
+    return issues
+
+
+def check_variant_late(cursor, kind: str, ids: Optional[Set[int]]) -> List[Issue]:
+    where, params = _scope('pv.id', ids)
+    due = valid_date_sql('pv.due_date')
+    cursor.execute(f'''
+        SELECT pv.id, {due} AS due, r.trl9_date, r.undated_children,
+               CAST(julianday(r.trl9_date) - julianday({due}) AS INTEGER) AS days
+        FROM product_variants pv
+        JOIN trl_rollup r ON r.entity_type = 'pv' AND r.entity_id = pv.id
+        WHERE {where} AND r.trl9_date > {due}
+    ''', params)
+    issues = []
+    for row in cursor.fetchall():
+        undated = f" ({row['undated_children']} features without TRL9)" if row['undated_children'] else ''
+        issues.append((row['id'], None, None,
+                       f"Features reach TRL9 on {row['trl9_date']}, {row['days']} days after "
+                       f"the due date {row['due']}{undated}"))
+    return issues
+
+
+# (rule, severity, item kinds the rule's issues belong to, check)
+RULES = [
+    ('trl_order', ERROR, (FEATURE, CAPABILITY), check_trl_order),
+    ('invalid_date', ERROR, (VARIANT, FEATURE, CAPABILITY), check_invalid_dates),
+    ('feature_before_capability', WARNING, (FEATURE,), check_feature_before_capability),
+    ('configuration_mismatch', WARNING, (VARIANT,), check_configuration),
+    ('variant_late', WARNING, (VARIANT,), check_variant_late),
+]
+RULE_NAMES = [rule[0] for rule in RULES]
+
+# Stored in derived_table_state; a different rule set triggers a full re-validation
+RULES_FINGERPRINT = 'rules:1:' + ','.join(RULE_NAMES)
+
+
+def _run_rules(cursor, scope: Optional[Dict[str, Set[int]]]):
+    """Replace the issues of the items in scope (every item when scope is None)."""
+    insert = ('INSERT INTO validation_issues (rule, severity, entity_type, entity_id, '
+              'related_type, related_id, message) VALUES (?, ?, ?, ?, ?, ?, ?)')
+    for name, severity, kinds, check in RULES:
+        for kind in kinds:
+            ids = None if scope is None else scope[kind]
+            if ids is not None:
+                if not ids:
+                    continue
+                where, params = _scope('entity_id', ids)
+                cursor.execute(f'DELETE FROM validation_issues WHERE rule = ? AND entity_type = ? AND {where}',
+                               [name, kind] + params)
+            cursor.executemany(insert, [(name, severity, kind) + issue for issue in check(cursor, kind, ids)])
+
+
+def validate_all(db: Database) -> int:
+    """Re-check the whole plan; returns the number of open issues."""
+    cursor = db.connection.cursor()
+    cursor.execute('DELETE FROM validation_issues')
+    _run_rules(cursor, None)
+    cursor.execute('DELETE FROM validation_queue')
+    cursor.execute('INSERT OR REPLACE INTO derived_table_state (table_name, fingerprint, built_at) '
+                   "VALUES ('validation_issues', ?, CURRENT_TIMESTAMP)", (RULES_FINGERPRINT,))
+    db.connection.commit()
+    cursor.execute('SELECT COUNT(*) FROM validation_issues')
+    return cursor.fetchone()[0]
+
+
+def _affected(cursor, queued: Iterable[Tuple[str, int]]) -> Dict[str, Set[int]]:
+    """Queued items plus the items whose rules read them: the features using a
+    capability and the variants using a feature."""
+    scope = {VARIANT: set(), FEATURE: set(), CAPABILITY: set()}
+    for kind, entity_id in queued:
+        scope[kind].add(entity_id)
+    if scope[CAPABILITY]:
+        where, params = _scope('capability_id', scope[CAPABILITY])
+        cursor.execute(f'SELECT product_feature_id FROM pf_capabilities WHERE {where}', params)
+        scope[FEATURE].update(row[0] for row in cursor.fetchall())
+    if scope[FEATURE]:
+        where, params = _scope('product_feature_id', scope[FEATURE])
+        cursor.execute(f'SELECT product_variant_id FROM pv_product_features WHERE {where}', params)
+        scope[VARIANT].update(row[0] for row in cursor.fetchall())
+    return scope
+
+
+def sync(db: Database) -> int:
+    """Re-check the items edited since the last sync (everything the first time or after
+    the rules changed); returns the number of items re-checked."""
+    cursor = db.connection.cursor()
+    cursor.execute("SELECT fingerprint FROM derived_table_state WHERE table_name = 'validation_issues'")
+    state = cursor.fetchone()
+    if state is None or state[0] != RULES_FINGERPRINT:
+        validate_all(db)
+        cursor.execute('SELECT (SELECT COUNT(*) FROM product_variants) + '
+                       '(SELECT COUNT(*) FROM product_features) + (SELECT COUNT(*) FROM capabilities)')
+        return cursor.fetchone()[0]
+
+    cursor.execute('SELECT rowid, entity_type, entity_id FROM validation_queue')
+    queued = cursor.fetchall()
+    if not queued:
+        return 0
+    scope = _affected(cursor, [(row['entity_type'], row['entity_id']) for row in queued])
+    _run_rules(cursor, scope)
+    cursor.execute('DELETE FROM validation_queue WHERE rowid <= ?', (max(row['rowid'] for row in queued),))
+    db.connection.commit()
+    return sum(len(ids) for ids in scope.values())
+
+
+def open_issues(db: Database, entity_type: Optional[str] = None, entity_id: Optional[int] = None,
+                rules: Optional[Iterable[str]] = None) -> List[Dict]:
+    """Stored issues with the labels of their items, errors first."""
+    query = '''
+        SELECT i.*, COALESCE(pv.label, pf.label, c.label) AS label,
+               COALESCE(rpf.label, rc.label) AS related_label
+        FROM validation_issues i
+        LEFT JOIN product_variants pv ON i.entity_type = 'pv' AND pv.id = i.entity_id
+        LEFT JOIN product_features pf ON i.entity_type = 'pf' AND pf.id = i.entity_id
+        LEFT JOIN capabilities c ON i.entity_type = 'cap' AND c.id = i.entity_id
+        LEFT JOIN product_features rpf ON i.related_type = 'pf' AND rpf.id = i.related_id
+        LEFT JOIN capabilities rc ON i.related_type = 'cap' AND rc.id = i.related_id
+        WHERE 1=1
+    '''
+    params = []
+    if entity_type:
+        query += ' AND i.entity_type = ?'
+        params.append(entity_type)
+    if entity_id is not None:
+        query += ' AND i.entity_id = ?'
+        params.append(entity_id)
+    if rules:
+        rules = list(rules)
+        query += f" AND i.rule IN ({','.join('?' * len(rules))})"
+        params.extend(rules)
+    query += " ORDER BY i.severity != 'error', i.rule, label, related_label"
+    cursor = db.connection.cursor()
+    cursor.execute(query, params)
+    return [dict(row) for row in cursor.fetchall()]
+
+
+def issue_counts(db: Database) -> Dict[str, int]:
+    """Number of open issues per severity."""
+    cursor = db.connection.cursor()
+    cursor.execute('SELECT severity, COUNT(*) FROM validation_issues GROUP BY severity')
+    return {row[0]: row[1] for row in cursor.fetchall()}
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Check the plan for inconsistent dates, links and configurations.")
+    parser.add_argument('--db', default='product_features.db', help="SQLite database (default: product_features.db)")
+    parser.add_argument('--all', action='store_true', help="Re-check the whole plan instead of the edited items")
+    parser.add_argument('--rule', dest='rules', action='append', choices=RULE_NAMES,
+                        help="Only list issues of this rule (repeatable)")
+    args = parser.parse_args(argv)
+
+    db = Database(args.db)
+    db.connect()
+    db.create_tables()
+    try:
+        if args.all:
+            validate_all(db)
+        else:
+            sync(db)
+        issues = open_issues(db, rules=args.rules)
+    finally:
+        db.close()
+
+    for issue in issues:
+        marker = '✗' if issue['severity'] == ERROR else '⚠'
+        item = f"{KIND_NAMES[issue['entity_type']]} {issue['label']}"
+        print(f"{marker} {issue['rule']:26} {item:32} {issue['message']}")
+    errors = sum(1 for issue in issues if issue['severity'] == ERROR)
+    print(f"\n{errors} errors, {len(issues) - errors} warnings")
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
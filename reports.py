@@ -0,0 +1,592 @@
+#!/usr/bin/env python3
+"""
+Product Variant report generation for Product Features application.
+
+Builds a format-neutral report model for a product variant and streams it out through
+per-format templates (Markdown or HTML), together with a roadmap snapshot image. Used by
+the GUI's "Export to Markdown" button and as a headless command that generates reports
+for every product variant (or a chosen subset) in parallel:
+
+    python reports.py --output-dir reports
+    python reports.py --output-dir reports --variant PV-1 --variant PV-2 --workers 4
+    python reports.py --output-dir reports --format html
+"""
+import argparse
+import html
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from string import Template
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, TextIO
+
+import matplotlib.dates as mdates
+from matplotlib.figure import Figure
+from matplotlib.patches import Rectangle
+
+from database import Database
+from dependency_index import DependencyIndex
+
+# TRL colors
+TRL_COLORS = {
+    'TRL3': '#DC3545',  # Red
+    'TRL6': '#FFC107',  # Amber
+    'TRL9': '#28A745'   # Green
+}
+
+# Shared report context for pool workers, set once per process by _init_worker
+_worker_context = None
+
+
+def load_report_context(db: Database) -> Dict:
+    """Load the data shared by every variant report.
+
+    Includes configurations, milestones and the dependency index, loaded once per batch
+    and handed to each worker rather than re-queried per variant.
+    """
+    configurations = {}
+    for config in db.get_configurations():
+        configurations.setdefault(config['config_type'], []).append(config)
+    return {
+        'configurations': configurations,
+        'milestones': db.get_milestones(),
+        'index': DependencyIndex.load(db)
+    }
+
+
+def build_variant_report_model(pv: Dict, context: Dict) -> Dict:
+    """Collect everything a product variant report shows into a format-neutral model.
+
+    The same model feeds every output format (see REPORT_FORMATS).
+    """
+    # Get configuration details
+    config_details = []
+    for config_type in ['platform', 'odd', 'environment', 'trailer', 'trl']:
+        if pv.get(config_type):
+            heading = config_type.upper() if config_type != 'platform' else 'Platform'
+            configs = context['configurations'].get(heading, [])
+            cfg = next((c for c in configs if c['code'] == pv[config_type]), None)
+            if cfg:
+                config_details.append((heading, cfg))
+
+    # Collect linked product features, capabilities and technical functions
+    index = context['index']
+    closure = index.variant_closure(pv['id'])
+    pfs = closure['product_features']
+    all_capabilities = closure['capabilities']
+    all_technical_functions = closure['technical_functions']
+    variant_pf_ids = {pf['id'] for pf in pfs}
+
+    features = []
+    for pf in pfs:
+        # Remove duplicate technical functions (shared between capabilities)
+        tf_ids = list(dict.fromkeys(closure['pf_technical_functions'][pf['id']]))
+        features.append({
+            'entity': pf,
+            'capabilities': [all_capabilities[cap_id] for cap_id in closure['pf_capabilities'][pf['id']]],
+            'technical_functions': [all_technical_functions[tf_id] for tf_id in tf_ids]
+        })
+
+    capabilities = []
+    for cap_id, cap in all_capabilities.items():
+        capabilities.append({
+            'entity': cap,
+            # Cross-dependencies: Which Product Features use this capability
+            'used_by': [index.product_features[pf_id] for pf_id in index.cap_pfs.get(cap_id, [])
+                        if pf_id in variant_pf_ids],
+            'technical_functions': [index.technical_functions[tf_id] for tf_id in index.cap_tfs.get(cap_id, [])]
+        })
+
+    technical_functions = []
+    for tf_id, tf in all_technical_functions.items():
+        technical_functions.append({
+            'entity': tf,
+            # Cross-dependencies: Which Capabilities use this technical function
+            'used_by': [all_capabilities[cap_id] for cap_id in index.tf_caps.get(tf_id, [])
+                        if cap_id in all_capabilities]
+        })
+
+    return {
+        'pv': pv,
+        'export_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'config_details': config_details,
+        'features': features,
+        'capabilities': capabilities,
+        'technical_functions': technical_functions,
+        'milestones': context['milestones']
+    }
+
+
+class ReportFormat:
+    """An output target for variant reports: compiled templates plus a value escaper.
+
+    Each template renders one building block of the report (a heading, a field, a list
+    item, ...). Adding a new format only needs a new set of templates.
+    """
+
+    def __init__(self, name: str, extension: str, templates: Dict[str, str],
+                 escape: Callable[[str], str] = str):
+        self.name = name
+        self.extension = extension
+        self.templates = {kind: Template(text) for kind, text in templates.items()}
+        self.escape = escape
+
+    def render(self, kind: str, **values) -> str:
+        """Render one template, escaping every substituted value."""
+        return self.templates[kind].substitute({key: self.escape(str(value)) for key, value in values.items()})
+
+
+MARKDOWN_TEMPLATES = {
+    'document_start': '',
+    'document_end': '',
+    'title': '# $text\n',
+    'meta': '**$label:** $value\n',
+    'rule': '---\n',
+    'section': '## $text\n',
+    'subsection': '### $text\n',
+    'field': '**$label:** $value\n\n',
+    'block_field': '**$label:**\n\n$value\n\n',
+    'count': '$label: **$value**\n\n',
+    'list_start': '**$label:**\n',
+    'list_item': '- $text\n',
+    'list_end': '\n',
+    'item_end': '---\n\n',
+    'paragraph': '$text\n\n',
+    'note': '*$text*\n\n',
+    'image': '![$alt](./$src)\n\n',
+}
+
+HTML_TEMPLATES = {
+    'document_start': (
+        '<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n<title>$title</title>\n'
+        '<style>\n'
+        'body { font-family: Arial, sans-serif; max-width: 1100px; margin: 2em auto; color: #222; }\n'
+        '.block { white-space: pre-wrap; }\n'
+        'img { max-width: 100%; }\n'
+        '</style>\n</head>\n<body>\n'
+    ),
+    'document_end': '</body>\n</html>\n',
+    'title': '<h1>$text</h1>\n',
+    'meta': '<p><strong>$label:</strong> $value</p>\n',
+    'rule': '<hr>\n',
+    'section': '<h2>$text</h2>\n',
+    'subsection': '<h3>$text</h3>\n',
+    'field': '<p><strong>$label:</strong> <span class="block">$value</span></p>\n',
+    'block_field': '<p><strong>$label:</strong></p>\n<div class="block">$value</div>\n',
+    'count': '<p>$label: <strong>$value</strong></p>\n',
+    'list_start': '<p><strong>$label:</strong></p>\n<ul>\n',
+    'list_item': '<li>$text</li>\n',
+    'list_end': '</ul>\n',
+    'item_end': '<hr>\n',
+    'paragraph': '<p>$text</p>\n',
+    'note': '<p><em>$text</em></p>\n',
+    'image': '<img src="$src" alt="$alt">\n',
+}
+
+REPORT_FORMATS = {
+    'markdown': ReportFormat('markdown', '.md', MARKDOWN_TEMPLATES),
+    'html': ReportFormat('html', '.html', HTML_TEMPLATES, html.escape),
+}
+
+
+def format_for_filename(filename: str) -> ReportFormat:
+    """Pick the report format from a file extension (Markdown unless it looks like HTML)."""
+    if os.path.splitext(filename)[1].lower() in ('.html', '.htm'):
+        return REPORT_FORMATS['html']
+    return REPORT_FORMATS['markdown']
+
+
+def _trl_dates_block(fmt: ReportFormat, entity: Dict) -> List[str]:
+    """TRL completion date list for a product feature, capability or technical function."""
+    parts = [fmt.render('list_start', label='TRL Completion Dates')]
+    for trl, field in (('TRL3', 'trl3_date'), ('TRL6', 'trl6_date'), ('TRL9', 'trl9_date')):
+        if entity.get(field):
+            parts.append(fmt.render('list_item', text=f"{trl}: {entity[field]}"))
+    parts.append(fmt.render('list_end'))
+    return parts
+
+
+def _entity_list_block(fmt: ReportFormat, label: str, entities: List[Dict]) -> List[str]:
+    """'Label:' followed by a '- LABEL: name' list, or nothing when entities is empty."""
+    if not entities:
+        return []
+    parts = [fmt.render('list_start', label=label)]
+    for entity in entities:
+        parts.append(fmt.render('list_item', text=f"{entity['label']}: {entity['name']}"))
+    parts.append(fmt.render('list_end'))
+    return parts
+
+
+def count_report_sections(model: Dict) -> int:
+    """Number of sections iter_report_sections will yield (for progress reporting)."""
+    # Header, overview, configuration, PF heading, CAP heading, TF heading, roadmap, footer
+    return 8 + len(model['features']) + len(model['capabilities']) + len(model['technical_functions'])
+
+
+def iter_report_sections(model: Dict, fmt: ReportFormat, snapshot_dir: Optional[str] = None) -> Iterator[str]:
+    """Yield the rendered report one section at a time.
+
+    When snapshot_dir is given, the roadmap image is written there and referenced by a
+    relative path; otherwise the roadmap section is left out.
+    """
+    pv = model['pv']
+
+    yield (fmt.render('document_start', title=f"{pv['label']} - {pv['title']}")
+           + fmt.render('title', text=f"Product Variant: {pv['label']} - {pv['title']}")
+           + fmt.render('meta', label='Export Date', value=model['export_date'])
+           + fmt.render('rule'))
+
+    # Product Variant Details
+    parts = [fmt.render('section', text='Product Variant Overview'),
+             fmt.render('field', label='Label', value=pv['label']),
+             fmt.render('field', label='Title', value=pv['title'])]
+    if pv.get('description'):
+        parts.append(fmt.render('block_field', label='Description', value=pv['description']))
+    if pv.get('due_date'):
+        parts.append(fmt.render('field', label='Target Date', value=pv['due_date']))
+    yield ''.join(parts)
+
+    # Configuration Details
+    parts = [fmt.render('section', text='Configuration Details')]
+    for heading, cfg in model['config_details']:
+        parts.append(fmt.render('subsection', text=heading))
+        parts.append(fmt.render('field', label='Code', value=cfg['code']))
+        parts.append(fmt.render('field', label='Description', value=cfg['description']))
+    yield ''.join(parts)
+
+    # Product Features
+    yield (fmt.render('section', text='Product Features')
+           + fmt.render('count', label='Total Product Features', value=len(model['features'])))
+
+    for feature in model['features']:
+        pf = feature['entity']
+        parts = [fmt.render('subsection', text=f"{pf['label']}: {pf['name']}")]
+        if pf.get('details'):
+            parts.append(fmt.render('field', label='Details', value=pf['details']))
+        parts.extend(_trl_dates_block(fmt, pf))
+
+        # Configuration
+        parts.append(fmt.render('list_start', label='Configuration'))
+        for name, field in (('Platform', 'platform'), ('ODD', 'odd'),
+                            ('Environment', 'environment'), ('Cargo', 'trailer')):
+            if pf.get(field):
+                parts.append(fmt.render('list_item', text=f"{name}: {pf[field]}"))
+        parts.append(fmt.render('list_end'))
+
+        parts.extend(_entity_list_block(fmt, 'Dependent Capabilities', feature['capabilities']))
+        parts.extend(_entity_list_block(fmt, 'Dependent Technical Functions', feature['technical_functions']))
+        parts.append(fmt.render('item_end'))
+        yield ''.join(parts)
+
+    # All Capabilities Section
+    if model['capabilities']:
+        yield (fmt.render('section', text='All Capabilities')
+               + fmt.render('count', label='Total Unique Capabilities', value=len(model['capabilities'])))
+    else:
+        yield ''
+
+    for capability in model['capabilities']:
+        cap = capability['entity']
+        parts = [fmt.render('subsection', text=f"{cap['label']}: {cap['name']}")]
+        if cap.get('description'):
+            parts.append(fmt.render('field', label='Description', value=cap['description']))
+        parts.extend(_trl_dates_block(fmt, cap))
+        parts.extend(_entity_list_block(fmt, 'Used by Product Features', capability['used_by']))
+        parts.extend(_entity_list_block(fmt, 'Dependent Technical Functions', capability['technical_functions']))
+        parts.append(fmt.render('item_end'))
+        yield ''.join(parts)
+
+    # All Technical Functions Section
+    if model['technical_functions']:
+        yield (fmt.render('section', text='All Technical Functions')
+               + fmt.render('count', label='Total Unique Technical Functions', value=len(model['technical_functions'])))
+    else:
+        yield ''
+
+    for technical_function in model['technical_functions']:
+        tf = technical_function['entity']
+        parts = [fmt.render('subsection', text=f"{tf['label']}: {tf['name']}")]
+        if tf.get('description'):
+            parts.append(fmt.render('field', label='Description', value=tf['description']))
+        parts.extend(_trl_dates_block(fmt, tf))
+        parts.extend(_entity_list_block(fmt, 'Used by Capabilities', technical_function['used_by']))
+        parts.append(fmt.render('item_end'))
+        yield ''.join(parts)
+
+    # Roadmap Snapshot
+    if snapshot_dir is not None:
+        parts = [fmt.render('section', text='Roadmap Snapshot'),
+                 fmt.render('paragraph', text='Visual roadmap showing all dependencies (Product Features, '
+                                              'Capabilities, Technical Functions) for this Product Variant.')]
+        img_filename = f"{pv['label']}_roadmap.png"
+        try:
+            saved = save_pv_roadmap_snapshot(
+                pv, [feature['entity'] for feature in model['features']],
+                {cap['entity']['id']: cap['entity'] for cap in model['capabilities']},
+                {tf['entity']['id']: tf['entity'] for tf in model['technical_functions']},
+                model['milestones'], os.path.join(snapshot_dir, img_filename))
+            if saved:
+                # Use relative path (just the filename)
+                parts.append(fmt.render('image', alt='Roadmap Snapshot', src=img_filename))
+                parts.append(fmt.render('note', text=f"Roadmap image saved as: {img_filename} "
+                                                     "(in same directory as this file)"))
+            else:
+                parts.append(fmt.render('note', text='No timeline data available for roadmap visualization.'))
+        except Exception as e:
+            parts.append(fmt.render('note', text=f"Error generating roadmap snapshot: {str(e)}"))
+        yield ''.join(parts)
+    else:
+        yield ''
+
+    yield fmt.render('document_end')
+
+
+def render_variant_report(model: Dict, stream: TextIO, fmt: ReportFormat,
+                          snapshot_dir: Optional[str] = None,
+                          progress: Optional[Callable[[int, int], None]] = None):
+    """Stream a rendered report to a text stream, section by section.
+
+    progress, if given, is called as progress(sections_done, sections_total).
+    """
+    total = count_report_sections(model)
+    for done, section in enumerate(iter_report_sections(model, fmt, snapshot_dir), 1):
+        stream.write(section)
+        if progress:
+            progress(done, total)
+
+
+def save_pv_roadmap_snapshot(pv, pfs, all_capabilities, all_technical_functions, milestones, img_path) -> bool:
+    """Draw the roadmap snapshot for a product variant and save it as an image.
+
+    Returns False when none of the items have TRL dates. Uses a standalone matplotlib
+    Figure (no pyplot state), so it is safe to call from worker processes and the GUI.
+    """
+    # Create a figure for the roadmap
+    fig = Figure(figsize=(14, 10), dpi=100)
+    ax = fig.add_subplot(111)
+
+    # Collect all items (PFs, Caps, TFs)
+    items = []
+    sources = [('PF', pfs), ('CAP', all_capabilities.values()), ('TF', all_technical_functions.values())]
+    for item_type, entities in sources:
+        for entity in entities:
+            trl_dates = []
+            if entity.get('trl3_date'):
+                try:
+                    trl_dates.append(('TRL3', datetime.strptime(entity['trl3_date'], '%Y-%m-%d')))
+                except: pass
+            if entity.get('trl6_date'):
+                try:
+                    trl_dates.append(('TRL6', datetime.strptime(entity['trl6_date'], '%Y-%m-%d')))
+                except: pass
+            if entity.get('trl9_date'):
+                try:
+                    trl_dates.append(('TRL9', datetime.strptime(entity['trl9_date'], '%Y-%m-%d')))
+                except: pass
+
+            if trl_dates:
+                trl_dates.sort(key=lambda x: x[1])
+                items.append({
+                    'type': item_type,
+                    'label': entity['label'],
+                    'name': entity['name'][:30] + '...' if len(entity['name']) > 30 else entity['name'],
+                    'trl_dates': trl_dates
+                })
+
+    if not items:
+        return False
+
+    # Sort items by type and first TRL date
+    items.sort(key=lambda x: (x['type'], x['trl_dates'][0][1]))
+
+    # Limit items for readability
+    if len(items) > 50:
+        title_suffix = f" (showing first 50 of {len(items)} items)"
+        items = items[:50]
+    else:
+        title_suffix = f" ({len(items)} items)"
+
+    # Find date range
+    all_dates = []
+    for item in items:
+        all_dates.extend([d[1] for d in item['trl_dates']])
+    min_date = min(all_dates)
+    max_date = max(all_dates)
+
+    # Add padding
+    date_range = (max_date - min_date).days
+    padding = max(30, date_range * 0.1)
+    plot_min_date = min_date - timedelta(days=padding)
+    plot_max_date = max_date + timedelta(days=padding)
+
+    # Draw timeline
+    y_pos = 0
+    y_labels = []
+    y_positions = []
+
+    for item in items:
+        y_labels.append(f"[{item['type']}] {item['label']}")
+        y_positions.append(y_pos)
+
+        trl_dates = item['trl_dates']
+
+        # Draw segments
+        for i in range(len(trl_dates)):
+            start_date = trl_dates[i][1]
+            start_trl = trl_dates[i][0]
+
+            if i < len(trl_dates) - 1:
+                end_date = trl_dates[i + 1][1]
+            else:
+                end_date = start_date + timedelta(days=max(30, date_range * 0.05))
+            color = TRL_COLORS[start_trl]
+
+            ax.barh(y_pos, (end_date - start_date).days,
+                   left=mdates.date2num(start_date),
+                   height=0.6,
+                   color=color,
+                   alpha=0.8,
+                   edgecolor='black',
+                   linewidth=0.5)
+
+            ax.plot(mdates.date2num(start_date), y_pos, 'o',
+                   color='black', markersize=6, zorder=10)
+
+        y_pos += 1
+
+    # Configure axes
+    ax.set_ylim(-0.5, len(items) - 0.5)
+    ax.set_yticks(y_positions)
+    ax.set_yticklabels(y_labels, fontsize=8)
+    ax.invert_yaxis()
+
+    # Format x-axis
+    ax.xaxis_date()
+    ax.xaxis.set_major_formatter(mdates.DateFormatter('%b %y'))
+    ax.xaxis.set_major_locator(mdates.MonthLocator(interval=1))
+    for tick_label in ax.get_xticklabels():
+        tick_label.set_rotation(45)
+        tick_label.set_ha('right')
+
+    ax.set_xlabel('Timeline', fontsize=12, fontweight='bold')
+    ax.set_title(f'{pv["label"]} Roadmap{title_suffix}', fontsize=14, fontweight='bold')
+    ax.grid(True, axis='x', alpha=0.3, linestyle='--')
+
+    # Add milestones
+    for milestone in milestones:
+        try:
+            milestone_date = datetime.strptime(milestone['date'], '%Y-%m-%d')
+            if plot_min_date <= milestone_date <= plot_max_date:
+                ax.axvline(x=mdates.date2num(milestone_date),
+                          color='purple', linestyle='--', linewidth=2, alpha=0.7, zorder=5)
+                ax.plot(mdates.date2num(milestone_date), -0.3,
+                       marker='*', color='gold', markersize=20,
+                       markeredgecolor='purple', markeredgewidth=1.5, zorder=15)
+        except: pass
+
+    # Add legend
+    legend_elements = [
+        Rectangle((0, 0), 1, 1, fc=TRL_COLORS['TRL3'], alpha=0.8, edgecolor='black', label='TRL3'),
+        Rectangle((0, 0), 1, 1, fc=TRL_COLORS['TRL6'], alpha=0.8, edgecolor='black', label='TRL6'),
+        Rectangle((0, 0), 1, 1, fc=TRL_COLORS['TRL9'], alpha=0.8, edgecolor='black', label='TRL9')
+    ]
+    ax.legend(handles=legend_elements, loc='upper right')
+
+    fig.tight_layout()
+
+    fig.savefig(img_path, dpi=150, bbox_inches='tight')
+    return True
+
+
+def write_variant_report(pv: Dict, filename: str, context: Dict,
+                         progress: Optional[Callable[[int, int], None]] = None) -> str:
+    """Write the report and roadmap snapshot for one product variant.
+
+    The output format follows the file extension (.md or .html) and the roadmap PNG is
+    saved next to the report. Returns the image filename.
+    """
+    model = build_variant_report_model(pv, context)
+    fmt = format_for_filename(filename)
+    with open(filename, 'w', encoding='utf-8') as f:
+        render_variant_report(model, f, fmt, os.path.dirname(os.path.abspath(filename)), progress)
+    return f"{pv['label']}_roadmap.png"
+
+
+def _init_worker(context: Dict):
+    """Pool initializer: keep the shared report context for this worker process."""
+    global _worker_context
+    _worker_context = context
+
+
+def _generate_one(pv: Dict, output_dir: str, extension: str) -> str:
+    """Pool task: write the report for a single product variant."""
+    filename = os.path.join(output_dir, f"{pv['label']}_export{extension}")
+    write_variant_report(pv, filename, _worker_context)
+    return filename
+
+
+def generate_reports(db_path: str, output_dir: str, labels: Optional[Sequence[str]] = None,
+                     workers: Optional[int] = None, format_name: str = 'markdown') -> List[str]:
+    """Generate reports and roadmap PNGs for all (or the selected) product variants.
+
+    The shared context (including the dependency index) is loaded once here and passed
+    to each worker process, so workers never touch the database. Returns the report
+    files written.
+    """
+    extension = REPORT_FORMATS[format_name].extension
+    os.makedirs(output_dir, exist_ok=True)
+
+    db = Database(db_path)
+    db.connect()
+    try:
+        pvs = db.get_product_variants()
+        context = load_report_context(db)
+    finally:
+        db.close()
+
+    if labels:
+        wanted = set(labels)
+        missing = wanted - {pv['label'] for pv in pvs}
+        for label in sorted(missing):
+            print(f"  ✗ Unknown product variant: {label}")
+        pvs = [pv for pv in pvs if pv['label'] in wanted]
+
+    written = []
+    if not pvs:
+        return written
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(context,)) as pool:
+        futures = {pool.submit(_generate_one, pv, output_dir, extension): pv['label'] for pv in pvs}
+        for future in as_completed(futures):
+            label = futures[future]
+            try:
+                written.append(future.result())
+                print(f"  ✓ {label}")
+            except Exception as e:
+                print(f"  ✗ {label}: {e}")
+
+    return sorted(written)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Command line entry point for batch report generation."""
+    parser = argparse.ArgumentParser(description="Generate Markdown/HTML reports and roadmap snapshots for product variants.")
+    parser.add_argument('--db', default='product_features.db', help="SQLite database path")
+    parser.add_argument('--output-dir', default='variant_reports', help="Directory to write reports into")
+    parser.add_argument('--variant', dest='variants', action='append',
+                        help="Product variant label to report on (repeatable, default: all)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Number of worker processes (default: CPU count)")
+    parser.add_argument('--format', dest='format_name', default='markdown', choices=sorted(REPORT_FORMATS),
+                        help="Report format (default: markdown)")
+    args = parser.parse_args(argv)
+
+    print(f"Generating variant reports into {args.output_dir}...")
+    written = generate_reports(args.db, args.output_dir, args.variants, args.workers, args.format_name)
+    print(f"\n✓ Generated {len(written)} reports")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
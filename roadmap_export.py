@@ -0,0 +1,503 @@
+"""
+Interactive roadmap figure building and export for Product Features application.
+
+Builds the Plotly roadmap used by the Interactive Roadmap tab and writes it out as
+offline HTML (sharing one locally cached plotly.js bundle) or as PNG/PDF images.
+Can also be run from the command line to export roadmaps for every product variant:
+
+    python roadmap_export.py --output-dir roadmaps --format html --format png
+"""
+import argparse
+import os
+import sys
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import plotly
+import plotly.graph_objects as go
+import plotly.io as pio
+from plotly.offline import get_plotlyjs
+
+from critical_path import CAPABILITY, FEATURE
+from database import Database
+from trl_rollup import rolled_up_features
+from variant_compatibility import ROADMAP_COLUMNS, variant_items
+
+# TRL colors
+TRL_COLORS = {
+    'TRL3': '#DC3545',  # Red
+    'TRL6': '#FFC107',  # Amber
+    'TRL9': '#28A745'   # Green
+}
+
+# Sub-directory (relative to exported HTML files) holding the shared plotly.js bundle
+PLOTLY_ASSET_DIR = 'assets'
+
+# Default static image width in pixels
+IMAGE_WIDTH = 1400
+
+
+def parse_trl_dates(entity: Dict) -> List[Tuple[str, datetime]]:
+    """Return the entity's (TRL, date) pairs sorted by date, skipping unparseable values."""
+    trl_dates = []
+    for trl, field in (('TRL3', 'trl3_date'), ('TRL6', 'trl6_date'), ('TRL9', 'trl9_date')):
+        if entity.get(field):
+            try:
+                trl_dates.append((trl, datetime.strptime(entity[field], '%Y-%m-%d')))
+            except (TypeError, ValueError):
+                pass
+    trl_dates.sort(key=lambda x: x[1])
+    return trl_dates
+
+
+def _roadmap_item(entity: Dict, item_type: str, trl_dates: List[Tuple[str, datetime]]) -> Dict:
+    """Build a roadmap item dict from a product feature or capability row."""
+    return {
+        'type': item_type,
+        'label': entity['label'],
+        'name': entity['name'],
+        'swimlane': entity.get('swimlane', 'Unassigned'),
+        'trl_dates': trl_dates,
+        'details': entity.get('details', ''),
+        'platform': entity.get('platform', ''),
+        'odd': entity.get('odd', ''),
+        'environment': entity.get('environment', '')
+    }
+
+
+def collect_roadmap_items(db: Database, view: str = 'Both',
+                          filters: Optional[Dict] = None, rollup: bool = False,
+                          pv_id: Optional[int] = None) -> Tuple[List[Dict], set]:
+    """Collect roadmap items with TRL dates for the given view and configuration filters.
+    
+    With pv_id, the items are instead those matching that variant's platform, ODD and
+    environment, read from the variant_compatibility table. With rollup, product
+    features show their TRL dates rolled up from their linked capabilities (trl_rollup
+    table). Returns the items and the set of swimlanes they belong to.
+    """
+    items = []
+    all_swimlanes = set()
+    
+    def source_entities(kind, query):
+        if pv_id is None:
+            return query(filters)
+        return variant_items(db, pv_id, kind, linked=False, columns=ROADMAP_COLUMNS)
+    
+    sources = []
+    if view in ['Product Features', 'Both']:
+        pfs = source_entities(FEATURE, db.get_product_features)
+        sources.append(('Product Feature', rolled_up_features(db, pfs) if rollup else pfs))
+    if view in ['Capabilities', 'Both']:
+        sources.append(('Capability', source_entities(CAPABILITY, db.get_capabilities)))
+    
+    for item_type, entities in sources:
+        for entity in entities:
+            trl_dates = parse_trl_dates(entity)
+            if trl_dates:
+                item = _roadmap_item(entity, item_type, trl_dates)
+                all_swimlanes.add(item['swimlane'])
+                items.append(item)
+    
+    return items, all_swimlanes
+
+
+def build_roadmap_figure(items: List[Dict], milestones: List[Dict], product_variants: List[Dict],
+                         view: str = 'Both', title: Optional[str] = None) -> go.Figure:
+    """Build the interactive Plotly roadmap figure for the given items."""
+    # Sort by swimlane then by date
+    items = sorted(items, key=lambda x: (x['swimlane'], x['trl_dates'][0][1]))
+    
+    # Calculate date range for background shading
+    all_dates = []
+    for item in items:
+        for _, date in item['trl_dates']:
+            all_dates.append(date)
+    min_date = min(all_dates) if all_dates else datetime.now()
+    max_date = max(all_dates) if all_dates else datetime.now()
+    # Add padding to date range
+    date_padding = timedelta(days=30)
+    min_date -= date_padding
+    max_date += date_padding
+    
+    # Create Plotly figure
+    fig = go.Figure()
+    
+    # Track y positions
+    y_pos = 0
+    y_labels = []
+    y_positions = []
+    swimlane_boundaries = []
+    current_swimlane = None
+    swimlane_start = 0
+    
+    for item in items:
+        # Track swimlane changes
+        if item['swimlane'] != current_swimlane:
+            if current_swimlane is not None:
+                swimlane_boundaries.append((current_swimlane, swimlane_start, y_pos - 0.6))
+            current_swimlane = item['swimlane']
+            swimlane_start = y_pos
+        
+        # Y-axis label without swimlane (back to original)
+        y_labels.append(f"{item['label']}")
+        y_positions.append(y_pos)
+        
+        # Create hover text - use description (details) instead of label
+        hover_text = f"<b>{item['type']}: {item['name']}</b><br>"
+        if item['details']:
+            hover_text += f"{item['details']}<br><br>"
+        hover_text += f"Label: {item['label']}<br>"
+        hover_text += f"Swimlane: {item['swimlane']}<br>"
+        hover_text += f"Platform: {item['platform']}<br>"
+        hover_text += f"ODD: {item['odd']}<br>"
+        hover_text += f"Environment: {item['environment']}<br>"
+        hover_text += "<br><b>TRL Progression:</b><br>"
+        
+        # Draw segments between TRL milestones
+        trl_dates = item['trl_dates']
+        
+        for i in range(len(trl_dates)):
+            start_date = trl_dates[i][1]
+            start_trl = trl_dates[i][0]
+            hover_text += f"{start_trl}: {start_date.strftime('%Y-%m-%d')}<br>"
+            
+            if i < len(trl_dates) - 1:
+                end_date = trl_dates[i + 1][1]
+            else:
+                # Extend last segment
+                end_date = start_date + timedelta(days=90)
+            
+            # Add bar for this segment using shape (reduced height)
+            fig.add_trace(go.Scatter(
+                x=[start_date, end_date, end_date, start_date, start_date],
+                y=[y_pos - 0.25, y_pos - 0.25, y_pos + 0.25, y_pos + 0.25, y_pos - 0.25],
+                fill='toself',
+                fillcolor=TRL_COLORS[start_trl],
+                line=dict(color='black', width=1),
+                mode='lines',
+                name=f"{item['name']} - {start_trl}",
+                hovertext=hover_text,
+                hoverinfo='text',
+                showlegend=False
+            ))
+            
+            # Add TRL milestone marker
+            fig.add_trace(go.Scatter(
+                x=[start_date],
+                y=[y_pos],
+                mode='markers',
+                marker=dict(
+                    size=10,
+                    color='black',
+                    symbol='circle'
+                ),
+                hovertext=f"{start_trl} Milestone: {start_date.strftime('%Y-%m-%d')}",
+                hoverinfo='text',
+                showlegend=False
+            ))
+        
+        y_pos += 1.2
+    
+    # Add final swimlane boundary
+    if current_swimlane is not None:
+        swimlane_boundaries.append((current_swimlane, swimlane_start, y_pos - 0.6))
+    
+    # Add swimlane separators, background shading, and labels on the left
+    for idx, (swimlane_name, start_y, end_y) in enumerate(swimlane_boundaries):
+        # Add alternating gray background shading
+        if idx % 2 == 1:  # Shade every other swimlane
+            fig.add_shape(
+                type="rect",
+                x0=0,
+                x1=1,
+                y0=start_y - 0.6,
+                y1=end_y,
+                xref="paper",
+                yref="y",
+                fillcolor="rgba(200, 200, 200, 0.15)",
+                line=dict(width=0),
+                layer="below"
+            )
+        
+        # Add horizontal line separator (moved up to avoid running through bars)
+        if end_y < y_pos - 1.2:
+            fig.add_hline(
+                y=end_y,
+                line=dict(color='gray', width=2, dash='solid'),
+                opacity=0.5
+            )
+        
+        # Add swimlane label as annotation on the far left
+        mid_y = (start_y + end_y) / 2
+        fig.add_annotation(
+            x=-0.15,  # Position further left, before the y-axis labels
+            y=mid_y,
+            text=f"<b>{swimlane_name}</b>",
+            xref="paper",
+            yref="y",
+            showarrow=False,
+            xanchor='center',
+            font=dict(size=12, color='blue'),
+            bgcolor='rgba(173, 216, 230, 0.3)',
+            bordercolor='blue',
+            borderwidth=2,
+            borderpad=8
+        )
+    
+    # Add milestone lines
+    for milestone in milestones:
+        try:
+            milestone_date = datetime.strptime(milestone['date'], '%Y-%m-%d')
+            fig.add_vline(
+                x=milestone_date,
+                line=dict(color='purple', width=2, dash='dash'),
+                opacity=0.7
+            )
+            fig.add_annotation(
+                x=milestone_date,
+                y=1.05,
+                text=f"⭐ {milestone['name']}",
+                xref="x",
+                yref="paper",
+                showarrow=False,
+                font=dict(size=10, color='purple', family='Arial'),
+                bgcolor='rgba(255, 255, 224, 0.8)',
+                bordercolor='purple',
+                borderwidth=1,
+                borderpad=3
+            )
+        except:
+            pass
+    
+    # Add product variant milestones (show all variants regardless of filters)
+    for pv in product_variants:
+        if pv.get('due_date'):
+            try:
+                pv_date = datetime.strptime(pv['due_date'], '%Y-%m-%d')
+                fig.add_vline(
+                    x=pv_date,
+                    line=dict(color='red', width=3, dash='solid'),
+                    opacity=0.8
+                )
+                fig.add_annotation(
+                    x=pv_date,
+                    y=1.12,
+                    text=f"🎯 {pv['label']}: {pv['title']}",
+                    xref="x",
+                    yref="paper",
+                    showarrow=False,
+                    font=dict(size=11, color='red', family='Arial Black'),
+                    bgcolor='rgba(255, 200, 200, 0.9)',
+                    bordercolor='red',
+                    borderwidth=2,
+                    borderpad=4
+                )
+            except:
+                pass
+    
+    # Update layout
+    fig.update_layout(
+        title=dict(
+            text=title or f"Interactive {view} Roadmap ({len(items)} items)",
+            font=dict(size=16, family='Arial Black')
+        ),
+        xaxis=dict(
+            title="Timeline",
+            type='date',
+            showgrid=True,
+            gridcolor='lightgray',
+            tickformat='%b %Y',
+            side='bottom'
+        ),
+        yaxis=dict(
+            title="",
+            tickmode='array',
+            tickvals=y_positions,
+            ticktext=y_labels,
+            autorange='reversed',
+            showgrid=False
+        ),
+        height=max(600, len(items) * 30 + 150),
+        hovermode='closest',
+        plot_bgcolor='white',
+        margin=dict(l=300, r=50, t=100, b=80),
+        bargap=0.1
+    )
+    
+    # Add top x-axis after initial layout
+    fig.add_trace(go.Scatter(
+        x=[min_date],
+        y=[0],
+        mode='markers',
+        marker=dict(size=0.1, color='rgba(0,0,0,0)'),
+        xaxis='x2',
+        yaxis='y',
+        showlegend=False,
+        hoverinfo='skip'
+    ))
+    
+    fig.update_layout(
+        xaxis2=dict(
+            type='date',
+            showgrid=False,
+            tickformat='%b %Y',
+            side='top',
+            overlaying='x',
+            range=[min_date, max_date],
+            showticklabels=True
+        )
+    )
+    
+    # Add legend for TRL levels
+    for trl, color in TRL_COLORS.items():
+        fig.add_trace(go.Scatter(
+            x=[None],
+            y=[None],
+            mode='markers',
+            marker=dict(size=10, color=color, symbol='square'),
+            showlegend=True,
+            name=trl
+        ))
+    
+    return fig
+
+
+def ensure_plotly_js(asset_dir: str) -> str:
+    """Write the bundled plotly.js into asset_dir once and return its path.
+    
+    The file name carries the plotly version so upgrading plotly writes a fresh bundle
+    instead of silently reusing a stale one.
+    """
+    os.makedirs(asset_dir, exist_ok=True)
+    path = os.path.join(asset_dir, f"plotly-{plotly.__version__}.min.js")
+    if not os.path.exists(path):
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(get_plotlyjs())
+        os.replace(tmp_path, path)
+    return path
+
+
+def write_roadmap_html(fig: go.Figure, filepath: str, asset_dir: Optional[str] = None) -> str:
+    """Write an offline interactive HTML roadmap referencing the shared plotly.js bundle.
+    
+    By default the bundle lives in an 'assets' folder next to the HTML file, so any
+    number of roadmaps exported to the same directory share a single copy.
+    """
+    out_dir = os.path.dirname(os.path.abspath(filepath))
+    if asset_dir is None:
+        asset_dir = os.path.join(out_dir, PLOTLY_ASSET_DIR)
+    js_path = ensure_plotly_js(asset_dir)
+    script_src = os.path.relpath(js_path, out_dir).replace(os.sep, '/')
+    fig.write_html(filepath, include_plotlyjs=script_src, full_html=True)
+    return filepath
+
+
+def write_static_images(figures: Sequence[go.Figure], paths: Sequence[str],
+                        format_type: str = 'png', width: int = IMAGE_WIDTH) -> List[str]:
+    """Write PNG/PDF images for several figures through a single kaleido process.
+    
+    Newer plotly releases expose write_images, which renders a whole batch in one
+    kaleido session. Older kaleido (0.2.x) keeps its renderer subprocess alive between
+    write_image calls, so looping reuses the same process there.
+    """
+    figures = list(figures)
+    paths = list(paths)
+    if not figures:
+        return []
+    
+    if hasattr(pio, 'write_images'):
+        pio.write_images(figures, paths, format=format_type, width=width)
+    else:
+        for fig, path in zip(figures, paths):
+            pio.write_image(fig, path, format=format_type, width=width)
+    return paths
+
+
+def build_variant_roadmap(db: Database, pv: Dict, view: str = 'Both',
+                          milestones: Optional[List[Dict]] = None,
+                          product_variants: Optional[List[Dict]] = None,
+                          rollup: bool = False) -> Optional[go.Figure]:
+    """Build the roadmap figure for a single product variant, or None if it has no timeline data."""
+    items, _ = collect_roadmap_items(db, view, rollup=rollup, pv_id=pv['id'])
+    if not items:
+        return None
+    if milestones is None:
+        milestones = db.get_milestones()
+    if product_variants is None:
+        product_variants = db.get_product_variants()
+    title = f"{pv['label']}: {pv['title']} - {view} Roadmap ({len(items)} items)"
+    return build_roadmap_figure(items, milestones, product_variants, view, title=title)
+
+
+def export_variant_roadmaps(db: Database, output_dir: str, formats: Iterable[str] = ('html',),
+                            view: str = 'Both', labels: Optional[Iterable[str]] = None,
+                            rollup: bool = False) -> List[str]:
+    """Export roadmaps for all (or the selected) product variants.
+    
+    HTML files share one plotly.js bundle in output_dir/assets; PNG and PDF images are
+    rendered in one batch per format. Returns the list of files written.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    formats = [fmt.lower() for fmt in formats]
+    
+    pvs = db.get_product_variants()
+    if labels:
+        wanted = set(labels)
+        pvs = [pv for pv in pvs if pv['label'] in wanted]
+    
+    # Shared lookups are loaded once for the whole batch
+    milestones = db.get_milestones()
+    all_variants = db.get_product_variants()
+    
+    figures = []
+    for pv in pvs:
+        fig = build_variant_roadmap(db, pv, view, milestones, all_variants, rollup)
+        if fig is None:
+            print(f"  Skipped {pv['label']}: no timeline data")
+            continue
+        figures.append((pv['label'], fig))
+    
+    written = []
+    if 'html' in formats:
+        for label, fig in figures:
+            written.append(write_roadmap_html(fig, os.path.join(output_dir, f"{label}_roadmap.html")))
+    for format_type in ('png', 'pdf'):
+        if format_type in formats:
+            paths = [os.path.join(output_dir, f"{label}_roadmap.{format_type}") for label, _ in figures]
+            written.extend(write_static_images([fig for _, fig in figures], paths, format_type))
+    return written
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Command line entry point for exporting variant roadmaps."""
+    parser = argparse.ArgumentParser(description="Export interactive roadmaps for product variants.")
+    parser.add_argument('--db', default='product_features.db', help="SQLite database path")
+    parser.add_argument('--output-dir', default='roadmap_export', help="Directory to write roadmaps into")
+    parser.add_argument('--format', dest='formats', action='append', choices=['html', 'png', 'pdf'],
+                        help="Output format (repeatable, default: html)")
+    parser.add_argument('--variant', dest='variants', action='append',
+                        help="Product variant label to export (repeatable, default: all)")
+    parser.add_argument('--view', default='Both', choices=['Product Features', 'Capabilities', 'Both'])
+    parser.add_argument('--rollup', action='store_true',
+                        help="Show product feature TRL dates rolled up from their capabilities")
+    args = parser.parse_args(argv)
+    
+    db = Database(args.db)
+    db.connect()
+    # Adds the derived tables (variant_compatibility, trl_rollup) older databases lack
+    db.create_tables()
+    try:
+        written = export_variant_roadmaps(db, args.output_dir, args.formats or ['html'],
+                                          args.view, args.variants, args.rollup)
+    finally:
+        db.close()
+    
+    for path in written:
+        print(f"  ✓ {path}")
+    print(f"\n✓ Exported {len(written)} files to {args.output_dir}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
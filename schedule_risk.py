@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo schedule risk for product variant due dates.
+
+critical_path.py gives one earliest TRL9 per variant from single-point plan dates.
+This module samples a TRL9 slip for every dated feature and capability, then pushes
+each trial through the same precedence graph, which yields a distribution of
+achievement dates per variant. From that distribution it reports P50/P80/P95 dates and
+the probability of meeting the due date.
+
+Slip model: an item's TRL9 slips by a fraction of its remaining time (planned TRL9
+minus the as-of date; items already due are treated as done). The fraction is drawn
+from a triangular distribution, by default (-10%, +10%, +50%): a little early at best,
+usually slightly late, and sometimes very late.
+
+Trials are simulated in chunks, and each chunk is a (nodes x trials) float32 NumPy
+array. Nodes are processed one topological level at a time. Within a level, each
+np.fmax pass applies one incoming edge of every node at once. The Python loop therefore
+runs over levels and in-degree, not over trials or nodes. Chunks can run in
+a process pool. Every chunk gets its own seed from a SeedSequence, so results for a
+given --seed are the same for any number of workers.
+
+Usage:
+    python schedule_risk.py [PV-LABEL ...] [--db product_features.db] [--trials 10000]
+    python schedule_risk.py --trials 100000 --workers 4 --seed 1
+"""
+import argparse
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from critical_path import VARIANT, CriticalPathResult, compute_critical_paths
+from database import Database
+
+# Default slip as a fraction of remaining time: (optimistic, most likely, pessimistic)
+DEFAULT_SLIP = (-0.1, 0.1, 0.5)
+PERCENTILES = (50, 80, 95)
+
+# Upper bound on node x trial cells per chunk (float32: 4M cells = 16 MB)
+CHUNK_CELLS = 4_000_000
+
+# Schedule model shared by pool workers, set once per process by _init_worker
+_worker_model = None
+
+
+class ScheduleModel:
+    """The precedence graph of critical_path.py as arrays, restricted to the nodes
+    that feed a variant. Dates are day offsets from the as-of date.
+
+    planned[i]     planned TRL9 offset of node i (NaN: undated, or a variant)
+    remaining[i]   days of planned work left on node i (0: cannot slip)
+    steps          (successor rows, predecessor rows, lags) in evaluation order; each
+                   step holds at most one incoming edge per successor, and a node's
+                   predecessors are final before any of its edges are applied
+    variant_rows   rows of the variant nodes, in variant_ids order
+    """
+
+    def __init__(self, result: CriticalPathResult, as_of: date):
+        self.as_of = as_of
+        self.variant_ids = sorted(node_id for kind, node_id in result.order if kind == VARIANT)
+
+        # Only ancestors of variants can affect a variant's date
+        feeding = {(VARIANT, pv_id) for pv_id in self.variant_ids}
+        queue = deque(feeding)
+        while queue:
+            for pred, _ in result.predecessors[queue.popleft()]:
+                if pred not in feeding:
+                    feeding.add(pred)
+                    queue.append(pred)
+        nodes = [node for node in result.order if node in feeding]
+        row = {node: i for i, node in enumerate(nodes)}
+        self.nodes = nodes
+
+        self.planned = np.full(len(nodes), np.nan)
+        for i, node in enumerate(nodes):
+            planned = result.planned[node]
+            if node[0] != VARIANT and planned is not None:
+                self.planned[i] = (planned - as_of).days
+        self.remaining = np.nan_to_num(np.clip(self.planned, 0, None))
+        self.variant_rows = np.array([row[(VARIANT, pv_id)] for pv_id in self.variant_ids], dtype=np.int64)
+
+        level = {}
+        edges_by_level: Dict[int, List[Tuple[int, int, int, int]]] = {}
+        for node in nodes:
+            preds = result.predecessors[node]
+            level[node] = 1 + max((level[pred] for pred, _ in preds), default=-1)
+            for slot, (pred, lag) in enumerate(preds):
+                edges_by_level.setdefault(level[node], []).append((slot, row[node], row[pred], lag))
+
+        self.steps = []
+        for _, edges in sorted(edges_by_level.items()):
+            edges.sort()
+            # Edges are sorted by slot (the edge's position among its successor's
+            # predecessors), so each part has at most one edge per successor
+            slots = np.array([edge[0] for edge in edges])
+            bounds = np.flatnonzero(np.diff(slots)) + 1
+            for part in np.split(np.array([edge[1:] for edge in edges], dtype=np.int64), bounds):
+                self.steps.append((part[:, 0], part[:, 1], part[:, 2].astype(np.float32)[:, None]))
+
+    def simulate(self, trials: int, seed, slip: Tuple[float, float, float] = DEFAULT_SLIP) -> np.ndarray:
+        """(trials x variants) achievement offsets in days (NaN: nothing feeding the
+        variant is dated)."""
+        rng = np.random.default_rng(seed)
+        finish = np.repeat(self.planned.astype(np.float32)[:, None], trials, axis=1)
+        slipping = np.flatnonzero(self.remaining > 0)
+        low, mode, high = slip
+        if slipping.size:
+            fractions = (rng.triangular(low, mode, high, size=(slipping.size, trials)) if high > low
+                         else np.full((slipping.size, trials), low))
+            finish[slipping] += np.rint(fractions * self.remaining[slipping, None])
+
+        for succ, pred, lag in self.steps:
+            # fmax ignores NaN, like the forward pass skips undated predecessors
+            finish[succ] = np.fmax(finish[succ], finish[pred] + lag)
+        return finish[self.variant_rows].T
+
+
+class VariantRisk:
+    """Simulated achievement dates of one variant.
+
+    percentiles: {50: date, 80: date, 95: date} (empty when the variant is undated)
+    on_time:     share of trials finishing on or before the due date (None without one)
+    """
+
+    def __init__(self, pv: Dict, due: Optional[date], planned: Optional[date],
+                 percentiles: Dict[int, date], on_time: Optional[float]):
+        self.pv = pv
+        self.due = due
+        self.planned = planned
+        self.percentiles = percentiles
+        self.on_time = on_time
+
+
+def _init_worker(model: ScheduleModel):
+    global _worker_model
+    _worker_model = model
+
+
+def _simulate_chunk(trials: int, seed, slip) -> np.ndarray:
+    return _worker_model.simulate(trials, seed, slip)
+
+
+def simulate_schedule(db: Database, trials: int = 10000, seed: Optional[int] = None,
+                      slip: Tuple[float, float, float] = DEFAULT_SLIP, workers: int = 1,
+                      as_of: Optional[date] = None) -> Dict[int, VariantRisk]:
+    """Run `trials` scenarios and summarize them per variant id.
+
+    With workers > 1 the chunks run in a process pool; the model is sent to each
+    worker once.
+    """
+    low, mode, high = slip
+    if not low <= mode <= high:
+        raise ValueError("Slip fractions must satisfy optimistic <= likely <= pessimistic")
+    if trials < 1:
+        raise ValueError("At least one trial is needed")
+
+    result = compute_critical_paths(db)
+    model = ScheduleModel(result, as_of or date.today())
+
+    chunk = max(1, min(trials, CHUNK_CELLS // max(1, len(model.nodes))))
+    sizes = [chunk] * (trials // chunk) + ([trials % chunk] if trials % chunk else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    if workers > 1 and len(sizes) > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(model,)) as pool:
+            parts = list(pool.map(_simulate_chunk, sizes, seeds, [slip] * len(sizes)))
+    else:
+        parts = [model.simulate(size, chunk_seed, slip) for size, chunk_seed in zip(sizes, seeds)]
+    finish = np.concatenate(parts)
+
+    risks = {}
+    for col, pv_id in enumerate(model.variant_ids):
+        node = (VARIANT, pv_id)
+        due = result.planned[node]
+        days = finish[:, col]
+        percentiles, on_time = {}, None
+        if not np.isnan(days).any():
+            values = np.percentile(days, PERCENTILES, method='higher')
+            percentiles = {p: model.as_of + timedelta(days=int(value)) for p, value in zip(PERCENTILES, values)}
+            if due is not None:
+                on_time = float(np.mean(days <= (due - model.as_of).days))
+        risks[pv_id] = VariantRisk(result.index.product_variants[pv_id], due, result.earliest[node],
+                                   percentiles, on_time)
+    return risks
+
+
+def _format_date(value: Optional[date]) -> str:
+    return value.isoformat() if value else '-'
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description="Monte Carlo achievement dates per product variant.")
+    parser.add_argument('variants', nargs='*', help="Product variant labels (default: all)")
+    parser.add_argument('--db', default='product_features.db', help="SQLite database (default: product_features.db)")
+    parser.add_argument('--trials', type=int, default=10000, help="Number of scenarios (default: 10000)")
+    parser.add_argument('--seed', type=int, default=None, help="Random seed for reproducible results")
+    parser.add_argument('--workers', type=int, default=1, help="Worker processes (default: 1)")
+    parser.add_argument('--slip', type=float, nargs=3, default=DEFAULT_SLIP,
+                        metavar=('OPTIMISTIC', 'LIKELY', 'PESSIMISTIC'),
+                        help="Slip as a fraction of remaining time (default: -0.1 0.1 0.5)")
+    parser.add_argument('--as-of', type=date.fromisoformat, default=None,
+                        help="Simulate from this date, YYYY-MM-DD (default: today)")
+    args = parser.parse_args(argv)
+
+    db = Database(args.db)
+    db.connect()
+    db.create_tables()
+    try:
+        risks = simulate_schedule(db, args.trials, args.seed, tuple(args.slip), args.workers, args.as_of)
+    except ValueError as e:
+        print(f"✗ {e}")
+        return 1
+    finally:
+        db.close()
+
+    by_label = {risk.pv['label']: risk for risk in risks.values()}
+    unknown = [label for label in args.variants if label not in by_label]
+    if unknown:
+        print(f"✗ Unknown product variant(s): {', '.join(unknown)}")
+        return 1
+
+    print(f"{args.trials} trials\n")
+    print(f"{'Variant':16} {'Due':10}  {'Planned':10}  {'P50':10}  {'P80':10}  {'P95':10}  On time")
+    for label in args.variants or sorted(by_label):
+        risk = by_label[label]
+        on_time = '-' if risk.on_time is None else f"{risk.on_time:.0%}"
+        print(f"{label:16} {_format_date(risk.due):10}  {_format_date(risk.planned):10}  " +
+              "  ".join(f"{_format_date(risk.percentiles.get(p)):10}" for p in PERCENTILES) +
+              f"  {on_time}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Columnar snapshots of the engineering plan database.
+
+Writes every entity and link table to its own Parquet or Arrow IPC (Feather v2) file with
+typed columns (integers, floats, dates, timestamps) derived from the SQLite schema, and
+loads such a snapshot back into a database. Both formats can be memory-mapped, so
+notebooks and analysis code can read tables without copying them into Python objects:
+
+    from snapshot import load_snapshot
+    tables = load_snapshot('plan_snapshot')            # {table name: pyarrow.Table}
+    df = tables['capabilities'].to_pandas()
+
+Usage:
+    python snapshot.py export [--db product_features.db] [--output-dir plan_snapshot] [--format parquet|arrow]
+    python snapshot.py import SNAPSHOT_DIR [--db product_features.db]
+"""
+import argparse
+import sys
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+from database import Database
+
+# Tables in insert order (link tables after the entities they reference)
+SNAPSHOT_TABLES = [
+    'configurations',
+    'milestones',
+    'product_variants',
+    'product_features',
+    'capabilities',
+    'technical_functions',
+    'pv_product_features',
+    'pf_capabilities',
+    'cap_technical_functions',
+]
+
+# Snapshot format name -> file extension
+SNAPSHOT_FORMATS = {
+    'parquet': '.parquet',
+    'arrow': '.arrow',
+}
+
+# SQLite declared column type -> Arrow type
+ARROW_TYPES = {
+    'INTEGER': pa.int64(),
+    'REAL': pa.float64(),
+    'DATE': pa.date32(),
+    'TIMESTAMP': pa.timestamp('s'),
+    'TEXT': pa.string(),
+}
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def _parse_value(value, arrow_type: pa.DataType):
+    """Convert one SQLite value to the Python type pyarrow expects for arrow_type."""
+    if value is None:
+        return None
+    if value == '' and arrow_type != pa.string():
+        return None
+    if arrow_type == pa.date32():
+        return value if isinstance(value, date) else date.fromisoformat(str(value))
+    if arrow_type == pa.timestamp('s'):
+        return value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+    return value
+
+
+def table_columns(db: Database, table: str) -> List[Tuple[str, pa.DataType]]:
+    """(column name, Arrow type) pairs for a table, from its declared SQLite types."""
+    cursor = db.connection.cursor()
+    cursor.execute(f'PRAGMA table_info({table})')
+    return [(row['name'], ARROW_TYPES.get(row['type'].upper(), pa.string()))
+            for row in cursor.fetchall()]
+
+
+def read_sqlite_table(db: Database, table: str) -> pa.Table:
+    """Read a database table into a typed Arrow table (rows ordered by id).
+
+    A date/timestamp column holding values that do not parse (e.g. free text typed into a
+    date field) is kept as a string column rather than silently dropping those values.
+    """
+    columns = table_columns(db, table)
+    cursor = db.connection.cursor()
+    cursor.execute(f'SELECT {", ".join(name for name, _ in columns)} FROM {table} ORDER BY id')
+    rows = cursor.fetchall()
+
+    arrays = []
+    fields = []
+    for idx, (name, arrow_type) in enumerate(columns):
+        values = [row[idx] for row in rows]
+        try:
+            array = pa.array([_parse_value(v, arrow_type) for v in values], type=arrow_type)
+        except (ValueError, TypeError, pa.ArrowInvalid):
+            print(f"  ⚠ {table}.{name}: values are not all valid {arrow_type}, keeping as text")
+            arrow_type = pa.string()
+            array = pa.array([None if v is None else str(v) for v in values], type=arrow_type)
+        arrays.append(array)
+        fields.append(pa.field(name, arrow_type))
+
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+
+def write_table(table: pa.Table, path: Path, format_name: str):
+    """Write one Arrow table as Parquet or uncompressed Arrow IPC.
+
+    Arrow IPC is written uncompressed so it can be memory-mapped without a decode step.
+    """
+    if format_name == 'parquet':
+        pq.write_table(table, path)
+    elif format_name == 'arrow':
+        feather.write_feather(table, path, compression='uncompressed')
+    else:
+        raise ValueError(f"Unknown snapshot format: {format_name}")
+
+
+def read_table(path, memory_map: bool = True) -> pa.Table:
+    """Read one snapshot file. Arrow IPC files are memory-mapped (zero-copy) by default."""
+    path = Path(path)
+    if path.suffix == SNAPSHOT_FORMATS['arrow']:
+        return feather.read_table(path, memory_map=memory_map)
+    return pq.read_table(path, memory_map=memory_map)
+
+
+def export_snapshot(db: Database, output_dir, format_name: str = 'parquet') -> Dict[str, Path]:
+    """Write every snapshot table to output_dir. Returns {table name: file path}."""
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+    extension = SNAPSHOT_FORMATS[format_name]
+
+    # Remove files of the other format so a directory never holds two snapshots
+    for other in SNAPSHOT_FORMATS.values():
+        if other != extension:
+            for table in SNAPSHOT_TABLES:
+                (output_path / f"{table}{other}").unlink(missing_ok=True)
+
+    paths = {}
+    for table in SNAPSHOT_TABLES:
+        arrow_table = read_sqlite_table(db, table)
+        path = output_path / f"{table}{extension}"
+        write_table(arrow_table, path, format_name)
+        paths[table] = path
+        print(f"  ✓ {table}: {arrow_table.num_rows} rows -> {path.name}")
+    return paths
+
+
+def snapshot_files(snapshot_dir) -> Dict[str, Path]:
+    """Find the file of each table in a snapshot directory."""
+    snapshot_path = Path(snapshot_dir)
+    files = {}
+    for table in SNAPSHOT_TABLES:
+        for extension in SNAPSHOT_FORMATS.values():
+            path = snapshot_path / f"{table}{extension}"
+            if path.exists():
+                files[table] = path
+                break
+    return files
+
+
+def load_snapshot(snapshot_dir, tables: Optional[Iterable[str]] = None,
+                  memory_map: bool = True) -> Dict[str, pa.Table]:
+    """Load snapshot tables as {table name: pyarrow.Table} (all tables by default)."""
+    files = snapshot_files(snapshot_dir)
+    wanted = list(tables) if tables is not None else list(files)
+    missing = [table for table in wanted if table not in files]
+    if missing:
+        raise FileNotFoundError(f"Snapshot {snapshot_dir} has no file for: {', '.join(missing)}")
+    return {table: read_table(files[table], memory_map=memory_map) for table in wanted}
+
+
+def _sqlite_value(value):
+    """Convert an Arrow/Python value back to the form the database stores."""
+    if isinstance(value, datetime):
+        return value.strftime(TIMESTAMP_FORMAT)
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def import_snapshot(snapshot_dir, db: Database) -> Dict[str, int]:
+    """Replace the database contents with a snapshot, in a single transaction.
+
+    Ids are preserved so link tables stay valid. Columns that the database does not have
+    are ignored. Returns {table name: rows imported}.
+    """
+    tables = load_snapshot(snapshot_dir)
+    missing = [table for table in SNAPSHOT_TABLES if table not in tables]
+    if missing:
+        raise FileNotFoundError(f"Snapshot {snapshot_dir} has no file for: {', '.join(missing)}")
+
+    db.create_tables()
+    cursor = db.connection.cursor()
+    counts = {}
+    try:
+        for table in reversed(SNAPSHOT_TABLES):
+            cursor.execute(f'DELETE FROM {table}')
+
+        for table in SNAPSHOT_TABLES:
+            db_columns = {name for name, _ in table_columns(db, table)}
+            arrow_table = tables[table]
+            columns = [name for name in arrow_table.column_names if name in db_columns]
+            placeholders = ', '.join('?' for _ in columns)
+            data = [arrow_table.column(name).to_pylist() for name in columns]
+            rows = ([_sqlite_value(value) for value in row] for row in zip(*data))
+            cursor.executemany(
+                f'INSERT INTO {table} ({", ".join(columns)}) VALUES ({placeholders})', rows)
+            counts[table] = arrow_table.num_rows
+
+        db.connection.commit()
+    except Exception:
+        db.connection.rollback()
+        raise
+    return counts
+
+
+def main(argv=None):
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Export/import columnar snapshots of the plan database.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = subparsers.add_parser('export', help="Write the database to a snapshot directory")
+    export_parser.add_argument('--db', default='product_features.db', help="SQLite database (default: product_features.db)")
+    export_parser.add_argument('--output-dir', default='plan_snapshot', help="Snapshot directory (default: plan_snapshot)")
+    export_parser.add_argument('--format', default='parquet', choices=sorted(SNAPSHOT_FORMATS),
+                               help="parquet (compressed) or arrow (uncompressed IPC, zero-copy reads)")
+
+    import_parser = subparsers.add_parser('import', help="Replace the database contents with a snapshot")
+    import_parser.add_argument('snapshot_dir', help="Snapshot directory")
+    import_parser.add_argument('--db', default='product_features.db', help="SQLite database (default: product_features.db)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'export' and not Path(args.db).exists():
+        print(f"✗ Error: Database '{args.db}' not found")
+        return 1
+
+    db = Database(args.db)
+    db.connect()
+    try:
+        if args.command == 'export':
+            print(f"Exporting {args.db} to {args.output_dir} ({args.format})")
+            export_snapshot(db, args.output_dir, args.format)
+            print(f"\n✓ Snapshot written to {args.output_dir}")
+        else:
+            print(f"Importing {args.snapshot_dir} into {args.db}")
+            counts = import_snapshot(args.snapshot_dir, db)
+            for table, count in counts.items():
+                print(f"  ✓ {table}: {count} rows")
+            print(f"\n✓ Snapshot imported into {args.db}")
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
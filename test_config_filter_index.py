@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the bitset filter index returns the same rows as the SQL filters,
+counts facets per dropdown value and notices table changes.
+"""
+import itertools
+import tempfile
+from pathlib import Path
+
+import database
+from config_filter_index import get_filter_index
+
+PLATFORMS = [None, 'Terberg-1', 'Terberg-1.1', 'Terberg-1.2', 'Generic']
+ODDS = [None, 'CFG-ODD-1', 'CFG-ODD-1.1', 'CFG-ODD-2']
+ENVIRONMENTS = [None, 'CFG-ENV-1.1', 'CFG-ENV-2.1']
+
+
+def main():
+    print("="*70)
+    print("CONFIG FILTER INDEX TEST")
+    print("="*70)
+
+    errors = 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / 'plan.db')
+        db = database.Database(path)
+        db.connect()
+        db.create_tables()
+
+        try:
+            combos = list(itertools.product(PLATFORMS, ODDS, ENVIRONMENTS))
+            for i, (platform, odd, environment) in enumerate(combos):
+                data = {'label': f'PF-T-{i:02}', 'name': f'Feature {i}', 'platform': platform,
+                        'odd': odd, 'environment': environment}
+                db.add_product_feature(data)
+                db.add_capability({**data, 'label': f'CA-T-{i:02}', 'swimlane': 'SW-1' if i % 2 else 'SW-2'})
+
+            mismatches = 0
+            for table, query in [('product_features', db.get_product_features), ('capabilities', db.get_capabilities)]:
+                index = get_filter_index(db, table)
+                for platform, odd, environment, swimlane in itertools.product(PLATFORMS, ODDS, ENVIRONMENTS,
+                                                                              [None, 'SW-1']):
+                    filters = {'platform': platform, 'odd': odd, 'environment': environment, 'swimlane': swimlane}
+                    if table == 'product_features':
+                        del filters['swimlane']
+                    if [row['id'] for row in index.filter(filters)] != [row['id'] for row in query(filters)]:
+                        mismatches += 1
+            if mismatches:
+                print(f"✗ {mismatches} filter combinations differ from the SQL query")
+                errors += 1
+            else:
+                print("✓ Every filter combination matches get_product_features/get_capabilities")
+
+            index = get_filter_index(db, 'product_features')
+            counts = index.facet_counts('platform', ['', 'Terberg-1.2', 'Generic'],
+                                        {'platform': 'Generic', 'odd': 'CFG-ODD-2'})
+            # Each platform has 3 ENV values; CFG-ODD-2 includes 1, 1.1 and 2 (3 of 4 ODD values);
+            # Terberg-1.2 includes 1, 1.1 and 1.2
+            if counts != {'': 45, 'Terberg-1.2': 27, 'Generic': 9}:
+                print(f"✗ Unexpected facet counts: {counts}")
+                errors += 1
+            else:
+                print("✓ Facet counts ignore the column's own filter: Terberg-1.2 27, Generic 9")
+
+            if get_filter_index(db, 'product_features') is not index:
+                print("✗ Index rebuilt without any change")
+                errors += 1
+
+            # A change through another connection makes the cached index stale
+            other = database.Database(path)
+            other.connect()
+            pf = other.get_product_feature_by_label('PF-T-00')
+            other.update_product_feature(pf['id'], {**pf, 'platform': 'Terberg-9'})
+            other.close()
+            fresh = get_filter_index(db, 'product_features')
+            if fresh is index or [row['label'] for row in fresh.filter({'platform': 'Terberg-9'})] != ['PF-T-00']:
+                print("✗ Change from another connection not picked up")
+                errors += 1
+            else:
+                print("✓ table_versions triggers invalidate the cached index")
+
+        finally:
+            db.close()
+
+    print("\n" + "="*70)
+    if errors:
+        print(f"✗ {errors} problems found")
+    else:
+        print("TEST COMPLETE - Config filter index works!")
+    print("="*70)
+    return errors
+
+
+if __name__ == '__main__':
+    raise SystemExit(1 if main() else 0)
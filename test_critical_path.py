@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test script to verify earliest TRL9 dates, slack and the critical chain of a variant.
+"""
+import tempfile
+from pathlib import Path
+
+import database
+from critical_path import CAPABILITY, FEATURE, VARIANT, compute_critical_paths
+
+
+def main():
+    print("="*70)
+    print("CRITICAL PATH TEST")
+    print("="*70)
+
+    errors = 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = database.Database(str(Path(tmp) / 'plan.db'))
+        db.connect()
+        db.create_tables()
+
+        try:
+            # PV due 2026-06-30 <- PF (TRL9 2026-03-01) <- CAP-B (2026-05-02, 31 days of work)
+            #                                           <- CAP-C (2026-01-01)
+            # CAP-B depends on CAP-A, which only reaches TRL9 on 2026-06-01
+            pv = db.add_product_variant({'label': 'PV-T', 'title': 'Test', 'due_date': '2026-06-30'})
+            pf = db.add_product_feature({'label': 'PF-T-1.1', 'name': 'Feature', 'trl9_date': '2026-03-01'})
+            cap_a = db.add_capability({'label': 'CA-T-1.1', 'name': 'A', 'trl9_date': '2026-06-01'})
+            cap_b = db.add_capability({'label': 'CA-T-1.2', 'name': 'B', 'start_date': '2026-04-01',
+                                       'trl9_date': '2026-05-02', 'dependencies': 'CA-T-1.1'})
+            cap_c = db.add_capability({'label': 'CA-T-1.3', 'name': 'C', 'trl9_date': '2026-01-01'})
+            db.link_pv_pf(pv, pf)
+            db.link_pf_capability(pf, cap_b)
+            db.link_pf_capability(pf, cap_c)
+
+            result = compute_critical_paths(db)
+
+            earliest = result.earliest[(VARIANT, pv)].isoformat()
+            if earliest != '2026-07-02' or result.slip(pv) != 2:
+                print(f"✗ Expected earliest TRL9 2026-07-02 (2 days late), got {earliest}")
+                errors += 1
+            else:
+                print("✓ Earliest TRL9 2026-07-02: A (2026-06-01) + B's 31 days, 2 days late")
+
+            chain = [result.label(node) for node in result.critical_chain(pv)]
+            if chain != ['CA-T-1.1', 'CA-T-1.2', 'PF-T-1.1', 'PV-T']:
+                print(f"✗ Unexpected critical chain: {chain}")
+                errors += 1
+            else:
+                print(f"✓ Critical chain: {' -> '.join(chain)}")
+
+            slacks = {label: result.slack(node) for label, node in [
+                ('A', (CAPABILITY, cap_a)), ('C', (CAPABILITY, cap_c)), ('PF', (FEATURE, pf))]}
+            if slacks != {'A': -2, 'C': 180, 'PF': -2}:
+                print(f"✗ Unexpected slack: {slacks}")
+                errors += 1
+            else:
+                print("✓ Slack: A -2 days, PF -2 days, C 180 days")
+
+            # CAP-D and CAP-E depend on each other; CAP-F (10 days of work) depends on
+            # CAP-E and on CAP-A, so only the D <-> E edges may be dropped
+            cap_d = db.add_capability({'label': 'CA-T-2.1', 'name': 'D', 'trl9_date': '2026-01-01',
+                                       'dependencies': 'CA-T-2.2'})
+            cap_e = db.add_capability({'label': 'CA-T-2.2', 'name': 'E', 'trl9_date': '2026-01-01',
+                                       'dependencies': 'CA-T-2.1'})
+            cap_f = db.add_capability({'label': 'CA-T-2.3', 'name': 'F', 'start_date': '2026-05-01',
+                                       'trl9_date': '2026-05-11', 'dependencies': 'CA-T-2.2, CA-T-1.1'})
+
+            result = compute_critical_paths(db)
+            node_f = (CAPABILITY, cap_f)
+            preds = sorted(result.predecessors[node_f])
+            if result.cyclic != sorted([cap_d, cap_e]):
+                print(f"✗ Unexpected cycle members: {result.cyclic}")
+                errors += 1
+            elif result.predecessors[(CAPABILITY, cap_d)] or result.predecessors[(CAPABILITY, cap_e)]:
+                print("✗ Edges inside the cycle were kept")
+                errors += 1
+            elif preds != sorted([((CAPABILITY, cap_a), 10), ((CAPABILITY, cap_e), 10)]):
+                print(f"✗ Capability downstream of the cycle lost its prerequisites: {preds}")
+                errors += 1
+            elif (result.earliest[node_f].isoformat(), result.driver[node_f]) != ('2026-06-11', (CAPABILITY, cap_a)):
+                print(f"✗ Expected F at 2026-06-11 driven by A, got {result.earliest[node_f]}")
+                errors += 1
+            else:
+                print("✓ Cycle D <-> E ignored; F keeps both prerequisites and is driven by A (2026-06-11)")
+
+        finally:
+            db.close()
+
+    print("\n" + "="*70)
+    if errors:
+        print(f"✗ {errors} problems found")
+    else:
+        print("TEST COMPLETE - Critical path engine works!")
+    print("="*70)
+    return errors
+
+
+if __name__ == '__main__':
+    raise SystemExit(1 if main() else 0)
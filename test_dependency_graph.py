@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the capability dependency graph parses the free-text columns,
+orders capabilities and answers transitive dependency queries.
+"""
+import tempfile
+from pathlib import Path
+
+import database
+from dependency_graph import DependencyCycleError, load_capability_graph
+
+
+def main():
+    print("="*70)
+    print("CAPABILITY DEPENDENCY GRAPH TEST")
+    print("="*70)
+
+    errors = 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = database.Database(str(Path(tmp) / 'graph.db'))
+        db.connect()
+        db.create_tables()
+
+        try:
+            # 1.1 depends on 1.0 (via 1.0's dependents text), 1.3 on 1.1, 1.2 on 1.1 and 1.3
+            ids = {}
+            for label, deps, dependents in [
+                ('CA-T-1.0', None, 'CA-T-1.1'),
+                ('CA-T-1.1', None, None),
+                ('CA-T-1.2', 'CA-T-1.1; ca-t-1.3', None),
+                ('CA-T-1.3', 'CA-T-1.1, CA-T-9.9 (tbc)', None),
+            ]:
+                ids[label] = db.add_capability({'label': label, 'name': label,
+                                                'dependencies': deps, 'dependents': dependents})
+
+            graph = load_capability_graph(db)
+            labels = lambda node_ids: sorted(graph.labels[n] for n in node_ids)
+
+            cursor = db.connection.cursor()
+            cursor.execute('SELECT COUNT(*) FROM capability_dependencies')
+            if cursor.fetchone()[0] != 4:
+                print("✗ Expected 4 materialized edges")
+                errors += 1
+            else:
+                print("✓ 4 edges materialized in capability_dependencies")
+
+            if [(n, c, t) for n, c, t in graph.unresolved] != [(ids['CA-T-1.3'], 'dependencies', 'CA-T-9.9')]:
+                print(f"✗ Unexpected unresolved references: {graph.unresolved}")
+                errors += 1
+            else:
+                print("✓ Unknown reference CA-T-9.9 reported, '(tbc)' ignored")
+
+            order = [graph.labels[n] for n in graph.topological_order()]
+            if order != ['CA-T-1.0', 'CA-T-1.1', 'CA-T-1.3', 'CA-T-1.2']:
+                print(f"✗ Unexpected topological order: {order}")
+                errors += 1
+            else:
+                print(f"✓ Topological order: {', '.join(order)}")
+
+            blocked = labels(graph.all_dependents(ids['CA-T-1.0']))
+            needs = labels(graph.all_prerequisites(ids['CA-T-1.2']))
+            if blocked != ['CA-T-1.1', 'CA-T-1.2', 'CA-T-1.3'] or needs != ['CA-T-1.0', 'CA-T-1.1', 'CA-T-1.3']:
+                print(f"✗ Unexpected closure: blocks {blocked}, depends on {needs}")
+                errors += 1
+            elif not graph.depends_on(ids['CA-T-1.2'], ids['CA-T-1.0']):
+                print("✗ depends_on missed a transitive dependency")
+                errors += 1
+            else:
+                print("✓ Transitive closure in both directions")
+
+            # Unchanged source columns: the cached graph is returned
+            if load_capability_graph(db) is not graph:
+                print("✗ Graph was rebuilt although nothing changed")
+                errors += 1
+            else:
+                print("✓ Unchanged database reuses the cached graph")
+
+            # Editing the text re-materializes the edges; a cycle is detected
+            db.update_capability(ids['CA-T-1.0'], {**db.get_capability_by_id(ids['CA-T-1.0']),
+                                                   'dependencies': 'CA-T-1.2'})
+            graph = load_capability_graph(db)
+            try:
+                graph.topological_order()
+                print("✗ Cycle not detected")
+                errors += 1
+            except DependencyCycleError as e:
+                print(f"✓ Cycle detected after edit: {', '.join(e.labels)}")
+            if not graph.depends_on(ids['CA-T-1.0'], ids['CA-T-1.3']):
+                print("✗ Closure wrong on cyclic graph")
+                errors += 1
+
+        finally:
+            db.close()
+
+    print("\n" + "="*70)
+    if errors:
+        print(f"✗ {errors} problems found")
+    else:
+        print("TEST COMPLETE - Dependency graph works!")
+    print("="*70)
+    return errors
+
+
+if __name__ == '__main__':
+    raise SystemExit(1 if main() else 0)
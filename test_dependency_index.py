@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the dependency index matches the per-entity link queries.
+"""
+import database
+from dependency_index import DependencyIndex
+
+
+def main():
+    print("="*70)
+    print("DEPENDENCY INDEX TEST")
+    print("="*70)
+
+    db = database.Database()
+    db.connect()
+
+    try:
+        index = DependencyIndex.load(db)
+        errors = 0
+
+        # Forward links must match the existing per-entity queries (including order)
+        for pv in db.get_product_variants():
+            expected = [pf['id'] for pf in db.get_pv_product_features(pv['id'])]
+            if index.pv_pfs.get(pv['id'], []) != expected:
+                print(f"  ✗ PV-PF mismatch for {pv['label']}")
+                errors += 1
+
+        for pf in db.get_product_features():
+            expected = [cap['id'] for cap in db.get_pf_capabilities(pf['id'])]
+            if index.pf_caps.get(pf['id'], []) != expected:
+                print(f"  ✗ PF-Capability mismatch for {pf['label']}")
+                errors += 1
+
+        for cap in db.get_capabilities():
+            expected = [tf['id'] for tf in db.get_cap_technical_functions(cap['id'])]
+            if index.cap_tfs.get(cap['id'], []) != expected:
+                print(f"  ✗ Capability-TF mismatch for {cap['label']}")
+                errors += 1
+            expected = [pf['id'] for pf in db.get_cap_product_features(cap['id'])]
+            if index.cap_pfs.get(cap['id'], []) != expected:
+                print(f"  ✗ Capability-PF reverse mismatch for {cap['label']}")
+                errors += 1
+
+        for tf in db.get_technical_functions():
+            expected = [cap['id'] for cap in db.get_tf_capabilities(tf['id'])]
+            if index.tf_caps.get(tf['id'], []) != expected:
+                print(f"  ✗ TF-Capability reverse mismatch for {tf['label']}")
+                errors += 1
+
+        # Variant closure must cover every capability of every linked feature
+        for pv in db.get_product_variants():
+            closure = index.variant_closure(pv['id'])
+            expected_caps = set()
+            for pf in db.get_pv_product_features(pv['id']):
+                expected_caps.update(cap['id'] for cap in db.get_pf_capabilities(pf['id']))
+            if set(closure['capabilities']) != expected_caps:
+                print(f"  ✗ Closure mismatch for {pv['label']}")
+                errors += 1
+            else:
+                print(f"  ✓ {pv['label']}: {len(closure['product_features'])} PFs, "
+                      f"{len(closure['capabilities'])} capabilities, "
+                      f"{len(closure['technical_functions'])} technical functions")
+
+        print("\n" + "="*70)
+        if errors:
+            print(f"✗ {errors} mismatches found")
+        else:
+            print("TEST COMPLETE - Dependency index matches database queries!")
+        print("="*70)
+        return errors
+
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    raise SystemExit(1 if main() else 0)
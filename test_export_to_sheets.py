@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the Google Sheets exporter streams tables into the workbook with
+column widths sized from their contents, reading a JSON export or the SQLite database,
+and that the non-interactive CLI writes CSV tables on a thread pool next to the workbook.
+"""
+import contextlib
+import csv
+import io
+import json
+import tempfile
+from pathlib import Path
+
+import openpyxl
+
+import database
+import export_to_sheets
+from export_to_sheets import SheetsExporter
+
+PLAN = {
+    'export_date': '2026-01-01 00:00:00',
+    'product_features': [
+        {'id': 1, 'label': 'PF-T-1', 'name': 'Short', 'details': None},
+        {'id': 2, 'label': 'PF-T-2', 'name': 'A feature name long enough to need a wide column',
+         'details': 'x' * 80},
+    ],
+    'capabilities': [
+        {'id': 1, 'label': 'CA-T-1', 'name': 'Cap'},
+    ],
+    'pf_capabilities_relationships': [
+        {'product_feature_id': 2, 'product_feature_label': 'PF-T-2',
+         'capability_id': 1, 'capability_label': 'CA-T-1'},
+    ],
+}
+
+
+def build_database(path):
+    """SQLite plan with the same features, capability and link as PLAN."""
+    db = database.Database(str(path))
+    db.connect()
+    db.create_tables()
+    pf_ids = [db.add_product_feature({key: value for key, value in pf.items() if key != 'id'})
+              for pf in PLAN['product_features']]
+    cap_id = db.add_capability({'label': 'CA-T-1', 'name': 'Cap'})
+    db.link_pf_capability(pf_ids[1], cap_id)
+    db.close()
+
+
+def sheet_rows(ws, columns):
+    """Rows of a worksheet as dicts restricted to `columns`."""
+    headers = [cell.value for cell in ws[1]]
+    return [{column: row[headers.index(column)] for column in columns}
+            for row in ws.iter_rows(min_row=2, values_only=True)]
+
+
+def column_widths(ws):
+    """{header: width} of a worksheet."""
+    return {cell.value: ws.column_dimensions[cell.column_letter].width for cell in ws[1]}
+
+
+def export_xlsx(source, path, components):
+    exporter = SheetsExporter(str(source))
+    with contextlib.redirect_stdout(io.StringIO()):
+        exporter.load_data()
+        exporter.selected_components = set(components)
+        exporter.export_to_excel(str(path))
+    exporter.close()
+    return openpyxl.load_workbook(path)
+
+
+def main():
+    print("="*70)
+    print("EXPORT TO SHEETS TEST")
+    print("="*70)
+
+    errors = 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / 'plan.json'
+        source.write_text(json.dumps(PLAN), encoding='utf-8')
+
+        wb = export_xlsx(source, Path(tmp) / 'plan.xlsx', ['product_features', 'capabilities'])
+        ws = wb['Product Features']
+        rows = [[cell.value for cell in row] for row in ws.iter_rows(min_row=2)]
+        if rows != [[1, 'PF-T-1', 'Short', None], [2, 'PF-T-2', PLAN['product_features'][1]['name'], 'x' * 80]]:
+            print(f"✗ Unexpected Product Features rows: {rows}")
+            errors += 1
+        else:
+            print("✓ Rows streamed into the Product Features sheet")
+
+        widths = column_widths(ws)
+        # Longest value + 2, at least 12 and at most 50
+        if widths != {'id': 12, 'label': 12, 'name': 50, 'details': 50}:
+            print(f"✗ Unexpected column widths: {widths}")
+            errors += 1
+        elif set(column_widths(wb['PF-Capability Links']).values()) != {20}:
+            print("✗ Link sheets should keep their fixed column width")
+            errors += 1
+        else:
+            print("✓ Column widths follow the longest value (capped at 50)")
+
+        # Straight from SQLite: same rows, links resolved to labels, content-sized widths
+        plan_db = Path(tmp) / 'plan.db'
+        build_database(plan_db)
+        wb = export_xlsx(plan_db, Path(tmp) / 'plan_db.xlsx', ['product_features', 'capabilities'])
+        ws = wb['Product Features']
+        links = sheet_rows(wb['PF-Capability Links'], ['product_feature_label', 'capability_label'])
+        if sheet_rows(ws, ['label', 'name', 'details']) != [
+                {key: pf[key] for key in ('label', 'name', 'details')} for pf in PLAN['product_features']]:
+            print("✗ SQLite export rows differ from the plan")
+            errors += 1
+        elif links != [{'product_feature_label': 'PF-T-2', 'capability_label': 'CA-T-1'}]:
+            print(f"✗ Unexpected link rows from SQLite: {links}")
+            errors += 1
+        elif (column_widths(ws)['name'], column_widths(ws)['details'], column_widths(ws)['label']) != (50, 50, 12):
+            print(f"✗ Unexpected SQLite column widths: {column_widths(ws)}")
+            errors += 1
+        else:
+            print("✓ SQLite source: same rows, label links and widths without a JSON export")
+
+        # CLI: CSV tables written by pool threads while the workbook is built
+        csv_dir = Path(tmp) / 'csv'
+        with contextlib.redirect_stdout(io.StringIO()):
+            status = export_to_sheets.main([str(plan_db), '--format', 'csv', '--format', 'xlsx',
+                                            '--xlsx-output', str(Path(tmp) / 'cli.xlsx'),
+                                            '--csv-dir', str(csv_dir), '--workers', '3'])
+        files = sorted(path.name for path in csv_dir.iterdir()) if csv_dir.exists() else []
+        # Empty tables (variants, configurations, technical functions) get no file
+        expected = ['capabilities.csv', 'pf_capability_links.csv', 'product_features.csv']
+        if status != 0 or files != expected or not (Path(tmp) / 'cli.xlsx').exists():
+            print(f"✗ CLI export failed ({status}): {files}")
+            errors += 1
+        else:
+            with open(csv_dir / 'product_features.csv', newline='', encoding='utf-8') as f:
+                labels = [row['label'] for row in csv.DictReader(f)]
+            with open(csv_dir / 'pf_capability_links.csv', newline='', encoding='utf-8') as f:
+                links = [(row['product_feature_label'], row['capability_label']) for row in csv.DictReader(f)]
+            if labels != ['PF-T-1', 'PF-T-2'] or links != [('PF-T-2', 'CA-T-1')]:
+                print(f"✗ Unexpected CSV contents: {labels} {links}")
+                errors += 1
+            else:
+                print("✓ CLI writes one CSV per non-empty table on 3 threads, plus the workbook")
+
+    print("\n" + "="*70)
+    if errors:
+        print(f"✗ {errors} problems found")
+    else:
+        print("TEST COMPLETE - Sheets export works!")
+    print("="*70)
+    return errors
+
+
+if __name__ == '__main__':
+    raise SystemExit(1 if main() else 0)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the gap analysis finds linked features and capabilities reaching
+TRL9 after their variants' due dates, and ranks them by lateness or variants blocked.
+"""
+import csv
+import tempfile
+from pathlib import Path
+
+import database
+from gap_analysis import CSV_HEADER, gap_analysis, write_gap_csv
+
+
+def summary(items):
+    return [(item.label, item.max_days_late, item.variants_blocked) for item in items]
+
+
+def main():
+    print("="*70)
+    print("GAP ANALYSIS TEST")
+    print("="*70)
+
+    errors = 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = database.Database(str(Path(tmp) / 'plan.db'))
+        db.connect()
+        db.create_tables()
+
+        try:
+            # PV-A (due 2026-06-01): PF-T-1 (on time) -> CA-T-1 (2026-07-01, 30 days late)
+            #                        PF-T-2 (2026-09-01, 92 days late)
+            # PV-B (due 2026-03-01): PF-T-1 -> CA-T-1 (122 days late), PF-T-3 (no TRL9)
+            # PV-C (due 2026-12-31): PF-T-1, PF-T-2 (on time)
+            pv_a = db.add_product_variant({'label': 'PV-A', 'title': 'A', 'due_date': '2026-06-01'})
+            pv_b = db.add_product_variant({'label': 'PV-B', 'title': 'B', 'due_date': '2026-03-01'})
+            pv_c = db.add_product_variant({'label': 'PV-C', 'title': 'C', 'due_date': '2026-12-31'})
+            pf1 = db.add_product_feature({'label': 'PF-T-1', 'name': 'F1', 'trl9_date': '2026-02-01'})
+            pf2 = db.add_product_feature({'label': 'PF-T-2', 'name': 'F2', 'trl9_date': '2026-09-01'})
+            pf3 = db.add_product_feature({'label': 'PF-T-3', 'name': 'F3'})
+            cap = db.add_capability({'label': 'CA-T-1', 'name': 'C1', 'trl9_date': '2026-07-01'})
+            for pv, pf in [(pv_a, pf1), (pv_a, pf2), (pv_b, pf1), (pv_b, pf3), (pv_c, pf1), (pv_c, pf2)]:
+                db.link_pv_pf(pv, pf)
+            db.link_pf_capability(pf1, cap)
+
+            items = gap_analysis(db)
+            if summary(items) != [('CA-T-1', 122, 2), ('PF-T-2', 92, 1)]:
+                print(f"✗ Unexpected ranking by lateness: {summary(items)}")
+                errors += 1
+            elif [(gap['pv_label'], gap['days_late'], gap['via']) for gap in items[0].gaps] != \
+                    [('PV-B', 122, 'PF-T-1'), ('PV-A', 30, 'PF-T-1')]:
+                print(f"✗ Unexpected gaps of CA-T-1: {items[0].gaps}")
+                errors += 1
+            else:
+                print("✓ Late capability (via its feature) and feature found; on-time and undated items skipped")
+
+            # A second feature reaching the capability, and a feature blocking more variants
+            pf4 = db.add_product_feature({'label': 'PF-T-4', 'name': 'F4', 'trl9_date': '2026-02-01'})
+            db.link_pv_pf(pv_a, pf4)
+            db.link_pf_capability(pf4, cap)
+            db.update_product_feature(pf2, {**db.get_product_feature_by_id(pf2), 'trl9_date': '2027-01-10'})
+            by_lateness = summary(gap_analysis(db, 'lateness'))
+            by_blocked = summary(gap_analysis(db, 'blocked'))
+            via = gap_analysis(db)[1].gaps[-1]['via']
+            if by_lateness != [('PF-T-2', 223, 2), ('CA-T-1', 122, 2)] or \
+                    by_blocked != [('PF-T-2', 223, 2), ('CA-T-1', 122, 2)] or via != 'PF-T-1, PF-T-4':
+                print(f"✗ Unexpected rankings: {by_lateness} / {by_blocked} (via {via})")
+                errors += 1
+            else:
+                print("✓ Capability reached through two features counted once per variant")
+
+            db.link_pv_pf(pv_c, pf4)
+            db.update_product_variant(pv_c, {**db.get_product_variant_by_label('PV-C'), 'due_date': '2026-06-30'})
+            by_blocked = summary(gap_analysis(db, 'blocked'))
+            if by_blocked != [('CA-T-1', 122, 3), ('PF-T-2', 223, 2)]:
+                print(f"✗ Unexpected ranking by variants blocked: {by_blocked}")
+                errors += 1
+            else:
+                print("✓ Ranking by variants blocked puts the capability first")
+
+            path = Path(tmp) / 'gaps.csv'
+            write_gap_csv(gap_analysis(db, 'blocked'), str(path))
+            with open(path, newline='') as f:
+                rows = list(csv.reader(f))
+            if rows[0] != CSV_HEADER or len(rows) != 6 or rows[1][:3] != ['1', 'Capability', 'CA-T-1']:
+                print(f"✗ Unexpected CSV export: {rows[:2]}")
+                errors += 1
+            else:
+                print("✓ CSV export has one row per gap in ranking order")
+
+            try:
+                gap_analysis(db, 'name')
+                print("✗ Unknown ranking accepted")
+                errors += 1
+            except ValueError:
+                pass
+
+        finally:
+            db.close()
+
+    print("\n" + "="*70)
+    if errors:
+        print(f"✗ {errors} problems found")
+    else:
+        print("TEST COMPLETE - Gap analysis works!")
+    print("="*70)
+    return errors
+
+
+if __name__ == '__main__':
+    raise SystemExit(1 if main() else 0)
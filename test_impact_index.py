@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the impact index follows link changes incrementally and that
+what-if shifts report new due-date gaps without modifying the database.
+"""
+import tempfile
+from pathlib import Path
+
+import database
+import dependency_graph
+from critical_path import CAPABILITY, FEATURE, VARIANT
+from impact_index import TECHNICAL_FUNCTION, ImpactIndex, get_impact_index, what_if_shift
+
+
+def main():
+    print("="*70)
+    print("IMPACT INDEX / WHAT-IF TEST")
+    print("="*70)
+
+    errors = 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = database.Database(str(Path(tmp) / 'plan.db'))
+        db.connect()
+        db.create_tables()
+
+        try:
+            pv1 = db.add_product_variant({'label': 'PV-T1', 'title': 'One', 'due_date': '2026-06-30'})
+            pv2 = db.add_product_variant({'label': 'PV-T2', 'title': 'Two', 'due_date': '2026-12-31'})
+            pf1 = db.add_product_feature({'label': 'PF-T-1.1', 'name': 'F1', 'trl9_date': '2026-03-01'})
+            pf2 = db.add_product_feature({'label': 'PF-T-2.1', 'name': 'F2', 'trl9_date': '2026-03-01'})
+            cap = db.add_capability({'label': 'CA-T-1.1', 'name': 'C', 'trl9_date': '2026-06-20'})
+            tf = db.add_technical_function({'label': 'TF-T-1.1', 'name': 'T'})
+            db.link_pv_pf(pv1, pf1)
+            db.link_pf_capability(pf1, cap)
+            db.link_cap_tf(cap, tf)
+
+            index = get_impact_index(db)
+            if index.impacted_variants((TECHNICAL_FUNCTION, tf)) != [pv1]:
+                print(f"✗ TF should impact PV-T1 only: {index.impacted_variants((TECHNICAL_FUNCTION, tf))}")
+                errors += 1
+            else:
+                print("✓ TF-T-1.1 -> CA-T-1.1 -> PF-T-1.1 -> PV-T1")
+
+            # New links are picked up from the change log without a rebuild
+            db.link_pf_capability(pf2, cap)
+            db.link_pv_pf(pv2, pf2)
+            applied = index.sync(db)
+            fresh = ImpactIndex.load(db)
+            if applied != 2 or index.reach != fresh.reach:
+                print(f"✗ Incremental sync applied {applied} changes, reach differs from rebuild")
+                errors += 1
+            elif index.impacted_variants((CAPABILITY, cap)) != [pv1, pv2]:
+                print("✗ Capability should now impact both variants")
+                errors += 1
+            else:
+                print("✓ 2 link changes applied incrementally (matches a full rebuild)")
+
+            db.unlink_pv_pf(pv1, pf1)
+            index.sync(db)
+            if index.impacted_variants((TECHNICAL_FUNCTION, tf)) != [pv2]:
+                print("✗ Removed link still reported")
+                errors += 1
+            else:
+                print("✓ Unlinking PF-T-1.1 from PV-T1 removes it from the impact set")
+            db.link_pv_pf(pv1, pf1)
+
+            # Shift the capability by 20 days: PV-T1 goes from 10 days early to 10 late
+            result = what_if_shift(db, {(CAPABILITY, cap): 20})
+            gaps = {row['label']: (row['gap_before'], row['gap_after']) for row in result.rows}
+            if gaps != {'PV-T1': (-10, 10), 'PV-T2': (-194, -174)}:
+                print(f"✗ Unexpected gaps: {gaps}")
+                errors += 1
+            else:
+                print("✓ Shift +20 days: PV-T1 -10 -> +10, PV-T2 -194 -> -174")
+
+            if db.get_capability_by_id(cap)['trl9_date'] != '2026-06-20':
+                print("✗ What-if modified the database")
+                errors += 1
+            else:
+                print("✓ Database unchanged by the what-if")
+
+            # Shifting a technical function moves the capabilities that use it
+            result = what_if_shift(db, {(TECHNICAL_FUNCTION, tf): 20})
+            if [row['gap_after'] for row in result.rows] != [10, -174]:
+                print(f"✗ TF shift not applied through its capability: {result.rows}")
+                errors += 1
+            elif sorted(result.features) != sorted([pf1, pf2]) or (FEATURE, pf1) not in index.impacted((TECHNICAL_FUNCTION, tf)):
+                print(f"✗ Unexpected impacted features: {result.features}")
+                errors += 1
+            else:
+                print("✓ TF shift propagates through CA-T-1.1 to both features")
+
+            try:
+                what_if_shift(db, {(VARIANT, pv1): 5})
+                print("✗ Shifting a variant should be rejected")
+                errors += 1
+            except ValueError:
+                pass
+
+            # CA-T-3.1 and CA-T-3.2 depend on each other; CA-T-3.3 depends on the cycle and
+            # is used by PF-T-1.1, so a slip of CA-T-3.2 still reaches PV-T1
+            db.add_capability({'label': 'CA-T-3.1', 'name': 'X', 'dependencies': 'CA-T-3.2'})
+            cap_y = db.add_capability({'label': 'CA-T-3.2', 'name': 'Y', 'dependencies': 'CA-T-3.1'})
+            cap_z = db.add_capability({'label': 'CA-T-3.3', 'name': 'Z', 'dependencies': 'CA-T-3.2'})
+            db.link_pf_capability(pf1, cap_z)
+            index = get_impact_index(db)
+            if index.impacted_variants((CAPABILITY, cap_y)) != [pv1]:
+                print(f"✗ Slip of a cycle member lost its downstream impact: {index.impacted_variants((CAPABILITY, cap_y))}")
+                errors += 1
+            else:
+                print("✓ Capability downstream of a dependency cycle keeps its impact edges")
+
+            # Syncing an index with nothing changed reads no capability rows; an edit to the
+            # dependency text is still picked up
+            reads = []
+            read_sources = dependency_graph._read_sources
+            dependency_graph._read_sources = lambda db, table: reads.append(table) or read_sources(db, table)
+            try:
+                get_impact_index(db)
+                get_impact_index(db)
+                idle_reads = list(reads)
+                db.update_capability(cap, {**db.get_capability_by_id(cap), 'dependencies': 'CA-T-3.3'})
+                index = get_impact_index(db)
+            finally:
+                dependency_graph._read_sources = read_sources
+            if idle_reads or reads != ['capabilities']:
+                print(f"✗ Capability rows read without a change: {idle_reads}, after an edit: {reads}")
+                errors += 1
+            elif index.reach != ImpactIndex.load(db).reach:
+                print("✗ Dependency edit not picked up")
+                errors += 1
+            else:
+                print("✓ Unchanged capabilities are not re-read; a dependency edit rebuilds the index")
+
+            # The log stays bounded however the links are written; an index left behind
+            # the trimmed entries rebuilds instead of replaying
+            cursor = db.connection.cursor()
+            count = database.CHANGE_LOG_LIMIT // 2 + 100
+            for _ in range(count):
+                cursor.execute('DELETE FROM pv_product_features WHERE product_variant_id = ?', (pv2,))
+                cursor.execute('INSERT INTO pv_product_features (product_variant_id, product_feature_id) '
+                               'VALUES (?, ?)', (pv2, pf2))
+            db.connection.commit()
+            cursor.execute('SELECT COUNT(*), MIN(id), MAX(id) FROM link_change_log')
+            size, first, last = cursor.fetchone()
+            stale = ImpactIndex.load(db)
+            stale.last_log_id = 1
+            if size != database.CHANGE_LOG_LIMIT or first != last - size + 1:
+                print(f"✗ Change log not trimmed: {size} entries ({first}..{last})")
+                errors += 1
+            elif stale.sync(db) != -1 or stale.reach != ImpactIndex.load(db).reach:
+                print("✗ Index behind the trimmed log did not rebuild")
+                errors += 1
+            else:
+                print(f"✓ {2 * count} link changes leave the last {size} log entries; stale indexes rebuild")
+
+        finally:
+            db.close()
+
+    print("\n" + "="*70)
+    if errors:
+        print(f"✗ {errors} problems found")
+    else:
+        print("TEST COMPLETE - Impact index and what-if analysis work!")
+    print("="*70)
+    return errors
+
+
+if __name__ == '__main__':
+    raise SystemExit(1 if main() else 0)
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the spreadsheet re-sync (import_data.py --sync) applies only the
+rows that changed, deletes removed rows with their links, and writes nothing on a dry run.
+"""
+import contextlib
+import io
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+import database
+import import_data
+
+SHEETS = {
+    'Product Features': [
+        {'Label': 'PF-T-1', 'Product Feature': 'Feature one', 'Capabilities': 'CA-T-1, CA-T-2',
+         'TRL 9': '2026-06-30'},
+        {'Label': 'PF-T-2', 'Product Feature': 'Feature two', 'Capabilities': 'CA-T-1',
+         'TRL 9': '2026-09-30'},
+    ],
+    'Capabilities': [
+        {'Label': 'CA-T-1', 'Capability': 'Capability one', 'TRL9': '2026-03-31'},
+        {'Label': 'CA-T-2', 'Capability': 'Capability two', 'TRL9': '2026-04-30'},
+    ],
+    'Technical Functions (WIP)': [
+        {'Label': 'TF-T-1', 'Technical Function': 'Function one', 'Capability': 'CA-T-2'},
+    ],
+    'Configurations': [
+        {'Swimlane': 'Platform', 'Label': 'Terberg-1', 'Configuration': 'First platform'},
+    ],
+}
+
+# Tables compared before and after a sync (sync bookkeeping included)
+TABLES = ['product_features', 'capabilities', 'technical_functions', 'configurations',
+          'pf_capabilities', 'cap_technical_functions', 'pv_product_features', 'import_row_hashes']
+
+
+def write_workbook(path, sheets):
+    with pd.ExcelWriter(path, engine='openpyxl') as writer:
+        for name, rows in sheets.items():
+            pd.DataFrame(rows).to_excel(writer, sheet_name=name, index=False)
+
+
+def snapshot(db_path):
+    """Contents of the compared tables, ignoring timestamps."""
+    db = database.Database(str(db_path))
+    db.connect()
+    try:
+        tables = {}
+        for table in TABLES:
+            rows = [dict(row) for row in db.connection.execute(f'SELECT * FROM {table}')]
+            tables[table] = sorted(str(sorted((k, v) for k, v in row.items()
+                                              if k not in ('created_at', 'updated_at', 'synced_at')))
+                                   for row in rows)
+        return tables
+    finally:
+        db.close()
+
+
+def sync(workbook, db_path):
+    """Run the sync quietly; returns the summary."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return import_data.sync_data(str(workbook), str(db_path))
+
+
+def changed(summary):
+    """Non-empty change lists of a sync summary: {table: {kind: keys}}."""
+    return {table: {kind: keys for kind, keys in changes.items() if keys and kind != 'unchanged'}
+            for table, changes in summary.items()
+            if any(keys for kind, keys in changes.items() if kind != 'unchanged')}
+
+
+def main():
+    print("="*70)
+    print("IMPORT SYNC TEST")
+    print("="*70)
+
+    errors = 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / 'plan.db'
+        # One file per version, so the workbook cache never sees an edit within one mtime tick
+        original = Path(tmp) / 'plan_v1.xlsx'
+        write_workbook(original, SHEETS)
+        with contextlib.redirect_stdout(io.StringIO()):
+            import_data.import_data(str(original), str(db_path))
+
+        # A variant added in the app links PF-T-2
+        db = database.Database(str(db_path))
+        db.connect()
+        pv = db.add_product_variant({'label': 'PV-T', 'title': 'Test', 'due_date': '2026-12-31'})
+        db.link_pv_pf(pv, db.get_product_feature_by_label('PF-T-2')['id'])
+        db.close()
+
+        before = snapshot(db_path)
+        summary = sync(original, db_path)
+        if changed(summary) or snapshot(db_path) != before:
+            print(f"✗ Unchanged sheet produced changes: {changed(summary)}")
+            errors += 1
+        else:
+            print("✓ Unchanged sheet is a no-op")
+
+        edited = Path(tmp) / 'plan_v2.xlsx'
+        sheets = {name: [dict(row) for row in rows] for name, rows in SHEETS.items()}
+        sheets['Product Features'][0]['Product Feature'] = 'Feature one, renamed'
+        write_workbook(edited, sheets)
+        summary = sync(edited, db_path)
+        db = database.Database(str(db_path))
+        db.connect()
+        name = db.get_product_feature_by_label('PF-T-1')['name']
+        db.close()
+        if changed(summary) != {'product_features': {'updated': ['PF-T-1']}} or name != 'Feature one, renamed':
+            print(f"✗ Edited row not updated alone: {changed(summary)} ({name})")
+            errors += 1
+        else:
+            print("✓ Edited row is updated, nothing else")
+
+        # Remove PF-T-2 (linked to the variant) and CA-T-2 (linked to PF-T-1 and TF-T-1)
+        removed = Path(tmp) / 'plan_v3.xlsx'
+        sheets['Product Features'] = sheets['Product Features'][:1]
+        sheets['Product Features'][0]['Capabilities'] = 'CA-T-1'
+        sheets['Capabilities'] = sheets['Capabilities'][:1]
+        sheets['Technical Functions (WIP)'][0]['Capability'] = None
+        write_workbook(removed, sheets)
+
+        before = snapshot(db_path)
+        with contextlib.redirect_stdout(io.StringIO()):
+            import_data.main(['--excel', str(removed), '--db', str(db_path), '--sync', '--dry-run'])
+        if snapshot(db_path) != before:
+            print("✗ --dry-run wrote changes")
+            errors += 1
+        else:
+            print("✓ --dry-run writes nothing")
+
+        summary = sync(removed, db_path)
+        after = snapshot(db_path)
+        expected = {
+            'product_features': {'deleted': ['PF-T-2']},
+            'capabilities': {'deleted': ['CA-T-2']},
+        }
+        db = database.Database(str(db_path))
+        db.connect()
+        try:
+            links = {table: db.connection.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+                     for table in ('pf_capabilities', 'cap_technical_functions', 'pv_product_features')}
+            labels = [pf['label'] for pf in db.get_product_features()]
+            caps = [cap['label'] for cap in db.get_capabilities()]
+        finally:
+            db.close()
+        if changed(summary) != expected:
+            print(f"✗ Unexpected changes for removed rows: {changed(summary)}")
+            errors += 1
+        elif labels != ['PF-T-1'] or caps != ['CA-T-1'] or links != {
+                'pf_capabilities': 1, 'cap_technical_functions': 0, 'pv_product_features': 0}:
+            print(f"✗ Removed rows or their links left behind: {labels} {caps} {links}")
+            errors += 1
+        elif changed(sync(removed, db_path)) or snapshot(db_path) != after:
+            print("✗ Second sync of the same sheet changed the database")
+            errors += 1
+        else:
+            print("✓ Removed rows are deleted together with their links (including the app's variant link)")
+
+    print("\n" + "="*70)
+    if errors:
+        print(f"✗ {errors} problems found")
+    else:
+        print("TEST COMPLETE - Import sync works!")
+    print("="*70)
+    return errors
+
+
+if __name__ == '__main__':
+    raise SystemExit(1 if main() else 0)
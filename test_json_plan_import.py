@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the planned JSON import (json_import.py) gives the same database
+as the row-by-row import the GUI used to do, writes nothing on a re-import and updates
+changed records in place.
+"""
+import copy
+import os
+import tempfile
+from pathlib import Path
+
+import database
+from json_import import ENTITY_SPECS, LINK_SPECS, load_json, plan_json_import
+
+JSON_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'engineering_plan_db.json')
+
+
+def row_by_row_import(db, data):
+    """The GUI's original import: add or update each record by its key, then replace
+    every link with the file's links."""
+    for pv in data.get('product_variants', []):
+        existing = db.get_product_variant_by_label(pv['label'])
+        db.update_product_variant(existing['id'], pv) if existing else db.add_product_variant(pv)
+    for pf in data.get('product_features', []):
+        existing = db.get_product_feature_by_label(pf['label'])
+        db.update_product_feature(existing['id'], pf) if existing else db.add_product_feature(pf)
+    for cap in data.get('capabilities', []):
+        existing = db.get_capability_by_label(cap['label'])
+        db.update_capability(existing['id'], cap) if existing else db.add_capability(cap)
+    for tf in data.get('technical_functions', []):
+        existing = db.get_technical_function_by_label(tf['label'])
+        db.update_technical_function(existing['id'], tf) if existing else db.add_technical_function(tf)
+    for config in data.get('configurations', []):
+        existing = next((c for c in db.get_configurations(config['config_type'])
+                         if c['code'] == config['code']), None)
+        db.update_configuration(existing['id'], config) if existing else db.add_configuration(config)
+    for milestone in data.get('milestones', []):
+        existing = next((m for m in db.get_milestones() if m['name'] == milestone['name']), None)
+        db.update_milestone(existing['id'], milestone) if existing else db.add_milestone(milestone)
+
+    cursor = db.connection.cursor()
+    for table, *_ in LINK_SPECS:
+        cursor.execute(f'DELETE FROM {table}')
+    for rel in data.get('pv_product_features_relationships', []):
+        pv = db.get_product_variant_by_label(rel['product_variant_label'])
+        pf = db.get_product_feature_by_label(rel['product_feature_label'])
+        if pv and pf:
+            db.link_pv_pf(pv['id'], pf['id'])
+    for rel in data.get('pf_capabilities_relationships', []):
+        pf = db.get_product_feature_by_label(rel['product_feature_label'])
+        cap = db.get_capability_by_label(rel['capability_label'])
+        if pf and cap:
+            db.link_pf_capability(pf['id'], cap['id'])
+    for rel in data.get('cap_technical_functions_relationships', []):
+        cap = db.get_capability_by_label(rel['capability_label'])
+        tf = db.get_technical_function_by_label(rel['technical_function_label'])
+        if cap and tf:
+            db.link_cap_tf(cap['id'], tf['id'])
+    db.connection.commit()
+
+
+def stale_copy(data):
+    """An older version of the plan: fewer features, renamed capabilities, other links."""
+    stale = copy.deepcopy(data)
+    stale['product_features'] = stale['product_features'][:-10]
+    for cap in stale['capabilities'][:5]:
+        cap['name'] = f"Old {cap['name']}"
+    stale['pf_capabilities_relationships'] = stale['pf_capabilities_relationships'][20:]
+    return stale
+
+
+def open_db(path, data):
+    """Database holding the stale plan plus a feature (and link) added in the app."""
+    db = database.Database(str(path))
+    db.connect()
+    db.create_tables()
+    row_by_row_import(db, stale_copy(data))
+    pf = db.add_product_feature({'label': 'PF-APP-1', 'name': 'Added in the app'})
+    db.link_pf_capability(pf, db.get_capability_by_label(data['capabilities'][0]['label'])['id'])
+    return db
+
+
+def snapshot(db):
+    """Entity contents by key and links by label (ids and timestamps ignored)."""
+    cursor = db.connection.cursor()
+    tables = {}
+    for table, _, _, columns, _ in ENTITY_SPECS:
+        cursor.execute(f'SELECT {", ".join(columns)} FROM {table}')
+        tables[table] = sorted(tuple(str(value) for value in row) for row in cursor.fetchall())
+    for table, _, _, parent_col, child_col, parent_table, child_table, _, _ in LINK_SPECS:
+        cursor.execute(f'''
+            SELECT p.label, c.label FROM {table} l
+            JOIN {parent_table} p ON p.id = l.{parent_col}
+            JOIN {child_table} c ON c.id = l.{child_col}
+        ''')
+        tables[table] = sorted(tuple(row) for row in cursor.fetchall())
+    return tables
+
+
+def main():
+    print("="*70)
+    print("JSON PLAN IMPORT TEST")
+    print("="*70)
+
+    errors = 0
+    data = load_json(JSON_FILE)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        expected_db = open_db(Path(tmp) / 'row_by_row.db', data)
+        planned_db = open_db(Path(tmp) / 'planned.db', data)
+
+        try:
+            row_by_row_import(expected_db, data)
+            plan = plan_json_import(planned_db, data)
+            counts = {table: (len(delta['insert']), len(delta['update']))
+                      for table, delta in plan.entities.items() if delta['insert'] or delta['update']}
+            plan.apply(planned_db)
+            if counts != {'product_features': (10, 0), 'capabilities': (0, 5)}:
+                print(f"✗ Unexpected plan (inserts, updates): {counts}")
+                errors += 1
+            elif snapshot(planned_db) != snapshot(expected_db):
+                print("✗ Planned import differs from the row-by-row import")
+                errors += 1
+            else:
+                print("✓ Planned import gives the same database as the row-by-row import")
+
+            again = plan_json_import(planned_db, data)
+            if not again.is_empty():
+                print("✗ Re-importing the same file would change the database:")
+                print("\n".join(f"    {line}" for line in again.summary_lines()))
+                errors += 1
+            else:
+                print("✓ A second plan for the same file is empty")
+
+            changed = copy.deepcopy(data)
+            changed['product_features'][0]['name'] = 'Renamed feature'
+            plan = plan_json_import(planned_db, changed)
+            updates = [key for _, key, _ in plan.entities['product_features']['update']]
+            count = len(planned_db.get_product_features())
+            plan.apply(planned_db)
+            label = changed['product_features'][0]['label']
+            if (updates != [(label,)] or plan.entities['product_features']['insert']
+                    or len(planned_db.get_product_features()) != count
+                    or planned_db.get_product_feature_by_label(label)['name'] != 'Renamed feature'):
+                print(f"✗ Changed record not updated in place: {updates}")
+                errors += 1
+            else:
+                print("✓ A changed record is updated, not duplicated")
+
+        finally:
+            expected_db.close()
+            planned_db.close()
+
+    print("\n" + "="*70)
+    if errors:
+        print(f"✗ {errors} problems found")
+    else:
+        print("TEST COMPLETE - Planned JSON import works!")
+    print("="*70)
+    return errors
+
+
+if __name__ == '__main__':
+    raise SystemExit(1 if main() else 0)
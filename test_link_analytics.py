@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the sparse link matrices answer reachability, "which variants
+need this item" and coverage questions.
+"""
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+import database
+from critical_path import CAPABILITY, VARIANT
+from impact_index import TECHNICAL_FUNCTION
+from link_analytics import CSRMatrix, LinkAnalytics
+
+
+def main():
+    print("="*70)
+    print("LINK ANALYTICS TEST")
+    print("="*70)
+
+    errors = 0
+
+    dense = np.array([[1, 0, 2], [0, 0, 0], [0, 3, 1]])
+    matrix = CSRMatrix.from_coo(*np.nonzero(dense), dense.shape, dense[np.nonzero(dense)])
+    if not ((matrix @ matrix.transpose()).to_dense() == dense @ dense.T).all():
+        print("✗ Sparse product differs from the dense product")
+        errors += 1
+    else:
+        print("✓ CSR product matches NumPy's dense product")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = database.Database(str(Path(tmp) / 'plan.db'))
+        db.connect()
+        db.create_tables()
+
+        try:
+            # PV-A -> PF-1 -> CA-1 -> TF-1, TF-2
+            # PV-B -> PF-1, PF-2 -> CA-2 -> TF-2
+            # TF-3 is not used by any capability
+            pvs = [db.add_product_variant({'label': label, 'title': label, 'due_date': '2026-12-31'})
+                   for label in ('PV-A', 'PV-B')]
+            pfs = [db.add_product_feature({'label': label, 'name': label}) for label in ('PF-T-1', 'PF-T-2')]
+            caps = [db.add_capability({'label': label, 'name': label}) for label in ('CA-T-1', 'CA-T-2')]
+            tfs = [db.add_technical_function({'label': label, 'name': label}) for label in ('TF-T-1', 'TF-T-2', 'TF-T-3')]
+            db.link_pv_pf(pvs[0], pfs[0])
+            db.link_pv_pf(pvs[1], pfs[0])
+            db.link_pv_pf(pvs[1], pfs[1])
+            db.link_pf_capability(pfs[0], caps[0])
+            db.link_pf_capability(pfs[1], caps[1])
+            db.link_cap_tf(caps[0], tfs[0])
+            db.link_cap_tf(caps[0], tfs[1])
+            db.link_cap_tf(caps[1], tfs[1])
+
+            analytics = LinkAnalytics.load(db)
+            reach = analytics.reach(VARIANT, TECHNICAL_FUNCTION).to_dense()
+            if reach.tolist() != [[1, 1, 0], [1, 2, 0]]:
+                print(f"✗ Unexpected PV->TF path counts: {reach.tolist()}")
+                errors += 1
+            else:
+                print("✓ PV->TF paths: PV-B reaches TF-T-2 via both features")
+
+            if analytics.needed_by(TECHNICAL_FUNCTION, tfs[1]) != pvs or analytics.needs(CAPABILITY, pvs[0]) != [caps[0]]:
+                print("✗ Wrong variants/capabilities for single-item queries")
+                errors += 1
+            else:
+                print("✓ TF-T-2 is needed by both variants; PV-A needs only CA-T-1")
+
+            coverage = analytics.coverage(TECHNICAL_FUNCTION)
+            if coverage != {tfs[0]: 2, tfs[1]: 2, tfs[2]: 0} or analytics.unneeded(TECHNICAL_FUNCTION) != [tfs[2]]:
+                print(f"✗ Unexpected coverage: {coverage}")
+                errors += 1
+            else:
+                print("✓ Coverage counts; TF-T-3 needed by no variant")
+
+            if analytics.overlap(CAPABILITY).tolist() != [[1, 1], [1, 2]]:
+                print(f"✗ Unexpected variant overlap: {analytics.overlap(CAPABILITY).tolist()}")
+                errors += 1
+            else:
+                print("✓ Variants share 1 capability (PV-B needs 2)")
+
+            # Dangling links (deleted entity, no foreign keys) are ignored
+            db.delete_capability(caps[1])
+            if LinkAnalytics.load(db).needs(TECHNICAL_FUNCTION, pvs[1]) != [tfs[0], tfs[1]]:
+                print("✗ Dangling links changed the result")
+                errors += 1
+
+        finally:
+            db.close()
+
+    print("\n" + "="*70)
+    if errors:
+        print(f"✗ {errors} problems found")
+    else:
+        print("TEST COMPLETE - Link analytics works!")
+    print("="*70)
+    return errors
+
+
+if __name__ == '__main__':
+    raise SystemExit(1 if main() else 0)
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the plan validator finds date, link and configuration issues and
+keeps validation_issues current by re-checking only edited items.
+"""
+import tempfile
+from pathlib import Path
+
+import database
+from plan_validator import open_issues, sync, validate_all
+
+
+def rules_of(db, **kwargs):
+    return sorted((issue['rule'], issue['label'], issue['related_label']) for issue in open_issues(db, **kwargs))
+
+
+def main():
+    print("="*70)
+    print("PLAN VALIDATOR TEST")
+    print("="*70)
+
+    errors = 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = database.Database(str(Path(tmp) / 'plan.db'))
+        db.connect()
+        db.create_tables()
+
+        try:
+            pv = db.add_product_variant({'label': 'PV-T', 'title': 'Test', 'due_date': '2026-06-30',
+                                         'platform': 'Terberg-1.2', 'odd': 'CFG-ODD-1.1'})
+            pf = db.add_product_feature({'label': 'PF-T-1.1', 'name': 'Feature', 'platform': 'Terberg-1.1',
+                                         'trl3_date': '2026-02-01', 'trl6_date': '2026-03-01',
+                                         'trl9_date': '2026-05-01'})
+            cap = db.add_capability({'label': 'CA-T-1.1', 'name': 'Cap', 'platform': 'Generic',
+                                     'trl3_date': '2026-02-01', 'trl9_date': '2026-04-01'})
+            db.link_pv_pf(pv, pf)
+            db.link_pf_capability(pf, cap)
+
+            if validate_all(db) != 0:
+                print(f"✗ Consistent plan reported issues: {rules_of(db)}")
+                errors += 1
+            else:
+                print("✓ Consistent plan: no issues (Terberg-1.1 and Generic fit Terberg-1.2)")
+
+            # TRL9 before TRL6, and later than the feature's TRL9 and the variant's due date
+            db.update_capability(cap, {**db.get_capability_by_id(cap), 'trl6_date': '2026-08-01',
+                                       'trl9_date': '2026-07-15', 'odd': 'CFG-ODD-2'})
+            rechecked = sync(db)
+            expected = [('configuration_mismatch', 'PV-T', 'CA-T-1.1'),
+                        ('feature_before_capability', 'PF-T-1.1', 'CA-T-1.1'),
+                        ('trl_order', 'CA-T-1.1', None),
+                        ('variant_late', 'PV-T', None)]
+            if rules_of(db) != expected:
+                print(f"✗ Unexpected issues after capability edit: {rules_of(db)}")
+                errors += 1
+            elif rechecked != 3:
+                print(f"✗ Expected to re-check the capability, feature and variant, got {rechecked}")
+                errors += 1
+            else:
+                print("✓ Capability edit re-checks 3 items: order, feature, configuration and lateness issues")
+
+            message = open_issues(db, rules=['trl_order'])[0]['message']
+            if message != 'TRL6 2026-08-01 is after TRL9 2026-07-15':
+                print(f"✗ Unexpected message: {message}")
+                errors += 1
+
+            # Unlinking the capability clears the issues that went through the link
+            db.unlink_pf_capability(pf, cap)
+            sync(db)
+            if rules_of(db) != [('trl_order', 'CA-T-1.1', None)]:
+                print(f"✗ Issues not cleared after unlinking: {rules_of(db)}")
+                errors += 1
+            else:
+                print("✓ Unlinking clears the link-dependent issues")
+
+            db.update_product_variant(pv, {**db.get_product_variant_by_label('PV-T'), 'due_date': 'Q3'})
+            sync(db)
+            incremental = rules_of(db)
+            validate_all(db)
+            if incremental != rules_of(db) or ('invalid_date', 'PV-T', None) not in incremental:
+                print(f"✗ Incremental issues differ from a full check: {incremental} / {rules_of(db)}")
+                errors += 1
+            elif sync(db) != 0:
+                print("✗ Nothing edited but items were re-checked")
+                errors += 1
+            else:
+                print("✓ Invalid due date flagged; incremental issues match a full check")
+
+        finally:
+            db.close()
+
+    print("\n" + "="*70)
+    if errors:
+        print(f"✗ {errors} problems found")
+    else:
+        print("TEST COMPLETE - Plan validator works!")
+    print("="*70)
+    return errors
+
+
+if __name__ == '__main__':
+    raise SystemExit(1 if main() else 0)
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test script to verify variant roadmaps export to offline HTML files that share one
+versioned plotly.js bundle, and that the CLI works on a database created before the
+derived tables existed.
+"""
+import contextlib
+import io
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
+from pathlib import Path
+
+import plotly
+
+import database
+import roadmap_export
+from roadmap_export import PLOTLY_ASSET_DIR, export_variant_roadmaps
+
+DB_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'product_features.db')
+
+
+def main():
+    print("="*70)
+    print("ROADMAP EXPORT TEST")
+    print("="*70)
+
+    errors = 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = database.Database(str(Path(tmp) / 'plan.db'))
+        db.connect()
+        db.create_tables()
+        out = Path(tmp) / 'roadmaps'
+
+        try:
+            db.add_product_variant({'label': 'PV-A', 'title': 'A', 'due_date': '2026-06-30',
+                                    'platform': 'Terberg-1'})
+            db.add_product_variant({'label': 'PV-B', 'title': 'B', 'due_date': '2026-09-30',
+                                    'platform': 'Terberg-1.1'})
+            db.add_product_variant({'label': 'PV-C', 'title': 'Empty', 'due_date': '2026-12-31',
+                                    'platform': 'Other-1'})
+            db.add_product_feature({'label': 'PF-T-1', 'name': 'F1', 'platform': 'Terberg-1',
+                                    'trl3_date': '2026-01-01', 'trl9_date': '2026-05-01'})
+            db.add_capability({'label': 'CA-T-1', 'name': 'C1', 'platform': 'Terberg-1.1',
+                               'trl6_date': '2026-04-01'})
+
+            written = export_variant_roadmaps(db, str(out), ['html'])
+            names = sorted(os.path.basename(path) for path in written)
+            if names != ['PV-A_roadmap.html', 'PV-B_roadmap.html']:
+                print(f"✗ Unexpected files: {names}")
+                errors += 1
+            else:
+                print("✓ One HTML file per variant with timeline data (PV-C skipped)")
+
+            bundle = f"plotly-{plotly.__version__}.min.js"
+            assets = sorted(os.listdir(out / PLOTLY_ASSET_DIR))
+            if assets != [bundle]:
+                print(f"✗ Expected a single shared bundle, found {assets}")
+                errors += 1
+            else:
+                print(f"✓ Single shared bundle {PLOTLY_ASSET_DIR}/{bundle}")
+
+            for name in names:
+                html = (out / name).read_text(encoding='utf-8')
+                scripts = re.findall(r'<script[^>]*src="([^"]+)"', html)
+                if scripts != [f"{PLOTLY_ASSET_DIR}/{bundle}"] or len(html) > 1_000_000:
+                    print(f"✗ {name} does not reference the shared bundle: {scripts}")
+                    errors += 1
+            if not errors:
+                print("✓ Each HTML file references the bundle instead of embedding plotly.js")
+
+            # Terberg-1.1 includes Terberg-1, so only PV-B matches the capability
+            caps_only = export_variant_roadmaps(db, str(out), ['html'], view='Capabilities')
+            if [os.path.basename(path) for path in caps_only] != ['PV-B_roadmap.html']:
+                print(f"✗ Unexpected Capabilities export: {caps_only}")
+                errors += 1
+            else:
+                print("✓ View and variant configuration restrict the items (PV-A has no capability)")
+
+        finally:
+            db.close()
+
+        # CLI on a copy of the shipped database, which has none of the derived tables
+        plan_db = Path(tmp) / 'shipped.db'
+        shutil.copy(DB_FILE, plan_db)
+        with sqlite3.connect(plan_db) as conn:
+            label = conn.execute('SELECT label FROM product_variants ORDER BY label LIMIT 1').fetchone()[0]
+        cli_out = Path(tmp) / 'cli'
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                status = roadmap_export.main(['--db', str(plan_db), '--output-dir', str(cli_out),
+                                              '--format', 'html', '--variant', label])
+        except Exception as e:
+            status = f"{type(e).__name__}: {e}"
+        if status != 0 or not (cli_out / f"{label}_roadmap.html").exists():
+            print(f"✗ CLI export from a fresh database copy failed: {status}")
+            errors += 1
+        else:
+            print(f"✓ CLI exports {label} from a fresh copy of product_features.db")
+
+    print("\n" + "="*70)
+    if errors:
+        print(f"✗ {errors} problems found")
+    else:
+        print("TEST COMPLETE - Roadmap export works!")
+    print("="*70)
+    return errors
+
+
+if __name__ == '__main__':
+    raise SystemExit(1 if main() else 0)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the Monte Carlo schedule simulation reproduces the critical path
+without slip, orders its percentiles and gives the same results with a process pool.
+"""
+import tempfile
+from datetime import date
+from pathlib import Path
+
+import database
+import schedule_risk
+from schedule_risk import simulate_schedule
+
+AS_OF = date(2026, 1, 1)
+
+
+def main():
+    print("="*70)
+    print("SCHEDULE RISK TEST")
+    print("="*70)
+
+    errors = 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = database.Database(str(Path(tmp) / 'plan.db'))
+        db.connect()
+        db.create_tables()
+
+        try:
+            # PV-T (due 2026-09-01) <- PF-T-1 (TRL9 2026-05-01) <- CA-T-1 (TRL9 2026-07-01)
+            #                       <- PF-T-2 (TRL9 2026-03-01)
+            pv = db.add_product_variant({'label': 'PV-T', 'title': 'Test', 'due_date': '2026-09-01'})
+            undated = db.add_product_variant({'label': 'PV-U', 'title': 'Undated', 'due_date': '2026-09-30'})
+            pf1 = db.add_product_feature({'label': 'PF-T-1', 'name': 'F1', 'trl9_date': '2026-05-01'})
+            pf2 = db.add_product_feature({'label': 'PF-T-2', 'name': 'F2', 'trl9_date': '2026-03-01'})
+            pf3 = db.add_product_feature({'label': 'PF-T-3', 'name': 'F3'})
+            cap = db.add_capability({'label': 'CA-T-1', 'name': 'C1', 'trl9_date': '2026-07-01'})
+            db.link_pv_pf(pv, pf1)
+            db.link_pv_pf(pv, pf2)
+            db.link_pv_pf(undated, pf3)
+            db.link_pf_capability(pf1, cap)
+
+            fixed = simulate_schedule(db, 100, seed=1, slip=(0, 0, 0), as_of=AS_OF)
+            if set(fixed[pv].percentiles.values()) != {date(2026, 7, 1)} or fixed[pv].on_time != 1.0:
+                print(f"✗ Without slip expected the critical path date: {fixed[pv].percentiles}")
+                errors += 1
+            elif fixed[undated].percentiles or fixed[undated].on_time is not None:
+                print("✗ Undated variant got simulated dates")
+                errors += 1
+            else:
+                print("✓ Without slip every trial finishes on the critical path date (2026-07-01)")
+
+            # A certain 50% slip: the capability has 181 days left -> 90 days (round half to even)
+            late = simulate_schedule(db, 100, seed=1, slip=(0.5, 0.5, 0.5), as_of=AS_OF)
+            if late[pv].percentiles[50] != date(2026, 9, 29):
+                print(f"✗ Expected a 90-day slip: {late[pv].percentiles}")
+                errors += 1
+            else:
+                print("✓ Slip scales with the remaining time (50% of 181 days)")
+
+            risks = simulate_schedule(db, 20000, seed=7, as_of=AS_OF)
+            p50, p80, p95 = (risks[pv].percentiles[p] for p in (50, 80, 95))
+            if not (date(2026, 7, 1) < p50 <= p80 <= p95 <= date(2026, 10, 1)) or not 0 < risks[pv].on_time < 1:
+                print(f"✗ Unexpected distribution: {p50} {p80} {p95} on time {risks[pv].on_time}")
+                errors += 1
+            else:
+                print(f"✓ P50 {p50}, P80 {p80}, P95 {p95}, on time {risks[pv].on_time:.0%}")
+
+            # Split the trials into several chunks and run them in worker processes
+            schedule_risk.CHUNK_CELLS = 1000
+            pooled = simulate_schedule(db, 20000, seed=7, as_of=AS_OF, workers=2)
+            serial = simulate_schedule(db, 20000, seed=7, as_of=AS_OF)
+            if (pooled[pv].percentiles, pooled[pv].on_time) != (serial[pv].percentiles, serial[pv].on_time):
+                print("✗ Process pool results differ from the serial run")
+                errors += 1
+            else:
+                print("✓ Same seed gives the same results with a process pool")
+
+            try:
+                simulate_schedule(db, 10, slip=(0.5, 0.1, 0.2))
+                print("✗ Inconsistent slip fractions accepted")
+                errors += 1
+            except ValueError:
+                pass
+
+        finally:
+            db.close()
+
+    print("\n" + "="*70)
+    if errors:
+        print(f"✗ {errors} problems found")
+    else:
+        print("TEST COMPLETE - Schedule risk simulation works!")
+    print("="*70)
+    return errors
+
+
+if __name__ == '__main__':
+    raise SystemExit(1 if main() else 0)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test script to verify feature and variant TRL dates are rolled up from linked
+capabilities and kept current by the database triggers on date and link edits.
+"""
+import tempfile
+from pathlib import Path
+
+import database
+from trl_rollup import FEATURE, VARIANT, feature_drift, stale_rows
+
+
+def main():
+    print("="*70)
+    print("TRL ROLL-UP TEST")
+    print("="*70)
+
+    errors = 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = database.Database(str(Path(tmp) / 'plan.db'))
+        db.connect()
+        db.create_tables()
+
+        try:
+            pv = db.add_product_variant({'label': 'PV-T', 'title': 'Test', 'due_date': '2026-12-31'})
+            pf = db.add_product_feature({'label': 'PF-T-1.1', 'name': 'Feature',
+                                         'trl6_date': '2026-02-01', 'trl9_date': '2026-03-01'})
+            cap_a = db.add_capability({'label': 'CA-T-1.1', 'name': 'A',
+                                       'trl6_date': '2026-04-01', 'trl9_date': '2026-05-01'})
+            cap_b = db.add_capability({'label': 'CA-T-1.2', 'name': 'B', 'trl6_date': '2026-01-01'})
+            db.link_pv_pf(pv, pf)
+            db.link_pf_capability(pf, cap_a)
+            db.link_pf_capability(pf, cap_b)
+
+            row = db.get_trl_rollup(FEATURE)[pf]
+            if (row['trl6_date'], row['trl9_date'], row['undated_children']) != ('2026-04-01', '2026-05-01', 1):
+                print(f"✗ Unexpected feature roll-up: {row}")
+                errors += 1
+            else:
+                print("✓ PF-T-1.1 rolls up TRL6 2026-04-01 / TRL9 2026-05-01 (CA-T-1.2 has no TRL9)")
+
+            # A capability date edit reaches the feature and the variant
+            db.update_capability(cap_b, {**db.get_capability_by_id(cap_b), 'trl9_date': '2026-08-15'})
+            if db.get_trl_rollup(VARIANT)[pv]['trl9_date'] != '2026-08-15':
+                print("✗ Capability date edit not rolled up to the variant")
+                errors += 1
+            else:
+                print("✓ CA-T-1.2 TRL9 edit rolled up to PV-T")
+
+            db.unlink_pf_capability(pf, cap_b)
+            row = db.get_trl_rollup(FEATURE)[pf]
+            if row['trl9_date'] != '2026-05-01' or db.get_trl_rollup(VARIANT)[pv]['trl9_date'] != '2026-05-01':
+                print("✗ Unlinking did not update the roll-up")
+                errors += 1
+            else:
+                print("✓ Unlinking CA-T-1.2 moves PF-T-1.1 and PV-T back to 2026-05-01")
+
+            db.delete_capability(cap_a)
+            if db.get_trl_rollup(FEATURE)[pf]['trl9_date'] != '2026-03-01':
+                print("✗ Deleted capability still rolled up")
+                errors += 1
+            else:
+                print("✓ Deleting CA-T-1.1 leaves the feature's own dates")
+
+            db.link_pf_capability(pf, cap_b)
+            drift = [(item['label'], col) for item, col, _, _ in feature_drift(db)]
+            if drift != [('PF-T-1.1', 'trl9_date')]:
+                print(f"✗ Unexpected drift report: {drift}")
+                errors += 1
+            elif stale_rows(db):
+                print(f"✗ Incremental roll-up differs from a rebuild: {stale_rows(db)}")
+                errors += 1
+            else:
+                print("✓ Drift reported for PF-T-1.1 TRL9; table matches a full rebuild")
+
+        finally:
+            db.close()
+
+    print("\n" + "="*70)
+    if errors:
+        print(f"✗ {errors} problems found")
+    else:
+        print("TEST COMPLETE - TRL roll-up works!")
+    print("="*70)
+    return errors
+
+
+if __name__ == '__main__':
+    raise SystemExit(1 if main() else 0)
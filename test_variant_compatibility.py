@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the materialized variant compatibility table holds linked and
+configuration-matching items and is refreshed incrementally after edits.
+"""
+import tempfile
+from pathlib import Path
+
+import database
+from critical_path import CAPABILITY, FEATURE
+from variant_compatibility import ROADMAP_COLUMNS, rebuild, sync, variant_items
+
+
+def labels(items):
+    return [item['label'] for item in items]
+
+
+def snapshot(db):
+    return sorted(tuple(row) for row in db.connection.execute('SELECT * FROM variant_compatibility'))
+
+
+def main():
+    print("="*70)
+    print("VARIANT COMPATIBILITY TEST")
+    print("="*70)
+
+    errors = 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = database.Database(str(Path(tmp) / 'plan.db'))
+        db.connect()
+        db.create_tables()
+
+        try:
+            pv = db.add_product_variant({'label': 'PV-T', 'title': 'Test', 'due_date': '2026-12-31',
+                                         'platform': 'Terberg-1.2', 'odd': 'CFG-ODD-2', 'trailer': 'CFG-TRL-1'})
+            pf_fit = db.add_product_feature({'label': 'PF-T-1', 'name': 'Fits', 'platform': 'Terberg-1.1',
+                                             'odd': 'CFG-ODD-1.1', 'trailer': 'CFG-TRL-1'})
+            db.add_product_feature({'label': 'PF-T-2', 'name': 'Other trailer', 'platform': 'Terberg-1',
+                                    'odd': 'CFG-ODD-1', 'trailer': 'CFG-TRL-2'})
+            pf_linked = db.add_product_feature({'label': 'PF-T-3', 'name': 'Linked only', 'platform': 'Terberg-2'})
+            cap = db.add_capability({'label': 'CA-T-1', 'name': 'Cap', 'platform': 'Terberg-1.3'})
+            db.link_pv_pf(pv, pf_linked)
+            db.link_pf_capability(pf_linked, cap)
+
+            sync(db)
+            readiness = labels(variant_items(db, pv, FEATURE, linked=False))
+            roadmap = labels(variant_items(db, pv, FEATURE, linked=False, columns=ROADMAP_COLUMNS))
+            if readiness != ['PF-T-1'] or roadmap != ['PF-T-1', 'PF-T-2']:
+                print(f"✗ Unexpected configuration matches: {readiness} / {roadmap}")
+                errors += 1
+            else:
+                print("✓ Config matches: trailer checked for readiness, ignored for roadmaps")
+
+            if (labels(variant_items(db, pv, FEATURE, linked=True)) != ['PF-T-3']
+                    or labels(variant_items(db, pv, CAPABILITY, linked=True)) != ['CA-T-1']
+                    or labels(variant_items(db, pv, CAPABILITY, linked=False))):
+                print("✗ Unexpected linked items")
+                errors += 1
+            else:
+                print("✓ Linked feature and its capability (which does not fit the configuration)")
+
+            # Edits only queue what they touch
+            db.update_capability(cap, {**db.get_capability_by_id(cap), 'platform': 'Terberg-1.1',
+                                       'odd': 'CFG-ODD-1'})
+            db.update_product_feature(pf_fit, {**db.get_product_feature_by_id(pf_fit), 'name': 'Renamed'})
+            refreshed = sync(db)
+            matches = labels(variant_items(db, pv, CAPABILITY, linked=False, columns=ROADMAP_COLUMNS))
+            if refreshed != 1 or matches != ['CA-T-1']:
+                print(f"✗ Expected only the re-configured capability to be refreshed, got {refreshed}")
+                errors += 1
+            else:
+                print("✓ A configuration edit refreshes one item; other edits are ignored")
+
+            db.delete_product_feature(pf_linked)
+            db.update_product_variant(pv, {**db.get_product_variant_by_label('PV-T'), 'trailer': 'CFG-TRL-2'})
+            sync(db)
+            incremental = snapshot(db)
+            rebuild(db)
+            if incremental != snapshot(db):
+                print("✗ Incremental refresh differs from a rebuild")
+                errors += 1
+            elif (labels(variant_items(db, pv, CAPABILITY, linked=True))
+                  or labels(variant_items(db, pv, FEATURE, linked=False)) != ['PF-T-2']):
+                print("✗ Deleted feature still links its capability, or trailer change ignored")
+                errors += 1
+            else:
+                print("✓ Feature deletion and variant edit match a full rebuild")
+
+            # Deleting a capability leaves its pf_capabilities rows behind
+            pf_kept = db.add_product_feature({'label': 'PF-T-4', 'name': 'Kept'})
+            cap_gone = db.add_capability({'label': 'CA-T-2', 'name': 'Deleted'})
+            db.link_pv_pf(pv, pf_kept)
+            db.link_pf_capability(pf_kept, cap_gone)
+            sync(db)
+            db.delete_capability(cap_gone)
+            db.update_product_variant(pv, {**db.get_product_variant_by_label('PV-T'), 'platform': 'Terberg-1.1'})
+            try:
+                sync(db)
+                incremental = snapshot(db)
+                linked = labels(variant_items(db, pv, CAPABILITY, linked=True))
+                rebuild(db)
+                problem = None if incremental == snapshot(db) and linked == [] else f"linked {linked}"
+            except KeyError as e:
+                problem = f"KeyError {e}"
+            if problem:
+                print(f"✗ Dangling link to a deleted capability: {problem}")
+                errors += 1
+            else:
+                print("✓ Links to a deleted capability are ignored by refreshes and rebuilds")
+
+        finally:
+            db.close()
+
+    print("\n" + "="*70)
+    if errors:
+        print(f"✗ {errors} problems found")
+    else:
+        print("TEST COMPLETE - Variant compatibility works!")
+    print("="*70)
+    return errors
+
+
+if __name__ == '__main__':
+    raise SystemExit(1 if main() else 0)
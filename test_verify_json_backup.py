@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test script to verify verify_json_backup.py accepts an exact JSON export and reports
+renamed entities, cleared dates and removed links down to the field.
+"""
+import contextlib
+import copy
+import io
+import json
+import tempfile
+from pathlib import Path
+
+import database
+import verify_json_backup
+from verify_json_backup import ENTITY_TABLES, LINK_TABLES
+
+
+def export(db):
+    """JSON export in the GUI's format: every row, links with ids and labels."""
+    cursor = db.connection.cursor()
+    data = {'export_date': '2026-01-01 00:00:00'}
+    for table, json_key, _ in ENTITY_TABLES:
+        cursor.execute(f'SELECT * FROM {table}')
+        data[json_key] = [dict(row) for row in cursor.fetchall()]
+    for (table, json_key, _, parent_col, child_col, parent_table, child_table,
+         parent_field, child_field) in LINK_TABLES:
+        cursor.execute(f'''
+            SELECT l.{parent_col}, l.{child_col}, p.label, c.label FROM {table} l
+            JOIN {parent_table} p ON p.id = l.{parent_col}
+            JOIN {child_table} c ON c.id = l.{child_col}
+        ''')
+        data[json_key] = [{parent_col: row[0], child_col: row[1], parent_field: row[2], child_field: row[3]}
+                          for row in cursor.fetchall()]
+    return data
+
+
+def verify(db_path, data, path):
+    """Run the verifier CLI on `data`; returns (exit status, output)."""
+    path.write_text(json.dumps(data), encoding='utf-8')
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        status = verify_json_backup.main(['--db', str(db_path), '--json', str(path)])
+    return status, output.getvalue()
+
+
+def main():
+    print("="*70)
+    print("VERIFY JSON BACKUP TEST")
+    print("="*70)
+
+    errors = 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / 'plan.db'
+        db = database.Database(str(db_path))
+        db.connect()
+        db.create_tables()
+        pv = db.add_product_variant({'label': 'PV-T', 'title': 'Test', 'due_date': '2026-12-31'})
+        pf = db.add_product_feature({'label': 'PF-T-1', 'name': 'Feature', 'trl9_date': '2026-06-30'})
+        cap = db.add_capability({'label': 'CA-T-1', 'name': 'Capability', 'maj': 1, 'min': 2})
+        tf = db.add_technical_function({'label': 'TF-T-1', 'name': 'Function'})
+        db.add_configuration({'config_type': 'Platform', 'code': 'Terberg-1', 'description': 'Platform'})
+        db.link_pv_pf(pv, pf)
+        db.link_pf_capability(pf, cap)
+        db.link_cap_tf(cap, tf)
+        data = export(db)
+        db.close()
+        path = Path(tmp) / 'backup.json'
+
+        status, output = verify(db_path, data, path)
+        if status != 0 or 'COMPLETE AND EXACT' not in output:
+            print(f"✗ Exact export rejected:\n{output}")
+            errors += 1
+        else:
+            print("✓ Exact export passes (exit 0)")
+
+        # Each broken backup must fail and name the differing field or link
+        renamed = copy.deepcopy(data)
+        renamed['product_features'][0]['label'] = 'PF-T-9'
+        no_date = copy.deepcopy(data)
+        no_date['product_features'][0]['trl9_date'] = None
+        no_link = copy.deepcopy(data)
+        no_link['pf_capabilities_relationships'] = []
+        cases = [
+            ('Renamed entity', renamed, f"id {pf} label: database='PF-T-1' json='PF-T-9'"),
+            ('Cleared date', no_date, f"id {pf} trl9_date: database='2026-06-30' json=None"),
+            ('Removed link', no_link, f"Missing from JSON (1): ids {pf} -> {cap}"),
+        ]
+        for name, broken, expected in cases:
+            status, output = verify(db_path, broken, path)
+            if status != 1 or expected not in output:
+                print(f"✗ {name}: expected exit 1 reporting \"{expected}\", got {status}:\n{output}")
+                errors += 1
+            else:
+                print(f"✓ {name}: exit 1, {expected.strip()}")
+
+    print("\n" + "="*70)
+    if errors:
+        print(f"✗ {errors} problems found")
+    else:
+        print("TEST COMPLETE - Backup verification works!")
+    print("="*70)
+    return errors
+
+
+if __name__ == '__main__':
+    raise SystemExit(1 if main() else 0)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the shared workbook loader parses a cold workbook (in worker
+processes) into the same frames as pandas, then serves them from the memory and disk
+caches without re-parsing until the contents change.
+"""
+import os
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+import workbook_cache
+from workbook_cache import cache_path, load_sheet, load_sheets, sheet_names
+
+SHEETS = {
+    'Product Features': pd.DataFrame({'Label': ['PF-T-1', 'PF-T-2'], 'Product Feature': ['One', 'Two']}),
+    'Capabilities': pd.DataFrame({'Label': ['CA-T-1'], 'Capability': ['Cap'], 'TRL9': ['2026-03-31']}),
+    'Configurations': pd.DataFrame({'Swimlane': ['Platform'], 'Label': ['Terberg-1']}),
+}
+
+
+def write_workbook(path, sheets):
+    with pd.ExcelWriter(path, engine='openpyxl') as writer:
+        for name, df in sheets.items():
+            df.to_excel(writer, sheet_name=name, index=False)
+
+
+def parses_counted():
+    """Wrap workbook_cache._parse_sheets to record the sheets it parses."""
+    parsed = []
+    original = workbook_cache._parse_sheets
+
+    def counting(excel_file, names, workers):
+        parsed.extend(names)
+        return original(excel_file, names, workers)
+
+    workbook_cache._parse_sheets = counting
+    return parsed, original
+
+
+def main():
+    print("="*70)
+    print("WORKBOOK CACHE TEST")
+    print("="*70)
+
+    errors = 0
+    parsed, original = parses_counted()
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            workbook = Path(tmp) / 'plan.xlsx'
+            write_workbook(workbook, SHEETS)
+
+            # Cold cache: every sheet parsed, two worker processes
+            frames = load_sheets(workbook, workers=2)
+            expected = {name: pd.read_excel(workbook, sheet_name=name) for name in SHEETS}
+            if list(frames) != list(SHEETS) or any(not frames[name].equals(expected[name]) for name in SHEETS):
+                print("✗ Cold parse differs from pd.read_excel")
+                errors += 1
+            elif sorted(parsed) != sorted(SHEETS) or not cache_path(workbook).exists():
+                print(f"✗ Unexpected cold parse: {parsed}, cache written: {cache_path(workbook).exists()}")
+                errors += 1
+            else:
+                print("✓ Cold cache: 3 sheets parsed in worker processes, same frames as pandas")
+
+            # Cache hits: from memory, then from disk in a fresh process state
+            parsed.clear()
+            frames['Product Features'].loc[0, 'Label'] = 'changed'
+            hit = load_sheet(workbook, 'Product Features')
+            workbook_cache._memory_cache.clear()
+            from_disk = load_sheets(workbook)
+            if parsed or not hit.equals(expected['Product Features']):
+                print(f"✗ Memory cache hit re-parsed {parsed} or returned a modified frame")
+                errors += 1
+            elif parsed or any(not from_disk[name].equals(expected[name]) for name in SHEETS):
+                print(f"✗ Disk cache hit re-parsed {parsed}")
+                errors += 1
+            else:
+                print("✓ Cache hits (memory and disk) parse nothing and return copies")
+
+            # Touched but identical: recognised by its hash
+            stat = os.stat(workbook)
+            os.utime(workbook, (stat.st_atime, stat.st_mtime + 60))
+            load_sheets(workbook)
+            if parsed:
+                print(f"✗ Touched workbook re-parsed: {parsed}")
+                errors += 1
+            else:
+                print("✓ A touched but unchanged workbook is not re-parsed")
+
+            # Changed contents: parsed again
+            changed = dict(SHEETS, Capabilities=pd.DataFrame({'Label': ['CA-T-2'], 'Capability': ['New']}))
+            write_workbook(workbook, changed)
+            os.utime(workbook, (stat.st_atime, stat.st_mtime + 120))
+            caps = load_sheet(workbook, 'Capabilities')
+            if parsed != ['Capabilities'] or list(caps['Label']) != ['CA-T-2']:
+                print(f"✗ Changed workbook not re-parsed: {parsed}")
+                errors += 1
+            elif sheet_names(workbook) != list(SHEETS):
+                print(f"✗ Unexpected sheet names: {sheet_names(workbook)}")
+                errors += 1
+            else:
+                print("✓ A changed workbook is re-parsed, only the requested sheet")
+
+            try:
+                load_sheets(workbook, ['Missing'])
+                print("✗ Unknown sheet should be rejected")
+                errors += 1
+            except ValueError:
+                pass
+    finally:
+        workbook_cache._parse_sheets = original
+        workbook_cache._memory_cache.clear()
+
+    print("\n" + "="*70)
+    if errors:
+        print(f"✗ {errors} problems found")
+    else:
+        print("TEST COMPLETE - Workbook cache works!")
+    print("="*70)
+    return errors
+
+
+if __name__ == '__main__':
+    raise SystemExit(1 if main() else 0)
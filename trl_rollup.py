@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+TRL roll-up of product feature and product variant readiness.
+
+The trl_rollup table (created in database.py) holds, for every product feature, the
+latest of its own TRL3/6/9 dates and those of its linked capabilities, and for every
+product variant the latest rolled-up dates of its features. Triggers on the entity date
+columns and on the link tables recompute only the rows an edit affects, so readers
+(Readiness Matrix, roadmaps) use the derived dates without recomputing them.
+Technical functions carry no TRL dates and do not contribute.
+
+Usage:
+    python trl_rollup.py [--db product_features.db]   # features whose own dates are too early
+    python trl_rollup.py --check                       # verify the table against a rebuild
+    python trl_rollup.py --rebuild                     # recompute the whole table
+"""
+import argparse
+import sys
+from typing import Dict, List, Optional, Tuple
+
+from database import TRL_DATE_COLUMNS, Database
+
+# Roll-up entity types
+FEATURE = 'pf'
+VARIANT = 'pv'
+
+
+def with_rolled_up_dates(entities: List[Dict], rollup: Dict[int, Dict]) -> List[Dict]:
+    """Copies of the entities with their TRL dates replaced by the rolled-up ones
+    (an entity keeps its own value where nothing is rolled up)."""
+    result = []
+    for entity in entities:
+        row = rollup.get(entity['id'])
+        entity = dict(entity)
+        if row:
+            for col in TRL_DATE_COLUMNS:
+                if row[col]:
+                    entity[col] = row[col]
+            entity['undated_children'] = row['undated_children']
+        result.append(entity)
+    return result
+
+
+def rolled_up_features(db: Database, entities: List[Dict]) -> List[Dict]:
+    """Product feature rows with their rolled-up TRL dates."""
+    return with_rolled_up_dates(entities, db.get_trl_rollup(FEATURE))
+
+
+def feature_drift(db: Database) -> List[Tuple[Dict, str, Optional[str], str]]:
+    """(feature, column, own date, rolled-up date) for every feature whose own TRL date
+    is missing or earlier than its capabilities allow."""
+    rollup = db.get_trl_rollup(FEATURE)
+    drift = []
+    for pf in db.get_product_features():
+        row = rollup.get(pf['id'])
+        if not row:
+            continue
+        for col in TRL_DATE_COLUMNS:
+            own = (pf.get(col) or '')[:10] or None
+            if row[col] and own != row[col]:
+                drift.append((pf, col, pf.get(col), row[col]))
+    return drift
+
+
+def stale_rows(db: Database) -> List[Tuple[str, int]]:
+    """(entity type, id) of rows that differ from a full rebuild; the table is unchanged."""
+    columns = ('entity_type', 'entity_id') + TRL_DATE_COLUMNS + ('child_count', 'undated_children')
+    query = f"SELECT {', '.join(columns)} FROM trl_rollup"
+    cursor = db.connection.cursor()
+    db.connection.commit()
+    cursor.execute('SAVEPOINT trl_rollup_check')
+    try:
+        current = {row[:2]: tuple(row) for row in cursor.execute(query).fetchall()}
+        db.rebuild_trl_rollup(commit=False)
+        fresh = {row[:2]: tuple(row) for row in cursor.execute(query).fetchall()}
+    finally:
+        cursor.execute('ROLLBACK TO trl_rollup_check')
+        cursor.execute('RELEASE trl_rollup_check')
+    return sorted(key for key in current.keys() | fresh.keys() if current.get(key) != fresh.get(key))
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Rolled-up TRL dates of product features and variants.")
+    parser.add_argument('--db', default='product_features.db', help="SQLite database (default: product_features.db)")
+    parser.add_argument('--check', action='store_true', help="Verify the roll-up table against a full rebuild")
+    parser.add_argument('--rebuild', action='store_true', help="Recompute the whole roll-up table")
+    args = parser.parse_args(argv)
+
+    db = Database(args.db)
+    db.connect()
+    db.create_tables()
+    try:
+        if args.rebuild:
+            db.rebuild_trl_rollup()
+            print(f"✓ Rebuilt roll-up for {len(db.get_trl_rollup(FEATURE))} features "
+                  f"and {len(db.get_trl_rollup(VARIANT))} variants")
+            return 0
+        if args.check:
+            stale = stale_rows(db)
+            if stale:
+                print(f"✗ {len(stale)} stale roll-up rows (run with --rebuild): "
+                      f"{', '.join(f'{kind}:{entity_id}' for kind, entity_id in stale[:20])}")
+                return 1
+            print("✓ Roll-up table matches a full rebuild")
+            return 0
+
+        drift = feature_drift(db)
+        for pf, col, own, derived in drift:
+            print(f"{pf['label']:16} {col:10} own {own or '-':10}  rolled up {derived}")
+        print(f"\n{len(drift)} feature TRL dates missing or earlier than their capabilities allow")
+        variant_rollup = db.get_trl_rollup(VARIANT)
+        for pv in db.get_product_variants():
+            row = variant_rollup.get(pv['id'])
+            if row and row['child_count']:
+                undated = f" ({row['undated_children']} features without TRL9)" if row['undated_children'] else ''
+                print(f"{pv['label']:16} TRL9 {row['trl9_date'] or '-'}{undated}")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
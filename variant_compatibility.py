@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Materialized compatibility between product variants and features/capabilities.
+
+Variant-scoped views need "the features/capabilities of this variant":
+    - the readiness matrix uses the explicit links, falling back to the variant's
+      configuration;
+    - roadmap exports use the configuration.
+Instead of re-deriving that per query, the variant_compatibility table stores one row
+per (variant, feature/capability) pair that is:
+
+    linked          a feature linked to the variant, or a capability linked to one of
+                    those features
+    config match    the item fits the variant on platform, ODD and environment, with the
+                    same hierarchical matching as the GUI filters (included_config_values)
+
+matched_columns is a bitmask over CONFIG_COLUMNS (bit set: the column fits, or the
+variant leaves it empty). Readiness views require every column; roadmap views ignore
+the trailer (ROADMAP_COLUMNS).
+
+Triggers queue variants whose configuration or links change, and features/capabilities
+that are added, deleted, re-configured or re-linked. sync() then refreshes only the rows
+of the queued variants (one bitset pass per variant, config_filter_index.py) and the
+queued items (one row per variant).
+
+Usage:
+    python variant_compatibility.py [PV-LABEL ...] [--db product_features.db] [--rebuild]
+"""
+import argparse
+import json
+import sys
+from typing import Dict, Iterable, List, Optional, Sequence, Set
+
+from config_filter_index import get_filter_index
+from critical_path import CAPABILITY, FEATURE, VARIANT
+from database import CONFIG_COLUMNS, Database, included_config_values
+
+ENTITY_TABLES = {FEATURE: 'product_features', CAPABILITY: 'capabilities'}
+
+# Configuration columns the roadmap views match a variant on
+ROADMAP_COLUMNS = ('platform', 'odd', 'environment')
+
+# Rows are stored for linked items and for items matching at least these columns
+STORED_COLUMNS = ROADMAP_COLUMNS
+
+# Bump when the matching rules change so stored rows are rebuilt
+FINGERPRINT = 'compatibility:1:' + ','.join(CONFIG_COLUMNS)
+
+
+def column_bits(columns: Iterable[str]) -> int:
+    """matched_columns bits of the given configuration columns."""
+    return sum(1 << CONFIG_COLUMNS.index(column) for column in columns)
+
+
+STORED_BITS = column_bits(STORED_COLUMNS)
+
+
+def matched_columns(pv: Dict, entity: Dict) -> int:
+    """Bitmask of the configuration columns on which the entity fits the variant."""
+    mask = 0
+    for i, column in enumerate(CONFIG_COLUMNS):
+        value = pv.get(column)
+        if not value or entity.get(column) in included_config_values(column, value):
+            mask |= 1 << i
+    return mask
+
+
+def _in(column: str, ids: Set[int]):
+    return f"{column} IN (SELECT value FROM json_each(?))", [json.dumps(sorted(ids))]
+
+
+def _linked_pairs(cursor, kind: str, where: str, params: List) -> Set[tuple]:
+    """(variant id, entity id) links between existing rows only (deletes leave link
+    rows behind and foreign keys are not enforced)."""
+    if kind == FEATURE:
+        cursor.execute(f'''
+            SELECT l.product_variant_id, l.product_feature_id FROM pv_product_features l
+            JOIN product_features pf ON pf.id = l.product_feature_id WHERE {where}
+        ''', params)
+    else:
+        cursor.execute(f'''
+            SELECT DISTINCT l.product_variant_id, pc.capability_id FROM pv_product_features l
+            JOIN product_features pf ON pf.id = l.product_feature_id
+            JOIN pf_capabilities pc ON pc.product_feature_id = pf.id
+            JOIN capabilities c ON c.id = pc.capability_id WHERE {where}
+        ''', params)
+    return {(row[0], row[1]) for row in cursor.fetchall()}
+
+
+def _refresh_variants(db: Database, pv_ids: Set[int]):
+    """Replace every row of the given variants."""
+    cursor = db.connection.cursor()
+    where, params = _in('product_variant_id', pv_ids)
+    cursor.execute(f'DELETE FROM variant_compatibility WHERE {where}', params)
+    where, params = _in('id', pv_ids)
+    cursor.execute(f'SELECT * FROM product_variants WHERE {where}', params)
+    pvs = [dict(row) for row in cursor.fetchall()]
+
+    rows = []
+    for kind, table in ENTITY_TABLES.items():
+        index = get_filter_index(db, table)
+        position = {row['id']: i for i, row in enumerate(index.rows)}
+        where, params = _in('l.product_variant_id', pv_ids)
+        links: Dict[int, Set[int]] = {}
+        for pv_id, entity_id in _linked_pairs(cursor, kind, where, params):
+            links.setdefault(pv_id, set()).add(entity_id)
+        for pv in pvs:
+            bits = [index.bits(column, pv[column]) if pv.get(column) else index.all_bits
+                    for column in CONFIG_COLUMNS]
+            stored = index.all_bits
+            for i, column in enumerate(CONFIG_COLUMNS):
+                if column in STORED_COLUMNS:
+                    stored &= bits[i]
+            linked = links.get(pv['id'], set())
+            for entity_id in linked:
+                stored |= 1 << position[entity_id]
+            for i, bit in enumerate(bin(stored)[:1:-1]):
+                if bit == '1':
+                    mask = sum(1 << c for c, column_set in enumerate(bits) if column_set >> i & 1)
+                    entity_id = index.rows[i]['id']
+                    rows.append((pv['id'], kind, entity_id, int(entity_id in linked), mask))
+    cursor.executemany('INSERT INTO variant_compatibility VALUES (?, ?, ?, ?, ?)', rows)
+
+
+def _refresh_entities(db: Database, kind: str, entity_ids: Set[int]):
+    """Replace the rows of the given features or capabilities, for every variant."""
+    cursor = db.connection.cursor()
+    where, params = _in('entity_id', entity_ids)
+    cursor.execute(f'DELETE FROM variant_compatibility WHERE entity_type = ? AND {where}', [kind] + params)
+    where, params = _in('id', entity_ids)
+    cursor.execute(f'SELECT * FROM {ENTITY_TABLES[kind]} WHERE {where}', params)
+    entities = [dict(row) for row in cursor.fetchall()]
+    cursor.execute('SELECT * FROM product_variants')
+    pvs = [dict(row) for row in cursor.fetchall()]
+    column = 'l.product_feature_id' if kind == FEATURE else 'pc.capability_id'
+    where, params = _in(column, entity_ids)
+    links = _linked_pairs(cursor, kind, where, params)
+
+    rows = []
+    for entity in entities:
+        for pv in pvs:
+            mask = matched_columns(pv, entity)
+            linked = (pv['id'], entity['id']) in links
+            if linked or mask & STORED_BITS == STORED_BITS:
+                rows.append((pv['id'], kind, entity['id'], int(linked), mask))
+    cursor.executemany('INSERT INTO variant_compatibility VALUES (?, ?, ?, ?, ?)', rows)
+
+
+def rebuild(db: Database):
+    """Recompute the whole table."""
+    cursor = db.connection.cursor()
+    cursor.execute('DELETE FROM variant_compatibility')
+    cursor.execute('SELECT id FROM product_variants')
+    pv_ids = {row[0] for row in cursor.fetchall()}
+    if pv_ids:
+        _refresh_variants(db, pv_ids)
+    cursor.execute('DELETE FROM compatibility_queue')
+    cursor.execute('INSERT OR REPLACE INTO derived_table_state (table_name, fingerprint, built_at) '
+                   "VALUES ('variant_compatibility', ?, CURRENT_TIMESTAMP)", (FINGERPRINT,))
+    db.connection.commit()
+
+
+def sync(db: Database) -> int:
+    """Refresh the rows of the variants and items changed since the last sync (the whole
+    table the first time or after the rules changed); returns the number of queued
+    variants and items refreshed."""
+    cursor = db.connection.cursor()
+    cursor.execute("SELECT fingerprint FROM derived_table_state WHERE table_name = 'variant_compatibility'")
+    state = cursor.fetchone()
+    if state is None or state[0] != FINGERPRINT:
+        rebuild(db)
+        cursor.execute('SELECT COUNT(*) FROM product_variants')
+        return cursor.fetchone()[0]
+
+    cursor.execute('SELECT rowid, entity_type, entity_id FROM compatibility_queue')
+    queued = cursor.fetchall()
+    if not queued:
+        return 0
+    scope = {VARIANT: set(), FEATURE: set(), CAPABILITY: set()}
+    for row in queued:
+        scope[row['entity_type']].add(row['entity_id'])
+    for kind in (FEATURE, CAPABILITY):
+        if scope[kind]:
+            _refresh_entities(db, kind, scope[kind])
+    if scope[VARIANT]:
+        _refresh_variants(db, scope[VARIANT])
+    cursor.execute('DELETE FROM compatibility_queue WHERE rowid <= ?', (max(row['rowid'] for row in queued),))
+    db.connection.commit()
+    return len(queued)
+
+
+def variant_items(db: Database, pv_id: int, kind: str, linked: Optional[bool] = None,
+                  columns: Optional[Iterable[str]] = CONFIG_COLUMNS) -> List[Dict]:
+    """Features or capabilities of a variant, in label order (the table is synced first).
+
+    linked=True: only linked items; linked=False/None: items matching the variant's
+    configuration on `columns` (linked=None also includes linked items that do not).
+    """
+    sync(db)
+    required = column_bits(columns)
+    if linked:
+        condition = 'v.linked = 1'
+    elif linked is None:
+        condition = f'(v.linked = 1 OR v.matched_columns & {required} = {required})'
+    else:
+        condition = f'v.matched_columns & {required} = {required}'
+    cursor = db.connection.cursor()
+    cursor.execute(f'''
+        SELECT e.* FROM variant_compatibility v
+        JOIN {ENTITY_TABLES[kind]} e ON e.id = v.entity_id
+        WHERE v.product_variant_id = ? AND v.entity_type = ? AND {condition}
+        ORDER BY e.label
+    ''', (pv_id, kind))
+    return [dict(row) for row in cursor.fetchall()]
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description="Features and capabilities compatible with each product variant.")
+    parser.add_argument('variants', nargs='*', help="Product variant labels (default: all)")
+    parser.add_argument('--db', default='product_features.db', help="SQLite database (default: product_features.db)")
+    parser.add_argument('--rebuild', action='store_true', help="Recompute the whole table")
+    args = parser.parse_args(argv)
+
+    db = Database(args.db)
+    db.connect()
+    db.create_tables()
+    try:
+        if args.rebuild:
+            rebuild(db)
+        pvs = {pv['label']: pv for pv in db.get_product_variants()}
+        unknown = [label for label in args.variants if label not in pvs]
+        if unknown:
+            print(f"✗ Unknown product variant(s): {', '.join(unknown)}")
+            return 1
+        print(f"{'Variant':16} {'Linked PF':>10} {'Config PF':>10} {'Linked cap':>11} {'Config cap':>11}")
+        for label in args.variants or sorted(pvs):
+            pv_id = pvs[label]['id']
+            counts = [len(variant_items(db, pv_id, kind, linked)) for kind in (FEATURE, CAPABILITY)
+                      for linked in (True, False)]
+            print(f"{label:16} {counts[0]:>10} {counts[1]:>10} {counts[2]:>11} {counts[3]:>11}")
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
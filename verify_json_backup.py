@@ -1,156 +1,269 @@
+#!/usr/bin/env python3
 """
-Verify that JSON export is a complete database backup.
+Verify that a JSON export is a complete, exact backup of the database.
+
+Each table is read once from SQLite (one SELECT, rows hashed by a SQL function) and
+once from the JSON file. Every row gets a content digest keyed by its id (links by
+their (parent id, child id) pair), and the digests are summed into an order-independent
+table checksum. Tables whose checksums and row counts agree are identical; for the others
+the exact rows that are missing, extra or different are reported, down to the field.
+
+Usage:
+    python verify_json_backup.py [--db product_features.db] [--json engineering_plan_db.json] [--limit 20]
+
+Exit status is 0 when the backup matches the database and 1 otherwise (for CI).
 """
+import argparse
+import json
+import sys
+from typing import Dict, List, Optional, Tuple
+
 import database
-import sqlite3
-
-db = database.Database()
-db.connect()
-
-print("=" * 70)
-print("DATABASE BACKUP VERIFICATION")
-print("=" * 70)
-print()
-
-# Check all tables
-tables = {
-    'product_variants': 'Product Variants',
-    'product_features': 'Product Features',
-    'capabilities': 'Capabilities',
-    'technical_functions': 'Technical Functions',
-    'configurations': 'Configurations',
-    'milestones': 'Milestones',
-    'pv_product_features': 'PV-PF Relationships',
-    'pf_capabilities': 'PF-Capability Relationships',
-    'cap_technical_functions': 'Capability-TF Relationships'
-}
-
-print("DATABASE TABLES:")
-print("-" * 70)
-for table, name in tables.items():
+from json_import import content_hash
+
+# (table, JSON key, display name)
+ENTITY_TABLES = [
+    ('product_variants', 'product_variants', 'Product Variants'),
+    ('product_features', 'product_features', 'Product Features'),
+    ('capabilities', 'capabilities', 'Capabilities'),
+    ('technical_functions', 'technical_functions', 'Technical Functions'),
+    ('configurations', 'configurations', 'Configurations'),
+    ('milestones', 'milestones', 'Milestones'),
+]
+
+# (link table, JSON key, display name, parent column, child column, parent table,
+#  child table, parent label field, child label field)
+LINK_TABLES = [
+    ('pv_product_features', 'pv_product_features_relationships', 'PV-PF Relationships',
+     'product_variant_id', 'product_feature_id', 'product_variants', 'product_features',
+     'product_variant_label', 'product_feature_label'),
+    ('pf_capabilities', 'pf_capabilities_relationships', 'PF-Capability Relationships',
+     'product_feature_id', 'capability_id', 'product_features', 'capabilities',
+     'product_feature_label', 'capability_label'),
+    ('cap_technical_functions', 'cap_technical_functions_relationships', 'Capability-TF Relationships',
+     'capability_id', 'technical_function_id', 'capabilities', 'technical_functions',
+     'capability_label', 'technical_function_label'),
+]
+
+CHECKSUM_MODULUS = 1 << 256
+
+
+def row_digest(*values) -> str:
+    """Digest of one row's values (registered as the SQL function row_digest)."""
+    return content_hash(values)
+
+
+class TableDigest:
+    """Per-key row digests of one table from one source, with an order-independent checksum."""
+
+    def __init__(self):
+        self.digests: Dict[Tuple, str] = {}
+        self.duplicates: List[Tuple] = []
+        self.checksum = 0
+
+    def add(self, key: Tuple, digest: str):
+        if key in self.digests:
+            self.duplicates.append(key)
+        self.digests[key] = digest
+        self.checksum = (self.checksum + int(digest, 16)) % CHECKSUM_MODULUS
+
+    @property
+    def rows(self) -> int:
+        return len(self.digests) + len(self.duplicates)
+
+
+class TableReport:
+    """Comparison of one table between the database and the JSON file."""
+
+    def __init__(self, name: str, db_side: TableDigest, json_side: TableDigest):
+        self.name = name
+        self.db_side = db_side
+        self.json_side = json_side
+        self.missing_fields: List[str] = []
+        self.matches = (db_side.checksum == json_side.checksum and db_side.rows == json_side.rows)
+        db_keys, json_keys = db_side.digests.keys(), json_side.digests.keys()
+        self.missing = [] if self.matches else sorted(db_keys - json_keys)
+        self.extra = [] if self.matches else sorted(json_keys - db_keys)
+        self.changed = [] if self.matches else sorted(
+            key for key in db_keys & json_keys if db_side.digests[key] != json_side.digests[key])
+        # Row-level differences for changed keys: {key: [(field, db value, json value)]}
+        self.field_differences: Dict[Tuple, List[Tuple[str, object, object]]] = {}
+
+    @property
+    def ok(self) -> bool:
+        return self.matches and not self.missing_fields
+
+
+def table_columns(db: database.Database, table: str) -> List[str]:
     cursor = db.connection.cursor()
-    cursor.execute(f"SELECT COUNT(*) FROM {table}")
-    count = cursor.fetchone()[0]
-    print(f"  {name:40} {count:5} records")
-print()
-
-# Check what gets exported
-print("JSON EXPORT COVERAGE:")
-print("-" * 70)
-
-export_sections = {
-    'product_variants': ('get_product_variants', 'Product Variants'),
-    'product_features': ('get_product_features', 'Product Features'),
-    'capabilities': ('get_capabilities', 'Capabilities'),
-    'technical_functions': ('get_technical_functions', 'Technical Functions'),
-    'milestones': ('get_milestones', 'Milestones'),
-}
-
-for section, (method, name) in export_sections.items():
-    func = getattr(db, method)
-    if method == 'get_product_features' or method == 'get_capabilities':
-        data = func({})  # These methods need filters param
-    else:
-        data = func()
-    print(f"  {name:40} {len(data):5} records ✓")
-
-# Configurations (exported by type)
-total_configs = 0
-for config_type in ['Platform', 'ODD', 'Environment', 'Cargo', 'TRL']:
-    configs = db.get_configurations(config_type)
-    total_configs += len(configs)
-print(f"  {'Configurations':40} {total_configs:5} records ✓")
-
-# Relationships (calculated from linked entities)
-pvs = db.get_product_variants()
-pv_pf_links = 0
-for pv in pvs:
-    pv_pf_links += len(db.get_pv_product_features(pv['id']))
-
-pfs = db.get_product_features({})
-pf_cap_links = 0
-for pf in pfs:
-    pf_cap_links += len(db.get_pf_capabilities(pf['id']))
-
-caps = db.get_capabilities({})
-cap_tf_links = 0
-for cap in caps:
-    cap_tf_links += len(db.get_cap_technical_functions(cap['id']))
-
-print(f"  {'PV-PF Relationships':40} {pv_pf_links:5} links ✓")
-print(f"  {'PF-Capability Relationships':40} {pf_cap_links:5} links ✓")
-print(f"  {'Capability-TF Relationships':40} {cap_tf_links:5} links ✓")
-print()
-
-# Check field coverage for each table
-print("FIELD COVERAGE CHECK:")
-print("-" * 70)
-
-def check_table_fields(table_name, entity_name, get_method, needs_filters=False):
-    """Check if all table fields are exported."""
+    cursor.execute(f'PRAGMA table_info({table})')
+    return [row['name'] for row in cursor.fetchall()]
+
+
+def _entity_columns(db_columns: List[str], records: List[Dict]) -> Tuple[List[str], List[str]]:
+    """(columns compared, database columns absent from every JSON record)."""
+    if not records:
+        return db_columns, []
+    exported = set().union(*(record.keys() for record in records))
+    return ([col for col in db_columns if col in exported],
+            [col for col in db_columns if col not in exported])
+
+
+def verify_entity_table(db: database.Database, table: str, name: str,
+                        records: List[Dict]) -> TableReport:
+    """Compare an entity table with its JSON records, keyed by id."""
+    columns, missing_fields = _entity_columns(table_columns(db, table), records)
+
+    db_side = TableDigest()
     cursor = db.connection.cursor()
-    cursor.execute(f"PRAGMA table_info({table_name})")
-    columns = [row[1] for row in cursor.fetchall()]
-    
-    # Get sample record
-    method = getattr(db, get_method)
-    if needs_filters:
-        records = method({})
-    else:
-        records = method()
-    
-    if records:
-        sample = records[0]
-        exported_fields = set(sample.keys())
-        db_fields = set(columns)
-        
-        missing = db_fields - exported_fields
-        extra = exported_fields - db_fields
-        
-        print(f"\n  {entity_name}:")
-        print(f"    Database columns: {len(db_fields)}")
-        print(f"    Exported fields:  {len(exported_fields)}")
-        
-        if missing:
-            print(f"    ⚠️  Missing in export: {missing}")
-            return False
-        elif extra:
-            print(f"    ℹ️  Extra in export (derived): {extra}")
-            return True
-        else:
-            print(f"    ✓ Complete match")
-            return True
-    else:
-        print(f"\n  {entity_name}: No records to check")
-        return True
-
-all_complete = True
-all_complete &= check_table_fields('product_variants', 'Product Variants', 'get_product_variants')
-all_complete &= check_table_fields('product_features', 'Product Features', 'get_product_features', True)
-all_complete &= check_table_fields('capabilities', 'Capabilities', 'get_capabilities', True)
-all_complete &= check_table_fields('technical_functions', 'Technical Functions', 'get_technical_functions')
-all_complete &= check_table_fields('milestones', 'Milestones', 'get_milestones')
-all_complete &= check_table_fields('configurations', 'Configurations', 'get_configurations', needs_filters=True)
-
-print()
-print("=" * 70)
-if all_complete:
-    print("✅ JSON EXPORT IS A COMPLETE DATABASE BACKUP")
+    cursor.execute(f'SELECT id, row_digest({", ".join(columns)}) FROM {table}')
+    for row_id, digest in cursor:
+        db_side.add((row_id,), digest)
+
+    json_side = TableDigest()
+    for record in records:
+        json_side.add((record.get('id'),), row_digest(*(record.get(col) for col in columns)))
+
+    report = TableReport(name, db_side, json_side)
+    report.missing_fields = missing_fields
+
+    # Field-level detail only for the rows known to differ
+    if report.changed:
+        by_id = {record.get('id'): record for record in records}
+        for key in report.changed:
+            cursor.execute(f'SELECT {", ".join(columns)} FROM {table} WHERE id = ?', key)
+            db_row = dict(cursor.fetchone())
+            report.field_differences[key] = [
+                (col, db_row[col], by_id[key[0]].get(col)) for col in columns
+                if row_digest(db_row[col]) != row_digest(by_id[key[0]].get(col))
+            ]
+    return report
+
+
+def verify_link_table(db: database.Database, spec: Tuple, relationships: List[Dict]) -> TableReport:
+    """Compare a link table with its JSON relationships, keyed by (parent id, child id)."""
+    (table, _, name, parent_col, child_col, parent_table, child_table,
+     parent_field, child_field) = spec
+
+    db_side = TableDigest()
+    cursor = db.connection.cursor()
+    cursor.execute(f'''
+        SELECT l.{parent_col}, l.{child_col},
+               row_digest(l.{parent_col}, l.{child_col}, p.label, c.label)
+        FROM {table} l
+        LEFT JOIN {parent_table} p ON p.id = l.{parent_col}
+        LEFT JOIN {child_table} c ON c.id = l.{child_col}
+    ''')
+    for parent_id, child_id, digest in cursor:
+        db_side.add((parent_id, child_id), digest)
+
+    json_side = TableDigest()
+    for rel in relationships:
+        values = (rel.get(parent_col), rel.get(child_col), rel.get(parent_field), rel.get(child_field))
+        json_side.add(values[:2], row_digest(*values))
+
+    report = TableReport(name, db_side, json_side)
+    if report.changed:
+        labels = {(rel.get(parent_col), rel.get(child_col)): (rel.get(parent_field), rel.get(child_field))
+                  for rel in relationships}
+        for key in report.changed:
+            cursor.execute(f'''
+                SELECT p.label, c.label FROM {table} l
+                LEFT JOIN {parent_table} p ON p.id = l.{parent_col}
+                LEFT JOIN {child_table} c ON c.id = l.{child_col}
+                WHERE l.{parent_col} = ? AND l.{child_col} = ?
+            ''', key)
+            db_labels = tuple(cursor.fetchone())
+            report.field_differences[key] = [
+                (field, db_value, json_value)
+                for field, db_value, json_value in zip((parent_field, child_field), db_labels, labels[key])
+                if db_value != json_value
+            ]
+    return report
+
+
+def verify_backup(db: database.Database, data: Dict) -> List[TableReport]:
+    """Compare every table of the database with a loaded JSON export."""
+    db.connection.create_function('row_digest', -1, row_digest, deterministic=True)
+    reports = [verify_entity_table(db, table, name, data.get(json_key, []))
+               for table, json_key, name in ENTITY_TABLES]
+    reports += [verify_link_table(db, spec, data.get(spec[1], [])) for spec in LINK_TABLES]
+    return reports
+
+
+def _format_key(key: Tuple) -> str:
+    return f"id {key[0]}" if len(key) == 1 else f"ids {key[0]} -> {key[1]}"
+
+
+def print_report(reports: List[TableReport], limit: int):
+    print(f"  {'Table':32} {'Database':>9} {'JSON':>9}  Checksum")
+    print("-" * 70)
+    for report in reports:
+        status = "✓" if report.ok else "✗"
+        checksum = f"{report.db_side.checksum:064x}"[:16]
+        print(f"  {report.name:32} {report.db_side.rows:9} {report.json_side.rows:9}  {checksum} {status}")
+
+    for report in reports:
+        if report.ok:
+            continue
+        print(f"\n{report.name}:")
+        if report.missing_fields:
+            print(f"  ⚠️  Fields missing from export: {', '.join(report.missing_fields)}")
+        for label, keys in (("Missing from JSON", report.missing), ("Only in JSON", report.extra),
+                            ("Duplicated in JSON", report.json_side.duplicates)):
+            if keys:
+                shown = ', '.join(_format_key(key) for key in keys[:limit])
+                more = f" ... and {len(keys) - limit} more" if len(keys) > limit else ''
+                print(f"  {label} ({len(keys)}): {shown}{more}")
+        if report.changed:
+            print(f"  Different ({len(report.changed)}):")
+            for key in report.changed[:limit]:
+                for field, db_value, json_value in report.field_differences[key]:
+                    print(f"    {_format_key(key)} {field}: database={db_value!r} json={json_value!r}")
+            if len(report.changed) > limit:
+                print(f"    ... and {len(report.changed) - limit} more")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Verify a JSON export against the database.")
+    parser.add_argument('--db', default='product_features.db', help="SQLite database (default: product_features.db)")
+    parser.add_argument('--json', default='engineering_plan_db.json',
+                        help="JSON export (default: engineering_plan_db.json)")
+    parser.add_argument('--limit', type=int, default=20, help="Rows to list per kind of mismatch (default: 20)")
+    args = parser.parse_args(argv)
+
+    print("=" * 70)
+    print("DATABASE BACKUP VERIFICATION")
+    print("=" * 70)
+    print(f"Database: {args.db}")
+    print(f"Backup:   {args.json}")
     print()
-    print("The export includes:")
-    print("  • All entity tables with all fields")
-    print("  • All relationship/junction tables")
-    print("  • Timestamps (created_at, updated_at)")
-    print("  • All configuration types")
+
+    try:
+        with open(args.json, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"✗ Error: Cannot read {args.json}: {e}")
+        return 1
+
+    db = database.Database(args.db)
+    db.connect()
+    try:
+        reports = verify_backup(db, data)
+    finally:
+        db.close()
+
+    print_report(reports, args.limit)
+
     print()
-    print("The export can be used to:")
-    print("  ✓ Fully restore the database")
-    print("  ✓ Migrate to another system")
-    print("  ✓ Backup and version control")
-    print("  ✓ Data analysis and reporting")
-else:
-    print("⚠️  EXPORT MAY BE INCOMPLETE - CHECK WARNINGS ABOVE")
+    print("=" * 70)
+    if all(report.ok for report in reports):
+        print("✅ JSON EXPORT IS A COMPLETE AND EXACT DATABASE BACKUP")
+    else:
+        print("⚠️  JSON EXPORT DOES NOT MATCH THE DATABASE - SEE DIFFERENCES ABOVE")
+    print("=" * 70)
+    return 0 if all(report.ok for report in reports) else 1
 
-print("=" * 70)
 
-db.close()
+if __name__ == '__main__':
+    sys.exit(main())
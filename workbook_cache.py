@@ -0,0 +1,172 @@
+"""
+Shared loader for the canonical Excel workbook.
+
+Parses each sheet once into a pandas DataFrame (openpyxl in read-only mode, through
+pandas) and caches the parsed frames on disk, keyed by the file's modification time,
+size and SHA-256. Scripts that read the same workbook (import_data.py,
+import_configurations.py, analyze_excel.py) reuse the cache until the file changes;
+a touched-but-identical file is recognised by its hash and does not trigger a re-parse.
+
+With more than one CPU, sheets not yet cached are decoded in parallel worker processes.
+"""
+import hashlib
+import os
+import pickle
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from xml.etree import ElementTree
+
+import pandas as pd
+
+# Directory (next to the workbook) holding the parsed-frame caches
+CACHE_DIR_NAME = '.workbook_cache'
+
+# Bump when the cached structure changes so old caches are ignored
+CACHE_VERSION = 1
+
+SPREADSHEET_NS = {'main': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'}
+
+# Parsed workbooks already loaded by this process: {resolved path: cache entry}
+_memory_cache: Dict[str, Dict] = {}
+
+
+def file_sha256(path) -> str:
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_path(excel_file) -> Path:
+    """Location of the on-disk cache for a workbook."""
+    path = Path(excel_file).resolve()
+    return path.parent / CACHE_DIR_NAME / f"{path.name}.pkl"
+
+
+def read_sheet_names(excel_file) -> List[str]:
+    """Sheet names in workbook order, read from xl/workbook.xml without loading any sheet."""
+    with zipfile.ZipFile(excel_file) as archive:
+        root = ElementTree.fromstring(archive.read('xl/workbook.xml'))
+    return [sheet.get('name') for sheet in root.find('main:sheets', SPREADSHEET_NS)]
+
+
+def _read_sheets(excel_file: str, sheet_names: List[str]) -> Dict[str, pd.DataFrame]:
+    """Parse sheets with a single open of the workbook (also the worker-process task)."""
+    with pd.ExcelFile(excel_file, engine='openpyxl') as book:
+        return {name: book.parse(name) for name in sheet_names}
+
+
+def _parse_sheets(excel_file: str, sheet_names: List[str],
+                  workers: Optional[int]) -> Dict[str, pd.DataFrame]:
+    """Parse sheets, spread over worker processes when more than one is available."""
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(sheet_names))
+    if workers <= 1:
+        return _read_sheets(excel_file, sheet_names)
+
+    # Each worker opens the workbook once and decodes its share of the sheets
+    chunks = [sheet_names[i::workers] for i in range(workers)]
+    frames = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for result in pool.map(_read_sheets, [excel_file] * workers, chunks):
+            frames.update(result)
+    return frames
+
+
+def _load_cache(excel_file) -> Optional[Dict]:
+    """Load the cache entry for a workbook (memory first, then disk)."""
+    key = str(Path(excel_file).resolve())
+    if key in _memory_cache:
+        return _memory_cache[key]
+    path = cache_path(excel_file)
+    if not path.exists():
+        return None
+    try:
+        with open(path, 'rb') as f:
+            entry = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    if entry.get('version') != CACHE_VERSION:
+        return None
+    _memory_cache[key] = entry
+    return entry
+
+
+def _save_cache(excel_file, entry: Dict):
+    """Store a cache entry in memory and on disk (best effort)."""
+    _memory_cache[str(Path(excel_file).resolve())] = entry
+    path = cache_path(excel_file)
+    try:
+        path.parent.mkdir(exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp_path.replace(path)
+    except OSError as e:
+        print(f"  Warning: could not write workbook cache {path}: {e}")
+
+
+def _workbook_entry(excel_file: str, use_cache: bool) -> Dict:
+    """Cache entry for the workbook's current contents (a fresh, empty one if stale)."""
+    stat = os.stat(excel_file)
+
+    entry = _load_cache(excel_file) if use_cache else None
+    if entry and (entry['mtime'], entry['size']) != (stat.st_mtime, stat.st_size):
+        # Modified time changed: only re-parse if the contents really did
+        if entry['size'] == stat.st_size and entry['sha256'] == file_sha256(excel_file):
+            entry['mtime'] = stat.st_mtime
+            _save_cache(excel_file, entry)
+        else:
+            entry = None
+
+    if entry is None:
+        entry = {
+            'version': CACHE_VERSION,
+            'mtime': stat.st_mtime,
+            'size': stat.st_size,
+            'sha256': file_sha256(excel_file),
+            'sheet_names': read_sheet_names(excel_file),
+            'frames': {},
+        }
+        if use_cache:
+            _save_cache(excel_file, entry)
+    return entry
+
+
+def load_sheets(excel_file, sheet_names: Optional[Iterable[str]] = None,
+                use_cache: bool = True, workers: Optional[int] = None) -> Dict[str, pd.DataFrame]:
+    """Return {sheet name: DataFrame} for the requested sheets (all sheets by default).
+
+    The frames are the same as pd.read_excel(excel_file, sheet_name=name) would return.
+    Callers get copies, so modifying a frame does not affect the cache.
+    """
+    excel_file = str(excel_file)
+    entry = _workbook_entry(excel_file, use_cache)
+
+    wanted = list(sheet_names) if sheet_names is not None else list(entry['sheet_names'])
+    unknown = [name for name in wanted if name not in entry['sheet_names']]
+    if unknown:
+        raise ValueError(f"Worksheet(s) not found in {excel_file}: {', '.join(unknown)}")
+
+    missing = [name for name in wanted if name not in entry['frames']]
+    if missing:
+        entry['frames'].update(_parse_sheets(excel_file, missing, workers))
+        if use_cache:
+            _save_cache(excel_file, entry)
+
+    return {name: entry['frames'][name].copy() for name in wanted}
+
+
+def load_sheet(excel_file, sheet_name: str, use_cache: bool = True) -> pd.DataFrame:
+    """Return one sheet as a DataFrame (see load_sheets)."""
+    return load_sheets(excel_file, [sheet_name], use_cache=use_cache)[sheet_name]
+
+
+def sheet_names(excel_file, use_cache: bool = True) -> List[str]:
+    """Names of all sheets in the workbook, in workbook order."""
+    return list(_workbook_entry(str(excel_file), use_cache)['sheet_names'])